@@ -0,0 +1,179 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+import streamlit as st
+from format1 import *
+from table1 import *
+from chart1 import *
+
+
+# Seuils de part cumulée de la dépense (en %) : classe A jusqu'à 80 %, B jusqu'à 95 %, C au-delà
+ABC_THRESHOLDS = (80, 95)
+
+ABC_COLORS = {'A': '#EF4444', 'B': '#F59E0B', 'C': '#10B981'}
+
+# Nombre maximal de classements conservés ; les moins récemment utilisés sont évincés
+ABC_CACHE_SIZE = 128
+
+# Dimensions proposées pour l'analyse ABC : libellé -> colonnes définissant un élément
+ABC_DIMENSIONS = {
+    "Fournisseur": ["Nom du fournisseur"],
+    "Matériel": ["Matériel", "Description du matériel"],
+    "Gamme": ["Prodline Name"]
+}
+
+# Nombre maximal de barres du diagramme de Pareto (la courbe cumulée couvre tous les éléments)
+PARETO_MAX_BARS = 50
+
+
+def abc_classes(spend, thresholds=ABC_THRESHOLDS):
+    """Classement ABC d'une dépense déjà agrégée par élément (un seul tri puis une somme cumulée)
+
+    Un élément est classé A tant que la part cumulée des éléments plus importants est sous
+    le premier seuil (l'élément qui franchit 80 % est donc A), B sous le second seuil, C sinon.
+    Le résultat est mis en cache selon l'empreinte de la dépense agrégée, qui identifie l'état
+    des filtres ; il est partagé et ne doit pas être modifié.
+
+    Args:
+        spend: Series de la dépense, indexée par élément (fournisseur, matériel, gamme...)
+        thresholds: seuils (en %) des classes A et B
+
+    Returns:
+        DataFrame trié par dépense décroissante, indexé comme spend : "Valeur", "Part (%)",
+        "Part cumulée (%)" et "Classe ABC"
+    """
+    cle = (data_fingerprint(spend), tuple(thresholds))
+    stockage = shared_lru("abc", ABC_CACHE_SIZE)
+    table = stockage.get(cle)
+    if table is not None:
+        return table
+
+    valeurs = np.nan_to_num(spend.to_numpy(dtype=float))
+    ordre = np.argsort(-valeurs, kind="stable")
+    tries = valeurs[ordre]
+    total = tries.sum()
+    part = tries / total * 100 if total > 0 else np.zeros(len(tries))
+    part_cumulee = np.cumsum(part)
+    precedente = part_cumulee - part
+    table = pd.DataFrame({
+        "Valeur": tries,
+        "Part (%)": part,
+        "Part cumulée (%)": part_cumulee,
+        "Classe ABC": np.select([precedente < thresholds[0], precedente < thresholds[1]], ["A", "B"], "C")
+    }, index=spend.index[ordre])
+
+    return stockage.put(cle, table)
+
+
+def abc_analysis(df, keys, value_column="Valeur nette de la commande"):
+    """Classement ABC des éléments définis par keys, à partir des lignes de commande filtrées"""
+    spend = df.groupby(list(keys), observed=True)[value_column].sum()
+    return abc_classes(spend)
+
+
+def add_abc_column(table, value_columns, column="Classe ABC"):
+    """Ajoute la classe ABC de chaque ligne d'un tableau déjà agrégé (une ligne = un élément)
+
+    Args:
+        table: tableau agrégé (ordre des lignes conservé)
+        value_columns: colonne de la dépense, ou liste de colonnes à additionner (une par année...)
+        column: nom de la colonne ajoutée
+    """
+    if isinstance(value_columns, str):
+        valeurs = table[value_columns].to_numpy(dtype=float)
+    else:
+        valeurs = table[list(value_columns)].to_numpy(dtype=float).sum(axis=1)
+    classes = abc_classes(pd.Series(valeurs, index=pd.RangeIndex(len(table))))
+    table = table.copy()
+    table[column] = classes["Classe ABC"].reindex(pd.RangeIndex(len(table))).to_numpy()
+    return table
+
+
+def abc_summary(classes):
+    """Synthèse par classe : nombre d'éléments, part des éléments et part de la dépense"""
+    synthese = classes.groupby("Classe ABC").agg(Elements=("Valeur", "size"), Valeur=("Valeur", "sum"))
+    synthese = synthese.reindex(list(ABC_COLORS), fill_value=0)
+    total = synthese["Valeur"].sum()
+    synthese["Part des éléments (%)"] = synthese["Elements"] / max(synthese["Elements"].sum(), 1) * 100
+    synthese["Part de la dépense (%)"] = synthese["Valeur"] / total * 100 if total > 0 else 0.0
+    return synthese.reset_index().rename(columns={"Classe ABC": "Classe", "Elements": "Éléments"})
+
+
+def abc_style(classes):
+    """Couleur de fond de la colonne "Classe ABC" (calculée en bloc pour tout le tableau)"""
+    return conditional_styles(
+        [classes == classe for classe in ABC_COLORS],
+        [f'background-color: {couleur}30; font-weight: bold' for couleur in ABC_COLORS.values()]
+    )
+
+
+def build_pareto_figure(classes, title):
+    """Diagramme de Pareto : dépense par élément (barres colorées par classe) et part cumulée"""
+    affichees = classes.iloc[:PARETO_MAX_BARS]
+    libelles = [" - ".join(str(v) for v in (cle if isinstance(cle, tuple) else (cle,))) for cle in affichees.index]
+    rangs = np.arange(1, len(classes) + 1)
+
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
+    fig.add_trace(go.Bar(
+        x=rangs[:len(affichees)], y=affichees["Valeur"], name="Dépense (€)",
+        marker_color=[ABC_COLORS[c] for c in affichees["Classe ABC"]],
+        customdata=np.column_stack([libelles, affichees["Classe ABC"]]),
+        hovertemplate="%{customdata[0]}<br>Classe %{customdata[1]}<br>%{y:,.0f} €<extra></extra>"
+    ), secondary_y=False)
+    fig.add_trace(go.Scatter(
+        x=rangs, y=classes["Part cumulée (%)"], name="Part cumulée (%)", mode="lines",
+        line=dict(color="#1E293B", width=2),
+        hovertemplate="Rang %{x}<br>%{y:.1f} % de la dépense<extra></extra>"
+    ), secondary_y=True)
+    for seuil in ABC_THRESHOLDS:
+        fig.add_hline(y=seuil, line_dash="dash", line_color="#64748B", secondary_y=True,
+                      annotation_text=f"{seuil} %", annotation_position="bottom right")
+    fig.update_yaxes(title_text="Dépense (€)", secondary_y=False)
+    fig.update_yaxes(title_text="Part cumulée (%)", range=[0, 105], secondary_y=True)
+    fig.update_layout(
+        title=title,
+        xaxis_title="Rang (par dépense décroissante)",
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        height=450
+    )
+    return fig
+
+
+def show_abc_analysis(df, key, title, dimensions=tuple(ABC_DIMENSIONS)):
+    """Affiche l'analyse ABC (Pareto et synthèse par classe) des lignes de commande filtrées
+
+    Args:
+        df: DataFrame des commandes filtré
+        key: préfixe unique des widgets
+        title: complément du titre du graphique (période, gamme...)
+        dimensions: dimensions proposées (clés de ABC_DIMENSIONS)
+    """
+    if df.empty:
+        return
+
+    st.markdown("<h6 style='color: #000000; margin-top: 20px;'>Analyse ABC de la dépense</h6>", unsafe_allow_html=True)
+    dimension = st.radio("Analyse ABC par", list(dimensions), horizontal=True, key=f"{key}_abc_dimension")
+    classes = abc_analysis(df, ABC_DIMENSIONS[dimension])
+    if classes.empty:
+        return
+
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        st.plotly_chart(
+            cached_figure(build_pareto_figure, classes, f"Pareto de la dépense par {dimension.lower()} - {title}"),
+            use_container_width=True
+        )
+    with col2:
+        synthese = abc_summary(classes)
+        render_table(
+            synthese,
+            row_styles={"Classe": abc_style(synthese["Classe"])},
+            column_config=numeric_column_config(
+                currency=["Valeur"], thousands=["Éléments"],
+                percent=["Part des éléments (%)", "Part de la dépense (%)"]
+            )
+        )
+        st.caption(f"A : {ABC_THRESHOLDS[0]} % de la dépense, B : {ABC_THRESHOLDS[1] - ABC_THRESHOLDS[0]} %, C : le reste.")
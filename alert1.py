@@ -0,0 +1,256 @@
+import operator
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from file1 import *
+from compare1 import STATUS_ORDER, delivery_status
+from rolling1 import ON_TIME_MAX_GAP
+
+
+# Niveaux d'analyse des règles : libellé -> colonne du fichier des délais
+ALERT_LEVELS = {"Fournisseur": "Nom du fournisseur", "Gamme": "Prodline Name", "Matériel": "Matériel"}
+
+# Indicateurs disponibles : clé -> libellé
+ALERT_METRICS = {
+    "a_temps": "Livraisons à temps (%)",
+    "ecart": "Écart moyen (j)",
+    "long": "Part Long délai (%)"
+}
+
+ALERT_OPERATORS = {"<": operator.lt, ">": operator.gt}
+
+# Règles par défaut ; "comparaison" = "N-1" compare la fenêtre à la même fenêtre un an plus tôt (écart de valeur)
+DEFAULT_RULES = [
+    {"Règle": "Livraisons à temps sur 3 mois < 70 %", "Niveau": "Fournisseur", "Indicateur": "a_temps",
+     "Fenêtre (mois)": 3, "Comparaison": "", "Opérateur": "<", "Seuil": 70.0},
+    {"Règle": "Écart moyen en hausse de plus de 5 j sur un an", "Niveau": "Fournisseur", "Indicateur": "ecart",
+     "Fenêtre (mois)": 3, "Comparaison": "N-1", "Opérateur": ">", "Seuil": 5.0},
+    {"Règle": "Part Long délai sur 3 mois > 30 %", "Niveau": "Gamme", "Indicateur": "long",
+     "Fenêtre (mois)": 3, "Comparaison": "", "Opérateur": ">", "Seuil": 30.0},
+]
+
+# Nombre minimal de lignes dans une fenêtre pour qu'une règle soit évaluée
+ALERT_MIN_LINES = 5
+
+# Colonnes dont le contenu identifie une ligne de livraison (empreinte des cellules)
+ALERT_HASH_COLUMNS = ["Bon de commande", "Fournisseur", "Matériel", "Date de comptabilisation", "Délai réel", "Délai théorique"]
+
+ALERT_COLUMNS = ["Règle", "Niveau", "Élément", "Valeur", "Seuil", "Mois", "Détectée le"]
+
+
+def alert_cells(df, column):
+    """Agrégats mensuels (élément x mois) sur lesquels les règles sont évaluées
+
+    Chaque cellule porte une empreinte (somme des empreintes de ses lignes) qui permet de
+    savoir, au chargement suivant, si de nouvelles données l'ont modifiée.
+
+    Args:
+        df: DataFrame des délais de livraison
+        column: colonne définissant les éléments (fournisseur, gamme, matériel)
+
+    Returns:
+        DataFrame : "Élément", "_mois" (année x 12 + mois - 1), "lignes", "a_temps", "long",
+        "somme_ecart", "nb_ecart" et "empreinte"
+    """
+    donnees = df.dropna(subset=["Year", "Month", column])
+    ecart = pd.to_numeric(donnees["Écart de délai"], errors="coerce").to_numpy(dtype=float)
+    colonnes = [col for col in ALERT_HASH_COLUMNS if col in donnees.columns]
+    cellules = pd.DataFrame({
+        "Élément": donnees[column].astype(str).to_numpy(),
+        "_mois": donnees["Year"].to_numpy(dtype=int) * 12 + donnees["Month"].to_numpy(dtype=int) - 1,
+        "lignes": 1,
+        "a_temps": (ecart <= ON_TIME_MAX_GAP).astype(int),
+        "long": (delivery_status(ecart) == STATUS_ORDER[3]).astype(int),
+        "somme_ecart": np.nan_to_num(ecart),
+        "nb_ecart": (~np.isnan(ecart)).astype(int),
+        "empreinte": pd.util.hash_pandas_object(donnees[colonnes], index=False).to_numpy()
+    })
+    return cellules.groupby(["Élément", "_mois"], sort=False).sum().reset_index()
+
+
+def _metric(sommes, indicateur):
+    """Valeur d'un indicateur à partir des sommes d'une fenêtre (NaN si trop peu de lignes)"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if indicateur == "a_temps":
+            valeur = sommes["a_temps"] / sommes["lignes"] * 100
+        elif indicateur == "long":
+            valeur = sommes["long"] / sommes["lignes"] * 100
+        else:
+            valeur = sommes["somme_ecart"] / sommes["nb_ecart"]
+    return valeur.where(sommes["lignes"] >= ALERT_MIN_LINES)
+
+
+def _window(cellules, anchor, fenetre):
+    """Sommes par élément des cellules des `fenetre` mois se terminant au mois anchor"""
+    mois = cellules["_mois"].to_numpy()
+    dans = (mois > anchor - fenetre) & (mois <= anchor)
+    return cellules[dans].groupby("Élément")[["lignes", "a_temps", "long", "somme_ecart", "nb_ecart"]].sum()
+
+
+def evaluate_rule(cellules, rule, anchor, elements=None):
+    """Évalue une règle au mois anchor pour les éléments donnés (tous si None)
+
+    Returns:
+        DataFrame des alertes déclenchées (colonnes ALERT_COLUMNS sans "Détectée le")
+    """
+    if elements is not None:
+        cellules = cellules[cellules["Élément"].isin(elements).to_numpy()]
+    fenetre = int(rule["Fenêtre (mois)"])
+    valeur = _metric(_window(cellules, anchor, fenetre), rule["Indicateur"])
+    if rule.get("Comparaison") == "N-1":
+        precedente = _metric(_window(cellules, anchor - 12, fenetre), rule["Indicateur"])
+        valeur = (valeur - precedente.reindex(valeur.index)).dropna()
+    valeur = valeur.dropna()
+    declenchees = valeur[ALERT_OPERATORS[rule["Opérateur"]](valeur, float(rule["Seuil"]))]
+    return pd.DataFrame({
+        "Règle": rule["Règle"],
+        "Niveau": rule["Niveau"],
+        "Élément": declenchees.index.to_numpy(),
+        "Valeur": declenchees.to_numpy(),
+        "Seuil": float(rule["Seuil"]),
+        "Mois": f"{month_name(anchor % 12 + 1)} {anchor // 12}"
+    })
+
+
+def _touched_elements(cellules, anciennes):
+    """Éléments dont au moins une cellule est nouvelle, disparue ou modifiée (empreinte ou volume)"""
+    comparaison = cellules[["Élément", "_mois", "empreinte", "lignes"]].merge(
+        anciennes[["Élément", "_mois", "empreinte", "lignes"]],
+        on=["Élément", "_mois"], how="outer", suffixes=("", "_avant")
+    )
+    modifiees = (
+        comparaison["empreinte"].ne(comparaison["empreinte_avant"]) |
+        comparaison["lignes"].ne(comparaison["lignes_avant"])
+    )
+    return comparaison.loc[modifiees.to_numpy(), "Élément"].unique()
+
+
+def refresh_alerts(df, state=None, rules=None):
+    """Met à jour les alertes après un chargement de données
+
+    Les agrégats mensuels de chaque niveau sont recalculés puis comparés à ceux du chargement
+    précédent : seules les règles des éléments dont une cellule a changé sont réévaluées, les
+    autres alertes sont conservées telles quelles. Si le dernier mois des données change, les
+    fenêtres glissent pour tous les éléments, qui sont alors tous réévalués.
+
+    Args:
+        df: DataFrame des délais de livraison chargé
+        state: état renvoyé par le chargement précédent (None au premier chargement)
+        rules: liste des règles (celles de l'état, ou DEFAULT_RULES)
+
+    Returns:
+        Nouvel état : {"rules", "cells", "anchor", "alerts", "evaluated", "total"}
+    """
+    state = state or {}
+    rules = rules or state.get("rules") or DEFAULT_RULES
+    mois = df["Year"].to_numpy(dtype=float) * 12 + df["Month"].to_numpy(dtype=float) - 1
+    anchor = int(np.nanmax(mois))
+    maintenant = pd.Timestamp.now().floor("s")
+    anciennes_alertes = state.get("alerts", pd.DataFrame(columns=ALERT_COLUMNS))
+
+    cells, reevalues, total, alertes = {}, 0, 0, []
+    for niveau in dict.fromkeys(rule["Niveau"] for rule in rules):
+        cellules = alert_cells(df, ALERT_LEVELS[niveau])
+        cells[niveau] = cellules
+        anciennes = state.get("cells", {}).get(niveau)
+        if anciennes is None or state.get("anchor") != anchor or state.get("rules") != rules:
+            elements = None
+            reevalues += cellules["Élément"].nunique()
+        else:
+            elements = _touched_elements(cellules, anciennes)
+            reevalues += len(elements)
+        total += cellules["Élément"].nunique()
+
+        precedentes = anciennes_alertes[anciennes_alertes["Niveau"] == niveau]
+        if elements is not None:
+            # Alertes conservées : éléments non touchés par les nouvelles données
+            alertes.append(precedentes[~precedentes["Élément"].isin(elements)])
+        for rule in (r for r in rules if r["Niveau"] == niveau):
+            alertes.append(evaluate_rule(cellules, rule, anchor, elements))
+
+    alertes = pd.concat([a for a in alertes if not a.empty] or [pd.DataFrame(columns=ALERT_COLUMNS)], ignore_index=True)
+    # Date de détection : conservée pour une alerte déjà active, date du chargement sinon
+    dates = anciennes_alertes.set_index(["Règle", "Élément"])["Détectée le"] if not anciennes_alertes.empty else pd.Series(dtype=object)
+    cles = pd.MultiIndex.from_frame(alertes[["Règle", "Élément"]]) if not alertes.empty else pd.MultiIndex.from_tuples([], names=["Règle", "Élément"])
+    alertes["Détectée le"] = dates[~dates.index.duplicated()].reindex(cles).to_numpy() if len(dates) else pd.NaT
+    alertes["Nouvelle"] = pd.isna(alertes["Détectée le"])
+    alertes["Détectée le"] = alertes["Détectée le"].fillna(maintenant)
+
+    return {"rules": rules, "cells": cells, "anchor": anchor, "alerts": alertes, "evaluated": reevalues, "total": total}
+
+
+def reevaluate_rules(state, rules, df):
+    """Réévalue toutes les règles (modifiées) sur les agrégats stockés
+
+    Seul un niveau absent des agrégats (première règle portant sur ce niveau) est agrégé à
+    partir des lignes de df.
+    """
+    cells = dict(state["cells"])
+    alertes = []
+    for niveau in dict.fromkeys(rule["Niveau"] for rule in rules):
+        if niveau not in cells:
+            cells[niveau] = alert_cells(df, ALERT_LEVELS[niveau])
+        for rule in (r for r in rules if r["Niveau"] == niveau):
+            alertes.append(evaluate_rule(cells[niveau], rule, state["anchor"]))
+    alertes = pd.concat([a for a in alertes if not a.empty] or [pd.DataFrame(columns=ALERT_COLUMNS)], ignore_index=True)
+    alertes["Détectée le"] = pd.Timestamp.now().floor("s")
+    alertes["Nouvelle"] = True
+    total = sum(cellules["Élément"].nunique() for cellules in cells.values())
+    return {**state, "rules": rules, "cells": cells, "alerts": alertes, "evaluated": total, "total": total}
+
+
+def show_alerts(state, df, key="alertes"):
+    """Affiche le tableau des alertes actives et l'éditeur des règles (page d'accueil)
+
+    Args:
+        state: état des alertes (voir refresh_alerts)
+        df: DataFrame des délais chargé (agrégation d'un nouveau niveau de règle)
+        key: préfixe unique des widgets
+    """
+    if not state:
+        return
+    alertes = state["alerts"]
+    st.markdown("<h4 style='color: #1E88E5;'>🔔 Alertes</h4>", unsafe_allow_html=True)
+    st.caption(
+        f"Évaluées au mois de {month_name(state['anchor'] % 12 + 1).lower()} {state['anchor'] // 12} : "
+        f"{state['evaluated']} éléments réévalués sur {state['total']} lors du dernier chargement."
+    )
+    if alertes.empty:
+        st.success("Aucune alerte active.")
+    else:
+        nouvelles = int(alertes["Nouvelle"].sum())
+        if nouvelles:
+            st.warning(f"{nouvelles} nouvelle(s) alerte(s) depuis le chargement précédent.")
+        tableau = alertes.sort_values(["Nouvelle", "Règle", "Valeur"], ascending=[False, True, True], kind="mergesort")
+        paged_table(
+            tableau,
+            key=f"{key}_table",
+            row_styles={"Nouvelle": np.where(tableau["Nouvelle"].to_numpy(), "background-color: #FFECB3", "")},
+            column_config=numeric_column_config(decimals={"Valeur": 1, "Seuil": 1}),
+            filter_columns=["Règle", "Niveau"],
+            file_name="alertes.csv"
+        )
+
+    with st.expander("Règles d'alerte", expanded=False):
+        regles = st.data_editor(
+            pd.DataFrame(state["rules"]),
+            key=f"{key}_regles",
+            num_rows="dynamic",
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                "Niveau": st.column_config.SelectboxColumn(options=list(ALERT_LEVELS), required=True),
+                "Indicateur": st.column_config.SelectboxColumn(options=list(ALERT_METRICS), required=True),
+                "Fenêtre (mois)": st.column_config.NumberColumn(min_value=1, max_value=24, step=1, required=True),
+                "Comparaison": st.column_config.SelectboxColumn(options=["", "N-1"]),
+                "Opérateur": st.column_config.SelectboxColumn(options=list(ALERT_OPERATORS), required=True),
+                "Seuil": st.column_config.NumberColumn(required=True)
+            }
+        )
+        st.caption(", ".join(f"{cle} : {libelle}" for cle, libelle in ALERT_METRICS.items()))
+        if st.button("Appliquer les règles", key=f"{key}_appliquer"):
+            regles = regles.dropna(subset=["Règle", "Niveau", "Indicateur", "Fenêtre (mois)", "Opérateur", "Seuil"])
+            regles["Comparaison"] = regles["Comparaison"].fillna("")
+            st.session_state.alerts = reevaluate_rules(state, regles.to_dict("records"), df)
+            st.rerun()
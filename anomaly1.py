@@ -0,0 +1,165 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+from table1 import *
+from format1 import *
+from load1 import order_keys, order_line_keys
+
+
+# Mesure contrôlée et seuil du score robuste (|z| > 3,5 : valeur aberrante selon Iglewicz et Hoaglin)
+ANOMALY_MEASURE = "Délai réel"
+ANOMALY_THRESHOLD = 3.5
+
+# Nombre minimal de lignes d'un groupe pour que son score soit calculé
+ANOMALY_MIN_LINES = 5
+
+# Colonnes ajoutées au fichier des délais lors de l'import
+ANOMALY_SCORE = "Score d'anomalie"
+ANOMALY_LINE = "Anomalie (ligne)"
+ANOMALY_ORDER = "Anomalie (commande)"
+
+# Portées possibles de l'exclusion
+ANOMALY_SCOPES = {"lignes": "Lignes anomales", "commandes": "Commandes entières"}
+
+
+def robust_zscores(values, groups, min_lines=ANOMALY_MIN_LINES):
+    """Score z robuste de chaque valeur dans son groupe : 0,6745 × (x - médiane) / MAD
+
+    Médianes et MAD sont calculées pour tous les groupes à la fois (groupby + transform).
+    Si la MAD d'un groupe est nulle (plus de la moitié des valeurs identiques), l'écart absolu
+    moyen est utilisé à sa place (× 1,2533) ; si lui aussi est nul, le score vaut 0.
+
+    Args:
+        values: Series numérique
+        groups: colonne(s) de regroupement (Series ou liste de Series alignées sur values)
+        min_lines: nombre minimal de valeurs du groupe (NaN en dessous)
+
+    Returns:
+        Series des scores (NaN pour les valeurs manquantes ou les petits groupes)
+    """
+    groupes = values.groupby(groups, observed=True, dropna=False)
+    mediane = groupes.transform("median")
+    ecart = (values - mediane).abs()
+    groupes_ecart = ecart.groupby(groups, observed=True, dropna=False)
+    mad = groupes_ecart.transform("median").to_numpy()
+    ecart_moyen = groupes_ecart.transform("mean").to_numpy()
+    effectif = groupes.transform("count").to_numpy()
+
+    echelle = np.where(mad > 0, mad / 0.6745, ecart_moyen * 1.2533)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scores = np.where(echelle > 0, (values - mediane).to_numpy() / echelle, 0.0)
+    scores = np.where((effectif >= min_lines) & values.notna().to_numpy(), scores, np.nan)
+    return pd.Series(scores, index=values.index)
+
+
+def score_anomalies(df):
+    """Étape d'import : score et signale les livraisons et commandes anomales
+
+    Chaque ligne est comparée à l'historique de son matériel (tous fournisseurs) et à celui
+    de son fournisseur. Le score retenu est celui du matériel, ou celui du fournisseur si le
+    matériel a trop peu de livraisons. Une commande est anomale si l'une de ses lignes l'est.
+    Les vues n'ont ensuite qu'à lire ces colonnes pour exclure les anomalies.
+
+    Args:
+        df: DataFrame des délais de livraison
+
+    Returns:
+        Copie du DataFrame avec les colonnes "Score matériel", "Score fournisseur",
+        ANOMALY_SCORE, ANOMALY_LINE et ANOMALY_ORDER
+    """
+    valeurs = pd.to_numeric(df[ANOMALY_MEASURE], errors="coerce")
+    score_materiel = robust_zscores(valeurs, df["Matériel"])
+    score_fournisseur = robust_zscores(valeurs, df["Fournisseur"])
+    score = score_materiel.fillna(score_fournisseur)
+    ligne = (score.abs() > ANOMALY_THRESHOLD).to_numpy()
+
+    resultat = df.copy()
+    resultat["Score matériel"] = score_materiel.to_numpy()
+    resultat["Score fournisseur"] = score_fournisseur.to_numpy()
+    resultat[ANOMALY_SCORE] = score.to_numpy()
+    resultat[ANOMALY_LINE] = ligne
+    resultat[ANOMALY_ORDER] = pd.Series(ligne, index=df.index).groupby(df["Bon de commande"], dropna=False).transform("any").to_numpy()
+    return resultat
+
+
+def exclude_anomalous_orders(df, df2, scope):
+    """Retire des commandes (fichier 2) celles qui correspondent aux livraisons anomales
+
+    Args:
+        df: DataFrame des délais de livraison (avec les colonnes d'anomalie)
+        df2: DataFrame des commandes
+        scope: clé de ANOMALY_SCOPES ; "lignes" retire les lignes de commande (bon de
+            commande, fournisseur, matériel) d'une livraison anomale, "commandes" retire
+            tous les bons de commande contenant une livraison anomale
+
+    Returns:
+        DataFrame des commandes sans les commandes anomales
+    """
+    anomales = df[df[ANOMALY_LINE].to_numpy()]
+    if scope == "lignes":
+        cles = order_line_keys(anomales["Bon de commande"], anomales["Fournisseur"], anomales["Matériel"])
+        masque = order_line_keys(df2["Bons de commande"], df2["Fournisseur"], df2["Matériel"]).isin(set(cles))
+    else:
+        masque = order_keys(df2["Bons de commande"]).isin(set(order_keys(anomales["Bon de commande"])))
+    return df2[~masque.to_numpy()]
+
+
+def anomaly_filter(df, df2=None, key="anomalies"):
+    """Affiche dans la barre latérale l'exclusion des anomalies et l'applique
+
+    Seuls les indicateurs calculés à l'import sont lus : aucun score n'est recalculé.
+    L'exclusion vaut pour les vues des livraisons comme pour celles des commandes.
+
+    Returns:
+        (DataFrame des délais, DataFrame des commandes) sans les lignes (ou commandes)
+        anomales si l'exclusion est active
+    """
+    if ANOMALY_LINE not in df.columns:
+        return df, df2
+    lignes = int(df[ANOMALY_LINE].sum())
+    commandes = df.loc[df[ANOMALY_LINE], "Bon de commande"].nunique()
+    exclure = st.sidebar.checkbox(
+        "Exclure les anomalies de délai",
+        key=f"{key}_exclure",
+        help=f"Délai réel à plus de {ANOMALY_THRESHOLD} écarts robustes (MAD) de la médiane du matériel ou du "
+             f"fournisseur. Les lignes de commande (ou commandes) correspondantes sont aussi exclues des vues des commandes."
+    )
+    st.sidebar.caption(f"{format_number_array([lignes])[0]} lignes anomales dans {format_number_array([commandes])[0]} commandes")
+    if not exclure or not lignes:
+        return df, df2
+    portee = st.sidebar.radio("Exclure", list(ANOMALY_SCOPES), format_func=ANOMALY_SCOPES.get, horizontal=True, key=f"{key}_portee")
+    colonne = ANOMALY_LINE if portee == "lignes" else ANOMALY_ORDER
+    if df2 is not None:
+        df2 = exclude_anomalous_orders(df, df2, portee)
+    return df[~df[colonne].to_numpy()], df2
+
+
+def show_anomalies(df):
+    """Affiche la liste des livraisons anomales, des plus extrêmes aux moins extrêmes"""
+    if ANOMALY_LINE not in df.columns or not df[ANOMALY_LINE].any():
+        return
+    anomalies = df[df[ANOMALY_LINE].to_numpy()]
+    anomalies = anomalies.iloc[np.argsort(-anomalies[ANOMALY_SCORE].abs().to_numpy(), kind="stable")]
+    colonnes = [
+        "Bon de commande", "Fournisseur", "Nom du fournisseur", "Matériel", "Description du matériel",
+        "Date de comptabilisation", "Délai théorique", "Délai réel", "Écart de délai",
+        "Score matériel", "Score fournisseur"
+    ]
+    anomalies = anomalies[[col for col in colonnes if col in anomalies.columns]]
+
+    with st.expander(f"⚠️ Livraisons anomales ({len(anomalies)} lignes)", expanded=False):
+        st.caption(
+            f"Score z robuste du délai réel : 0,6745 × (délai - médiane) / MAD, par matériel et par "
+            f"fournisseur (au moins {ANOMALY_MIN_LINES} livraisons). Anomalie au-delà de {ANOMALY_THRESHOLD}."
+        )
+        paged_table(
+            anomalies,
+            key="anomalies_lignes",
+            row_styles={"Délai réel": gradient_styles(anomalies["Délai réel"], cmap="Reds")},
+            column_config=numeric_column_config(decimals={
+                "Délai théorique": 1, "Délai réel": 1, "Écart de délai": 1,
+                "Score matériel": 1, "Score fournisseur": 1
+            }),
+            search_columns=["Bon de commande", "Nom du fournisseur", "Matériel", "Description du matériel"],
+            file_name="livraisons_anomales.csv"
+        )
@@ -0,0 +1,121 @@
+import hashlib
+from collections import OrderedDict
+from threading import Lock
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+
+# Nombre maximal de figures conservées ; les moins récemment utilisées sont évincées
+FIGURE_CACHE_SIZE = 256
+
+
+def data_fingerprint(*inputs):
+    """Calcule une empreinte stable des données d'entrée d'un graphique
+
+    Les DataFrame et Series sont hachés en bloc (valeurs, index, noms et types des colonnes),
+    les tableaux NumPy par leur contenu binaire et les autres objets par leur représentation.
+
+    Returns:
+        Chaîne hexadécimale identifiant le contenu des entrées
+    """
+    empreinte = hashlib.blake2b(digest_size=16)
+    for element in inputs:
+        if isinstance(element, pd.DataFrame):
+            empreinte.update(repr((list(element.columns), [str(t) for t in element.dtypes])).encode())
+            empreinte.update(pd.util.hash_pandas_object(element, index=True).to_numpy().tobytes())
+        elif isinstance(element, pd.Series):
+            empreinte.update(repr((element.name, str(element.dtype))).encode())
+            empreinte.update(pd.util.hash_pandas_object(element, index=True).to_numpy().tobytes())
+        elif isinstance(element, np.ndarray):
+            empreinte.update(repr((element.dtype.str, element.shape)).encode())
+            empreinte.update(np.ascontiguousarray(element).tobytes() if element.dtype != object else repr(element.tolist()).encode())
+        else:
+            empreinte.update(repr(element).encode())
+        # Séparateur pour que (a, bc) et (ab, c) ne donnent pas la même empreinte
+        empreinte.update(b"\x00")
+    return empreinte.hexdigest()
+
+
+def session_fingerprint(key):
+    """Empreinte (data_fingerprint) d'un jeu de données de l'état de session, calculée une fois
+
+    L'empreinte est mémorisée avec l'objet qu'elle décrit : elle n'est recalculée que lorsque
+    cet objet est remplacé (nouvel import, espace de travail rouvert), pas à chaque réexécution.
+    """
+    donnees = st.session_state.get(key)
+    memo = st.session_state.get(f"{key}_fingerprint")
+    if memo is None or memo[0] is not donnees:
+        memo = (donnees, data_fingerprint(donnees))
+        st.session_state[f"{key}_fingerprint"] = memo
+    return memo[1]
+
+
+class BoundedLRU:
+    """Dictionnaire borné : au-delà de `size` entrées, les moins récemment utilisées sont évincées
+
+    Les lectures et écritures sont protégées par un verrou, le stockage pouvant être partagé
+    entre les sessions (voir shared_lru). Les valeurs stockées sont partagées et ne doivent
+    pas être modifiées.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self._items = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key):
+        """Valeur associée à key (None si absente), marquée comme la plus récemment utilisée"""
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        """Stocke value sous key, évince les entrées les plus anciennes et renvoie value"""
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.size:
+                self._items.popitem(last=False)
+        return value
+
+
+@st.cache_resource
+def shared_lru(name, size):
+    """Stockage LRU borné nommé, créé une fois et commun à toutes les sessions"""
+    return BoundedLRU(size)
+
+
+def cached_figure(builder, *inputs, **options):
+    """Renvoie la figure construite par builder(*inputs, **options), réutilisée tant que rien ne change
+
+    La clé du cache combine le graphique (fonction de construction), l'empreinte des données
+    agrégées passées en entrée et les options de mise en page. Une figure identique n'est donc
+    construite qu'une fois, quel que soit le nombre de réexécutions de la page.
+    La figure renvoyée est partagée : elle ne doit pas être modifiée après coup.
+
+    Args:
+        builder: fonction qui construit la figure Plotly à partir des entrées
+        *inputs: données agrégées utilisées par le graphique (DataFrame, Series, listes...)
+        **options: options de mise en page (titre, hauteur, couleurs...)
+
+    Returns:
+        Figure Plotly
+    """
+    cle = (
+        f"{builder.__module__}.{builder.__qualname__}",
+        data_fingerprint(*inputs),
+        data_fingerprint(*sorted(options.items()))
+    )
+    stockage = shared_lru("figures", FIGURE_CACHE_SIZE)
+    figure = stockage.get(cle)
+    if figure is not None:
+        return figure
+    return stockage.put(cle, builder(*inputs, **options))
+
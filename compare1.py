@@ -0,0 +1,344 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+from format1 import *
+from table1 import *
+from period1 import *
+
+
+# Statuts de livraison, du meilleur au moins bon
+STATUS_ORDER = ['En avance', 'À temps', 'Retard accepté', 'Long délai']
+
+# Seuils des statuts (jours d'écart) : début et fin de la fenêtre « à temps », fin du retard accepté
+STATUS_THRESHOLDS = (0, 1, 7)
+
+# Références de comparaison disponibles : clé -> libellé
+BASELINES = {
+    "previous_year": "Même période N-1",
+    "previous_period": "Période précédente",
+    "average_3y": "Moyenne N-1 à N-3"
+}
+
+DEFAULT_BASELINES = ["previous_year"]
+
+# Indicateurs de volume des commandes (fichier des commandes)
+ORDER_METRICS = {
+    "Commandes": ("Bons de commande", "nunique"),
+    "Références": ("Matériel", "nunique"),
+    "Valeur": ("Valeur nette de la commande", "sum")
+}
+
+
+def format_count(value):
+    """Formate un volume (entier, ou moyenne à une décimale pour les références moyennées)"""
+    value = 0 if pd.isna(value) else float(value)
+    return format_number_array([value], decimals=0 if value.is_integer() else 1)[0]
+
+
+def delivery_status(ecart):
+    """Catégorise en bloc des écarts de délai (en jours) selon les statuts de livraison
+
+    Mêmes seuils que la catégorisation ligne par ligne des vues (STATUS_THRESHOLDS) : avance
+    si < 0, à temps de 0 à 1 jour, retard accepté de 2 à 7 jours, long délai sinon.
+    """
+    debut, fin, accepte = STATUS_THRESHOLDS
+    ecart = pd.to_numeric(pd.Series(ecart), errors="coerce").to_numpy(dtype=float)
+    return np.select(
+        [ecart < debut, (ecart >= debut) & (ecart <= fin), (ecart >= fin + 1) & (ecart <= accepte)],
+        STATUS_ORDER[:3],
+        default=STATUS_ORDER[3]
+    ).astype(object)
+
+
+def select_baselines(key="comparison_baselines"):
+    """Affiche dans la barre latérale le choix des références de comparaison et le mémorise"""
+    choix = st.sidebar.multiselect(
+        "Comparer avec",
+        list(BASELINES),
+        default=DEFAULT_BASELINES,
+        format_func=BASELINES.get,
+        key=key
+    )
+    return choix or DEFAULT_BASELINES
+
+
+def comparison_baselines(key="comparison_baselines"):
+    """Références de comparaison choisies (celles par défaut si aucun choix n'a été fait)"""
+    return st.session_state.get(key) or DEFAULT_BASELINES
+
+
+def baseline_periods(period, baseline):
+    """Renvoie la liste des périodes composant une référence de comparaison
+
+    Args:
+        period: période analysée (voir period1.make_period)
+        baseline: clé de BASELINES
+
+    Returns:
+        Liste de périodes (trois pour la moyenne sur trois ans)
+    """
+    if baseline == "previous_year":
+        return [previous_year_period(period)]
+    if baseline == "previous_period":
+        start, end = period["start"], period["end"]
+        nb_mois = (end.year - start.year) * 12 + end.month - start.month
+        # Périodes en mois entiers : décaler d'autant de mois, sinon d'autant de jours
+        if start.day == 1 and end.day == 1 and nb_mois > 0:
+            decalage = pd.DateOffset(months=nb_mois)
+        else:
+            decalage = end - start
+        return [make_period(start - decalage, start)]
+    if baseline == "average_3y":
+        return [
+            make_period(period["start"] - pd.DateOffset(years=n), period["end"] - pd.DateOffset(years=n))
+            for n in (1, 2, 3)
+        ]
+    raise ValueError(f"Référence de comparaison inconnue : {baseline}")
+
+
+def baseline_label(period, baseline):
+    """Libellé d'une référence de comparaison pour une période donnée"""
+    periodes = baseline_periods(period, baseline)
+    if len(periodes) == 1:
+        return periodes[0]["label"]
+    return f"{BASELINES[baseline]} ({periodes[-1]['start'].year} à {periodes[0]['start'].year})"
+
+
+def stack_periods(df, date_column, period, baselines=DEFAULT_BASELINES):
+    """Empile la période analysée et ses références dans un seul DataFrame étiqueté
+
+    Le DataFrame est trié une seule fois par date ; chaque période est une tranche
+    contiguë (recherche dichotomique). La colonne "_periode" donne le numéro de la tranche.
+
+    Returns:
+        (DataFrame empilé, liste des clés (référence, rang) de chaque tranche)
+    """
+    trie = sort_by_date(df, date_column)
+    cles = [("current", 0)]
+    periodes = [period]
+    for baseline in baselines:
+        for rang, periode in enumerate(baseline_periods(period, baseline)):
+            cles.append((baseline, rang))
+            periodes.append(periode)
+
+    tranches = [period_slice(trie, date_column, periode) for periode in periodes]
+    empile = pd.concat(tranches, ignore_index=True)
+    empile["_periode"] = np.repeat(np.arange(len(tranches)), [len(t) for t in tranches])
+    return empile, cles
+
+
+def collapse_periods(resultat, cles, baselines):
+    """Ramène un résultat groupé par tranche à une ligne par référence (moyenne des tranches)
+
+    Les tranches sans données sont ignorées dans les moyennes ; une référence sans
+    aucune donnée donne une ligne de NaN.
+    """
+    resultat = resultat.reindex(range(len(cles)))
+    resultat.index = pd.MultiIndex.from_tuples(cles, names=["Référence", "Rang"])
+    resultat = resultat.groupby(level="Référence", sort=False).mean()
+    return resultat.reindex(["current"] + list(baselines))
+
+
+def compare_periods(df, date_column, period, metrics, baselines=DEFAULT_BASELINES):
+    """Calcule des indicateurs pour une période et ses références en une seule agrégation
+
+    Args:
+        df: DataFrame complet (toutes années) du périmètre analysé
+        date_column: colonne de dates utilisée pour découper les périodes
+        period: période analysée
+        metrics: agrégations nommées, comme pour DataFrame.agg (nom=(colonne, fonction))
+        baselines: clés de BASELINES
+
+    Returns:
+        DataFrame indexé par "current" puis chaque référence, une colonne par indicateur
+        (NaN pour une référence sans données)
+    """
+    empile, cles = stack_periods(df, date_column, period, baselines)
+    resultat = empile.groupby("_periode").agg(**metrics)
+    return collapse_periods(resultat, cles, baselines)
+
+
+def delay_comparison(df, period, baselines=DEFAULT_BASELINES, date_column="Date de comptabilisation"):
+    """Indicateurs de délais d'une période et de ses références, par ligne et par commande
+
+    Les statuts sont catégorisés en bloc sur toutes les périodes à la fois, puis chaque
+    niveau (lignes, commandes) est agrégé en une seule passe groupée par période.
+
+    Returns:
+        Dictionnaire {"lignes", "commandes", "volumes"} de DataFrame au format de compare_periods :
+        délais moyens et part (%) de chaque statut par niveau, et volumes (commandes,
+        références, lignes)
+    """
+    empile, cles = stack_periods(df, date_column, period, baselines)
+
+    # Niveau ligne
+    ecart = empile["Délai réel"] - empile["Délai théorique"]
+    empile["_statut"] = delivery_status(ecart.round(1))
+    statuts_lignes = pd.get_dummies(empile["_statut"]).reindex(columns=STATUS_ORDER, fill_value=False) * 100.0
+    lignes = pd.concat([empile[["_periode", "Matériel", "Délai théorique", "Délai réel"]], statuts_lignes], axis=1)
+    lignes["Écart"] = ecart
+    lignes = lignes.groupby("_periode").agg(
+        Lignes=("Matériel", "size"),
+        Références=("Matériel", "nunique"),
+        Théorique=("Délai théorique", "mean"),
+        Réel=("Délai réel", "mean"),
+        Écart=("Écart", "mean"),
+        **{statut: (statut, "mean") for statut in STATUS_ORDER}
+    )
+
+    # Niveau commande : délai le plus long de chaque commande
+    commandes = empile.groupby(["_periode", "Bon de commande"]).agg(
+        Théorique=("Délai théorique", "max"),
+        Réel=("Délai réel", "max")
+    ).round(1)
+    commandes["Écart"] = (commandes["Réel"] - commandes["Théorique"]).round(1)
+    statuts_commandes = pd.get_dummies(
+        pd.Series(delivery_status(commandes["Écart"]), index=commandes.index)
+    ).reindex(columns=STATUS_ORDER, fill_value=False) * 100.0
+    commandes = pd.concat([commandes, statuts_commandes], axis=1).groupby(level="_periode").agg(
+        Commandes=("Écart", "size"),
+        Théorique=("Théorique", "mean"),
+        Réel=("Réel", "mean"),
+        Écart=("Écart", "mean"),
+        **{statut: (statut, "mean") for statut in STATUS_ORDER}
+    )
+
+    lignes = collapse_periods(lignes, cles, baselines)
+    commandes = collapse_periods(commandes, cles, baselines)
+    return {
+        "lignes": lignes,
+        "commandes": commandes,
+        "volumes": pd.concat([commandes[["Commandes"]], lignes[["Références", "Lignes"]]], axis=1)
+    }
+
+
+def period_deltas(table, baseline, columns=None):
+    """Écarts absolus et relatifs entre la période analysée et une référence
+
+    Returns:
+        DataFrame indexé par indicateur : Actuel, Référence, Évolution, Évolution (%)
+        (évolution relative NaN si la référence est nulle ou absente)
+    """
+    columns = columns or list(table.columns)
+    actuel = table.loc["current", columns].astype(float)
+    reference = table.loc[baseline, columns].astype(float)
+    evolution = actuel - reference
+    with np.errstate(divide="ignore", invalid="ignore"):
+        relative = np.where(reference > 0, evolution / reference * 100, np.nan)
+    return pd.DataFrame({
+        "Actuel": actuel,
+        "Référence": reference,
+        "Évolution": evolution,
+        "Évolution (%)": relative
+    })
+
+
+def has_baseline_data(table, baseline, count_column):
+    """Indique si une référence contient des données (volume non nul)"""
+    valeur = table.loc[baseline, count_column]
+    return pd.notna(valeur) and valeur > 0
+
+
+def render_volume_changes(table, baseline, items, color_palette, title=None):
+    """Affiche l'évolution des volumes par rapport à une référence (ancienne valeur → nouvelle, %)
+
+    Args:
+        table: résultat de compare_periods (ou un niveau de delay_comparison)
+        baseline: clé de la référence
+        items: liste de (colonne, libellé, fonction de formatage)
+        color_palette: palette de la vue ('positive', 'negative', 'background', 'text')
+        title: titre affiché au-dessus des indicateurs
+    """
+    deltas = period_deltas(table, baseline, [col for col, _, _ in items])
+    if title:
+        st.markdown(f"""
+        <div style="background-color:{color_palette['background']}; padding: 10px; border-radius: 8px; margin-top: 15px;">
+            <h4 style="color:{color_palette['text']};">{title}</h4>
+        </div>
+        """, unsafe_allow_html=True)
+
+    colonnes = st.columns(len(items))
+    for colonne, (col, libelle, formatage) in zip(colonnes, items):
+        ligne = deltas.loc[col]
+        reference = 0 if pd.isna(ligne["Référence"]) else ligne["Référence"]
+        if pd.notna(ligne["Évolution (%)"]):
+            evolution = f"{ligne['Évolution (%)']:+.1f}%"
+            couleur = color_palette['positive'] if ligne["Évolution (%)"] >= 0 else color_palette['negative']
+        else:
+            evolution = "N/A"
+            couleur = "gray"
+        with colonne:
+            st.markdown(f"""
+            <div style="padding:10px; border-radius:5px; text-align:center;">
+                <p style="margin:0;">{libelle}: {formatage(reference)} → {formatage(ligne['Actuel'])}</p>
+                <h5 style="color:{couleur}; margin:5px 0 0 0;">{evolution}</h5>
+            </div>
+            """, unsafe_allow_html=True)
+
+
+def render_delay_changes(comparison, baseline, current_label, reference_label, color_palette):
+    """Affiche les tableaux d'évolution des délais moyens (par commande et par produit)"""
+    actuel_col = f'Actuel ({current_label})'
+    reference_col = f'Précédent ({reference_label})'
+
+    # Couleurs par colonne et couleur de l'évolution selon son signe (calculées en bloc)
+    evolution_column_styles = {
+        'Type': 'background-color: #f5f5f5',
+        actuel_col: f'background-color: {color_palette["primary"]}; color: white',
+        reference_col: f'background-color: {color_palette["secondary"]}; color: white',
+        'Évolution (jours)': 'background-color: #e1f5fe'
+    }
+    evolution_columns_config = numeric_column_config(decimals={
+        actuel_col: 1,
+        reference_col: 1,
+        'Évolution (jours)': 1
+    })
+
+    tab1, tab2 = st.tabs(["Délais par commande", "Délais par produit"])
+    for onglet, niveau in ((tab1, "commandes"), (tab2, "lignes")):
+        deltas = period_deltas(comparison[niveau], baseline, ['Théorique', 'Réel', 'Écart']).round(1)
+        evolution = pd.DataFrame({
+            'Type': deltas.index,
+            actuel_col: deltas['Actuel'].to_numpy(),
+            reference_col: deltas['Référence'].to_numpy(),
+            'Évolution (jours)': deltas['Évolution'].to_numpy()
+        })
+        # Pour les délais, négatif est mieux (donc vert) et positif est pire (donc rouge)
+        evolution_styles = conditional_styles(
+            [evolution['Évolution (jours)'] < 0, evolution['Évolution (jours)'] > 0],
+            [f'background-color: {color_palette["positive"]}; color: white',
+             f'background-color: {color_palette["negative"]}; color: white']
+        )
+        with onglet:
+            render_table(
+                evolution,
+                column_styles=evolution_column_styles,
+                row_styles={'Évolution (jours)': evolution_styles},
+                column_config=evolution_columns_config
+            )
+
+
+def render_status_changes(table, baseline, reference_label, color_palette):
+    """Affiche, statut par statut, la part de la référence et l'évolution en points"""
+    deltas = period_deltas(table.fillna({statut: 0 for statut in STATUS_ORDER}), baseline, STATUS_ORDER)
+
+    st.markdown(f"""
+    <div style="background-color:{color_palette['background']}; padding: 10px; border-radius: 8px;">
+        <h4 style="color:{color_palette['text']};">Comparaison avec {reference_label}:</h4>
+    </div>
+    """, unsafe_allow_html=True)
+
+    for statut, ligne in deltas.iterrows():
+        evolution = round(ligne['Actuel'], 1) - round(ligne['Référence'], 1)
+        # Pour les retards, une hausse est une dégradation
+        if statut in ('Retard accepté', 'Long délai'):
+            couleur = color_palette['negative'] if evolution > 0 else color_palette['positive']
+        else:
+            couleur = color_palette['positive'] if evolution > 0 else color_palette['negative']
+        col1, col2, col3 = st.columns([2.5, 1.5, 1.5])
+        with col1:
+            st.markdown(f"<div style='font-weight:bold;'>{statut}</div>", unsafe_allow_html=True)
+        with col2:
+            st.markdown(f"{ligne['Référence']:.1f}%", unsafe_allow_html=True)
+        with col3:
+            st.markdown(f"<div style='color:{couleur};font-weight:bold;'>{evolution:+.1f}%</div>", unsafe_allow_html=True)
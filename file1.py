@@ -1,7 +1,10 @@
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 import streamlit as st
+from format1 import *
+from table1 import *
+from chart1 import *
+from locale1 import *
+from period1 import *
 
 
 def display_metric_card(title, value, delta=None, color="#1E88E5"):
@@ -74,10 +77,8 @@ def apply_custom_theme():
 
 def format_currency(value):
     """Formate les valeurs monétaires"""
-    return f"{value:,.2f} €".replace(",", " ").replace(".", ",")
+    return format_currency_array([value])[0]
 
 def format_number(value, is_year=False):
     """Formate les nombres avec séparateur de milliers, sauf pour les années"""
-    if is_year:
-        return f"{int(value)}"
-    return f"{int(value):,}".replace(",", " ")
+    return format_number_array([value], is_year=is_year)[0]
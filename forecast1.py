@@ -0,0 +1,135 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+
+# Paire prévue : fournisseur (code) x matériel
+FORECAST_KEYS = ["Fournisseur", "Matériel"]
+
+# Nombre de dernières livraisons retenues par paire
+FORECAST_HISTORY = 24
+
+# Coefficients de lissage essayés ; chaque paire retient celui qui prévoit le mieux son historique
+FORECAST_ALPHAS = (0.1, 0.2, 0.3, 0.5, 0.8)
+
+# Intervalle de prévision à 80 % (quantile de la loi normale) et observations minimales pour le calculer
+FORECAST_INTERVAL_Z = 1.2816
+FORECAST_MIN_ERRORS = 2
+
+# Colonnes de prévision ajoutées aux tableaux de produits
+FORECAST_COLUMNS = ["Délai prévu", "Prévision basse", "Prévision haute"]
+
+
+def padded_series(df, keys=FORECAST_KEYS, value="Délai réel", date="Date de comptabilisation", history=FORECAST_HISTORY):
+    """Range les dernières observations de chaque paire dans un tableau rectangulaire
+
+    Les séries sont alignées à droite : la dernière livraison de chaque paire est dans la
+    dernière colonne, les paires ayant moins de `history` livraisons sont complétées par NaN
+    à gauche. Aucune boucle par paire : un tri, un rang par groupe et une affectation en bloc.
+
+    Returns:
+        (DataFrame des paires (colonnes keys et "Livraisons"), tableau NumPy paires x history)
+    """
+    valeurs = pd.to_numeric(df[value], errors="coerce").to_numpy(dtype=float)
+    valides = ~np.isnan(valeurs) & df[keys].notna().all(axis=1).to_numpy()
+    donnees = df.loc[valides, keys]
+
+    # Codes entiers des paires (ordre des clés), puis tri par paire et par date sur ces seuls entiers
+    codes = donnees.groupby(keys, sort=True, observed=True).ngroup().to_numpy()
+    dates = pd.to_datetime(df.loc[valides, date], errors="coerce").to_numpy(dtype="datetime64[ns]")
+    ordre = np.lexsort((dates, codes))
+    codes = codes[ordre]
+    tailles = np.bincount(codes)
+    fins = np.cumsum(tailles)
+    rang_depuis_fin = fins[codes] - 1 - np.arange(len(codes))
+    dernieres = fins - 1
+
+    paires = donnees.iloc[ordre[dernieres]].reset_index(drop=True)
+    paires["Livraisons"] = tailles
+    paires["Délai théorique actuel"] = pd.to_numeric(df.loc[valides, "Délai théorique"], errors="coerce").to_numpy()[ordre[dernieres]]
+
+    retenues = rang_depuis_fin < history
+    series = np.full((len(paires), history), np.nan)
+    series[codes[retenues], history - 1 - rang_depuis_fin[retenues]] = valeurs[valides][ordre][retenues]
+    return paires, series
+
+
+def exponential_smoothing(series, alphas=FORECAST_ALPHAS):
+    """Lissage exponentiel simple de toutes les séries à la fois, pour plusieurs coefficients
+
+    La boucle porte sur les colonnes (au plus FORECAST_HISTORY pas de temps), chaque pas
+    mettant à jour le niveau de toutes les paires et de tous les coefficients d'un coup.
+    Le coefficient retenu pour chaque paire minimise l'erreur quadratique de ses prévisions
+    à un pas ; l'écart type de ces erreurs donne la largeur de l'intervalle.
+
+    Args:
+        series: tableau paires x temps (NaN pour les pas sans observation)
+        alphas: coefficients de lissage essayés
+
+    Returns:
+        (prévisions, écarts types des erreurs à un pas (NaN si trop peu d'erreurs), coefficients retenus)
+    """
+    alphas = np.asarray(alphas, dtype=float)[:, None]
+    nb_paires = series.shape[0]
+    niveau = np.full((len(alphas), nb_paires), np.nan)
+    somme_carres = np.zeros((len(alphas), nb_paires))
+    nb_erreurs = np.zeros(nb_paires)
+
+    for t in range(series.shape[1]):
+        x = series[:, t]
+        present = ~np.isnan(x)
+        erreur = x - niveau
+        evaluee = present & ~np.isnan(niveau[0])
+        somme_carres += np.where(evaluee, erreur, 0) ** 2
+        nb_erreurs += evaluee
+        niveau = np.where(present, np.where(np.isnan(niveau), x, niveau + alphas * erreur), niveau)
+
+    # À erreur égale (dont aucune erreur évaluée), le lissage le plus fort est retenu
+    meilleur = np.argmin(somme_carres, axis=0)
+    colonnes = np.arange(nb_paires)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ecart_type = np.where(
+            nb_erreurs >= FORECAST_MIN_ERRORS,
+            np.sqrt(somme_carres[meilleur, colonnes] / nb_erreurs),
+            np.nan
+        )
+    return niveau[meilleur, colonnes], ecart_type, alphas[meilleur, 0]
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def forecast_lead_times(df):
+    """Prévoit le délai réel de la prochaine livraison de chaque paire fournisseur x matériel
+
+    Args:
+        df: DataFrame des délais de livraison (historique complet)
+
+    Returns:
+        DataFrame : colonnes FORECAST_KEYS, "Livraisons", "Délai théorique actuel",
+        "Délai prévu", "Prévision basse", "Prévision haute" (intervalle à 80 %),
+        "Écart prévu" (prévision - délai théorique actuel) et "Lissage (α)"
+    """
+    paires, series = padded_series(df)
+    prevision, ecart_type, alpha = exponential_smoothing(series)
+    marge = FORECAST_INTERVAL_Z * ecart_type
+    paires["Délai prévu"] = prevision
+    paires["Prévision basse"] = np.maximum(prevision - marge, 0)
+    paires["Prévision haute"] = prevision + marge
+    paires["Écart prévu"] = prevision - paires["Délai théorique actuel"]
+    paires["Lissage (α)"] = alpha
+    return paires
+
+
+def add_forecast_columns(table, forecasts, keys=FORECAST_KEYS, columns=FORECAST_COLUMNS):
+    """Ajoute les colonnes de prévision à un tableau (ordre et index des lignes conservés)
+
+    Si le tableau n'a pas toutes les colonnes de keys (matériel seul pour un fournisseur
+    donné), la prévision de la paire la mieux documentée est retenue pour chaque clé.
+    """
+    colonnes = [col for col in keys if col in table.columns]
+    previsions = forecasts.sort_values("Livraisons", ascending=False, kind="mergesort")
+    previsions = previsions.drop_duplicates(subset=colonnes)[colonnes + list(columns)]
+    ajout = table[colonnes].merge(previsions, on=colonnes, how="left")
+    resultat = table.copy()
+    for col in columns:
+        resultat[col] = ajout[col].to_numpy()
+    return resultat
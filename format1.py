@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+
+def _separer_milliers(entiers, separateur=" "):
+    """Insère le séparateur de milliers dans un tableau d'entiers positifs, bloc par bloc"""
+    reste = np.asarray(entiers, dtype=np.int64)
+    bloc = reste % 1000
+    reste = reste // 1000
+    texte = _bloc_en_texte(bloc, reste > 0)
+    # Chaque tour ajoute un bloc de 3 chiffres à gauche pour les valeurs qui en ont encore
+    while (reste > 0).any():
+        actif = reste > 0
+        bloc = reste % 1000
+        reste = reste // 1000
+        prefixe = np.char.add(_bloc_en_texte(bloc, reste > 0), separateur)
+        texte = np.where(actif, np.char.add(prefixe, texte), texte)
+    return texte
+
+
+def _bloc_en_texte(bloc, interne):
+    """Convertit un bloc de 3 chiffres en texte, complété par des zéros s'il n'est pas en tête"""
+    return np.where(interne, _completer_zeros(bloc, 3), bloc.astype(str))
+
+
+def _completer_zeros(entiers, largeur):
+    """Convertit des entiers en texte complété à gauche par des zéros"""
+    texte = np.asarray(entiers).astype(str)
+    if texte.size == 0:
+        return texte
+    return np.char.zfill(texte, largeur)
+
+
+def _preparer_tableau(values):
+    """Convertit l'entrée en tableau de flottants et renvoie le masque des valeurs manquantes"""
+    tableau = pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    manquants = ~np.isfinite(tableau)
+    return np.where(manquants, 0.0, tableau), manquants
+
+
+def format_currency_array(values):
+    """Formate un tableau de valeurs monétaires en une seule passe (ex. 1 234,56 €)"""
+    tableau, manquants = _preparer_tableau(values)
+    centimes = np.rint(np.abs(tableau) * 100).astype(np.int64)
+    texte = np.char.add(_separer_milliers(centimes // 100), ",")
+    texte = np.char.add(texte, _completer_zeros(centimes % 100, 2))
+    texte = np.char.add(np.where((tableau < 0) & (centimes > 0), "-", ""), texte)
+    texte = np.char.add(texte, " €")
+    return np.where(manquants, "", texte).astype(object)
+
+
+def format_number_array(values, decimals=0, is_year=False, separateur=" "):
+    """Formate un tableau de nombres avec séparateur de milliers, sauf pour les années"""
+    tableau, manquants = _preparer_tableau(values)
+    if is_year:
+        texte = np.trunc(tableau).astype(np.int64).astype(str)
+        return np.where(manquants, "", texte).astype(object)
+
+    if decimals > 0:
+        echelle = 10 ** decimals
+        unites = np.rint(np.abs(tableau) * echelle).astype(np.int64)
+        entiers = unites // echelle
+        fraction = np.char.add(",", _completer_zeros(unites % echelle, decimals))
+    else:
+        # Même comportement que int() : troncature vers zéro
+        unites = np.trunc(np.abs(tableau)).astype(np.int64)
+        entiers = unites
+        fraction = np.full(len(tableau), "", dtype="<U1")
+
+    if separateur:
+        texte = _separer_milliers(entiers, separateur)
+    else:
+        texte = entiers.astype(str)
+    texte = np.char.add(np.char.add(np.where((tableau < 0) & (unites > 0), "-", ""), texte), fraction)
+    return np.where(manquants, "", texte).astype(object)
+
+
+def format_columns(df, currency=(), integers=(), decimals=None, years=()):
+    """Formate en bloc plusieurs colonnes d'un DataFrame (renvoie une copie)
+
+    Args:
+        df: DataFrame à formater
+        currency: colonnes monétaires (1 234,56 €)
+        integers: colonnes entières avec séparateur de milliers
+        decimals: dictionnaire {colonne: nombre de décimales}
+        years: colonnes d'années (sans séparateur)
+    """
+    df = df.copy()
+    for col in currency:
+        df[col] = format_currency_array(df[col])
+    for col in integers:
+        df[col] = format_number_array(df[col])
+    for col, nb in (decimals or {}).items():
+        df[col] = format_number_array(df[col], decimals=nb, separateur="")
+    for col in years:
+        df[col] = format_number_array(df[col], is_year=True)
+    return df
+
+
+def numeric_column_config(currency=(), integers=(), thousands=(), decimals=None, years=(), percent=()):
+    """Construit la configuration des colonnes numériques pour st.dataframe
+
+    Les données restent numériques (tri correct, pas de conversion en texte côté
+    serveur) et le formatage est fait par le navigateur. Les couleurs d'un Styler
+    sont conservées : seul l'affichage des nombres est délégué à la grille.
+
+    Args:
+        currency: colonnes monétaires (format euro, selon la langue du navigateur)
+        integers: colonnes entières
+        thousands: colonnes entières avec séparateur de milliers (selon le navigateur)
+        decimals: dictionnaire {colonne: nombre de décimales}
+        years: colonnes d'années (sans séparateur)
+        percent: colonnes de pourcentages déjà exprimés en % (ex. 12.5)
+    """
+    config = {}
+    for col in currency:
+        config[col] = st.column_config.NumberColumn(col, format="euro")
+    for col in integers:
+        config[col] = st.column_config.NumberColumn(col, format="%d")
+    for col in thousands:
+        config[col] = st.column_config.NumberColumn(col, format="localized")
+    for col, nb in (decimals or {}).items():
+        config[col] = st.column_config.NumberColumn(col, format=f"%.{nb}f")
+    for col in years:
+        config[col] = st.column_config.NumberColumn(col, format="%d")
+    for col in percent:
+        config[col] = st.column_config.NumberColumn(col, format="%.1f%%")
+    return config
@@ -0,0 +1,183 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+from locale1 import *
+from chart1 import *
+from rolling1 import ON_TIME_MAX_GAP
+
+
+# Indicateurs proposés dans la carte de chaleur
+HEATMAP_METRICS = ["Livraisons à temps (%)", "Écart moyen (jours)"]
+
+# Ordres d'affichage des fournisseurs retenus
+HEATMAP_SORTS = ["Volume de lignes", "Moins bonne performance", "Ordre alphabétique"]
+
+# Nombre de fournisseurs affichés par défaut et au maximum
+HEATMAP_TOP_N = 20
+HEATMAP_MAX_N = 100
+
+
+def build_status_grid(df, fingerprint=None):
+    """Construit une seule fois la grille dense fournisseur x mois des livraisons
+
+    Les fournisseurs sont codés par des entiers (ordre alphabétique) et les mois par leur
+    décalage depuis le premier mois des données : chaque ligne de livraison tombe dans une
+    cellule code * nb_mois + décalage, comptée en un seul passage (np.bincount).
+    La grille est partagée entre les réexécutions et ne doit pas être modifiée.
+
+    Args:
+        df: DataFrame des délais (colonnes Year, Month, "Nom du fournisseur" et "Écart de délai")
+        fingerprint: empreinte identifiant df, calculée une fois à l'import ; sans elle,
+            toutes les lignes de df sont hachées à chaque appel
+
+    Returns:
+        Dictionnaire : "names" (fournisseurs), "months" (premier jour de chaque mois) et
+        tableaux NumPy fournisseurs x mois "lignes", "a_temps", "somme_ecart", "nb_ecart"
+    """
+    return _status_grid(fingerprint or data_fingerprint(df), df)
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _status_grid(fingerprint, _df):
+    """Grille de build_status_grid, mise en cache sous l'empreinte (_df n'est pas haché)"""
+    donnees = _df.dropna(subset=["Year", "Month", "Nom du fournisseur"])
+    codes, names = pd.factorize(donnees["Nom du fournisseur"].astype(str), sort=True)
+    mois = donnees["Year"].to_numpy(dtype=int) * 12 + donnees["Month"].to_numpy(dtype=int) - 1
+    if len(mois) == 0:
+        vide = np.zeros((0, 0))
+        return {"names": np.array([], dtype=object), "months": pd.DatetimeIndex([]),
+                "lignes": vide, "a_temps": vide, "somme_ecart": vide, "nb_ecart": vide}
+
+    premier, dernier = int(mois.min()), int(mois.max())
+    nb_mois = dernier - premier + 1
+    cellule = codes * nb_mois + (mois - premier)
+    taille = len(names) * nb_mois
+
+    ecart = pd.to_numeric(donnees["Écart de délai"], errors="coerce").to_numpy(dtype=float)
+    valide = ~np.isnan(ecart)
+    grille = {
+        "lignes": np.bincount(cellule, minlength=taille),
+        "a_temps": np.bincount(cellule, weights=(ecart <= ON_TIME_MAX_GAP).astype(float), minlength=taille),
+        "somme_ecart": np.bincount(cellule[valide], weights=ecart[valide], minlength=taille),
+        "nb_ecart": np.bincount(cellule[valide], minlength=taille)
+    }
+    grille = {mesure: valeurs.reshape(len(names), nb_mois).astype(float) for mesure, valeurs in grille.items()}
+
+    colonnes_mois = np.arange(premier, dernier + 1)
+    grille["names"] = np.asarray(names, dtype=object)
+    grille["months"] = pd.DatetimeIndex(pd.to_datetime({"year": colonnes_mois // 12, "month": colonnes_mois % 12 + 1, "day": 1}))
+    return grille
+
+
+def _ratio(numerateur, denominateur, facteur=1.0):
+    """Division élément par élément, NaN là où le dénominateur est nul"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denominateur > 0, numerateur / denominateur * facteur, np.nan)
+
+
+def heatmap_matrix(grid, metric=HEATMAP_METRICS[0], top_n=HEATMAP_TOP_N, sort=HEATMAP_SORTS[0]):
+    """Extrait de la grille les top_n fournisseurs (par volume de lignes) pour un indicateur
+
+    Seuls les totaux par fournisseur et les lignes retenues de la grille sont lus : le coût
+    ne dépend pas du nombre de lignes de livraison.
+
+    Args:
+        grid: grille construite par build_status_grid
+        metric: indicateur affiché (voir HEATMAP_METRICS)
+        top_n: nombre de fournisseurs retenus
+        sort: ordre d'affichage des fournisseurs retenus (voir HEATMAP_SORTS)
+
+    Returns:
+        (valeurs : DataFrame fournisseurs x mois, lignes : DataFrame des volumes correspondants)
+    """
+    lignes = grid["lignes"]
+    total_lignes = lignes.sum(axis=1)
+    if metric == HEATMAP_METRICS[0]:
+        valeurs = _ratio(grid["a_temps"], lignes, 100)
+        global_ = _ratio(grid["a_temps"].sum(axis=1), total_lignes, 100)
+        pire = np.argsort(global_, kind="stable")
+    else:
+        valeurs = _ratio(grid["somme_ecart"], grid["nb_ecart"])
+        global_ = _ratio(grid["somme_ecart"].sum(axis=1), grid["nb_ecart"].sum(axis=1))
+        pire = np.argsort(-np.nan_to_num(global_, nan=-np.inf), kind="stable")
+
+    # Top N par volume (tri stable : à volume égal, ordre alphabétique)
+    retenus = np.argsort(-total_lignes, kind="stable")[:top_n]
+    if sort == HEATMAP_SORTS[1]:
+        rang = np.empty(len(pire), dtype=int)
+        rang[pire] = np.arange(len(pire))
+        retenus = retenus[np.argsort(rang[retenus], kind="stable")]
+    elif sort == HEATMAP_SORTS[2]:
+        retenus = np.sort(retenus)
+
+    libelles = [f"{month_name(m.month, abbr=True)} {m.year}" for m in grid["months"]]
+    index = pd.Index(grid["names"][retenus], name="Fournisseur")
+    return (
+        pd.DataFrame(valeurs[retenus], index=index, columns=libelles),
+        pd.DataFrame(lignes[retenus], index=index, columns=libelles)
+    )
+
+
+def build_heatmap_figure(valeurs, lignes, metric=HEATMAP_METRICS[0]):
+    """Construit la carte de chaleur fournisseur x mois"""
+    if metric == HEATMAP_METRICS[0]:
+        couleurs = dict(colorscale="RdYlGn", zmin=0, zmax=100)
+        format_valeur = "%{z:.1f} %"
+    else:
+        borne = np.nanpercentile(np.abs(valeurs.to_numpy()), 95) if valeurs.notna().any().any() else 1
+        couleurs = dict(colorscale="RdYlGn_r", zmid=0, zmin=-borne, zmax=borne)
+        format_valeur = "%{z:.1f} j"
+
+    fig = go.Figure(go.Heatmap(
+        z=valeurs.to_numpy(),
+        x=list(valeurs.columns),
+        y=list(valeurs.index),
+        customdata=lignes.to_numpy(),
+        hoverongaps=False,
+        hovertemplate="<b>%{y}</b><br>%{x}<br>" + metric + " : " + format_valeur +
+                      "<br>Lignes : %{customdata:.0f}<extra></extra>",
+        colorbar=dict(title=metric),
+        xgap=1, ygap=1,
+        **couleurs
+    ))
+    fig.update_layout(
+        height=max(350, 26 * len(valeurs) + 150),
+        margin=dict(l=10, r=10, t=30, b=10),
+        yaxis=dict(autorange="reversed", type="category"),
+        xaxis=dict(type="category", tickangle=-45),
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)'
+    )
+    return fig
+
+
+def show_supplier_heatmap(df, key="heatmap", fingerprint=None):
+    """Affiche la carte de chaleur des performances fournisseur x mois sur tout l'historique
+
+    Args:
+        df: DataFrame des délais (toutes années)
+        key: préfixe unique des widgets
+        fingerprint: empreinte de df (voir build_status_grid)
+    """
+    grid = build_status_grid(df, fingerprint)
+    if len(grid["names"]) == 0:
+        return
+
+    st.markdown("<h5 style='color: #1E88E5; margin-top: 20px;'>Carte de chaleur fournisseurs x mois</h5>", unsafe_allow_html=True)
+    col1, col2, col3 = st.columns([2, 2, 1])
+    with col1:
+        metric = st.radio("Indicateur", HEATMAP_METRICS, horizontal=True, key=f"{key}_indicateur")
+    with col2:
+        sort = st.selectbox("Ordre des fournisseurs", HEATMAP_SORTS, key=f"{key}_ordre")
+    with col3:
+        maximum = min(HEATMAP_MAX_N, len(grid["names"]))
+        top_n = st.number_input("Fournisseurs", min_value=1, max_value=maximum,
+                                value=min(HEATMAP_TOP_N, maximum), step=5, key=f"{key}_top")
+
+    valeurs, lignes = heatmap_matrix(grid, metric, int(top_n), sort)
+    st.caption(
+        f"{len(valeurs)} fournisseurs ayant le plus de lignes sur {len(grid['names'])}. "
+        "Livraison à temps : au plus 1 jour de retard. Cases vides : aucune livraison ce mois-là."
+    )
+    st.plotly_chart(cached_figure(build_heatmap_figure, valeurs, lignes, metric=metric), use_container_width=True)
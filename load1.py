@@ -1,77 +1,106 @@
 import pandas as pd
 import streamlit as st
-import matplotlib.pyplot as plt
+from quality1 import validate_frame, QUALITY_REJECT, QUALITY_EXCLUDE, QUALITY_FLAG
+
+
+# Gamme attribuée aux lignes absentes du fichier de référence
+PRODLINE_DEFAULT = "NA / Raw Material / Semi fini"
+
+# Règles de validation, dans l'ordre de priorité des motifs de rejet (voir quality1.validate_frame)
+FILE1_RULES = [
+    {"Règle": "Date de comptabilisation manquante", "Colonne": "Date de comptabilisation", "Test": "manquant", "Action": QUALITY_REJECT},
+    {"Règle": "Date de comptabilisation illisible", "Colonne": "Date de comptabilisation", "Test": "illisible", "Action": QUALITY_REJECT},
+    {"Règle": "Délai réel manquant", "Colonne": "Délai réel", "Test": "manquant", "Action": QUALITY_REJECT},
+    {"Règle": "Délai réel illisible", "Colonne": "Délai réel", "Test": "illisible", "Action": QUALITY_REJECT},
+    {"Règle": "Délai théorique manquant", "Colonne": "Délai théorique", "Test": "manquant", "Action": QUALITY_REJECT},
+    {"Règle": "Délai théorique illisible", "Colonne": "Délai théorique", "Test": "illisible", "Action": QUALITY_REJECT},
+    {"Règle": "Année 2022 exclue", "Colonne": "Date de comptabilisation", "Test": "annee", "Valeurs": [2022], "Action": QUALITY_EXCLUDE},
+    {"Règle": "Matériel Y4950100 exclu", "Colonne": "Matériel", "Test": "valeur", "Valeurs": ["Y4950100"], "Action": QUALITY_EXCLUDE},
+    {"Règle": "Nom du fournisseur manquant", "Colonne": "Nom du fournisseur", "Test": "manquant", "Action": QUALITY_FLAG},
+    {"Règle": "Description du matériel manquante", "Colonne": "Description du matériel", "Test": "manquant", "Action": QUALITY_FLAG},
+    {"Règle": "Matériel du fournisseur manquant", "Colonne": "Matériel du fournisseur", "Test": "manquant", "Action": QUALITY_FLAG}
+]
+
+FILE2_RULES = [
+    {"Règle": "Date du document manquante", "Colonne": "Date du document", "Test": "manquant", "Action": QUALITY_REJECT},
+    {"Règle": "Date du document illisible", "Colonne": "Date du document", "Test": "illisible", "Action": QUALITY_REJECT},
+    {"Règle": "Valeur nette manquante", "Colonne": "Valeur nette de la commande", "Test": "manquant", "Action": QUALITY_REJECT},
+    {"Règle": "Valeur nette illisible", "Colonne": "Valeur nette de la commande", "Test": "illisible", "Action": QUALITY_REJECT},
+    {"Règle": "Quantité commandée illisible", "Colonne": "Order Quantity", "Test": "illisible", "Action": QUALITY_FLAG}
+]
+
+# Clé métier d'une ligne de chaque fichier, pour la détection des doublons de clé (voir quality1.deduplicate)
+FILE1_KEYS = ["Bon de commande", "Fournisseur", "Matériel", "Date de comptabilisation"]
+FILE2_KEYS = ["Bons de commande", "Fournisseur", "Matériel", "Date du document"]
+
+PRODLINE_RULES = [
+    {"Règle": "Gamme absente du référentiel", "Colonne": "Prodline Name", "Test": "valeur", "Valeurs": [PRODLINE_DEFAULT], "Action": QUALITY_FLAG}
+]
+
+
+def order_keys(po):
+    """Numéro de bon de commande normalisé (texte, sans « .0 » des numéros lus comme décimaux ni espaces)"""
+    return po.astype(str).str.replace(r'\.0$', '', regex=True).str.strip()
+
+
+def order_line_keys(po, vendor, material):
+    """Clé « bon de commande | fournisseur | matériel » normalisée d'une ligne de commande
+
+    Les numéros lus comme décimaux (« 4500001234.0 ») et les espaces sont retirés pour que
+    les deux fichiers produisent des clés identiques.
+    """
+    material = material.astype(str).str.strip()
+    return order_keys(po) + "|" + order_keys(vendor) + "|" + material
 
 
 @st.cache_data
 def merge_df(df1, df2):
     if df1 is None or df2 is None or df1.empty or df2.empty:
         return df1
-    
-    # Préparer les données
+
+    # La k-ième livraison d'une ligne de commande reçoit la k-ième ligne de commande de même clé
+    cles1 = order_line_keys(df1["Bon de commande"], df1["Fournisseur"], df1["Matériel"]).to_numpy()
+    cles2 = order_line_keys(df2["Bons de commande"], df2["Fournisseur"], df2["Matériel"]).to_numpy()
+    livraisons = pd.DataFrame({"_cle": cles1})
+    livraisons["_rang"] = livraisons.groupby("_cle").cumcount()
+    commandes = pd.DataFrame({
+        "_cle": cles2,
+        "Document Date": df2["Date du document"].to_numpy(),
+        "Order Quantity": df2["Order Quantity"].to_numpy()
+    })
+    commandes["_rang"] = commandes.groupby("_cle").cumcount()
+
+    # Jointure vectorisée (une correspondance au plus par livraison, ordre des livraisons conservé)
+    appariement = livraisons.merge(commandes, on=["_cle", "_rang"], how="left")
+
     result = df1.copy()
-    result["Document Date"] = None
-    result["Order Quantity"] = None
-    
-    # STANDARDISATION DES FORMATS - Copier les DataFrames pour éviter les modifications
-    df1_clean = df1.copy()
-    df2_clean = df2.copy()
-    
-    # Standardiser les bons de commande (enlever les décimales si présentes)
-    df1_clean["Bon de commande"] = df1_clean["Bon de commande"].astype(str).str.replace('\.0$', '', regex=True).str.strip()
-    df2_clean["Bons de commande"] = df2_clean["Bons de commande"].astype(str).str.replace('\.0$', '', regex=True).str.strip()
-    
-    # Standardiser les fournisseurs (enlever les décimales et espaces)
-    df1_clean["Fournisseur"] = df1_clean["Fournisseur"].astype(str).str.replace('\.0$', '', regex=True).str.strip()
-    df2_clean["Fournisseur"] = df2_clean["Fournisseur"].astype(str).str.replace('\.0$', '', regex=True).str.strip()
-    
-    # Standardiser les matériels (enlever les espaces)
-    df1_clean["Matériel"] = df1_clean["Matériel"].astype(str).str.strip()
-    df2_clean["Matériel"] = df2_clean["Matériel"].astype(str).str.strip()
-    
-    # Convertir en numpy pour vitesse maximale avec les données nettoyées
-    df1_keys = (df1_clean["Bon de commande"].values.astype(str) + "|" + 
-                df1_clean["Fournisseur"].values.astype(str) + "|" + 
-                df1_clean["Matériel"].values.astype(str))
-    
-    df2_keys = (df2_clean["Bons de commande"].values.astype(str) + "|" + 
-                df2_clean["Fournisseur"].values.astype(str) + "|" + 
-                df2_clean["Matériel"].values.astype(str))
-    
-    # Créer mapping ultra-rapide
-    from collections import defaultdict
-    key_mapping = defaultdict(list)
-    for i, key in enumerate(df2_keys):
-        key_mapping[key].append(i)
-    
-    # Compteur par clé
-    key_counters = defaultdict(int)
-    
-    # Vectoriser l'assignation
-    doc_dates = result["Document Date"].values
-    quantities = result["Order Quantity"].values
-    df2_doc_dates = df2["Date du document"].values
-    df2_quantities = df2["Order Quantity"].values
-    
-    # Compteur de correspondances pour diagnostic
-    matches_found = 0
-    
-    # Boucle optimisée
-    for i, key in enumerate(df1_keys):
-        if key in key_mapping:
-            available_indices = key_mapping[key]
-            counter = key_counters[key]
-            if counter < len(available_indices):
-                df2_idx = available_indices[counter]
-                doc_dates[i] = df2_doc_dates[df2_idx]
-                quantities[i] = df2_quantities[df2_idx]
-                key_counters[key] += 1
-                matches_found += 1
-    
-    # Réassigner les valeurs
-    result["Document Date"] = doc_dates
-    result["Order Quantity"] = quantities
-    
+    result["Document Date"] = appariement["Document Date"].to_numpy()
+    result["Order Quantity"] = appariement["Order Quantity"].to_numpy()
+    return result
+
+
+def attach_order_value(df1, df2):
+    """Ajoute aux lignes de livraison la valeur nette de leur ligne de commande (colonne "Valeur nette")
+
+    La valeur d'une ligne de commande (bon de commande, fournisseur, matériel) est répartie
+    à parts égales entre ses livraisons : la somme des valeurs livrées reste égale à la valeur
+    commandée. Les livraisons sans commande correspondante ont une valeur manquante.
+    Calculé une seule fois au chargement des fichiers, par jointure vectorisée.
+
+    Args:
+        df1: DataFrame des délais de livraison
+        df2: DataFrame des commandes
+
+    Returns:
+        Copie de df1 avec la colonne "Valeur nette"
+    """
+    cles1 = order_line_keys(df1["Bon de commande"], df1["Fournisseur"], df1["Matériel"])
+    cles2 = order_line_keys(df2["Bons de commande"], df2["Fournisseur"], df2["Matériel"])
+    valeurs = df2["Valeur nette de la commande"].groupby(cles2.to_numpy()).sum()
+    livraisons = cles1.map(cles1.value_counts())
+
+    result = df1.copy()
+    result["Valeur nette"] = (cles1.map(valeurs) / livraisons).to_numpy()
     return result
     
 @st.cache_data
@@ -172,8 +201,8 @@ def add_prodline_name(df, reference_file):
             how="left"
         )
         
-        # Remplacement des valeurs NaN par une valeur par défaut
-        df_with_prodline["Prodline Name"] = df_with_prodline["Prodline Name"].fillna("NA / Raw Material / Semi fini")
+        # Remplacement des valeurs NaN par une valeur par défaut (lignes signalées par PRODLINE_RULES)
+        df_with_prodline["Prodline Name"] = df_with_prodline["Prodline Name"].fillna(PRODLINE_DEFAULT)
         
         # Ajout de la colonne Drop Status basée sur la valeur de MRP Controller
         df_with_prodline["Drop Statut"] = df_with_prodline["MRP Controller"].apply(
@@ -185,90 +214,104 @@ def add_prodline_name(df, reference_file):
         st.error(f"Erreur lors de l'ajout de Prodline Name: {str(e)}")
         return df
 
-@st.cache_data
-def load_and_validate_file1(uploaded_file):
-    if uploaded_file is not None:
-        try:
-            df = pd.read_excel(uploaded_file)
-            required_columns = ["Purchase order", "Vendor", "Name 1", "Material", 
-                                "Material Description", "Vendor Material Number", "Posting Date", 
-                                "Actual Lead Time", "Planned Deliv. Time"]
+def _load_file1(uploaded_file):
+    """Lit et valide le fichier des délais de livraison
+
+    Returns:
+        (DataFrame validé, rapport de validation) ou (None, None) en cas d'erreur
+    """
+    try:
+        df = pd.read_excel(uploaded_file)
+        required_columns = ["Purchase order", "Vendor", "Name 1", "Material", 
+                            "Material Description", "Vendor Material Number", "Posting Date", 
+                            "Actual Lead Time", "Planned Deliv. Time"]
+        # Check that all required columns exist
+        if all(column in df.columns for column in required_columns):
             df = df[required_columns]
-            # Check that all required columns exist
-            if all(column in df.columns for column in required_columns):
-                #Remplacer les valeurs None par des chaînes vides pour les trois colonnes spécifiées
-                df["Vendor Material Number"] = df["Vendor Material Number"].fillna("")
-                df["Material Description"] = df["Material Description"].fillna("")
-                df["Name 1"] = df["Name 1"].fillna("")
-                
-                # Date conversion
-                df["Posting Date"] = pd.to_datetime(df["Posting Date"], errors='coerce')
-                
-                # Remove rows with invalid dates
-                df = df.dropna(subset=["Posting Date"])
-                
-                # Convert lead time columns to numeric, coercing errors to NaN
-                df["Actual Lead Time"] = pd.to_numeric(df["Actual Lead Time"], errors='coerce')
-                df["Planned Deliv. Time"] = pd.to_numeric(df["Planned Deliv. Time"], errors='coerce')
-                
-                # Drop rows where either lead time is NaN
-                df = df.dropna(subset=["Actual Lead Time", "Planned Deliv. Time"])
-                
-                # Extract year, month and month name
-                df["Year"] = df["Posting Date"].dt.year
-                df["Month"] = df["Posting Date"].dt.month
-                df["Month_Name"] = df["Posting Date"].dt.strftime('%B')
-                
-                # Rename columns to French
-                df = df.rename(columns={
-                    "Purchase order": "Bon de commande",
-                    "Vendor": "Fournisseur",
-                    "Name 1": "Nom du fournisseur",
-                    "Material": "Matériel",
-                    "Material Description": "Description du matériel",
-                    "Vendor Material Number": "Matériel du fournisseur",
-                    "Posting Date": "Date de comptabilisation",
-                    "Actual Lead Time": "Délai réel",
-                    "Planned Deliv. Time": "Délai théorique"
-                })
-                
-                # Exclude 2022 data and material "Y4950100"
-                df = df[(df["Year"] != 2022) & (df["Matériel"] != "Y4950100")]
-                
-                # Calculate performance metrics
-                df["Écart de délai"] = df["Délai réel"] - df["Délai théorique"]
-                
-                # Define delivery status based on new categories
-                def categorize_delay(days_diff):
-                    if days_diff < 0:
-                        return "En avance"
-                    elif 0 <= days_diff <= 1:
-                        return "À temps"
-                    elif 2 <= days_diff <= 7:
-                        return "Retard accepté"
-                    else:  # 8 days or more
-                        return "Long délai"
-                
-                df["Statut de livraison"] = df["Écart de délai"].apply(categorize_delay)
-
-                colonne_df = ['Year','Month','Month_Name','Bon de commande','Fournisseur','Nom du fournisseur','Matériel','Description du matériel','Matériel du fournisseur','Date de comptabilisation','Délai réel','Délai théorique','Écart de délai','Statut de livraison']
-                df = df[colonne_df]
-                
-                return df
-            else:
-                missing_columns = [col for col in required_columns if col not in df.columns]
-                st.error(f"Le fichier Excel ne contient pas les colonnes nécessaires: {', '.join(missing_columns)}")
-                return None
-        except Exception as e:
-            st.error(f"Erreur lors du chargement du fichier: {str(e)}")
-            return None
-    return None
+            noms = {
+                "Purchase order": "Bon de commande",
+                "Vendor": "Fournisseur",
+                "Name 1": "Nom du fournisseur",
+                "Material": "Matériel",
+                "Material Description": "Description du matériel",
+                "Vendor Material Number": "Matériel du fournisseur",
+                "Posting Date": "Date de comptabilisation",
+                "Actual Lead Time": "Délai réel",
+                "Planned Deliv. Time": "Délai théorique"
+            }
+            # Valeurs lues avant remplacement et conversion, pour le rapport de validation
+            brutes = df.rename(columns=noms)
+
+            #Remplacer les valeurs None par des chaînes vides pour les trois colonnes spécifiées
+            df["Vendor Material Number"] = df["Vendor Material Number"].fillna("")
+            df["Material Description"] = df["Material Description"].fillna("")
+            df["Name 1"] = df["Name 1"].fillna("")
+            
+            # Date conversion
+            df["Posting Date"] = pd.to_datetime(df["Posting Date"], errors='coerce')
+            
+            # Convert lead time columns to numeric, coercing errors to NaN
+            df["Actual Lead Time"] = pd.to_numeric(df["Actual Lead Time"], errors='coerce')
+            df["Planned Deliv. Time"] = pd.to_numeric(df["Planned Deliv. Time"], errors='coerce')
+            
+            # Rename columns to French
+            df = df.rename(columns=noms)
+
+            # Dates ou délais manquants/illisibles, 2022 et matériel Y4950100 : lignes retirées et comptées
+            df, rapport = validate_frame(df, FILE1_RULES, source=brutes)
+            
+            # Extract year and month (month labels are looked up from the month number when displayed)
+            df["Year"] = df["Date de comptabilisation"].dt.year
+            df["Month"] = df["Date de comptabilisation"].dt.month
+            
+            # Calculate performance metrics
+            df["Écart de délai"] = df["Délai réel"] - df["Délai théorique"]
+            
+            # Define delivery status based on new categories
+            def categorize_delay(days_diff):
+                if days_diff < 0:
+                    return "En avance"
+                elif 0 <= days_diff <= 1:
+                    return "À temps"
+                elif 2 <= days_diff <= 7:
+                    return "Retard accepté"
+                else:  # 8 days or more
+                    return "Long délai"
+            
+            df["Statut de livraison"] = df["Écart de délai"].apply(categorize_delay)
+
+            colonne_df = ['Year','Month','Bon de commande','Fournisseur','Nom du fournisseur','Matériel','Description du matériel','Matériel du fournisseur','Date de comptabilisation','Délai réel','Délai théorique','Écart de délai','Statut de livraison']
+            df = df[colonne_df]
+            
+            return df, rapport
+        else:
+            missing_columns = [col for col in required_columns if col not in df.columns]
+            st.error(f"Le fichier Excel ne contient pas les colonnes nécessaires: {', '.join(missing_columns)}")
+            return None, None
+    except Exception as e:
+        st.error(f"Erreur lors du chargement du fichier: {str(e)}")
+        return None, None
 
 @st.cache_data
-def load_and_validate_file2(uploaded_file, reference_df=None):
-    if uploaded_file is None:
-        return None
-        
+def load_and_validate_file1(uploaded_file, with_report=False):
+    """Charge le fichier des délais de livraison
+
+    Args:
+        uploaded_file: fichier Excel importé
+        with_report: renvoyer aussi le rapport de validation (lignes retirées et motifs)
+
+    Returns:
+        DataFrame validé (None en cas d'erreur), ou couple (DataFrame, rapport) si with_report
+    """
+    df, rapport = _load_file1(uploaded_file) if uploaded_file is not None else (None, None)
+    return (df, rapport) if with_report else df
+
+def _load_file2(uploaded_file, reference_df=None):
+    """Lit et valide le fichier des commandes
+
+    Returns:
+        (DataFrame validé, rapport de validation) ou (None, None) en cas d'erreur
+    """
     try:
         # Chargement du fichier
         df2 = pd.read_excel(uploaded_file)
@@ -279,7 +322,7 @@ def load_and_validate_file2(uploaded_file, reference_df=None):
         
         if missing_columns:
             st.error(f"Le fichier Excel ne contient pas les colonnes nécessaires: {', '.join(missing_columns)}")
-            return None
+            return None, None
         
         # Création d'un nouveau DataFrame pour éviter les problèmes de référence
         df2_processed = pd.DataFrame()
@@ -294,13 +337,18 @@ def load_and_validate_file2(uploaded_file, reference_df=None):
         df2_processed["Order Unit"] = df2["Order Unit"]
 
         
-        # Nettoyer les données
-        df2_processed = df2_processed.dropna(subset=["Date du document", "Valeur nette de la commande"])
+        # Nettoyer les données : dates et valeurs manquantes ou illisibles retirées et comptées
+        brutes = pd.DataFrame({
+            "Bons de commande": df2["Purchasing Document"],
+            "Date du document": df2["Document Date"],
+            "Valeur nette de la commande": df2["Net Order Value"],
+            "Order Quantity": df2["Order Quantity"]
+        })
+        df2_processed, rapport = validate_frame(df2_processed, FILE2_RULES, source=brutes)
         
         # Ajouter les informations temporelles
         df2_processed["Year"] = df2_processed["Date du document"].dt.year
         df2_processed["Month"] = df2_processed["Date du document"].dt.month
-        df2_processed["Month_Name"] = df2_processed["Date du document"].dt.strftime('%B')
         
         # Initialiser les colonnes supplémentaires
         df2_processed["Nom du fournisseur"] = "Fournisseur inconnu"
@@ -340,11 +388,26 @@ def load_and_validate_file2(uploaded_file, reference_df=None):
                     df2_processed.at[idx, "Description du matériel"] = material_dict[key]["Description"]
                     df2_processed.at[idx, "Matériel du fournisseur"] = material_dict[key]["VendorMaterial"]
         
-        return df2_processed
+        return df2_processed, rapport
         
     except Exception as e:
         st.error(f"Erreur lors du chargement du fichier: {str(e)}")
-        return None
+        return None, None
+
+@st.cache_data
+def load_and_validate_file2(uploaded_file, reference_df=None, with_report=False):
+    """Charge le fichier des commandes
+
+    Args:
+        uploaded_file: fichier Excel importé
+        reference_df: DataFrame des délais (noms des fournisseurs et descriptions des matériels)
+        with_report: renvoyer aussi le rapport de validation (lignes retirées et motifs)
+
+    Returns:
+        DataFrame validé (None en cas d'erreur), ou couple (DataFrame, rapport) si with_report
+    """
+    df2, rapport = _load_file2(uploaded_file, reference_df) if uploaded_file is not None else (None, None)
+    return (df2, rapport) if with_report else df2
     
 def display_header():
     st.markdown("""
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+
+
+# Libellés des mois, indexés par le numéro du mois - 1 (calculés une seule fois)
+MONTH_NAMES = {
+    "fr": ["Janvier", "Février", "Mars", "Avril", "Mai", "Juin",
+           "Juillet", "Août", "Septembre", "Octobre", "Novembre", "Décembre"],
+    "en": ["January", "February", "March", "April", "May", "June",
+           "July", "August", "September", "October", "November", "December"]
+}
+
+MONTH_ABBR = {
+    "fr": ["Jan", "Fév", "Mar", "Avr", "Mai", "Juin", "Juil", "Août", "Sep", "Oct", "Nov", "Déc"],
+    "en": ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+}
+
+# Mêmes tables sous forme de tableaux NumPy, avec une case vide en tête pour les mois inconnus
+_LABEL_ARRAYS = {
+    (lang, abbr): np.array([""] + (MONTH_ABBR if abbr else MONTH_NAMES)[lang], dtype=object)
+    for lang in MONTH_NAMES
+    for abbr in (False, True)
+}
+
+
+def month_table(lang="fr", abbr=False):
+    """Renvoie le dictionnaire {numéro du mois: libellé} pour les 12 mois"""
+    return dict(enumerate((MONTH_ABBR if abbr else MONTH_NAMES)[lang], start=1))
+
+
+def month_name(month, lang="fr", abbr=False):
+    """Renvoie le libellé d'un mois à partir de son numéro (1 à 12)"""
+    return (MONTH_ABBR if abbr else MONTH_NAMES)[lang][int(month) - 1]
+
+
+def month_labels(months, lang="fr", abbr=False):
+    """Convertit en bloc des numéros de mois en libellés, par simple lecture dans la table
+
+    Remplace dt.strftime('%B') ou babel, évalués ligne par ligne : à appliquer de préférence
+    sur les données déjà agrégées par mois (au plus 12 libellés distincts).
+
+    Args:
+        months: numéros de mois (Series, tableau ou liste) ; les valeurs manquantes donnent ""
+        lang: langue des libellés ("fr" ou "en")
+        abbr: libellés abrégés (Jan, Fév...) au lieu des noms complets
+
+    Returns:
+        Series de libellés (même index que l'entrée si c'est une Series)
+    """
+    index = months.index if isinstance(months, pd.Series) else None
+    codes = pd.to_numeric(pd.Series(months, copy=False), errors="coerce").to_numpy(dtype=float)
+    codes = np.where((codes >= 1) & (codes <= 12), np.nan_to_num(codes), 0).astype(int)
+    return pd.Series(_LABEL_ARRAYS[(lang, abbr)][codes], index=index)
@@ -1,22 +1,14 @@
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 import streamlit as st
 from datetime import datetime
-from part1 import *
-from part2 import *
-from part5 import *
-from part4 import *
-from part3 import *
 from load1 import *
-from part1_one import *
-from part1_two import *
-from part1_three import *
-from part1_four import *
-from gamme import *
-from part1_five import *
 from file1 import *
-from part22 import *
+from views1 import *
+from vendor1 import *
+from anomaly1 import *
+from alert1 import refresh_alerts
+from quality1 import validate_frame, deduplicate, merge_reports, DEDUP_POLICIES, DEDUP_DEFAULT
+from workspace1 import show_workspace_open, show_workspace_save
 
 st.set_page_config(layout="wide",page_title="Suivi de la Performance Fournisseur ⭐")
 
@@ -62,19 +54,36 @@ def main():
                 st.markdown("<p>Fichier des produits VC:</p>", unsafe_allow_html=True)
                 vc_file = st.file_uploader("Importez votre quatrième fichier Excel (produits VC)", type=["xlsx"], key="file4")
             
+            # Traitement des lignes répétées par des extractions SAP qui se recouvrent
+            politique_doublons = st.radio(
+                "Doublons", list(DEDUP_POLICIES), format_func=DEDUP_POLICIES.get,
+                index=list(DEDUP_POLICIES).index(DEDUP_DEFAULT), horizontal=True, key="doublons_politique",
+                help="Doublon exact : ligne identique à une précédente. Doublon de clé : même bon de commande, "
+                     "fournisseur, matériel et date qu'une précédente, mais valeurs différentes."
+            )
+            
+            # Reprendre une analyse enregistrée sans réimporter les fichiers
+            show_workspace_open()
+            
             st.markdown("</div>", unsafe_allow_html=True)
         
         # Vérifier si TOUS les fichiers sont présents avant de commencer le traitement
         if uploaded_file1 is not None and uploaded_file2 is not None and prodline_ref_file is not None and vc_file is not None:
             # Charger les fichiers
-            df1 = load_and_validate_file1(uploaded_file1)
+            df1, rapport1 = load_and_validate_file1(uploaded_file1, with_report=True)
+            doublons1 = gammes1 = None
             if df1 is not None:
+                df1, doublons1 = deduplicate(df1, FILE1_KEYS, politique_doublons)
                 df1 = add_prodline_name(df1, prodline_ref_file)
+                df1, gammes1 = validate_frame(df1, PRODLINE_RULES)
                 df1 = add_vc_status(df1, vc_file)
             
-            df2 = load_and_validate_file2(uploaded_file2, df1)
+            df2, rapport2 = load_and_validate_file2(uploaded_file2, df1, with_report=True)
+            doublons2 = gammes2 = None
             if df2 is not None:
+                df2, doublons2 = deduplicate(df2, FILE2_KEYS, politique_doublons)
                 df2 = add_prodline_name(df2, prodline_ref_file)
+                df2, gammes2 = validate_frame(df2, PRODLINE_RULES)
                 df2 = add_vc_status(df2, vc_file)
             
             # Vérifier/ajouter la colonne Drop Statut si nécessaire
@@ -85,6 +94,17 @@ def main():
             
             # Si les deux fichiers sont chargés avec succès, mettre à jour l'état de session
             if df1 is not None and df2 is not None:
+                # Valeur nette des commandes portée sur les lignes de livraison (jointure faite une seule fois)
+                df1 = attach_order_value(df1, df2)
+                # Scores d'anomalie des délais (calculés une seule fois, lus ensuite par le filtre)
+                df1 = score_anomalies(df1)
+                # Règles d'alerte : seuls les éléments touchés par les nouvelles données sont réévalués
+                st.session_state.alerts = refresh_alerts(df1, st.session_state.get("alerts"))
+                # Bilan de la validation : lignes retirées (et motifs) et valeurs signalées
+                st.session_state.quality = merge_reports([
+                    ("Fichier 1", rapport1), ("Fichier 1", doublons1), ("Fichier 1", gammes1),
+                    ("Fichier 2", rapport2), ("Fichier 2", doublons2), ("Fichier 2", gammes2)
+                ])
                 st.session_state.files_uploaded = True
                 st.session_state.df1 = df1
                 st.session_state.df2 = df2
@@ -114,8 +134,12 @@ def main():
             st.session_state.files_uploaded = False
             st.session_state.pop('df1', None)
             st.session_state.pop('df2', None)
+            st.session_state.pop('quality', None)
             st.rerun()
 
+        # Enregistrer l'analyse en cours (données traitées, agrégats et filtres) pour la rouvrir plus tard
+        show_workspace_save()
+
     if df1 is not None and df2 is not None and st.session_state.files_uploaded:
         # Récupérer les années et mois uniques pour les filtres
         # Combiner les années des deux dataframes
@@ -125,12 +149,23 @@ def main():
         
         # Filtres interactifs
         st.sidebar.markdown("<h2 style='color: #1E88E5;'>Filtres</h2>", unsafe_allow_html=True)
+
+        # Exclusion des anomalies de délai (livraisons et commandes correspondantes) : simple lecture
+        # des indicateurs calculés à l'import
+        all_df1 = df1
+        df1, df2 = anomaly_filter(df1, df2)
+        # Empreinte des délais analysés : celle du fichier importé (calculée une fois) et le choix
+        # d'exclusion des anomalies. Les agrégats précalculés sont retrouvés sans rehacher les lignes
+        df1_key = data_fingerprint(
+            session_fingerprint("df1"),
+            st.session_state.get("anomalies_exclure"), st.session_state.get("anomalies_portee")
+        )
         
         # Filtre d'année (select au lieu de multiselect)
         year_options = [str(int(y)) for y in available_years]  # Convertir en entier pour éviter la virgule
         # Ajouter "Toutes les années" au début de la liste
         year_options = ["Toutes les années"] + year_options
-        selected_year = st.sidebar.selectbox("Sélectionnez l'année", year_options)
+        selected_year = st.sidebar.selectbox("Sélectionnez l'année", year_options, key="filtre_annee")
         
         # Appliquer le filtre d'année aux deux dataframes
         if selected_year != "Toutes les années":
@@ -146,8 +181,7 @@ def main():
         
         # Filtre de mois (select au lieu de multiselect)
         available_months = []
-        month_names = {1:'Janvier', 2:'Février', 3:'Mars', 4:'Avril', 5:'Mai', 6:'Juin', 
-                      7:'Juillet', 8:'Août', 9:'Septembre', 10:'Octobre', 11:'Novembre', 12:'Décembre'}
+        month_names = month_table()
         
         if selected_year != "Toutes les années":
             # Trouver les mois disponibles dans les deux dataframes
@@ -158,7 +192,7 @@ def main():
             month_options = [f"{m} - {month_names[m]}" for m in available_months]
             # Ajouter "Tous les mois" au début de la liste
             month_options = ["Tous les mois"] + month_options
-            selected_month_option = st.sidebar.selectbox("Sélectionnez le mois", month_options)
+            selected_month_option = st.sidebar.selectbox("Sélectionnez le mois", month_options, key="filtre_mois")
             
             if selected_month_option != "Tous les mois":
                 month = int(selected_month_option.split(" - ")[0])
@@ -186,27 +220,20 @@ def main():
         # Liste déroulante des fournisseurs
         st.sidebar.markdown("<h3 style='color: #1E88E5; margin-top: 20px;'>Sélection fournisseur</h3>", unsafe_allow_html=True)
         
-        # Obtenir les fournisseurs communs des deux dataframes filtrés
-        vendors_df1 = set(month_filtered_df1["Nom du fournisseur"].unique())
-        vendors_df2 = set(month_filtered_df2["Nom du fournisseur"].unique())
-        common_vendors = sorted(vendors_df1.intersection(vendors_df2))
-        
-        # Si pas de fournisseurs communs, prendre tous les fournisseurs
-        all_vendors = sorted([str(vendor) for vendor in list(vendors_df1.union(vendors_df2))])
-        vendor_list = common_vendors if common_vendors else all_vendors
-        
-        # Ajouter "Tous les fournisseurs" au début de la liste
-        vendor_options = ["Tous les fournisseurs"] + vendor_list
-        selected_vendor = st.sidebar.selectbox("Choisissez un fournisseur", vendor_options)
+        # Recherche de fournisseur : l'annuaire (codes, noms, index de recherche, fournisseurs
+        # disponibles par année / mois) n'est construit qu'une fois par jeu de données
+        supplier_directory = build_supplier_directory(df1, df2)
+        selected_vendor = supplier_picker(supplier_directory, year, month)
         # Filtre de période - affiché seulement si une année ET un fournisseur sont sélectionnés
         if selected_year != "Toutes les années" and selected_vendor != "Tous les fournisseurs" and month == "Tous":
             st.sidebar.markdown("<h3 style='color: #1E88E5; margin-top: 20px;'>Période</h3>", unsafe_allow_html=True)
-            setup_period_filter(int(selected_year))
+            view("setup_period_filter")(int(selected_year))
         else:
             # Valeurs par défaut si aucune année n'est sélectionnée
             st.session_state.start_month = 1
             st.session_state.end_month = 12
             st.session_state.selected_months = list(range(1, 13))
+            st.session_state.period = None
         
         # Filtre de gamme de produit - Maintenant permis sans sélection préalable
         st.sidebar.markdown("<h3 style='color: #1E88E5; margin-top: 20px;'>Gamme de produit</h3>", unsafe_allow_html=True)
@@ -220,7 +247,7 @@ def main():
         
         # Ajouter "Toutes les gammes" au début de la liste
         prodline_options = ["Toutes les gammes"] + all_prodline_list
-        selected_prodline = st.sidebar.selectbox("Choisissez une gamme de produit", prodline_options)
+        selected_prodline = st.sidebar.selectbox("Choisissez une gamme de produit", prodline_options, key="filtre_gamme")
         
         # Initialiser selected_vc_types
         selected_vc_types = []
@@ -253,7 +280,7 @@ def main():
             
             # Ajouter "Tous les statuts" au début de la liste
             status_options = ["Tous les statuts"] + list(drop_status_values)
-            selected_status = st.sidebar.selectbox("Choisissez un statut", status_options)
+            selected_status = st.sidebar.selectbox("Choisissez un statut", status_options, key="filtre_statut")
         else:
             # Si aucun autre filtre n'est sélectionné, désactiver ce filtre
             st.sidebar.markdown(
@@ -308,6 +335,27 @@ def main():
         else:
             filtered_df1 = status_filtered_df1
             filtered_df2 = status_filtered_df2
+
+        # Livraisons filtrées sur les seuls statut, gamme et type VC : historique des indicateurs
+        # glissants, dont les fenêtres ne s'arrêtent pas au 1er janvier de l'année choisie
+        scope_df1 = df1
+        if selected_status != "Tous les statuts":
+            scope_df1 = scope_df1[scope_df1["Drop Statut"] == selected_status]
+        if selected_prodline != "Toutes les gammes":
+            scope_df1 = scope_df1[scope_df1["Prodline Name"] == selected_prodline]
+        if selected_vc_types and "Type VC" in scope_df1.columns:
+            scope_df1 = scope_df1[scope_df1["Type VC"].isin(selected_vc_types)]
+
+        # Commandes filtrées sur les seuls statut, gamme et type VC : la grille des camemberts par
+        # gamme n'est construite qu'une fois par jeu de filtres, l'année, le mois, le fournisseur
+        # et la période étant passés en périmètre
+        scope_df2 = df2
+        if selected_status != "Tous les statuts":
+            scope_df2 = scope_df2[scope_df2["Drop Statut"] == selected_status]
+        if selected_prodline != "Toutes les gammes":
+            scope_df2 = scope_df2[scope_df2["Prodline Name"] == selected_prodline]
+        if selected_vc_types and "Type VC" in scope_df2.columns:
+            scope_df2 = scope_df2[scope_df2["Type VC"].isin(selected_vc_types)]
         
         # Gérer le cas où le filtre ne retourne aucune donnée
         if filtered_df1.empty or filtered_df2.empty:
@@ -408,7 +456,7 @@ def main():
             if selected_vc_types and len(selected_vc_types) < len(vc_values):
                 st.markdown(f"<h6 style='color: #1E88E5;'>Type(s): {', '.join(selected_vc_types)}</h6>", unsafe_allow_html=True)
             # Appel à la fonction d'analyse de gamme
-            analyser_gamme(gamme_df2, selected_prodline)
+            view("analyser_gamme")(gamme_df2, selected_prodline)
             
         # Affichage des résultats en fonction des filtres existants
         elif selected_year != "Toutes les années" and month != "Tous" and selected_vendor != "Tous les fournisseurs":
@@ -430,11 +478,20 @@ def main():
             if selected_vc_types and "Type VC" in special_df1_part3.columns:
                 special_df1_part3 = special_df1_part3[special_df1_part3["Type VC"].isin(selected_vc_types)]
 
-            part_three(special_df1_part3, year, month, selected_vendor)
-            part1_three(filtered_df2, year, month, selected_vendor)
+            # Toutes années pour part1_three, afin de comparer le mois à ses périodes de référence
+            special_df2_part1_three = df2
+            if selected_status != "Tous les statuts":
+                special_df2_part1_three = special_df2_part1_three[special_df2_part1_three["Drop Statut"] == selected_status]
+            if selected_prodline != "Toutes les gammes":
+                special_df2_part1_three = special_df2_part1_three[special_df2_part1_three["Prodline Name"] == selected_prodline]
+            if selected_vc_types and "Type VC" in special_df2_part1_three.columns:
+                special_df2_part1_three = special_df2_part1_three[special_df2_part1_three["Type VC"].isin(selected_vc_types)]
+
+            view("part_three")(special_df1_part3, year, month, selected_vendor)
+            view("part1_three")(special_df2_part1_three, year, month, selected_vendor)
 
             if selected_prodline == "Toutes les gammes":
-                camembert3(filtered_df2, year, month, selected_vendor)
+                view("camembert3")(scope_df2, year, month, selected_vendor)
         elif selected_vendor != "Tous les fournisseurs":
             # Mode fournisseur spécifique
             if selected_year == "Toutes les années":
@@ -446,10 +503,11 @@ def main():
                     st.markdown(f"<h6 style='color: #1E88E5;'>Statut: {selected_status}</h6>", unsafe_allow_html=True)
                 if selected_vc_types and len(selected_vc_types) < len(vc_values):
                     st.markdown(f"<h6 style='color: #1E88E5;'>Type(s): {', '.join(selected_vc_types)}</h6>", unsafe_allow_html=True)
-                part_four(filtered_df1, selected_vendor)
-                part1_four(filtered_df2, selected_vendor)
+                view("part_four")(filtered_df1, selected_vendor)
+                view("tendance_glissante")(filtered_df1, selected_vendor)
+                view("part1_four")(filtered_df2, selected_vendor)
                 if selected_prodline == "Toutes les gammes":
-                    camembert4(filtered_df2, selected_vendor)
+                    view("camembert4")(scope_df2, selected_vendor)
 
             elif month == "Tous":
                 # Fournisseur sur une année spécifique (Vue 5)
@@ -469,14 +527,8 @@ def main():
                 if selected_vc_types and "Type VC" in special_df1_part5.columns:
                     special_df1_part5 = special_df1_part5[special_df1_part5["Type VC"].isin(selected_vc_types)]
 
-                # Création d'un DataFrame spécial pour part1_five (à partir de df2 complet)
-                special_df2_part1_five = df2.copy()
-                if selected_status != "Tous les statuts":
-                    special_df2_part1_five = special_df2_part1_five[special_df2_part1_five["Drop Statut"] == selected_status]
-                if selected_prodline != "Toutes les gammes":
-                    special_df2_part1_five = special_df2_part1_five[special_df2_part1_five["Prodline Name"] == selected_prodline]
-                if selected_vc_types and "Type VC" in special_df2_part1_five.columns:
-                    special_df2_part1_five = special_df2_part1_five[special_df2_part1_five["Type VC"].isin(selected_vc_types)]
+                # DataFrame spécial pour part1_five : df2 complet filtré par statut, gamme et type VC
+                special_df2_part1_five = scope_df2
 
                 # Fusionner les DataFrames AVANT d'appeler part_five
                 special_df1_part5 = merge_df(special_df1_part5, special_df2_part1_five)
@@ -484,10 +536,10 @@ def main():
 
                 # Utilisez ce DataFrame spécial
                 # setup_period_filter(year)
-                part_five(special_df1_part5, year, selected_vendor)
-                part1_five(special_df2_part1_five, year, selected_vendor)
+                view("part_five")(special_df1_part5, year, selected_vendor)
+                view("part1_five")(special_df2_part1_five, year, selected_vendor)
                 if selected_prodline == "Toutes les gammes":
-                    camembert5(filtered_df2, year, selected_vendor)
+                    view("camembert5")(scope_df2, year, selected_vendor)
             else:
                 # Mois et année spécifiques pour un fournisseur
                 if selected_prodline != "Toutes les gammes":
@@ -497,10 +549,10 @@ def main():
                     st.markdown(f"<h6 style='color: #1E88E5;'>Statut: {selected_status}</h6>", unsafe_allow_html=True)
                 if selected_vc_types and len(selected_vc_types) < len(vc_values):
                     st.markdown(f"<h6 style='color: #1E88E5;'>Type(s): {', '.join(selected_vc_types)}</h6>", unsafe_allow_html=True)
-                part_two(filtered_df1, year, month)
-                part1_two(filtered_df2, year, month)
+                view("part_two")(filtered_df1, year, month)
+                view("part1_two")(filtered_df2, year, month)
                 if selected_prodline == "Toutes les gammes":
-                    camembert2(filtered_df2, year, month)
+                    view("camembert2")(scope_df2, year, month)
 
         else:
             # Mode standard (sans fournisseur spécifique)
@@ -513,10 +565,11 @@ def main():
                     st.markdown(f"<h6 style='color: #1E88E5;'>Statut: {selected_status}</h6>", unsafe_allow_html=True)
                 if selected_vc_types and len(selected_vc_types) < len(vc_values):
                     st.markdown(f"<h6 style='color: #1E88E5;'>Type(s): {', '.join(selected_vc_types)}</h6>", unsafe_allow_html=True)
-                part_two(filtered_df1, year, month)
-                part1_two(filtered_df2, year, month)
+                view("part_two")(filtered_df1, year, month)
+                view("show_supplier_segments")(filtered_df1, key="segments_mois")
+                view("part1_two")(filtered_df2, year, month)
                 if selected_prodline == "Toutes les gammes":
-                    camembert2(filtered_df2, year, month)
+                    view("camembert2")(scope_df2, year, month)
 
             elif selected_year != "Toutes les années":
                 # Vue 1: Année spécifique
@@ -527,10 +580,14 @@ def main():
                     st.markdown(f"<h6 style='color: #1E88E5;'>Statut: {selected_status}</h6>", unsafe_allow_html=True)
                 if selected_vc_types and len(selected_vc_types) < len(vc_values):
                     st.markdown(f"<h6 style='color: #1E88E5;'>Type(s): {', '.join(selected_vc_types)}</h6>", unsafe_allow_html=True)
-                part_one(filtered_df1, year)
-                part1_one(filtered_df2, year)
+                view("part_one")(filtered_df1, year, history=scope_df1)
+                # Segmentation des fournisseurs de l'année (plus fine que la séparation bons / à améliorer)
+                view("show_supplier_segments")(filtered_df1, key="segments_annee")
+                # Comparaison des fournisseurs d'un même matériel
+                view("show_dual_sourcing")(filtered_df1, key="sourcing_annee")
+                view("part1_one")(filtered_df2, year)
                 if selected_prodline == "Toutes les gammes":
-                    camembert1(filtered_df2, year)
+                    view("camembert1")(scope_df2, year)
 
             else:
                 st.markdown("""
@@ -541,6 +598,12 @@ def main():
                 </div>
                 """, unsafe_allow_html=True)
                 
+                # Alertes actives (évaluées au chargement des fichiers)
+                view("show_alerts")(st.session_state.get("alerts"), all_df1)
+
+                # Lignes retirées ou signalées par la validation des fichiers importés
+                view("show_quality_report")(st.session_state.get("quality"))
+
                 st.markdown("<h4 style='color: #1E88E5;'>Fichier 1: Délais de livraison</h4>", unsafe_allow_html=True)
                 st.markdown(
                     f"""
@@ -586,17 +649,29 @@ def main():
                     "nb_lignes": "Lignes de commandes"
                 })
                 
-                # Formater les nombres - sans virgule pour les années
-                years_summary1["Année"] = years_summary1["Année"].apply(lambda x: format_number(x, is_year=True))
-                
-                # Formater les autres colonnes avec séparateurs de milliers
-                for col in ["Fournisseurs", "Nbre de commandes", "Nbre de références", "Lignes de commandes"]:
-                    years_summary1[col] = years_summary1[col].apply(lambda x: format_number(x))
+                # Formatage délégué à la grille - sans séparateur pour les années
+                summary1_columns_config = numeric_column_config(
+                    years=["Année"],
+                    thousands=["Fournisseurs", "Nbre de commandes", "Nbre de références", "Lignes de commandes"]
+                )
                 
                 # Afficher le DataFrame sans l'index
-                st.dataframe(years_summary1, use_container_width=True, hide_index=True)
+                st.dataframe(years_summary1, use_container_width=True, hide_index=True, column_config=summary1_columns_config)
                 st.markdown("</div>", unsafe_allow_html=True)
 
+                # Carte de chaleur fournisseur x mois sur tout l'historique : grille précalculée,
+                # retrouvée par l'empreinte des délais et des filtres appliqués (statut, gamme, type VC)
+                view("show_supplier_heatmap")(
+                    filtered_df1,
+                    fingerprint=data_fingerprint(df1_key, selected_status, selected_prodline, selected_vc_types)
+                )
+
+                # Comparaison des fournisseurs d'un même matériel, sur tout l'historique
+                view("show_dual_sourcing")(filtered_df1, key="sourcing_global")
+
+                # Livraisons anomales (liste complète, même si elles sont exclues des analyses)
+                view("show_anomalies")(all_df1)
+
                 
                 # Fichier 2
                 st.markdown("<h4 style='color: #1E88E5; margin-top: 30px;'>Fichier 2: Commandes</h4>", unsafe_allow_html=True)
@@ -648,18 +723,15 @@ def main():
                     "total_value": "Valeur totale"
                 })
                 
-                # Formater les nombres - sans virgule pour les années
-                years_summary2["Année"] = years_summary2["Année"].apply(lambda x: format_number(x, is_year=True))
-                
-                # Formater les autres colonnes avec séparateurs de milliers
-                for col in ["Fournisseurs", "Nbre de commandes", "Nbre de références", "Lignes de commandes"]:
-                    years_summary2[col] = years_summary2[col].apply(lambda x: format_number(x))
-                
-                # Formater la valeur totale
-                years_summary2["Valeur totale"] = years_summary2["Valeur totale"].apply(format_currency)
+                # Formatage délégué à la grille - sans séparateur pour les années
+                summary2_columns_config = numeric_column_config(
+                    years=["Année"],
+                    thousands=["Fournisseurs", "Nbre de commandes", "Nbre de références", "Lignes de commandes"],
+                    currency=["Valeur totale"]
+                )
                 
                 # Afficher le DataFrame sans l'index
-                st.dataframe(years_summary2, use_container_width=True, hide_index=True)
+                st.dataframe(years_summary2, use_container_width=True, hide_index=True, column_config=summary2_columns_config)
                 st.markdown("</div>", unsafe_allow_html=True)
                 
                 # Instructions d'utilisation
@@ -680,6 +752,43 @@ def main():
                     unsafe_allow_html=True
                 )
 
+        # Quantiles des délais (P50 / P90 / P95) et indicateurs pondérés par la valeur pour la sélection
+        if not filtered_df1.empty and (selected_year != "Toutes les années" or selected_vendor != "Tous les fournisseurs" or selected_prodline != "Toutes les gammes"):
+            delay_selection = {
+                "Year": year if selected_year != "Toutes les années" else None,
+                "Month": month if month != "Tous" else None,
+                "Nom du fournisseur": selected_vendor if selected_vendor != "Tous les fournisseurs" else None,
+                "Prodline Name": selected_prodline if selected_prodline != "Toutes les gammes" else None,
+                "Drop Statut": selected_status if selected_status != "Tous les statuts" else None,
+                "Type VC": selected_vc_types or None
+            }
+            delay_lines = filtered_df1 if selected_vendor != "Tous les fournisseurs" else None
+            # Période de la barre latérale (vue fournisseur + année) : les mois qu'elle couvre,
+            # qui peuvent chevaucher l'année précédente, remplacent l'année sélectionnée
+            period = st.session_state.get("period")
+            if period is not None:
+                cell_selection = {**delay_selection, "Year": None, "Month": None, ("Year", "Month"): period_year_months(period)}
+                delay_lines = scope_df1[
+                    (scope_df1["Nom du fournisseur"] == selected_vendor).to_numpy() & period_month_mask(scope_df1, period)
+                ]
+            else:
+                cell_selection = delay_selection
+            view("show_delay_quantiles")(df1, cell_selection, delay_lines, df1_key)
+            # Taux à temps pondérés par la valeur et valeur à risque, détaillés par fournisseur ou par gamme
+            view("show_value_kpis")(
+                filtered_df1,
+                "Prodline Name" if selected_vendor != "Tous les fournisseurs" else "Nom du fournisseur"
+            )
+            # Simulation des seuils de statut à partir des histogrammes d'écart par cellule
+            view("show_threshold_whatif")(
+                df1, cell_selection,
+                "Prodline Name" if selected_vendor != "Tous les fournisseurs" else "Nom du fournisseur",
+                df1_key
+            )
+
+    # Profil des imports différés (diagnostic du temps de démarrage)
+    show_import_profile()
+
 
 if __name__ == "__main__":
     main()
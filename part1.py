@@ -5,6 +5,7 @@ from plotly.subplots import make_subplots
 import streamlit as st
 from datetime import datetime
 from file1 import *
+from rolling1 import *
 
 def colorize_dataframe(df):
     """Applique des couleurs aux lignes du dataframe"""
@@ -19,7 +20,7 @@ def colorize_dataframe(df):
     # Appliquer les styles
     return df.style.set_table_styles(styles)
 
-def part_one(df, annee):
+def part_one(df, annee, history=None):
       # Définition d'une palette de couleurs
     color_palette = {
         'primary': '#6366F1',         # Indigo vif
@@ -145,74 +146,80 @@ def part_one(df, annee):
     colors = ["#28a745", "#007bff", "#ffc107", "#dc3545"]
 
     with col1:
-        # Graphique pour produits
-        fig_taux_produits = go.Figure(go.Pie(
-            labels=statut_labels,
-            values=[
-                statut_counts_produits.get("En avance", 0), 
-                statut_counts_produits.get("À temps", 0),
-                statut_counts_produits.get("Retard accepté", 0), 
-                statut_counts_produits.get("Long délai", 0)
-            ],
-            marker=dict(colors=colors),
-            hole=0.6,
-            textinfo="percent",
-            hoverinfo="label+percent+value",
-            textfont=dict(size=12),
-            insidetextorientation='radial'
-        ))
+        def build_taux_produits(statut_counts_produits, nb_produits):
+            # Graphique pour produits
+            fig_taux_produits = go.Figure(go.Pie(
+                labels=statut_labels,
+                values=[
+                    statut_counts_produits.get("En avance", 0), 
+                    statut_counts_produits.get("À temps", 0),
+                    statut_counts_produits.get("Retard accepté", 0), 
+                    statut_counts_produits.get("Long délai", 0)
+                ],
+                marker=dict(colors=colors),
+                hole=0.6,
+                textinfo="percent",
+                hoverinfo="label+percent+value",
+                textfont=dict(size=12),
+                insidetextorientation='radial'
+            ))
         
-        fig_taux_produits.update_layout(
-            title="Répartition des livraisons (Produits)",
-            height=350,
-            annotations=[dict(text=f"{len(df_filtre)}\nproduits", x=0.5, y=0.5, font_size=14, showarrow=False)],
-            legend=dict(
-                orientation="v", 
-                yanchor="top", 
-                y=0.95, 
-                xanchor="left", 
-                x=1.02,
-                font=dict(size=12)
-            ),
-            margin=dict(l=20, r=120, t=50, b=20)
-        )
-        
-        st.plotly_chart(fig_taux_produits, use_container_width=True)
+            fig_taux_produits.update_layout(
+                title="Répartition des livraisons (Produits)",
+                height=350,
+                annotations=[dict(text=f"{nb_produits}\nproduits", x=0.5, y=0.5, font_size=14, showarrow=False)],
+                legend=dict(
+                    orientation="v", 
+                    yanchor="top", 
+                    y=0.95, 
+                    xanchor="left", 
+                    x=1.02,
+                    font=dict(size=12)
+                ),
+                margin=dict(l=20, r=120, t=50, b=20)
+            )
+            return fig_taux_produits
+
+        # Afficher le graphique (reconstruit uniquement si ses données changent)
+        st.plotly_chart(cached_figure(build_taux_produits, statut_counts_produits, len(df_filtre)), use_container_width=True)
 
     with col2:
-        # Graphique pour commandes
-        fig_taux_commandes = go.Figure(go.Pie(
-            labels=statut_labels,
-            values=[
-                statut_counts_commandes.get("En avance", 0), 
-                statut_counts_commandes.get("À temps", 0),
-                statut_counts_commandes.get("Retard accepté", 0), 
-                statut_counts_commandes.get("Long délai", 0)
-            ],
-            marker=dict(colors=colors),
-            hole=0.6,
-            textinfo="percent",
-            hoverinfo="label+percent+value",
-            textfont=dict(size=12),
-            insidetextorientation='radial'
-        ))
-        
-        fig_taux_commandes.update_layout(
-            title="Répartition des livraisons (Commandes)",
-            height=350,
-            annotations=[dict(text=f"{len(commandes_df)}\ncommandes", x=0.5, y=0.5, font_size=13, showarrow=False)],
-            legend=dict(
-                orientation="v", 
-                yanchor="top", 
-                y=0.95, 
-                xanchor="left", 
-                x=1.02,
-                font=dict(size=12)
-            ),
-            margin=dict(l=20, r=120, t=50, b=20)
-        )
+        def build_taux_commandes(statut_counts_commandes, nb_commandes):
+            # Graphique pour commandes
+            fig_taux_commandes = go.Figure(go.Pie(
+                labels=statut_labels,
+                values=[
+                    statut_counts_commandes.get("En avance", 0), 
+                    statut_counts_commandes.get("À temps", 0),
+                    statut_counts_commandes.get("Retard accepté", 0), 
+                    statut_counts_commandes.get("Long délai", 0)
+                ],
+                marker=dict(colors=colors),
+                hole=0.6,
+                textinfo="percent",
+                hoverinfo="label+percent+value",
+                textfont=dict(size=12),
+                insidetextorientation='radial'
+            ))
         
-        st.plotly_chart(fig_taux_commandes, use_container_width=True)
+            fig_taux_commandes.update_layout(
+                title="Répartition des livraisons (Commandes)",
+                height=350,
+                annotations=[dict(text=f"{nb_commandes}\ncommandes", x=0.5, y=0.5, font_size=13, showarrow=False)],
+                legend=dict(
+                    orientation="v", 
+                    yanchor="top", 
+                    y=0.95, 
+                    xanchor="left", 
+                    x=1.02,
+                    font=dict(size=12)
+                ),
+                margin=dict(l=20, r=120, t=50, b=20)
+            )
+            return fig_taux_commandes
+
+        # Afficher le graphique (reconstruit uniquement si ses données changent)
+        st.plotly_chart(cached_figure(build_taux_commandes, statut_counts_commandes, len(commandes_df)), use_container_width=True)
 
     # --- CALCUL DES PERFORMANCES DES FOURNISSEURS ---
     df_avec_commandes = pd.merge(
@@ -245,33 +252,42 @@ def part_one(df, annee):
     # Calcul de l'écart moyen
     performances_fournisseurs["écart_moyen"] = performances_fournisseurs["delai_reel_moyen"] - performances_fournisseurs["delai_theorique_moyen"]
 
+    # Indicateurs glissants (3, 6 et 12 mois) au dernier mois de l'année, calculés pour tous
+    # les fournisseurs à la fois sur l'historique complet (les fenêtres débordent sur l'année
+    # précédente) : taux de lignes livrées à temps et écart moyen
+    colonnes_glissantes = [f"À temps {w} mois (%)" for w in ROLLING_MONTHS] + [f"Écart {w} mois" for w in ROLLING_MONTHS]
+    dernier_mois = pd.Timestamp(int(annee), int(df_filtre["Month"].max()), 1)
+    glissants = latest_rolling_metrics(history if history is not None else df, ("Nom du fournisseur",), end=dernier_mois)
+    performances_fournisseurs = performances_fournisseurs.merge(
+        glissants[colonnes_glissantes], left_on="Nom du fournisseur", right_index=True, how="left"
+    )
+
     # Séparer les fournisseurs en deux groupes
     bons_fournisseurs = performances_fournisseurs[performances_fournisseurs["écart_moyen"] <= 0].sort_values("écart_moyen")
     fournisseurs_a_ameliorer = performances_fournisseurs[performances_fournisseurs["écart_moyen"] > 0].sort_values("écart_moyen", ascending=False)
 
-    # Fonction de style pour les tableaux de fournisseurs - inspiré par part1_one
-    def style_fournisseurs_table(df):
-        # Créer un DataFrame vide pour le style
-        styled = pd.DataFrame('', index=df.index, columns=df.columns)
-        
-        # Appliquer les couleurs similaires à celles utilisées dans part1_one
-        styled['Nom du fournisseur'] = 'background-color: #fff8e1'  # Couleur de 'Nom Fournisseur' dans part1_one
-        styled['Nb. commandes'] = 'background-color: #e1f5fe'       # Couleur de 'Nb Commandes' dans part1_one
-        styled['Délai théorique'] = 'background-color: #f5f5f5'     # Similaire à 'Nb Matériels'
-        styled['Délai réel'] = 'background-color: #f5f5f5'          # Même couleur pour cohérence
-        styled['% En avance'] = 'background-color: #e8f5e9'         # Couleur de 'ID Fournisseur'
-        styled['% À temps'] = 'background-color: #e8f5e9'           # Même famille de couleurs
-        styled['% Retard accepté'] = 'background-color: #fce4ec'    # Couleur de 'Valeur Totale'
-        styled['% Long délai'] = 'background-color: #fce4ec'        # Même famille de couleurs
-        styled['Livraison plus rapide'] = 'background-color: #e1f5fe'  # Même que 'Nb Commandes'
-        styled['Livraison plus lente'] = 'background-color: #e1f5fe'   # Cohérence visuelle
-        
-        return styled
+    # Couleurs par colonne des tableaux de fournisseurs - inspirées par part1_one
+    fournisseurs_column_styles = {
+        'Nom du fournisseur': 'background-color: #fff8e1',  # Couleur de 'Nom Fournisseur' dans part1_one
+        'Nb. commandes': 'background-color: #e1f5fe',  # Couleur de 'Nb Commandes' dans part1_one
+        'Délai théorique': 'background-color: #f5f5f5',  # Similaire à 'Nb Matériels'
+        'Délai réel': 'background-color: #f5f5f5',  # Même couleur pour cohérence
+        '% En avance': 'background-color: #e8f5e9',  # Couleur de 'ID Fournisseur'
+        '% À temps': 'background-color: #e8f5e9',  # Même famille de couleurs
+        '% Retard accepté': 'background-color: #fce4ec',  # Couleur de 'Valeur Totale'
+        '% Long délai': 'background-color: #fce4ec',  # Même famille de couleurs
+        'Livraison plus rapide': 'background-color: #e1f5fe',  # Même que 'Nb Commandes'
+        'Livraison plus lente': 'background-color: #e1f5fe',  # Cohérence visuelle
+        **{col: 'background-color: #ede7f6' for col in colonnes_glissantes}  # Tendances glissantes
+    }
 
     # Colonnes à arrondir
     cols_a_arrondir = ["Délai théorique", "Délai réel", "Écart",
                     "% En avance", "% À temps", "% Retard accepté", "% Long délai",
-                    "Livraison plus rapide", "Livraison plus lente"]
+                    "Livraison plus rapide", "Livraison plus lente"] + colonnes_glissantes
+
+    # Formatage délégué à la grille (une décimale)
+    fournisseurs_columns_config = numeric_column_config(decimals={col: 1 for col in cols_a_arrondir})
 
     # --- MEILLEURS FOURNISSEURS ---
 
@@ -281,7 +297,7 @@ def part_one(df, annee):
         "Nom du fournisseur", "nb_commandes", "delai_theorique_moyen",
         "delai_reel_moyen", "écart_moyen", "en_avance", "a_temps",
         "retard_accepte", "long_delai", "livraison_plus_rapide", "livraison_plus_lente"
-    ]].rename(columns={
+    ] + colonnes_glissantes].rename(columns={
         "nb_commandes": "Nb. commandes",
         "delai_theorique_moyen": "Délai théorique",
         "delai_reel_moyen": "Délai réel",
@@ -303,16 +319,16 @@ def part_one(df, annee):
     # Pour vraiment supprimer l'index
     bons_fournisseurs_display = bons_fournisseurs_display.reset_index(drop=True)
 
-    # Appliquer le style avec coloration part1_one et garder le gradient sur Écart
-    styled_bons_fournisseurs = bons_fournisseurs_display.style\
-        .apply(style_fournisseurs_table, axis=None)\
-        .background_gradient(subset=["Écart"], cmap="RdYlGn_r")\
-        .format(precision=1)\
-        .set_properties(**{'text-align': 'center'})\
-        .hide(axis="index")
-
-    # Afficher le tableau avec les données
-    st.dataframe(styled_bons_fournisseurs, use_container_width=True, hide_index=True)
+    # Afficher le tableau paginé avec la coloration par colonne et le dégradé sur Écart
+    paged_table(
+        bons_fournisseurs_display,
+        key="bons_fournisseurs",
+        column_styles=fournisseurs_column_styles,
+        row_styles={"Écart": gradient_styles(bons_fournisseurs_display["Écart"], cmap="RdYlGn_r")},
+        column_config=fournisseurs_columns_config,
+        search_columns=["Nom du fournisseur"],
+        file_name="bons_fournisseurs.csv"
+    )
 
 
     # --- FOURNISSEURS À AMÉLIORER ---
@@ -323,7 +339,7 @@ def part_one(df, annee):
         "Nom du fournisseur", "nb_commandes", "delai_theorique_moyen",
         "delai_reel_moyen", "écart_moyen", "en_avance", "a_temps", 
         "retard_accepte", "long_delai", "livraison_plus_rapide", "livraison_plus_lente"
-    ]].rename(columns={
+    ] + colonnes_glissantes].rename(columns={
         "nb_commandes": "Nb. commandes",
         "delai_theorique_moyen": "Délai théorique",
         "delai_reel_moyen": "Délai réel",
@@ -345,16 +361,16 @@ def part_one(df, annee):
     # Pour vraiment supprimer l'index
     fournisseurs_a_ameliorer_display = fournisseurs_a_ameliorer_display.reset_index(drop=True)
 
-    # Appliquer le style avec coloration part1_one et garder le gradient sur Écart
-    styled_ameliorer = fournisseurs_a_ameliorer_display.style\
-        .apply(style_fournisseurs_table, axis=None)\
-        .background_gradient(subset=["Écart"], cmap="RdYlGn_r")\
-        .format(precision=1)\
-        .set_properties(**{'text-align': 'center'})\
-        .hide(axis="index")
-
-    # Afficher le tableau avec les données
-    st.dataframe(styled_ameliorer, use_container_width=True, hide_index=True)
+    # Afficher le tableau paginé avec la coloration par colonne et le dégradé sur Écart
+    paged_table(
+        fournisseurs_a_ameliorer_display,
+        key="fournisseurs_a_ameliorer",
+        column_styles=fournisseurs_column_styles,
+        row_styles={"Écart": gradient_styles(fournisseurs_a_ameliorer_display["Écart"], cmap="RdYlGn_r")},
+        column_config=fournisseurs_columns_config,
+        search_columns=["Nom du fournisseur"],
+        file_name="fournisseurs_a_ameliorer.csv"
+    )
 
     # --- PERFORMANCE MENSUELLE ---
     st.markdown("<h6 style='color: #000000; margin-top: 20px;'>Comparaison des délais de livraison par mois", unsafe_allow_html=True)
@@ -368,11 +384,10 @@ def part_one(df, annee):
         
         if 'Date' in df_avec_commandes.columns:
             df_avec_commandes['Month'] = df_avec_commandes['Date'].dt.month
-            df_avec_commandes['Month_Name'] = df_avec_commandes['Date'].dt.strftime('%b')
     
     # Regrouper par mois en utilisant les délais des commandes (si Month existe)
     if 'Month' in df_avec_commandes.columns:
-        performance_mensuelle = df_avec_commandes.drop_duplicates('Bon de commande').groupby(["Month", "Month_Name"]).agg(
+        performance_mensuelle = df_avec_commandes.drop_duplicates('Bon de commande').groupby("Month").agg(
             délai_théorique_moyen=("delai_theorique_max", "mean"),
             délai_réel_moyen=("delai_reel_max", "mean"),
             nombre_commandes=("Bon de commande", "count")
@@ -380,6 +395,7 @@ def part_one(df, annee):
         
         # Gérer les valeurs NaN et trier
         performance_mensuelle = performance_mensuelle.fillna(0).sort_values("Month")
+        performance_mensuelle["Month_Name"] = month_labels(performance_mensuelle["Month"], lang="en")
         
         # Calculer l'écart
         performance_mensuelle["écart"] = performance_mensuelle["délai_réel_moyen"] - performance_mensuelle["délai_théorique_moyen"]
@@ -516,24 +532,24 @@ def part_one(df, annee):
     produits_bons = produits_analyse[produits_analyse["écart"] <= 0].sort_values("écart")
     produits_a_ameliorer = produits_analyse[produits_analyse["écart"] > 0].sort_values("écart", ascending=False)
 
-    # Fonction de style pour les tableaux de produits - similaire à celle des fournisseurs
-    def style_produits_table(df):
-        # Créer un DataFrame vide pour le style
-        styled = pd.DataFrame('', index=df.index, columns=df.columns)
-        
-        # Appliquer les couleurs similaires à celles utilisées pour les fournisseurs
-        styled['Matériel'] = 'background-color: #fff8e1'
-        styled['Description du matériel'] = 'background-color: #fff8e1'
-        styled['Nb. commandes'] = 'background-color: #e1f5fe'
-        styled['Délai théorique'] = 'background-color: #f5f5f5'
-        styled['Délai réel'] = 'background-color: #f5f5f5'
-        styled['% En avance'] = 'background-color: #e8f5e9'
-        styled['% À temps'] = 'background-color: #e8f5e9'
-        styled['% Retard accepté'] = 'background-color: #fce4ec'
-        styled['% Long délai'] = 'background-color: #fce4ec'
-        styled['Fournisseurs'] = 'background-color: #e1f5fe'
-        
-        return styled
+    # Couleurs par colonne des tableaux de produits - similaires à celles des fournisseurs
+    produits_column_styles = {
+        'Matériel': 'background-color: #fff8e1',
+        'Description du matériel': 'background-color: #fff8e1',
+        'Nb. commandes': 'background-color: #e1f5fe',
+        'Délai théorique': 'background-color: #f5f5f5',
+        'Délai réel': 'background-color: #f5f5f5',
+        '% En avance': 'background-color: #e8f5e9',
+        '% À temps': 'background-color: #e8f5e9',
+        '% Retard accepté': 'background-color: #fce4ec',
+        '% Long délai': 'background-color: #fce4ec',
+        'Fournisseurs': 'background-color: #e1f5fe'
+    }
+
+    # Formatage délégué à la grille (une décimale)
+    produits_columns_config = numeric_column_config(decimals={
+        col: 1 for col in ["Délai théorique", "Délai réel", "Écart", "% En avance", "% À temps", "% Retard accepté", "% Long délai"]
+    })
 
     # --- MEILLEURS PRODUITS ---
     st.markdown("<h6 style='color: #000000; margin-top: 20px;'>Meilleurs produits (écart ≤ 0)</h6>", unsafe_allow_html=True)
@@ -560,16 +576,16 @@ def part_one(df, annee):
     # Pour vraiment supprimer l'index
     bons_produits_display = bons_produits_display.reset_index(drop=True)
 
-    # Appliquer le style avec coloration et gradient sur Écart
-    styled_bons_produits = bons_produits_display.style\
-        .apply(style_produits_table, axis=None)\
-        .background_gradient(subset=["Écart"], cmap="RdYlGn_r")\
-        .format(precision=1)\
-        .set_properties(**{'text-align': 'center'})\
-        .hide(axis="index")
-
-    # Afficher le tableau avec les données
-    st.dataframe(styled_bons_produits, use_container_width=True, hide_index=True)
+    # Afficher le tableau paginé avec la coloration par colonne et le dégradé sur Écart
+    paged_table(
+        bons_produits_display,
+        key="bons_produits",
+        column_styles=produits_column_styles,
+        row_styles={"Écart": gradient_styles(bons_produits_display["Écart"], cmap="RdYlGn_r")},
+        column_config=produits_columns_config,
+        search_columns=["Matériel", "Description du matériel", "Fournisseurs"],
+        file_name="bons_produits.csv"
+    )
 
     # --- PRODUITS À AMÉLIORER ---
     st.markdown("<h6 style='color: #000000; margin-top: 20px;'>Produits à améliorer (écart > 0)</h6>", unsafe_allow_html=True)
@@ -596,13 +612,13 @@ def part_one(df, annee):
     # Pour vraiment supprimer l'index
     produits_a_ameliorer_display = produits_a_ameliorer_display.reset_index(drop=True)
 
-    # Appliquer le style avec coloration et gradient sur Écart
-    styled_produits_ameliorer = produits_a_ameliorer_display.style\
-        .apply(style_produits_table, axis=None)\
-        .background_gradient(subset=["Écart"], cmap="RdYlGn_r")\
-        .format(precision=1)\
-        .set_properties(**{'text-align': 'center'})\
-        .hide(axis="index")
-
-    # Afficher le tableau avec les données
-    st.dataframe(styled_produits_ameliorer, use_container_width=True, hide_index=True)
+    # Afficher le tableau paginé avec la coloration par colonne et le dégradé sur Écart
+    paged_table(
+        produits_a_ameliorer_display,
+        key="produits_a_ameliorer",
+        column_styles=produits_column_styles,
+        row_styles={"Écart": gradient_styles(produits_a_ameliorer_display["Écart"], cmap="RdYlGn_r")},
+        column_config=produits_columns_config,
+        search_columns=["Matériel", "Description du matériel", "Fournisseurs"],
+        file_name="produits_a_ameliorer.csv"
+    )
@@ -1,8 +1,8 @@
-import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
 import streamlit as st
 from file1 import *
+from prodline1 import *
+from compare1 import *
 
 def part1_five(df, year, vendor_search):
     """
@@ -40,15 +40,21 @@ def part1_five(df, year, vendor_search):
     # Filtrer les données pour le fournisseur sélectionné
     supplier_data = df[(df['Nom du fournisseur'] == vendor_search) | 
                  (df['Fournisseur'] == vendor_search)].copy()
-    # Filtrer par année ET mois en une seule opération
+    # Période sélectionnée et références de comparaison
     year_int = int(year)
-    mask_current = (supplier_data['Year'] == year_int) & (supplier_data['Month'].isin(st.session_state.selected_months))
-    df_year = supplier_data[mask_current].copy()
+    previous_year = year_int - 1
+    period = current_period(year_int)
+    baselines = comparison_baselines()
+    df_year, df_previous_year = period_slices(supplier_data, 'Date du document', period, previous_year_period(period))
+
+    # Indicateurs de la période et de toutes ses références, calculés en une seule passe groupée
+    comparaison = compare_periods(supplier_data, 'Date du document', period, ORDER_METRICS, baselines)
+    actuel = comparaison.loc["current"].fillna(0)
 
     # Afficher les indicateurs clés (KPIs) pour le fournisseur sélectionné
-    total_orders = df_year["Bons de commande"].nunique()
-    total_materials = df_year["Matériel"].nunique()
-    total_value = df_year["Valeur nette de la commande"].sum()
+    total_orders = int(actuel["Commandes"])
+    total_materials = int(actuel["Références"])
+    total_value = actuel["Valeur"]
     
     # Affichage des KPIs dans 3 colonnes
     st.markdown('<div class="equal-height-cols">', unsafe_allow_html=True)
@@ -60,79 +66,24 @@ def part1_five(df, year, vendor_search):
     with col3:
         display_metric_card("Valeur totale", format_currency(total_value), color="#f39c12")
     st.markdown('</div>', unsafe_allow_html=True) 
-    # --- SECTION 2: COMPARAISON AVEC L'ANNÉE PRÉCÉDENTE ---
+    # --- SECTION 2: COMPARAISON AVEC LES PÉRIODES DE RÉFÉRENCE ---
     st.markdown(f"""
     <div style="background-color:{color_palette['tertiary']}; padding: 8px; border-radius: 8px; margin-top: 25px;">
-        <h5 style="color: white;text-align: center; margin: 0;">Comparaison avec l'année précédente {int(year)-1}</h5>
+        <h5 style="color: white;text-align: center; margin: 0;">Comparaison avec {', '.join(baseline_label(period, b) for b in baselines)}</h5>
     </div>
     """, unsafe_allow_html=True)
 
-    # Calculer les KPIs pour l'année précédente
-    previous_year = year_int - 1
-    mask_prev = (supplier_data['Year'] == previous_year) & (supplier_data['Month'].isin(st.session_state.selected_months))
-    df_previous_year = supplier_data[mask_prev].copy()
-    
-    # KPIs année précédente
-    if len(df_previous_year) > 0:
-        previous_total_orders = df_previous_year["Bons de commande"].nunique()
-        previous_total_materials = df_previous_year["Matériel"].nunique()
-        previous_total_value = df_previous_year["Valeur nette de la commande"].sum()
-    else:
-        previous_total_orders = 0
-        previous_total_materials = 0
-        previous_total_value = 0
-    
-
-    # Calculer les variations avec gestion de la division par zéro
-    if previous_total_orders > 0:
-        orders_change = ((total_orders - previous_total_orders) / previous_total_orders * 100)
-        orders_change_text = f"{orders_change:+.1f}%"
-        orders_color = "green" if orders_change > 0 else "red" if orders_change < 0 else "gray"
-    else:
-        orders_change_text = "N/A"
-        orders_color = "gray"
-    
-    if previous_total_materials > 0:
-        materials_change = ((total_materials - previous_total_materials) / previous_total_materials * 100)
-        materials_change_text = f"{materials_change:+.1f}%"
-        materials_color = "green" if materials_change > 0 else "red" if materials_change < 0 else "gray"
-    else:
-        materials_change_text = "N/A"
-        materials_color = "gray"
-    
-    if previous_total_value > 0:
-        value_change = ((total_value - previous_total_value) / previous_total_value * 100)
-        value_change_text = f"{value_change:+.1f}%"
-        value_color = "green" if value_change > 0 else "red" if value_change < 0 else "gray"
-    else:
-        value_change_text = "N/A"
-        value_color = "gray"
-    
-    # Affichage de la comparaison
-    st.markdown('<div class="equal-height-cols">', unsafe_allow_html=True)
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        st.markdown(f"""
-            <div style="padding:10px; border-radius:5px; text-align:center;">
-                <p style="margin:0;">Nombre de commandes: {previous_total_orders} → {total_orders}</p>
-                <h5 style="color:{orders_color}; margin:5px 0 0 0;">{orders_change_text}</h5>
-            </div>
-        """, unsafe_allow_html=True)
-    with col2:
-        st.markdown(f"""
-            <div style="padding:10px; border-radius:5px; text-align:center;">
-                <p style="margin:0;">Nombre de références: {previous_total_materials} → {total_materials}</p>
-                <h5 style="color:{materials_color}; margin:5px 0 0 0;">{materials_change_text}</h5>
-            </div>
-        """, unsafe_allow_html=True)
-    with col3:
-        st.markdown(f"""
-            <div style="padding:10px; border-radius:5px; text-align:center;">
-                <p style="margin:0;">Valeur totale: {format_currency(previous_total_value)} → {format_currency(total_value)}</p>
-                <h5 style="color:{value_color}; margin:5px 0 0 0;">{value_change_text}</h5>
-            </div>
-        """, unsafe_allow_html=True)
-    st.markdown('</div>', unsafe_allow_html=True)
+    # Affichage de la comparaison avec chaque référence
+    for baseline in baselines:
+        render_volume_changes(
+            comparaison,
+            baseline,
+            [("Commandes", "Nombre de commandes", format_count),
+             ("Références", "Nombre de références", format_count),
+             ("Valeur", "Valeur totale", format_currency)],
+            color_palette,
+            title=f"Par rapport à {baseline_label(period, baseline)}:" if len(baselines) > 1 else None
+        )
  
     # Analyse détaillée des produits pour ce fournisseur
     st.markdown("<h6 style='color: #000000; margin-top: 20px;'>Détail des Matériels Commandés</h6>", unsafe_allow_html=True)
@@ -167,35 +118,30 @@ def part1_five(df, year, vendor_search):
         "valeur_totale": "Valeur Totale",
     })
 
-    # Formater les colonnes numériques
-    material_summary["Valeur Totale"] = material_summary["Valeur Totale"].apply(format_currency)
-    # Formater les colonnes de quantité
-    material_summary["Qté Moyenne"] = material_summary["Qté Moyenne"].apply(lambda x: f"{x:.1f}")  # Un chiffre après la virgule
-    material_summary["Qté Totale"] = material_summary["Qté Totale"].apply(lambda x: f"{int(x)}")  # Pas de décimales
-    material_summary["Qté Min"] = material_summary["Qté Min"].apply(lambda x: f"{int(x)}")  # Pas de décimales
-    material_summary["Qté Max"] = material_summary["Qté Max"].apply(lambda x: f"{int(x)}")  # Pas de décimales
-
-    # Créer un style pour l'ensemble du DataFrame des matériels avec des couleurs par colonnes
-    def highlight_columns_material(x):
-        df_styler = pd.DataFrame('', index=x.index, columns=x.columns)
-        df_styler['Matériel'] = 'background-color: #e3f2fd'
-        df_styler['Description'] = 'background-color: #f1f8e9'  
-        df_styler['Réf. Fournisseur'] = 'background-color: #e8eaf6'
-        df_styler['Nb Commandes'] = 'background-color: #e0f7fa'
-        df_styler['Nb Lignes'] = 'background-color: #f3e5f5'
-        df_styler['Order Unit'] = 'background-color: #f5f5f5'
-        df_styler['Qté Min'] = 'background-color: #fce4ec'
-        df_styler['Qté Max'] = 'background-color: #f3e5f5'
-        df_styler['Qté Moyenne'] = 'background-color: #e8f5e9'
-        df_styler['Qté Totale'] = 'background-color: #fff8e1'
-        df_styler['Valeur Totale'] = 'background-color: #ffebee'
-        return df_styler
+    # Les colonnes restent numériques : le formatage est fait par la grille
+    material_columns_config = numeric_column_config(
+        currency=["Valeur Totale"],
+        integers=["Qté Totale", "Qté Min", "Qté Max"],
+        decimals={"Qté Moyenne": 1}
+    )
 
-    # Appliquer le style avec coloration des colonnes
-    styled_material_df = material_summary.style.apply(highlight_columns_material, axis=None)
+    # Couleurs par colonne, calculées une seule fois pour tout le tableau
+    material_column_styles = {
+        'Matériel': 'background-color: #e3f2fd',
+        'Description': 'background-color: #f1f8e9',
+        'Réf. Fournisseur': 'background-color: #e8eaf6',
+        'Nb Commandes': 'background-color: #e0f7fa',
+        'Nb Lignes': 'background-color: #f3e5f5',
+        'Order Unit': 'background-color: #f5f5f5',
+        'Qté Min': 'background-color: #fce4ec',
+        'Qté Max': 'background-color: #f3e5f5',
+        'Qté Moyenne': 'background-color: #e8f5e9',
+        'Qté Totale': 'background-color: #fff8e1',
+        'Valeur Totale': 'background-color: #ffebee'
+    }
 
     # Afficher le tableau avec les données et les couleurs
-    st.dataframe(styled_material_df, use_container_width=True, hide_index=True)
+    render_table(material_summary, column_styles=material_column_styles, column_config=material_columns_config)
     
     # Top 10 des produits les plus commandés en valeur
     st.markdown("<h6 style='color: #000000; margin-top: 20px;'>Top 10 des Produits les Plus Commandés</h6>", unsafe_allow_html=True)
@@ -299,7 +245,7 @@ def part1_five(df, year, vendor_search):
     st.markdown("<h6 style='color: #000000; margin-top: 20px;'>Évolution Mensuelle des Commandes</h6>", unsafe_allow_html=True)
 
     # Regrouper les données par mois
-    monthly_data = df_year.groupby(["Month", "Month_Name"]).agg(
+    monthly_data = df_year.groupby("Month").agg(
         nb_commandes=("Bons de commande", "nunique"),
         nb_materials=("Matériel", "nunique"),
         valeur_totale=("Valeur nette de la commande", "sum")
@@ -309,7 +255,7 @@ def part1_five(df, year, vendor_search):
     monthly_data = monthly_data.sort_values(by="Month")
     
     # Regrouper les données par mois pour l'année précédente
-    monthly_data_prev = df_previous_year.groupby(["Month", "Month_Name"]).agg(
+    monthly_data_prev = df_previous_year.groupby("Month").agg(
         nb_commandes=("Bons de commande", "nunique"),
         nb_materials=("Matériel", "nunique"),
         valeur_totale=("Valeur nette de la commande", "sum")
@@ -317,17 +263,9 @@ def part1_five(df, year, vendor_search):
     
     # Trier par mois
     monthly_data_prev = monthly_data_prev.sort_values(by="Month")
-    # Dictionnaire de traduction des mois
-    mois_fr = {
-        'January': 'Janvier', 'February': 'Février', 'March': 'Mars',
-        'April': 'Avril', 'May': 'Mai', 'June': 'Juin',
-        'July': 'Juillet', 'August': 'Août', 'September': 'Septembre',
-        'October': 'Octobre', 'November': 'Novembre', 'December': 'Décembre'
-    }
-
-    # Appliquer la traduction
-    monthly_data['Month_Name'] = monthly_data['Month_Name'].map(mois_fr)
-    monthly_data_prev['Month_Name'] = monthly_data_prev['Month_Name'].map(mois_fr)
+    # Libellés des mois en français (lecture dans la table des 12 mois)
+    monthly_data['Month_Name'] = month_labels(monthly_data['Month'])
+    monthly_data_prev['Month_Name'] = month_labels(monthly_data_prev['Month'])
     
     # Créer le graphique d'évolution mensuelle avec comparaison
     fig = go.Figure()
@@ -465,116 +403,14 @@ def part1_five(df, year, vendor_search):
             )
 
 def camembert5(df,year,vendor_search):
-
-    # Analyse par gamme (prodline)
-    st.markdown("<h6 style='color: #000000; margin-top: 20px;'>Répartition par Gamme de Produits</h6>", unsafe_allow_html=True)
-     # Filtrer les données pour l'année sélectionnée
-    df_year = df[df['Year'] == int(year)]
-    # Filtrer les données pour le fournisseur sélectionné
-    df_year = df_year[
-    (df_year["Nom du fournisseur"].str.contains(vendor_search, case=False)) | 
-    (df_year["Fournisseur"].astype(str).str.contains(vendor_search, case=False))
-]
-     # Utiliser les mois sélectionnés stockés dans session_state
-    df_year = df_year[df_year['Month'].isin(st.session_state.selected_months)]
-
-    # Regrouper les données par prodline
-    prodline_summary = df_year.groupby("Prodline Name").agg(
-        nb_commandes=("Bons de commande", "nunique"),
-        qte_totale=("Order Quantity", "sum"),
-        valeur_totale=("Valeur nette de la commande", "sum")
-    ).reset_index()
-
-    # Trier par valeur totale
-    prodline_summary = prodline_summary.sort_values(by="valeur_totale", ascending=False)
-
-    # Créer les labels personnalisés pour le camembert
-    prodline_summary['labels'] = prodline_summary.apply(
-        lambda row: f"{row['Prodline Name']}: {format_currency(row['valeur_totale'])}<br>"
-                f"({int(row['qte_totale'])} unités, {int(row['nb_commandes'])} commandes)", 
-        axis=1
-    )
-
-    # Palette de couleurs sophistiquées - garder les mêmes couleurs que dans le code original
-    color_palette = [
-        '#5D4E7B', '#8A7AAF', '#A799CE', '#C4BAE0', '#D3C4E3',
-        '#26495C', '#4C86A8', '#68B0AB', '#8FC0A9', '#C8D5B9',
-        '#AC3B61', '#D63B77', '#EF5D92', '#F283B6', '#FBAFC4'
-    ]
-
-    # Créer le camembert
-    fig_pie = go.Figure(data=[go.Pie(
-        labels=prodline_summary['Prodline Name'],
-        values=prodline_summary['valeur_totale'],
-        text=prodline_summary['labels'],
-        hoverinfo='text',
-        textinfo='percent',
-        hole=0.4,
-        marker=dict(colors=color_palette, line=dict(color='#FFFFFF', width=1.5)),
-        textfont=dict(size=14),
-        rotation=45
-    )])
-
-    # Mise en forme du graphique
-    fig_pie.update_layout(
-        title={
-            'text': f"Répartition des produits par gamme pour {vendor_search} en {year}",
-            'font': {'size': 13, 'color': '#505050'},
-            'y': 0.95
-        },
-        legend=dict(
-            orientation='h',
-            yanchor='bottom',
-            y=-0.4,
-            xanchor='center',
-            x=0.5,
-            font=dict(size=12)
-        ),
-        height=500,
-        template='plotly_white',
-        margin=dict(t=80, b=80, l=40, r=40)
-    )
-
-    # Ajouter des annotations au centre du camembert
-    fig_pie.add_annotation(
-        text=f"<b>Total<br>{format_currency(prodline_summary['valeur_totale'].sum())}</b>",
-        x=0.5, y=0.5,
-        font=dict(size=16, color='#505050'),
-        showarrow=False
+    """Répartition par gamme des commandes d'un fournisseur sur la période sélectionnée"""
+    period = current_period(year)
+    prodline_summary = prodline_breakdown(df, supplier=vendor_search, period=period)
+    if prodline_summary.empty:
+        st.warning(f"Aucune donnée disponible pour le fournisseur {vendor_search} ({period['label']})")
+        return
+
+    show_prodline_breakdown(
+        prodline_summary, f"Répartition des produits par gamme pour {vendor_search} en {period['label']}",
+        palette=PIE_PALETTE_VIOLET
     )
-
-    # Afficher le graphique
-    st.plotly_chart(fig_pie, use_container_width=True)
-
-    # Ajouter un expander avec le tableau récapitulatif
-    with st.expander("📊 Détail par gamme de produits", expanded=False):
-        # Préparation du tableau récapitulatif
-        prodline_table = prodline_summary[['Prodline Name', 'nb_commandes', 'qte_totale', 'valeur_totale']].copy()
-        
-        # Renommer les colonnes
-        prodline_table = prodline_table.rename(columns={
-            "Prodline Name": "Gamme de Produits", 
-            "nb_commandes": "Commandes", 
-            "qte_totale": "Quantité", 
-            "valeur_totale": "Valeur Totale"
-        })
-        
-        # Formater les colonnes
-        prodline_table["Valeur Totale"] = prodline_table["Valeur Totale"].apply(format_currency)
-        prodline_table["Quantité"] = prodline_table["Quantité"].apply(lambda x: f"{int(x)}")
-        prodline_table["Commandes"] = prodline_table["Commandes"].apply(lambda x: f"{int(x)}")
-        
-        # Créer un style pour le DataFrame avec des couleurs par colonnes
-        def highlight_columns_prodline(x):
-            df_styler = pd.DataFrame('', index=x.index, columns=x.columns)
-            df_styler['Gamme de Produits'] = 'background-color: #e8f5e9; font-weight: bold'
-            df_styler['Commandes'] = 'background-color: #e1f5fe'
-            df_styler['Quantité'] = 'background-color: #fff8e1'
-            df_styler['Valeur Totale'] = 'background-color: #fce4ec; font-weight: bold'
-            return df_styler
-        
-        # Appliquer le style
-        styled_prodline_df = prodline_table.style.apply(highlight_columns_prodline, axis=None)
-        
-        # Afficher le tableau avec les données
-        st.dataframe(styled_prodline_df, use_container_width=True, hide_index=True)
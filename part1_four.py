@@ -3,6 +3,7 @@ import plotly.express as px
 import plotly.graph_objects as go
 import streamlit as st
 from file1 import *
+from prodline1 import *
 
 
 def part1_four(df, vendor_search):
@@ -62,10 +63,9 @@ def part1_four(df, vendor_search):
     # Trier par année
     yearly_summary = yearly_summary.sort_values(by="Année")
     
-    # Formater les colonnes pour l'affichage
+    # Préparer les colonnes pour l'affichage
     yearly_summary_display = yearly_summary.copy()
-    # Ajouter la colonne formatée sans supprimer l'originale pour l'instant
-    yearly_summary_display["Valeur Totale"] = yearly_summary_display["valeur_totale"].apply(format_currency)
+    yearly_summary_display["Valeur Totale"] = yearly_summary_display["valeur_totale"]
 
 
     # Renommer les colonnes
@@ -79,46 +79,45 @@ def part1_four(df, vendor_search):
         "qte_somme":"Qté Totale"
     })
 
-    yearly_summary_display["Qté Moyenne"] = yearly_summary_display["Qté Moyenne"].apply(lambda x: f"{x:.1f}")  # Un chiffre après la virgule
-    yearly_summary_display["Qté Totale"] = yearly_summary_display["Qté Totale"].apply(lambda x: f"{int(x)}")  # Pas de décimales
-    yearly_summary_display["Qté Min"] = yearly_summary_display["Qté Min"].apply(lambda x: f"{int(x)}")  # Pas de décimales
-    yearly_summary_display["Qté Max"] = yearly_summary_display["Qté Max"].apply(lambda x: f"{int(x)}")  # Pas de décimales
+    # Les colonnes restent numériques : le formatage est fait par la grille
+    yearly_columns_config = numeric_column_config(
+        currency=["Valeur Totale"],
+        integers=["Qté Totale", "Qté Min", "Qté Max"],
+        decimals={"Qté Moyenne": 1},
+        years=["Année"]
+    )
     # Vérifier que la colonne existe avant de la supprimer
     if "valeur_totale" in yearly_summary_display.columns:
         yearly_summary_display = yearly_summary_display.drop(columns=["valeur_totale"])
     
     
-    # Style pour le tableau des années
-    def highlight_columns_yearly(x):
-        df_styler = pd.DataFrame('', index=x.index, columns=x.columns)
-        df_styler['Année'] = 'background-color: #e3f2fd; font-weight: bold;'
-        df_styler['Nbre de commandes'] = 'background-color: #f1f8e9'
-        df_styler['Nbre de références'] = 'background-color: #e8eaf6'
-        df_styler['Nombre de Lignes'] = 'background-color: #e0f7fa'
-        df_styler['Qté Totale'] = 'background-color: #f1f8e9'
-        df_styler['Qté Min'] = 'background-color: #e8eaf6'
-        df_styler['Qté Max'] = 'background-color: #ffebee'
-        df_styler['Qté Moyenne'] = 'background-color: #e0f7fa'
-        df_styler['Valeur Totale'] = 'background-color: #ffebee'
-        return df_styler
-    
-    # Appliquer le style avec coloration des colonnes
-    styled_yearly_df = yearly_summary_display.style.apply(highlight_columns_yearly, axis=None)
+    # Couleurs par colonne, calculées une seule fois pour tout le tableau
+    yearly_column_styles = {
+        'Année': 'background-color: #e3f2fd; font-weight: bold;',
+        'Nbre de commandes': 'background-color: #f1f8e9',
+        'Nbre de références': 'background-color: #e8eaf6',
+        'Nombre de Lignes': 'background-color: #e0f7fa',
+        'Qté Totale': 'background-color: #f1f8e9',
+        'Qté Min': 'background-color: #e8eaf6',
+        'Qté Max': 'background-color: #ffebee',
+        'Qté Moyenne': 'background-color: #e0f7fa',
+        'Valeur Totale': 'background-color: #ffebee'
+    }
     
     # Afficher le tableau des résumés annuels
     st.markdown("<h6 style='color: #OOOOOO; margin-top: 20px;'>Résumé par Année</h6>", unsafe_allow_html=True)
-    st.dataframe(styled_yearly_df, use_container_width=True, hide_index=True)
+    render_table(yearly_summary_display, column_styles=yearly_column_styles, column_config=yearly_columns_config)
     
     # Ajouter l'information sur le mois pour les graphiques mensuels
     df['Mois'] = pd.to_datetime(df['Date du document']).dt.month
-    df['Mois_Nom'] = pd.to_datetime(df['Date du document']).dt.strftime('%B')  # Nom du mois pour l'affichage
     
     # Grouper par année et mois pour les valeurs mensuelles
-    monthly_values = df.groupby(['Année', 'Mois', 'Mois_Nom']).agg(
+    monthly_values = df.groupby(['Année', 'Mois']).agg(
         valeur_totale=("Valeur nette de la commande", "sum"),
         nb_commandes=("Bons de commande", "nunique"),
         nb_produits=("Matériel", "nunique")
     ).reset_index()
+    monthly_values['Mois_Nom'] = month_labels(monthly_values['Mois'], lang="en")  # Nom du mois pour l'affichage
     
     # Créer un graphique pour la valeur mensuelle par année
     st.markdown("<h6 style='color: #000000; margin-top: 20px;'>Évolution Mensuelle de la Valeur des Commandes</h6>", unsafe_allow_html=True)
@@ -335,81 +334,55 @@ def part1_four(df, vendor_search):
         )
 
         
-        # Réorganiser le tableau pour l'affichage
-        formatted_table = []
-        
-        for (material, desc, vendor_material), row in pivot_table.iterrows():
-            # Calculer la valeur moyenne pour ce produit
-            yearly_values = [row[('valeur_totale', year)] for year in all_years if ('valeur_totale', year) in row]
-            avg_value = sum(yearly_values) / len(yearly_values) if yearly_values else 0
-            
-            product_data = {
-                'Code Produit': material,
-                'Description': desc,
-                'Réf. Fournisseur': vendor_material,
-                'Valeur Moyenne': format_currency(avg_value),
-                'Unité d\'Achat': row[('unite_achat', all_years[0])]  # Ajout de l’unité à la 1re année
-
-            }
-            
-            # Ajouter les données pour chaque année
-            for year in all_years:
-                try:
-                    product_data[f'Commandes {year}'] = int(row[('nb_commandes', year)])
-                    product_data[f'Lignes {year}'] = int(row[('nb_lignes', year)])
-                    product_data[f'Valeur {year}'] = format_currency(row[('valeur_totale', year)])
-                    product_data[f'Quantité {year}'] = f"{int(row[('quantite_totale', year)]):,}".replace(',', ' ')  # Format avec espace comme séparateur de milliers
-                except (KeyError, TypeError):
-                    product_data[f'Commandes {year}'] = 0
-                    product_data[f'Lignes {year}'] = 0
-                    product_data[f'Valeur {year}'] = format_currency(0)
-                    product_data[f'Quantité {year}'] = "0"
-            
-            formatted_table.append(product_data)
+        # Réorganiser le tableau pour l'affichage (colonnes construites en bloc à partir du pivot)
+        yearly_metrics = {
+            metric: pivot_table[metric].reindex(columns=all_years, fill_value=0)
+            for metric in ['nb_commandes', 'nb_lignes', 'valeur_totale', 'quantite_totale']
+        }
+        product_index = pivot_table.index
+        formatted_df = pd.DataFrame({
+            'Code Produit': product_index.get_level_values('Matériel'),
+            'Description': product_index.get_level_values('Description du matériel'),
+            'Réf. Fournisseur': product_index.get_level_values('Matériel du fournisseur'),
+            'Valeur Moyenne': yearly_metrics['valeur_totale'].mean(axis=1).to_numpy(),
+            'Unité d\'Achat': pivot_table[('unite_achat', all_years[0])].to_numpy()  # Ajout de l’unité à la 1re année
+        })
         
-        # Créer un DataFrame à partir de la liste formatée
-        formatted_df = pd.DataFrame(formatted_table)
+        # Ajouter les données pour chaque année
+        for year in all_years:
+            formatted_df[f'Commandes {year}'] = yearly_metrics['nb_commandes'][year].to_numpy().astype(int)
+            formatted_df[f'Lignes {year}'] = yearly_metrics['nb_lignes'][year].to_numpy().astype(int)
+            formatted_df[f'Valeur {year}'] = yearly_metrics['valeur_totale'][year].to_numpy()
+            formatted_df[f'Quantité {year}'] = yearly_metrics['quantite_totale'][year].to_numpy().astype(int)
         
         # Trier le DataFrame par la valeur moyenne (décroissante)
-        formatted_df = formatted_df.sort_values(by='Valeur Moyenne', ascending=False, key=lambda x: x.str.replace(' ', '').str.replace('€', '').str.replace(',', '.').astype(float))
+        formatted_df = formatted_df.sort_values(by='Valeur Moyenne', ascending=False)
         
-        # Style pour le tableau des produits communs
-        def highlight_columns_products(df):
-            # Créer un styler avec des cellules vides
-            styles = pd.DataFrame('', index=df.index, columns=df.columns)
-            
-            # Appliquer des styles par colonne
-            styles['Code Produit'] = 'background-color: #e3f2fd; font-weight: bold;'
-            styles['Description'] = 'background-color: #f1f8e9'
-            styles['Réf. Fournisseur'] = 'background-color: #e8eaf6'
-            styles['Valeur Moyenne'] = 'background-color: #fff9c4; font-weight: bold;'
-            styles['Unité d\'Achat'] = 'background-color: #e0f7fa; font-style: italic;'
-
-
-            
-            # Appliquer des styles pour les colonnes d'années
-            for year in all_years:
-                col_commandes = f'Commandes {year}'
-                col_lignes = f'Lignes {year}'
-                col_valeur = f'Valeur {year}'
-                col_quantite = f'Quantité {year}'
-                
-                if col_commandes in df.columns:
-                    styles[col_commandes] = 'background-color: #e0f7fa'
-                if col_lignes in df.columns:
-                    styles[col_lignes] = 'background-color: #f3e5f5'
-                if col_valeur in df.columns:
-                    styles[col_valeur] = 'background-color: #ffebee; font-weight: bold;'
-                if col_quantite in df.columns:
-                    styles[col_quantite] = 'background-color: #e8f5e9; font-weight: bold;'
-            
-            return styles
+        # Formatage délégué à la grille (les valeurs restent numériques)
+        products_columns_config = numeric_column_config(
+            currency=['Valeur Moyenne'] + [f'Valeur {year}' for year in all_years],
+            integers=[f'Commandes {year}' for year in all_years] + [f'Lignes {year}' for year in all_years],
+            thousands=[f'Quantité {year}' for year in all_years]
+        )
+        
+        # Couleurs par colonne, calculées une seule fois pour tout le tableau
+        products_column_styles = {
+            'Code Produit': 'background-color: #e3f2fd; font-weight: bold;',
+            'Description': 'background-color: #f1f8e9',
+            'Réf. Fournisseur': 'background-color: #e8eaf6',
+            'Valeur Moyenne': 'background-color: #fff9c4; font-weight: bold;',
+            'Unité d\'Achat': 'background-color: #e0f7fa; font-style: italic;'
+        }
         
-        # Appliquer le style
-        styled_products_df = formatted_df.style.apply(highlight_columns_products, axis=None)
+        # Couleurs des colonnes d'années
+        for year in all_years:
+            products_column_styles[f'Commandes {year}'] = 'background-color: #e0f7fa'
+            products_column_styles[f'Lignes {year}'] = 'background-color: #f3e5f5'
+            products_column_styles[f'Valeur {year}'] = 'background-color: #ffebee; font-weight: bold;'
+            products_column_styles[f'Quantité {year}'] = 'background-color: #e8f5e9; font-weight: bold;'
         
         # Afficher le tableau
-        st.dataframe(styled_products_df, use_container_width=True, hide_index=True)
+        render_table(formatted_df, column_styles=products_column_styles, column_config=products_columns_config)
         
     elif len(all_years) <= 1:
         st.info("Analyse des produits communs non disponible - données présentes pour une seule année.")
@@ -418,110 +391,13 @@ def part1_four(df, vendor_search):
 
 
 def camembert4(df,vendor_search):
+    """Répartition par gamme des commandes d'un fournisseur, toutes années confondues"""
+    prodline_summary = prodline_breakdown(df, supplier=vendor_search)
+    if prodline_summary.empty:
+        st.warning(f"Aucune donnée disponible pour le fournisseur {vendor_search}")
+        return
 
-     # Filtrer le DataFrame pour ne garder que les données du fournisseur sélectionné
-    df = df[df['Nom du fournisseur'] == vendor_search].copy()
-
-    # Cela doit être fait au début pour s'assurer que toutes les analyses concernent ce fournisseur
-    df = df.copy()  
-    
-    # Analyse par gamme (prodline)
-    st.markdown("<h6 style='color: #000000; margin-top: 20px;'>Répartition par Gamme de Produits</h6>", unsafe_allow_html=True)
-
-    # Regrouper les données par prodline
-    prodline_summary = df.groupby("Prodline Name").agg(
-        nb_commandes=("Bons de commande", "nunique"),
-        qte_totale=("Order Quantity", "sum"),
-        valeur_totale=("Valeur nette de la commande", "sum")
-    ).reset_index()
-
-    # Trier par valeur totale
-    prodline_summary = prodline_summary.sort_values(by="valeur_totale", ascending=False)
-
-    # Créer les labels personnalisés pour le camembert
-    prodline_summary['labels'] = prodline_summary.apply(
-        lambda row: f"{row['Prodline Name']}: {format_currency(row['valeur_totale'])}<br>"
-                f"({int(row['qte_totale'])} unités, {int(row['nb_commandes'])} commandes)", 
-        axis=1
+    show_prodline_breakdown(
+        prodline_summary, f"Répartition des produits par gamme pour {vendor_search}",
+        palette=PIE_PALETTE_CATEGORY
     )
-
-    # Palette de couleurs (utilise les couleurs du premier code)
-    colors = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', 
-            '#8c564b', '#e377c2', '#7f7f7f', '#bcbd22', '#17becf']
-
-    # Créer le camembert
-    fig_pie = go.Figure(data=[go.Pie(
-        labels=prodline_summary['Prodline Name'],
-        values=prodline_summary['valeur_totale'],
-        text=prodline_summary['labels'],
-        hoverinfo='text',
-        textinfo='percent',
-        hole=0.4,
-        marker=dict(colors=colors, line=dict(color='#FFFFFF', width=1.5)),
-        textfont=dict(size=14),
-        rotation=45
-    )])
-
-    # Mise en forme du graphique
-    fig_pie.update_layout(
-        title={
-            'text': f"Répartition des produits par gamme pour {vendor_search}",
-            'font': {'size': 13, 'color': '#505050'},
-            'y': 0.95
-        },
-        legend=dict(
-            orientation='h',
-            yanchor='bottom',
-            y=-0.4,
-            xanchor='center',
-            x=0.5,
-            font=dict(size=12)
-        ),
-        height=500,
-        template='plotly_white',
-        margin=dict(t=80, b=80, l=40, r=40)
-    )
-
-    # Ajouter des annotations au centre du camembert
-    fig_pie.add_annotation(
-        text=f"<b>Total<br>{format_currency(prodline_summary['valeur_totale'].sum())}</b>",
-        x=0.5, y=0.5,
-        font=dict(size=16, color='#505050'),
-        showarrow=False
-    )
-
-    # Afficher le graphique
-    st.plotly_chart(fig_pie, use_container_width=True)
-
-    # Ajouter un expander avec le tableau récapitulatif
-    with st.expander("📊 Détail par gamme de produits", expanded=False):
-        # Préparation du tableau récapitulatif
-        prodline_table = prodline_summary[['Prodline Name', 'nb_commandes', 'qte_totale', 'valeur_totale']].copy()
-        
-        # Renommer les colonnes
-        prodline_table = prodline_table.rename(columns={
-            "Prodline Name": "Gamme de Produits", 
-            "nb_commandes": "Commandes", 
-            "qte_totale": "Quantité", 
-            "valeur_totale": "Valeur Totale"
-        })
-        
-        # Formater les colonnes
-        prodline_table["Valeur Totale"] = prodline_table["Valeur Totale"].apply(format_currency)
-        prodline_table["Quantité"] = prodline_table["Quantité"].apply(lambda x: f"{int(x)}")
-        prodline_table["Commandes"] = prodline_table["Commandes"].apply(lambda x: f"{int(x)}")
-        
-        # Créer un style pour le DataFrame avec des couleurs par colonnes
-        def highlight_columns_prodline(x):
-            df_styler = pd.DataFrame('', index=x.index, columns=x.columns)
-            df_styler['Gamme de Produits'] = 'background-color: #e3f2fd; font-weight: bold;'
-            df_styler['Commandes'] = 'background-color: #f1f8e9'
-            df_styler['Quantité'] = 'background-color: #e8eaf6'
-            df_styler['Valeur Totale'] = 'background-color: #ffebee; font-weight: bold;'
-            return df_styler
-        
-        # Appliquer le style
-        styled_prodline_df = prodline_table.style.apply(highlight_columns_prodline, axis=None)
-        
-        # Afficher le tableau avec les données
-        st.dataframe(styled_prodline_df, use_container_width=True, hide_index=True)
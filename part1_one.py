@@ -1,8 +1,9 @@
-import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import streamlit as st
 from file1 import *
+from prodline1 import *
+from abc1 import *
 
 
 def part1_one(df, year):
@@ -79,6 +80,9 @@ def part1_one(df, year):
     # Trier par valeur totale (décroissant)
     material_summary = material_summary.sort_values(by="valeur_totale", ascending=False)
 
+    # Classe ABC de chaque matériel (part cumulée de la dépense)
+    material_summary = add_abc_column(material_summary, "valeur_totale")
+
     # Renommer les colonnes pour l'affichage
     material_summary = material_summary.rename(columns={
         "Matériel": "Matériel",
@@ -95,128 +99,135 @@ def part1_one(df, year):
         "valeur_totale": "Valeur Totale"
     })
 
-    # Formater la colonne de valeur totale
-    material_summary["Valeur Totale"] = material_summary["Valeur Totale"].apply(format_currency)
-    # Formater les colonnes de quantité
-    material_summary["Qté Moyenne"] = material_summary["Qté Moyenne"].apply(lambda x: f"{x:.1f}")  # Un chiffre après la virgule
-    material_summary["Qté Totale"] = material_summary["Qté Totale"].apply(lambda x: f"{int(x)}")  # Pas de décimales
-    material_summary["Qté Min"] = material_summary["Qté Min"].apply(lambda x: f"{int(x)}")  # Pas de décimales
-    material_summary["Qté Max"] = material_summary["Qté Max"].apply(lambda x: f"{int(x)}")  # Pas de décimales
-
-    # Créer un style pour l'ensemble du DataFrame des matériels avec des couleurs par colonnes
-    def highlight_columns_material(x):
-        df_styler = pd.DataFrame('', index=x.index, columns=x.columns)
-        df_styler['Matériel'] = 'background-color: #e3f2fd'
-        df_styler['Description'] = 'background-color: #f1f8e9'  
-        df_styler['Réf. Fournisseur'] = 'background-color: #e8eaf6'
-        df_styler['Fournisseur'] = 'background-color: #fff3e0'
-        df_styler['Nb Commandes'] = 'background-color: #e0f7fa'
-        df_styler['Nb Lignes'] = 'background-color: #f3e5f5'
-        df_styler['Order Unit'] = 'background-color: #f5f5f5'
-        df_styler['Qté Min'] = 'background-color: #fce4ec'
-        df_styler['Qté Max'] = 'background-color: #f3e5f5'
-        df_styler['Qté Moyenne'] = 'background-color: #e8f5e9'
-        df_styler['Qté Totale'] = 'background-color: #fff8e1'
-        df_styler['Valeur Totale'] = 'background-color: #ffebee'
-        return df_styler
-
-    # Appliquer le style avec coloration des colonnes
-    styled_material_df = material_summary.style.apply(highlight_columns_material, axis=None)
-
-    # Afficher le tableau avec les données et les couleurs
-    st.dataframe(styled_material_df, use_container_width=True, hide_index=True)
+    # Les colonnes restent numériques : le formatage est fait par la grille
+    material_columns_config = numeric_column_config(
+        currency=["Valeur Totale"],
+        integers=["Qté Totale", "Qté Min", "Qté Max"],
+        decimals={"Qté Moyenne": 1}
+    )
+
+    # Couleurs par colonne, calculées une seule fois pour tout le tableau
+    material_column_styles = {
+        'Matériel': 'background-color: #e3f2fd',
+        'Description': 'background-color: #f1f8e9',
+        'Réf. Fournisseur': 'background-color: #e8eaf6',
+        'Fournisseur': 'background-color: #fff3e0',
+        'Nb Commandes': 'background-color: #e0f7fa',
+        'Nb Lignes': 'background-color: #f3e5f5',
+        'Order Unit': 'background-color: #f5f5f5',
+        'Qté Min': 'background-color: #fce4ec',
+        'Qté Max': 'background-color: #f3e5f5',
+        'Qté Moyenne': 'background-color: #e8f5e9',
+        'Qté Totale': 'background-color: #fff8e1',
+        'Valeur Totale': 'background-color: #ffebee'
+    }
+
+    # Afficher le tableau paginé (seule la page visible est envoyée au navigateur)
+    paged_table(
+        material_summary,
+        key="materiaux_commandes",
+        column_styles=material_column_styles,
+        row_styles={'Classe ABC': abc_style(material_summary['Classe ABC'])},
+        column_config=material_columns_config,
+        search_columns=["Matériel", "Description", "Réf. Fournisseur", "Fournisseur"],
+        filter_columns=["Fournisseur", "Classe ABC"],
+        file_name="materiaux_commandes.csv"
+    )
     
     # Analyse par mois
     st.markdown("<h6 style='color: #000000; margin-top: 20px;'>Évolution Mensuelle des Commandes</h6>", unsafe_allow_html=True)
 
     # Regrouper les données par mois
-    monthly_data = df.groupby(["Month", "Month_Name"]).agg(
+    monthly_data = df.groupby("Month").agg(
         nb_commandes=("Bons de commande", "nunique"),
         nb_materials=("Matériel", "nunique"),
         valeur_totale=("Valeur nette de la commande", "sum")
     ).reset_index()
 
-    # Trier par mois
+    # Trier par mois et ajouter le libellé (lecture dans la table des 12 mois)
     monthly_data = monthly_data.sort_values(by="Month")
-
-    # Créer le graphique d'évolution mensuelle
-    fig = go.Figure()
-
-    # Ajouter les barres pour la valeur totale (axe Y gauche)
-    fig.add_trace(go.Bar(
-        x=monthly_data["Month_Name"],
-        y=monthly_data["valeur_totale"],
-        name='Valeur Totale (€)',
-        marker=dict(color='#6A0DAD'),
-        opacity=0.85,
-        hovertemplate='<b>%{x}</b><br>Valeur: %{y:,.2f} €<extra></extra>'
-    ))
-
-    # Ajouter une ligne pour le nombre de matériels (axe Y droit)
-    fig.add_trace(go.Scatter(
-        x=monthly_data["Month_Name"],
-        y=monthly_data["nb_materials"],
-        mode='lines+markers',
-        name='Nb Matériels',
-        line=dict(color='#FF7F00', width=3),
-        marker=dict(size=9, symbol='diamond'),
-        yaxis='y2',
-        hovertemplate='<b>%{x}</b><br>Matériels: %{y}<extra></extra>'
-    ))
-
-    # Ajouter une ligne pour le nombre de commandes (axe Y droit)
-    fig.add_trace(go.Scatter(
-        x=monthly_data["Month_Name"],
-        y=monthly_data["nb_commandes"],
-        mode='lines+markers',
-        name='Nb Commandes',
-        line=dict(color='#32CD32', width=3, dash='dashdot'),
-        marker=dict(size=9, symbol='circle'),
-        yaxis='y2',
-        hovertemplate='<b>%{x}</b><br>Commandes: %{y}<extra></extra>'
-    ))
-
-    # Configuration des axes et du layout
-    fig.update_layout(
-        title={
-            'text': f"Évolution des commandes en {year}",
-            'font': {'size': 13, 'color': '#505050'},
-            'y': 0.95
-        },
-        xaxis=dict(
-            title='Mois',
-            tickangle=-45
-        ),
-        yaxis=dict(
-            title=dict(
-                text='Valeur (€)',
-                font=dict(color='#6A0DAD')
+    monthly_data["Month_Name"] = month_labels(monthly_data["Month"], lang="en")
+
+    def build_monthly_figure(monthly_data, year):
+        # Créer le graphique d'évolution mensuelle
+        fig = go.Figure()
+
+        # Ajouter les barres pour la valeur totale (axe Y gauche)
+        fig.add_trace(go.Bar(
+            x=monthly_data["Month_Name"],
+            y=monthly_data["valeur_totale"],
+            name='Valeur Totale (€)',
+            marker=dict(color='#6A0DAD'),
+            opacity=0.85,
+            hovertemplate='<b>%{x}</b><br>Valeur: %{y:,.2f} €<extra></extra>'
+        ))
+
+        # Ajouter une ligne pour le nombre de matériels (axe Y droit)
+        fig.add_trace(go.Scatter(
+            x=monthly_data["Month_Name"],
+            y=monthly_data["nb_materials"],
+            mode='lines+markers',
+            name='Nb Matériels',
+            line=dict(color='#FF7F00', width=3),
+            marker=dict(size=9, symbol='diamond'),
+            yaxis='y2',
+            hovertemplate='<b>%{x}</b><br>Matériels: %{y}<extra></extra>'
+        ))
+
+        # Ajouter une ligne pour le nombre de commandes (axe Y droit)
+        fig.add_trace(go.Scatter(
+            x=monthly_data["Month_Name"],
+            y=monthly_data["nb_commandes"],
+            mode='lines+markers',
+            name='Nb Commandes',
+            line=dict(color='#32CD32', width=3, dash='dashdot'),
+            marker=dict(size=9, symbol='circle'),
+            yaxis='y2',
+            hovertemplate='<b>%{x}</b><br>Commandes: %{y}<extra></extra>'
+        ))
+
+        # Configuration des axes et du layout
+        fig.update_layout(
+            title={
+                'text': f"Évolution des commandes en {year}",
+                'font': {'size': 13, 'color': '#505050'},
+                'y': 0.95
+            },
+            xaxis=dict(
+                title='Mois',
+                tickangle=-45
             ),
-            tickfont=dict(color='#6A0DAD')
-        ),
-        yaxis2=dict(
-            title=dict(
-                text='Nombre de Commandes/Matériels',
-                font=dict(color='#32CD32')
+            yaxis=dict(
+                title=dict(
+                    text='Valeur (€)',
+                    font=dict(color='#6A0DAD')
+                ),
+                tickfont=dict(color='#6A0DAD')
             ),
-            tickfont=dict(color='#32CD32'),
-            anchor='x',
-            overlaying='y',
-            side='right'
-        ),
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.05,
-            xanchor="center",
-            x=0.5
-        ),
-        height=550,
-        template='plotly_white'
-    )
+            yaxis2=dict(
+                title=dict(
+                    text='Nombre de Commandes/Matériels',
+                    font=dict(color='#32CD32')
+                ),
+                tickfont=dict(color='#32CD32'),
+                anchor='x',
+                overlaying='y',
+                side='right'
+            ),
+            legend=dict(
+                orientation="h",
+                yanchor="bottom",
+                y=1.05,
+                xanchor="center",
+                x=0.5
+            ),
+            height=550,
+            template='plotly_white'
+        )
+        return fig
 
-    # Afficher le graphique
-    st.plotly_chart(fig, use_container_width=True)
+    # Afficher le graphique (reconstruit uniquement si ses données changent)
+    st.plotly_chart(cached_figure(build_monthly_figure, monthly_data, year), use_container_width=True)
 
     # Ajouter un expander avec le tableau récapitulatif
     with st.expander("📊 Récapitulatif mensuel détaillé", expanded=False):
@@ -258,34 +269,36 @@ def part1_one(df, year):
     # Trier par valeur totale et prendre les 10 premiers
     top_vendors = vendor_summary.sort_values(by="valeur_totale", ascending=False).head(10)
     
-    # Créer le graphique pour les fournisseurs
-    fig_vendors = px.bar(
-        top_vendors,
-        x="Nom du fournisseur",
-        y="valeur_totale",
-        # text=top_vendors["valeur_totale"].apply(lambda x: f"{x:,.2f} €".replace(",", " ").replace(".", ",")),
-        color="nb_commandes",
-        color_continuous_scale=px.colors.sequential.Viridis,
-        title=f"Top 10 des fournisseurs en {year} par valeur de commande",
-        labels={
-            "Nom du fournisseur": "Fournisseur",
-            "valeur_totale": "Valeur Totale (€)",
-            "qte_somme": "Qté Totale",
-            "nb_commandes": "Nombre de Commandes"
-        },
-        height=500
-    )
+    def build_vendors_figure(top_vendors, year):
+        # Créer le graphique pour les fournisseurs
+        fig_vendors = px.bar(
+            top_vendors,
+            x="Nom du fournisseur",
+            y="valeur_totale",
+            # text=top_vendors["valeur_totale"].apply(lambda x: f"{x:,.2f} €".replace(",", " ").replace(".", ",")),
+            color="nb_commandes",
+            color_continuous_scale=px.colors.sequential.Viridis,
+            title=f"Top 10 des fournisseurs en {year} par valeur de commande",
+            labels={
+                "Nom du fournisseur": "Fournisseur",
+                "valeur_totale": "Valeur Totale (€)",
+                "qte_somme": "Qté Totale",
+                "nb_commandes": "Nombre de Commandes"
+            },
+            height=500
+        )
     
-    # Mise en forme du graphique
-    fig_vendors.update_layout(
-        xaxis_tickangle=-45,
-        yaxis=dict(title='Valeur Totale (€)'),
-        coloraxis_colorbar=dict(title='Nb Commandes'),
-        template='plotly_white'
-    )
-    
-    # Afficher le graphique
-    st.plotly_chart(fig_vendors, use_container_width=True)
+        # Mise en forme du graphique
+        fig_vendors.update_layout(
+            xaxis_tickangle=-45,
+            yaxis=dict(title='Valeur Totale (€)'),
+            coloraxis_colorbar=dict(title='Nb Commandes'),
+            template='plotly_white'
+        )
+        return fig_vendors
+
+    # Afficher le graphique (reconstruit uniquement si ses données changent)
+    st.plotly_chart(cached_figure(build_vendors_figure, top_vendors, year), use_container_width=True)
     
     # Tableau détaillé des fournisseurs
     st.markdown("<h6 style='color: #000000; margin-top: 20px;'>Détail par Fournisseur</h6>", unsafe_allow_html=True)
@@ -302,142 +315,45 @@ def part1_one(df, year):
     vendor_display['ID Fournisseur'] = vendor_display['ID Fournisseur'].astype(int)
 
 
-    # Créer une copie pour le tri avant le formatage
+    # Trier par valeur totale (décroissant)
     vendor_display_sorted = vendor_display.sort_values(by="Valeur Totale", ascending=False)
+    vendor_display_sorted = add_abc_column(vendor_display_sorted, "Valeur Totale")
 
-    # Maintenant, formater la colonne après le tri
-    vendor_display_sorted["Valeur Totale"] = vendor_display_sorted["Valeur Totale"].apply(format_currency)
-    vendor_display_sorted["Qté Totale"] = vendor_display_sorted["Qté Totale"].apply(lambda x: f"{int(x)}")  # Pas de décimales
-
+    # Formatage délégué à la grille (les valeurs restent numériques)
+    vendor_columns_config = numeric_column_config(currency=["Valeur Totale"], integers=["Qté Totale"])
 
-    # Créer un style pour l'ensemble du DataFrame des fournisseurs avec des couleurs par colonnes
-    def highlight_columns_vendor(x):
-        df_styler = pd.DataFrame('', index=x.index, columns=x.columns)
-        df_styler['ID Fournisseur'] = 'background-color: #e8f5e9'
-        df_styler['Nom Fournisseur'] = 'background-color: #fff8e1' 
-        df_styler['Nb Commandes'] = 'background-color: #e1f5fe'
-        df_styler['Nb Matériels'] = 'background-color: #f5f5f5'
-        df_styler['Qté Totale'] = 'background-color: #fff8e1'
-        df_styler['Valeur Totale'] = 'background-color: #fce4ec'
-        return df_styler
 
-    # Appliquer le style avec coloration des colonnes
-    styled_vendor_df = vendor_display_sorted.style.apply(highlight_columns_vendor, axis=None)
+    # Couleurs par colonne, calculées une seule fois pour tout le tableau
+    vendor_column_styles = {
+        'ID Fournisseur': 'background-color: #e8f5e9',
+        'Nom Fournisseur': 'background-color: #fff8e1',
+        'Nb Commandes': 'background-color: #e1f5fe',
+        'Nb Matériels': 'background-color: #f5f5f5',
+        'Qté Totale': 'background-color: #fff8e1',
+        'Valeur Totale': 'background-color: #fce4ec'
+    }
 
     # Afficher le tableau avec les données
-    st.dataframe(styled_vendor_df, use_container_width=True, hide_index=True)
+    render_table(
+        vendor_display_sorted,
+        column_styles=vendor_column_styles,
+        row_styles={'Classe ABC': abc_style(vendor_display_sorted['Classe ABC'])},
+        column_config=vendor_columns_config
+    )
 
+    # Analyse ABC (Pareto) par fournisseur, matériel ou gamme
+    show_abc_analysis(df, key="commandes_annee", title=str(year))
 
 
-def camembert1(df,year):
 
-    
-    df = df[df['Year'] ==year]
-    # Vérifier si le dataframe est vide après le second filtre
-    if df.empty:
+def camembert1(df,year):
+    """Répartition par gamme des commandes d'une année"""
+    prodline_summary = prodline_breakdown(df, year=year)
+    if prodline_summary.empty:
         st.warning(f"Aucune donnée disponible pour l'année {year}")
         return
-   
-    # Analyse par gamme (prodline)
-    st.markdown("<h6 style='color: #000000; margin-top: 20px;'>Répartition par Gamme de Produits</h6>", unsafe_allow_html=True)
-
-    # Regrouper les données par prodline
-    prodline_summary = df.groupby("Prodline Name").agg(
-        nb_commandes=("Bons de commande", "nunique"),
-        qte_totale=("Order Quantity", "sum"),
-        valeur_totale=("Valeur nette de la commande", "sum")
-    ).reset_index()
-
-    # Trier par valeur totale
-    prodline_summary = prodline_summary.sort_values(by="valeur_totale", ascending=False)
 
-    # Créer les labels personnalisés pour le camembert
-    prodline_summary['labels'] = prodline_summary.apply(
-        lambda row: f"{row['Prodline Name']}: {format_currency(row['valeur_totale'])}<br>"
-                f"({int(row['qte_totale'])} unités, {int(row['nb_commandes'])} commandes)", 
-        axis=1
+    show_prodline_breakdown(
+        prodline_summary, f"Répartition des produits par gamme en {year}",
+        palette=PIE_PALETTE_BLUE, height=650, legend_y=-0.7
     )
-
-    # Palette de couleurs sophistiquées
-    color_palette = [
-        '#2E4057', '#083D77', '#4D6A92', '#006E90', '#4F86C6', 
-        '#5C4A72', '#7E5A9B', '#9B5094', '#B64E97', '#D34B99',
-        '#7E7B52', '#938B4A', '#A89A42', '#BDAA3A', '#D1BB32'
-    ]
-
-    # Créer le camembert
-    fig_pie = go.Figure(data=[go.Pie(
-        labels=prodline_summary['Prodline Name'],
-        values=prodline_summary['valeur_totale'],
-        text=prodline_summary['labels'],
-        hoverinfo='text',
-        textinfo='percent',
-        hole=0.4,
-        marker=dict(colors=color_palette, line=dict(color='#FFFFFF', width=1.5)),
-        textfont=dict(size=14),
-        rotation=45
-    )])
-
-    # Mise en forme du graphique
-    fig_pie.update_layout(
-        title={
-            'text': f"Répartition des produits par gamme en {year}",
-            'font': {'size': 13, 'color': '#505050'},
-            'y': 0.95
-        },
-        legend=dict(
-            orientation='h',
-            yanchor='bottom',
-            y=-0.7,
-            xanchor='center',
-            x=0.5,
-            font=dict(size=12)
-        ),
-        height=650,
-        template='plotly_white',
-        margin=dict(t=80, b=80, l=40, r=40)
-    )
-
-    # Ajouter des annotations au centre du camembert
-    fig_pie.add_annotation(
-        text=f"<b>Total<br>{format_currency(prodline_summary['valeur_totale'].sum())}</b>",
-        x=0.5, y=0.5,
-        font=dict(size=16, color='#505050'),
-        showarrow=False
-    )
-
-    # Afficher le graphique
-    st.plotly_chart(fig_pie, use_container_width=True)
-
-    # Ajouter un expander avec le tableau récapitulatif
-    with st.expander("📊 Détail par gamme de produits", expanded=False):
-        # Préparation du tableau récapitulatif
-        prodline_table = prodline_summary[['Prodline Name', 'nb_commandes', 'qte_totale', 'valeur_totale']].copy()
-        
-        # Renommer les colonnes
-        prodline_table = prodline_table.rename(columns={
-            "Prodline Name": "Gamme de Produits", 
-            "nb_commandes": "Commandes", 
-            "qte_totale": "Quantité", 
-            "valeur_totale": "Valeur Totale"
-        })
-        
-        # Formater les colonnes
-        prodline_table["Valeur Totale"] = prodline_table["Valeur Totale"].apply(format_currency)
-        prodline_table["Quantité"] = prodline_table["Quantité"].apply(lambda x: f"{int(x)}")
-        prodline_table["Commandes"] = prodline_table["Commandes"].apply(lambda x: f"{int(x)}")
-        
-        # Créer un style pour le DataFrame avec des couleurs par colonnes
-        def highlight_columns_prodline(x):
-            df_styler = pd.DataFrame('', index=x.index, columns=x.columns)
-            df_styler['Gamme de Produits'] = 'background-color: #e8f5e9; font-weight: bold'
-            df_styler['Commandes'] = 'background-color: #e1f5fe'
-            df_styler['Quantité'] = 'background-color: #fff8e1'
-            df_styler['Valeur Totale'] = 'background-color: #fce4ec; font-weight: bold'
-            return df_styler
-        
-        # Appliquer le style
-        styled_prodline_df = prodline_table.style.apply(highlight_columns_prodline, axis=None)
-        
-        # Afficher le tableau avec les données
-        st.dataframe(styled_prodline_df, use_container_width=True, hide_index=True)
\ No newline at end of file
@@ -1,12 +1,8 @@
-import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
 import streamlit as st
-from datetime import datetime
-from babel.dates import format_date
-import locale
-locale.setlocale(locale.LC_ALL, 'C')
 from file1 import *
+from prodline1 import *
+from compare1 import *
 
 
 
@@ -48,15 +44,20 @@ def part1_three(df, year, month, vendor_search):
         return
    
 
-   # Ensuite filtrer par année et mois 
-    df = df[(df['Year'] == year) & (df['Month'] == month)]
+    # Ensuite extraire le mois sélectionné (tranche de dates) et calculer en une passe
+    # les indicateurs du mois et de ses références de comparaison
+    supplier_data = df
+    period = month_range_period(year, month, month)
+    baselines = comparison_baselines()
+    comparaison = compare_periods(supplier_data, 'Date du document', period, ORDER_METRICS, baselines)
+    df, = period_slices(supplier_data, 'Date du document', period)
 
     # Vérifier si le dataframe est vide après le second filtre
     if df.empty:
         st.warning(f"Aucune donnée disponible pour le fournisseur {vendor_search} en mois {month} {year}")
         return
 
-    current_month_name = format_date(datetime(2022, month, 1), 'MMMM', locale='fr')
+    current_month_name = month_name(month).lower()
     # Titre et description de la section
     st.markdown(f"""
     <div style="background-color:{color_palette['tertiary']}; padding: 8px; border-radius: 8px; margin-top: 25px;">
@@ -78,6 +79,23 @@ def part1_three(df, year, month, vendor_search):
         display_metric_card("Matériels uniques", total_materials, color="#2ecc71")
     with col3:
         display_metric_card("Valeur totale", format_currency(total_value), color="#f39c12")
+
+    # Comparaison avec les périodes de référence
+    st.markdown(f"""
+    <div style="background-color:{color_palette['tertiary']}; padding: 8px; border-radius: 8px; margin-top: 25px;">
+        <h5 style="color: white;text-align: center; margin: 0;">Comparaison avec {', '.join(baseline_label(period, b) for b in baselines)}</h5>
+    </div>
+    """, unsafe_allow_html=True)
+    for baseline in baselines:
+        render_volume_changes(
+            comparaison,
+            baseline,
+            [("Commandes", "Bons de commande", format_count),
+             ("Références", "Matériels uniques", format_count),
+             ("Valeur", "Valeur totale", format_currency)],
+            color_palette,
+            title=f"Par rapport à {baseline_label(period, baseline)}:" if len(baselines) > 1 else None
+        )
    
     
     # Analyse détaillée des produits pour ce fournisseur
@@ -115,35 +133,30 @@ def part1_three(df, year, month, vendor_search):
         "valeur_totale": "Valeur Totale",
     })
 
-    # Formater les colonnes numériques
-    material_summary["Valeur Totale"] = material_summary["Valeur Totale"].apply(format_currency)
-    # Formater les colonnes de quantité
-    material_summary["Qté Moyenne"] = material_summary["Qté Moyenne"].apply(lambda x: f"{x:.1f}")  # Un chiffre après la virgule
-    material_summary["Qté Totale"] = material_summary["Qté Totale"].apply(lambda x: f"{int(x)}")  # Pas de décimales
-    material_summary["Qté Min"] = material_summary["Qté Min"].apply(lambda x: f"{int(x)}")  # Pas de décimales
-    material_summary["Qté Max"] = material_summary["Qté Max"].apply(lambda x: f"{int(x)}")  # Pas de décimales
-
-    # Créer un style pour l'ensemble du DataFrame des matériels avec des couleurs par colonnes
-    def highlight_columns_material(x):
-        df_styler = pd.DataFrame('', index=x.index, columns=x.columns)
-        df_styler['Matériel'] = 'background-color: #e3f2fd'
-        df_styler['Description'] = 'background-color: #f1f8e9'  
-        df_styler['Réf. Fournisseur'] = 'background-color: #e8eaf6'
-        df_styler['Nb Commandes'] = 'background-color: #e0f7fa'
-        df_styler['Nb Lignes'] = 'background-color: #f3e5f5'
-        df_styler['Order Unit'] = 'background-color: #f5f5f5'
-        df_styler['Qté Min'] = 'background-color: #fce4ec'
-        df_styler['Qté Max'] = 'background-color: #f3e5f5'
-        df_styler['Qté Moyenne'] = 'background-color: #e8f5e9'
-        df_styler['Qté Totale'] = 'background-color: #fff8e1'
-        df_styler['Valeur Totale'] = 'background-color: #ffebee'
-        return df_styler
+    # Les colonnes restent numériques : le formatage est fait par la grille
+    material_columns_config = numeric_column_config(
+        currency=["Valeur Totale"],
+        integers=["Qté Totale", "Qté Min", "Qté Max"],
+        decimals={"Qté Moyenne": 1}
+    )
 
-    # Appliquer le style avec coloration des colonnes
-    styled_material_df = material_summary.style.apply(highlight_columns_material, axis=None)
+    # Couleurs par colonne, calculées une seule fois pour tout le tableau
+    material_column_styles = {
+        'Matériel': 'background-color: #e3f2fd',
+        'Description': 'background-color: #f1f8e9',
+        'Réf. Fournisseur': 'background-color: #e8eaf6',
+        'Nb Commandes': 'background-color: #e0f7fa',
+        'Nb Lignes': 'background-color: #f3e5f5',
+        'Order Unit': 'background-color: #f5f5f5',
+        'Qté Min': 'background-color: #fce4ec',
+        'Qté Max': 'background-color: #f3e5f5',
+        'Qté Moyenne': 'background-color: #e8f5e9',
+        'Qté Totale': 'background-color: #fff8e1',
+        'Valeur Totale': 'background-color: #ffebee'
+    }
 
     # Afficher le tableau avec les données et les couleurs
-    st.dataframe(styled_material_df, use_container_width=True, hide_index=True)
+    render_table(material_summary, column_styles=material_column_styles, column_config=material_columns_config)
     
     # Top 10 des produits les plus commandés en valeur
     st.markdown("<h6 style='color: #000000; margin-top: 20px;'>Top 10 des Produits les Plus Commandés</h6>", unsafe_allow_html=True)
@@ -252,123 +265,13 @@ def part1_three(df, year, month, vendor_search):
 
 
 def camembert3(df,year,month,vendor_search):
-
-    df = df[(df['Nom du fournisseur'] == vendor_search) | 
-                     (df['Fournisseur'] == vendor_search)].copy()
-    
-    if df.empty:
-        st.warning(f"Aucune donnée disponible pour le fournisseur {vendor_search}")
-        return
-   
-
-   # Ensuite filtrer par année et mois 
-    df = df[(df['Year'] == year) & (df['Month'] == month)]
-
-    # Vérifier si le dataframe est vide après le second filtre
-    if df.empty:
-        st.warning(f"Aucune donnée disponible pour le fournisseur {vendor_search} en mois {month} {year}")
+    """Répartition par gamme des commandes d'un fournisseur pour un mois"""
+    prodline_summary = prodline_breakdown(df, year=year, month=month, supplier=vendor_search)
+    if prodline_summary.empty:
+        st.warning(f"Aucune donnée disponible pour le fournisseur {vendor_search} en {month_name(month)} {year}")
         return
-    # Répartition par Gamme de Produits
-    st.markdown("<h6 style='color: #000000; margin-top: 20px;'>Répartition par Gamme de Produits</h6>", unsafe_allow_html=True)
-
-    # Regrouper les données par prodline
-    prodline_summary = df.groupby("Prodline Name").agg(
-        nb_commandes=("Bons de commande", "nunique"),
-        qte_totale=("Order Quantity", "sum"),
-        valeur_totale=("Valeur nette de la commande", "sum")
-    ).reset_index()
-
-    # Trier par valeur totale
-    prodline_summary = prodline_summary.sort_values(by="valeur_totale", ascending=False)
 
-    # Créer les labels personnalisés pour le camembert
-    prodline_summary['labels'] = prodline_summary.apply(
-        lambda row: f"{row['Prodline Name']}: {format_currency(row['valeur_totale'])}<br>"
-                f"({int(row['qte_totale'])} unités, {int(row['nb_commandes'])} commandes)", 
-        axis=1
+    show_prodline_breakdown(
+        prodline_summary, f"Répartition des produits par gamme pour le mois de {month_name(month)} {year}",
+        palette=PIE_PALETTE_VIOLET
     )
-
-    # Palette de couleurs sophistiquées (réutilisation de celle définie plus haut ou utilisation de cette palette spécifique)
-    color_palette_pie = [
-        '#5D4E7B', '#8A7AAF', '#A799CE', '#C4BAE0', '#D3C4E3',
-        '#26495C', '#4C86A8', '#68B0AB', '#8FC0A9', '#C8D5B9',
-        '#AC3B61', '#D63B77', '#EF5D92', '#F283B6', '#FBAFC4'
-    ]
-
-    # Créer le camembert
-    fig_pie = go.Figure(data=[go.Pie(
-        labels=prodline_summary['Prodline Name'],
-        values=prodline_summary['valeur_totale'],
-        text=prodline_summary['labels'],
-        hoverinfo='text',
-        textinfo='percent',
-        hole=0.4,
-        marker=dict(colors=color_palette_pie, line=dict(color='#FFFFFF', width=1.5)),
-        textfont=dict(size=14),
-        rotation=45
-    )])
-
-    # Mise en forme du graphique
-    current_month_name = datetime(2022, month, 1).strftime('%B')
-    fig_pie.update_layout(
-        title={
-            'text': f"Répartition des produits par gamme pour le mois de {current_month_name} {year}",
-            'font': {'size': 13, 'color': '#505050'},
-            'y': 0.95
-        },
-        legend=dict(
-            orientation='h',
-            yanchor='bottom',
-            y=-0.4,
-            xanchor='center',
-            x=0.5,
-            font=dict(size=12)
-        ),
-        height=500,
-        template='plotly_white',
-        margin=dict(t=80, b=80, l=40, r=40)
-    )
-
-    # Ajouter des annotations au centre du camembert
-    fig_pie.add_annotation(
-        text=f"<b>Total<br>{format_currency(prodline_summary['valeur_totale'].sum())}</b>",
-        x=0.5, y=0.5,
-        font=dict(size=16, color='#505050'),
-        showarrow=False
-    )
-
-    # Afficher le graphique
-    st.plotly_chart(fig_pie, use_container_width=True)
-
-    # Ajouter un expander avec le tableau récapitulatif
-    with st.expander("📊 Détail par gamme de produits", expanded=False):
-        # Préparation du tableau récapitulatif
-        prodline_table = prodline_summary[['Prodline Name', 'nb_commandes', 'qte_totale', 'valeur_totale']].copy()
-        
-        # Renommer les colonnes
-        prodline_table = prodline_table.rename(columns={
-            "Prodline Name": "Gamme de Produits", 
-            "nb_commandes": "Commandes", 
-            "qte_totale": "Quantité", 
-            "valeur_totale": "Valeur Totale"
-        })
-        
-        # Formater les colonnes
-        prodline_table["Valeur Totale"] = prodline_table["Valeur Totale"].apply(format_currency)
-        prodline_table["Quantité"] = prodline_table["Quantité"].apply(lambda x: f"{int(x)}")
-        prodline_table["Commandes"] = prodline_table["Commandes"].apply(lambda x: f"{int(x)}")
-        
-        # Créer un style pour le DataFrame avec des couleurs par colonnes
-        def highlight_columns_prodline(x):
-            df_styler = pd.DataFrame('', index=x.index, columns=x.columns)
-            df_styler['Gamme de Produits'] = 'background-color: #e8f5e9; font-weight: bold'
-            df_styler['Commandes'] = 'background-color: #e1f5fe'
-            df_styler['Quantité'] = 'background-color: #fff8e1'
-            df_styler['Valeur Totale'] = 'background-color: #fce4ec; font-weight: bold'
-            return df_styler
-        
-        # Appliquer le style
-        styled_prodline_df = prodline_table.style.apply(highlight_columns_prodline, axis=None)
-        
-        # Afficher le tableau avec les données
-        st.dataframe(styled_prodline_df, use_container_width=True, hide_index=True)
@@ -1,14 +1,50 @@
-import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import streamlit as st
-from datetime import datetime
 from file1 import *
-from babel.dates import format_date
-import locale
-locale.setlocale(locale.LC_ALL, 'C')
-from datetime import datetime
+
+
+# Couleurs fixes par colonne des tableaux de performance (produits et fournisseurs)
+PERFORMANCE_COLUMN_STYLES = {
+    "Matériel": 'background-color: #e3f2fd',
+    "Description du matériel": 'background-color: #f1f8e9',
+    "Nom du fournisseur": 'background-color: #fff3e0',
+    "Matériel-Fournisseur ID": 'background-color: #e8eaf6',
+    "Nb. commandes": 'background-color: #e0f7fa',
+    "Délai théorique": 'background-color: #f3e5f5',
+    "Délai réel": 'background-color: #e8f5e9',
+    "% En avance": 'background-color: #bbdefb',
+    "% À temps": 'background-color: #c8e6c9',
+    "% Retard accepté": 'background-color: #ffecb3',
+    "% Long délai": 'background-color: #ffccbc',
+    "Livraison plus rapide": 'background-color: #e1f5fe',
+    "Livraison plus lente": 'background-color: #fce4ec'
+}
+
+# Formatage numérique fait par le navigateur (les données restent numériques)
+PERFORMANCE_COLUMNS_CONFIG = numeric_column_config(
+    decimals={"Délai théorique": 1, "Délai réel": 1, "Écart": 1, "Livraison plus rapide": 1, "Livraison plus lente": 1},
+    percent=["% En avance", "% À temps", "% Retard accepté", "% Long délai"]
+)
+
+
+def render_performance_table(df):
+    """Affiche un tableau de performance avec la coloration progressive de l'écart (calculée en bloc)"""
+    ecart = df["Écart"]
+    ecart_styles = conditional_styles(
+        [ecart <= -3, ecart <= -1, ecart <= 0, ecart <= 2, ecart <= 5, ecart > 5],
+        [
+            'background-color: #1b5e20; color: white',  # Vert foncé (très bon)
+            'background-color: #4caf50; color: white',  # Vert (bon)
+            'background-color: #8bc34a',  # Vert clair (acceptable)
+            'background-color: #ffeb3b',  # Jaune (à surveiller)
+            'background-color: #ff9800',  # Orange (problématique)
+            'background-color: #f44336; color: white'  # Rouge (critique)
+        ]
+    )
+    config = {col: cfg for col, cfg in PERFORMANCE_COLUMNS_CONFIG.items() if col in df.columns}
+    render_table(df, column_styles=PERFORMANCE_COLUMN_STYLES, row_styles={"Écart": ecart_styles}, column_config=config)
 
 
 def part_two(df, year, month):
@@ -24,7 +60,7 @@ def part_two(df, year, month):
         'background': '#F3F4F6',      # Gris très clair
      }
     
-    current_month_name = format_date(datetime(2022, month, 1), 'MMMM', locale='fr')
+    current_month_name = month_name(month).lower()
     st.markdown(f"""
         <div style="background-color:{color_palette['primary']}; padding: 10px; border-radius: 10px;">
             <h4 style="color: white; text-align: center;">Résultats pour le mois {current_month_name} {year} </h4>
@@ -146,74 +182,80 @@ def part_two(df, year, month):
     colors = ["#28a745", "#007bff", "#ffc107", "#dc3545"]
 
     with col1:
-        # Graphique pour produits
-        fig_taux_produits = go.Figure(go.Pie(
-            labels=statut_labels,
-            values=[
-                statut_counts_produits.get("En avance", 0), 
-                statut_counts_produits.get("À temps", 0),
-                statut_counts_produits.get("Retard accepté", 0), 
-                statut_counts_produits.get("Long délai", 0)
-            ],
-            marker=dict(colors=colors),
-            hole=0.6,
-            textinfo="percent",
-            hoverinfo="label+percent+value",
-            textfont=dict(size=12),
-            insidetextorientation='radial'
-        ))
+        def build_taux_produits(statut_counts_produits, nb_produits):
+            # Graphique pour produits
+            fig_taux_produits = go.Figure(go.Pie(
+                labels=statut_labels,
+                values=[
+                    statut_counts_produits.get("En avance", 0), 
+                    statut_counts_produits.get("À temps", 0),
+                    statut_counts_produits.get("Retard accepté", 0), 
+                    statut_counts_produits.get("Long délai", 0)
+                ],
+                marker=dict(colors=colors),
+                hole=0.6,
+                textinfo="percent",
+                hoverinfo="label+percent+value",
+                textfont=dict(size=12),
+                insidetextorientation='radial'
+            ))
         
-        fig_taux_produits.update_layout(
-            title="Répartition des livraisons (Produits)",
-            height=350,
-            annotations=[dict(text=f"{len(filtered_df)}\nproduits", x=0.5, y=0.5, font_size=14, showarrow=False)],
-            legend=dict(
-                orientation="v", 
-                yanchor="top", 
-                y=0.95, 
-                xanchor="left", 
-                x=1.02,
-                font=dict(size=12)
-            ),
-            margin=dict(l=20, r=120, t=50, b=20)
-        )
-        
-        st.plotly_chart(fig_taux_produits, use_container_width=True)
+            fig_taux_produits.update_layout(
+                title="Répartition des livraisons (Produits)",
+                height=350,
+                annotations=[dict(text=f"{nb_produits}\nproduits", x=0.5, y=0.5, font_size=14, showarrow=False)],
+                legend=dict(
+                    orientation="v", 
+                    yanchor="top", 
+                    y=0.95, 
+                    xanchor="left", 
+                    x=1.02,
+                    font=dict(size=12)
+                ),
+                margin=dict(l=20, r=120, t=50, b=20)
+            )
+            return fig_taux_produits
+
+        # Afficher le graphique (reconstruit uniquement si ses données changent)
+        st.plotly_chart(cached_figure(build_taux_produits, statut_counts_produits, len(filtered_df)), use_container_width=True)
 
     with col2:
-        # Graphique pour commandes
-        fig_taux_commandes = go.Figure(go.Pie(
-            labels=statut_labels,
-            values=[
-                statut_counts_commandes.get("En avance", 0), 
-                statut_counts_commandes.get("À temps", 0),
-                statut_counts_commandes.get("Retard accepté", 0), 
-                statut_counts_commandes.get("Long délai", 0)
-            ],
-            marker=dict(colors=colors),
-            hole=0.6,
-            textinfo="percent",
-            hoverinfo="label+percent+value",
-            textfont=dict(size=12),
-            insidetextorientation='radial'
-        ))
-        
-        fig_taux_commandes.update_layout(
-            title="Répartition des livraisons (Commandes)",
-            height=350,
-            annotations=[dict(text=f"{len(commandes_df)}\ncommandes", x=0.5, y=0.5, font_size=14, showarrow=False)],
-            legend=dict(
-                orientation="v", 
-                yanchor="top", 
-                y=0.95, 
-                xanchor="left", 
-                x=1.02,
-                font=dict(size=12)
-            ),
-            margin=dict(l=20, r=120, t=50, b=20)
-        )
+        def build_taux_commandes(statut_counts_commandes, nb_commandes):
+            # Graphique pour commandes
+            fig_taux_commandes = go.Figure(go.Pie(
+                labels=statut_labels,
+                values=[
+                    statut_counts_commandes.get("En avance", 0), 
+                    statut_counts_commandes.get("À temps", 0),
+                    statut_counts_commandes.get("Retard accepté", 0), 
+                    statut_counts_commandes.get("Long délai", 0)
+                ],
+                marker=dict(colors=colors),
+                hole=0.6,
+                textinfo="percent",
+                hoverinfo="label+percent+value",
+                textfont=dict(size=12),
+                insidetextorientation='radial'
+            ))
         
-        st.plotly_chart(fig_taux_commandes, use_container_width=True)
+            fig_taux_commandes.update_layout(
+                title="Répartition des livraisons (Commandes)",
+                height=350,
+                annotations=[dict(text=f"{nb_commandes}\ncommandes", x=0.5, y=0.5, font_size=14, showarrow=False)],
+                legend=dict(
+                    orientation="v", 
+                    yanchor="top", 
+                    y=0.95, 
+                    xanchor="left", 
+                    x=1.02,
+                    font=dict(size=12)
+                ),
+                margin=dict(l=20, r=120, t=50, b=20)
+            )
+            return fig_taux_commandes
+
+        # Afficher le graphique (reconstruit uniquement si ses données changent)
+        st.plotly_chart(cached_figure(build_taux_commandes, statut_counts_commandes, len(commandes_df)), use_container_width=True)
 
     # ========== ANALYSE PAR PRODUIT ==========
     
@@ -269,89 +311,8 @@ def part_two(df, year, month):
         # Reset index pour supprimer l'index, pas seulement le masquer
         meilleurs_produits_display = meilleurs_produits_display.reset_index(drop=True)
         
-        # Fonction pour appliquer le style et la coloration conditionnelle
-        def style_all_columns(df):
-            # Créer un DataFrame vide pour les styles
-            styles = pd.DataFrame('', index=df.index, columns=df.columns)
-            
-            # Appliquer des couleurs différentes à chaque colonne
-            if "Matériel" in df.columns:
-                styles["Matériel"] = 'background-color: #e3f2fd'
-            if "Description du matériel" in df.columns:
-                styles["Description du matériel"] = 'background-color: #f1f8e9'
-            if "Nom du fournisseur" in df.columns:
-                styles["Nom du fournisseur"] = 'background-color: #fff3e0'
-            if "Matériel-Fournisseur ID" in df.columns:
-                styles["Matériel-Fournisseur ID"] = 'background-color: #e8eaf6'
-            if "Nb. commandes" in df.columns:
-                styles["Nb. commandes"] = 'background-color: #e0f7fa'
-            if "Délai théorique" in df.columns:
-                styles["Délai théorique"] = 'background-color: #f3e5f5'
-            if "Délai réel" in df.columns: 
-                styles["Délai réel"] = 'background-color: #e8f5e9'
-            
-            # Coloration progressive pour la colonne d'écart
-            if "Écart" in df.columns:
-                # Fonction pour colorier l'écart en fonction de sa valeur
-                def color_ecart(val):
-                    if val <= -3:
-                        return 'background-color: #1b5e20; color: white'  # Vert foncé (très bon)
-                    elif val <= -1:
-                        return 'background-color: #4caf50; color: white'  # Vert (bon)
-                    elif val <= 0:
-                        return 'background-color: #8bc34a'  # Vert clair (acceptable)
-                    elif val <= 2:
-                        return 'background-color: #ffeb3b'  # Jaune (à surveiller)
-                    elif val <= 5:
-                        return 'background-color: #ff9800'  # Orange (problématique)
-                    else:
-                        return 'background-color: #f44336; color: white'  # Rouge (critique)
-                
-                # Appliquer le style à la colonne Écart
-                for idx in df.index:
-                    val = df.loc[idx, "Écart"]
-                    styles.loc[idx, "Écart"] = color_ecart(val)
-            
-            # Coloration des colonnes de pourcentage
-            percentage_cols = ["% En avance", "% À temps", "% Retard accepté", "% Long délai"]
-            for col in percentage_cols:
-                if col in df.columns:
-                    if col == "% En avance":
-                        styles[col] = 'background-color: #bbdefb'
-                    elif col == "% À temps":
-                        styles[col] = 'background-color: #c8e6c9'
-                    elif col == "% Retard accepté":
-                        styles[col] = 'background-color: #ffecb3'
-                    elif col == "% Long délai":
-                        styles[col] = 'background-color: #ffccbc'
-            
-            # Coloration des colonnes de livraison
-            if "Livraison plus rapide" in df.columns:
-                styles["Livraison plus rapide"] = 'background-color: #e1f5fe'
-            if "Livraison plus lente" in df.columns:
-                styles["Livraison plus lente"] = 'background-color: #fce4ec'
-            
-            # Appliquer les styles au DataFrame
-            styled_df = df.style.apply(lambda _: styles, axis=None)
-            
-            # Formatter les valeurs numériques
-            if "Écart" in df.columns:
-                styled_df = styled_df.format({
-                    "Délai théorique": "{:.1f}",
-                    "Délai réel": "{:.1f}",
-                    "Écart": "{:.1f}",
-                    "% En avance": "{:.1f}%",
-                    "% À temps": "{:.1f}%",
-                    "% Retard accepté": "{:.1f}%",
-                    "% Long délai": "{:.1f}%",
-                    "Livraison plus rapide": "{:.1f}",
-                    "Livraison plus lente": "{:.1f}"
-                }, na_rep="N/A")
-            
-            return styled_df
-        
         # Afficher le tableau stylisé
-        st.dataframe(style_all_columns(meilleurs_produits_display), use_container_width=True, hide_index=True)
+        render_performance_table(meilleurs_produits_display)
 
     # Section pour les produits à améliorer
     st.markdown("<h6 style='color: #000000; margin-top: 20px;'>Produits à améliorer (écart > 0)</h6>", unsafe_allow_html=True)
@@ -382,7 +343,7 @@ def part_two(df, year, month):
         produits_a_ameliorer_display = produits_a_ameliorer_display.reset_index(drop=True)
         
         # Afficher le tableau stylisé
-        st.dataframe(style_all_columns(produits_a_ameliorer_display), use_container_width=True, hide_index=True)
+        render_performance_table(produits_a_ameliorer_display)
 
     # Agréger les données par fournisseur et par commande
     performances_fournisseurs = commandes_df.groupby(["nom_fournisseur", "fournisseur", "Bon de commande"]).agg(
@@ -443,7 +404,7 @@ def part_two(df, year, month):
         bons_fournisseurs_display = bons_fournisseurs_display.reset_index(drop=True)
         
         # Afficher le tableau stylisé
-        st.dataframe(style_all_columns(bons_fournisseurs_display), use_container_width=True, hide_index=True)
+        render_performance_table(bons_fournisseurs_display)
 
     # Fournisseurs à améliorer
     st.markdown("<h6 style='color: #000000; margin-top: 20px;'>Fournisseurs à améliorer (écart > 0)</h6>", unsafe_allow_html=True)
@@ -473,7 +434,7 @@ def part_two(df, year, month):
         fournisseurs_a_ameliorer_display = fournisseurs_a_ameliorer_display.reset_index(drop=True)
         
         # Afficher le tableau stylisé
-        st.dataframe(style_all_columns(fournisseurs_a_ameliorer_display), use_container_width=True, hide_index=True)
+        render_performance_table(fournisseurs_a_ameliorer_display)
 
 
     
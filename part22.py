@@ -1,36 +1,61 @@
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 import streamlit as st
+from datetime import date
+from locale1 import *
+from period1 import *
 
 def setup_period_filter(year):
-    month_names = ["Janvier", "Février", "Mars", "Avril", "Mai", "Juin", 
-                  "Juillet", "Août", "Septembre", "Octobre", "Novembre", "Décembre"]
-    
     color_palette = {
         'primary': '#6366F1',
         'secondary': '#EC4899',
         'background': '#F3F4F6',
         # autres couleurs...
     }
-    
-    # Créer le slider une seule fois DANS LA SIDEBAR
-    month_range = st.sidebar.slider("Période", 
-                         min_value=1, 
-                         max_value=12, 
-                         value=(1, 12),  # Valeur par défaut (début, fin)
-                         step=1, 
-                         help="Sélectionnez la période (mois de début et de fin)")
-    
-    # Stocker les valeurs dans session_state
-    st.session_state.start_month, st.session_state.end_month = month_range
-    
-    # Créer la liste des mois sélectionnés et la stocker
-    st.session_state.selected_months = list(range(st.session_state.start_month, st.session_state.end_month + 1))
-    
+
+    # Mode de sélection : mois de l'année, plage de dates libre ou fenêtre glissante
+    mode = st.sidebar.radio("Type de période", PERIOD_MODES, key="period_mode")
+
+    if mode == "Plage de dates":
+        # Plage libre, pouvant chevaucher deux années (ex. octobre à mars)
+        dates = st.sidebar.date_input(
+            "Période",
+            value=(date(year, 1, 1), date(year, 12, 31)),
+            min_value=date(year - 5, 1, 1),
+            max_value=date(year + 1, 12, 31),
+            format="DD/MM/YYYY",
+            key=f"period_dates_{year}",
+            help="Sélectionnez la date de début et la date de fin (incluses)"
+        )
+        # Pendant la saisie, une seule date peut être renseignée
+        debut, fin = (dates[0], dates[-1]) if dates else (date(year, 1, 1), date(year, 12, 31))
+        period = make_period(debut, pd.Timestamp(fin) + pd.Timedelta(days=1))
+    elif mode == "Derniers jours":
+        # Fenêtre glissante se terminant à la fin de l'année choisie (ou aujourd'hui pour l'année en cours)
+        jours = st.sidebar.selectbox("Fenêtre", ROLLING_WINDOWS, index=1, format_func=lambda j: f"{j} derniers jours", key="period_window")
+        period = rolling_period(jours, min(date.today(), date(year, 12, 31)))
+    else:
+        # Créer le slider une seule fois DANS LA SIDEBAR
+        month_range = st.sidebar.slider("Période", 
+                             min_value=1, 
+                             max_value=12, 
+                             value=(1, 12),  # Valeur par défaut (début, fin)
+                             step=1, 
+                             help="Sélectionnez la période (mois de début et de fin)")
+        period = month_range_period(year, *month_range)
+
+    # Stocker la période [début, fin) dans session_state
+    st.session_state.period = period
+
+    # Mois couverts, conservés pour les vues qui raisonnent encore par numéro de mois
+    st.session_state.selected_months = period_months(period)
+    st.session_state.start_month = period["start"].month
+    st.session_state.end_month = (period["end"] - pd.Timedelta(days=1)).month
+
     # Afficher la période sélectionnée DANS LA SIDEBAR
+    comparaison = previous_year_period(period)
     st.sidebar.markdown(f"""
     <div style="background-color:{color_palette['background']}; padding: 10px; border-radius: 8px; margin-bottom: 15px; text-align: center;">
-        <p style="margin: 0; font-weight: bold;">Période sélectionnée: {month_names[st.session_state.start_month-1]} à {month_names[st.session_state.end_month-1]} {year}</p>
+        <p style="margin: 0; font-weight: bold;">Période sélectionnée: {period['label']}</p>
+        <p style="margin: 0; font-size: 0.85em;">Comparée à: {comparaison['label']}</p>
     </div>
-    """, unsafe_allow_html=True)
+    """, unsafe_allow_html=True)
\ No newline at end of file
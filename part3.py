@@ -2,10 +2,12 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import streamlit as st
-from babel.dates import format_date
-import locale
-locale.setlocale(locale.LC_ALL, 'C')
-from datetime import datetime
+from format1 import *
+from table1 import *
+from chart1 import *
+from locale1 import *
+from compare1 import *
+from forecast1 import *
 
 def part_three(df, year, month, vendor_search):
     """
@@ -50,27 +52,21 @@ def part_three(df, year, month, vendor_search):
     supplier_name = supplier_data['Nom du fournisseur'].iloc[0]
     supplier_id = supplier_data['Fournisseur'].iloc[0].astype(int)
     
-    # Filtrer par année et mois
-    mask_current = (supplier_data['Year'] == year) & (supplier_data['Month'] == month)
-    current_data = supplier_data[mask_current].copy()
+    # Période analysée (le mois sélectionné) et références de comparaison
+    period = month_range_period(year, month, month)
+    baselines = select_baselines()
+    current_data, = period_slices(supplier_data, 'Date de comptabilisation', period)
+    current_data = current_data.copy()
     
     if current_data.empty:
-        month_name = datetime(2022, month, 1).strftime('%B')
-        st.warning(f"Aucune donnée disponible pour {supplier_name} en {month_name} {year}")
+        st.warning(f"Aucune donnée disponible pour {supplier_name} en {month_name(month, lang='en')} {year}")
         return
     
-    # Déterminer le mois précédent
-    prev_month = month
-    prev_year = year - 1
+    # Indicateurs de la période et de toutes ses références, calculés en une seule passe groupée
+    comparaison = delay_comparison(supplier_data, period, baselines)
     
-    
-    # Filtrer les données pour le mois précédent
-    mask_prev = (supplier_data['Year'] == prev_year) & (supplier_data['Month'] == prev_month)
-    prev_data = supplier_data[mask_prev].copy()
-    
-    # Obtenir les noms des mois
-    current_month_name = format_date(datetime(2022, month, 1), 'MMMM', locale='fr')
-    prev_month_name = format_date(datetime(2022, month, 1), 'MMMM', locale='fr')
+    # Obtenir le nom du mois
+    current_month_name = month_name(month).lower()
     
     # Utiliser un style personnalisé pour l'en-tête
     st.markdown(f"""
@@ -89,17 +85,6 @@ def part_three(df, year, month, vendor_search):
         'Date de comptabilisation': 'first',  # Date de la commande
     }).reset_index()
     
-    # Faire la même chose pour le mois précédent
-    if not prev_data.empty:
-        prev_orders = prev_data.groupby('Bon de commande').agg({
-            'Délai théorique': 'max',
-            'Délai réel': 'max',
-            'Matériel': 'nunique',  # Nombre de produits uniques par commande
-            'Date de comptabilisation': 'first',  # Date de la commande
-        }).reset_index()
-    else:
-        prev_orders = pd.DataFrame()
-    
     # Convertir les colonnes numériques en types appropriés
     current_orders['Bon de commande'] = current_orders['Bon de commande'].astype(str).str.replace('\.0$', '', regex=True)
     
@@ -280,183 +265,37 @@ def part_three(df, year, month, vendor_search):
         </div>
         """, unsafe_allow_html=True)
 
-    # --- SECTION 3: COMPARAISON AVEC LE MOIS  ---
+    # --- SECTION 3: COMPARAISON AVEC LES PÉRIODES DE RÉFÉRENCE ---
     st.markdown(f"""
     <div style="background-color:{color_palette['primary']}; padding: 8px; border-radius: 8px; margin-top: 25px;">
-        <h5 style="color: white; text-align: center; margin: 0;">Comparaison avec le Mois {current_month_name} de {prev_year} </h5>
+        <h5 style="color: white; text-align: center; margin: 0;">Comparaison avec {', '.join(baseline_label(period, b) for b in baselines)}</h5>
     </div>
     """, unsafe_allow_html=True)
 
-    if not prev_data.empty:
-        # Calcul des indicateurs clés pour le mois précédent
-        prev_total_orders = len(prev_orders)
-        prev_total_products = prev_data['Matériel'].nunique()
-        prev_total_products_count = len(prev_data)
-        
-        # Calcul de l'évolution (pourcentage)
-        order_change = round(((total_orders - prev_total_orders) / prev_total_orders * 100), 1) if prev_total_orders > 0 else 100
-        product_change = round(((total_products - prev_total_products) / prev_total_products * 100), 1) if prev_total_products > 0 else 100
-        product_count_change = round(((total_products_count - prev_total_products_count) / prev_total_products_count * 100), 1) if prev_total_products_count > 0 else 100
-        
-        # Affichage des évolutions en 3 colonnes
+    for baseline in baselines:
+        reference_label = baseline_label(period, baseline)
+        if not has_baseline_data(comparaison["volumes"], baseline, "Lignes"):
+            st.info(f"Aucune donnée disponible pour {reference_label} pour comparaison")
+            continue
+
+        # Évolution des volumes (nombre de commandes, de références et de lignes)
+        render_volume_changes(
+            comparaison["volumes"],
+            baseline,
+            [("Commandes", "Commandes", format_count),
+             ("Références", "Produits uniques", format_count),
+             ("Lignes", "Total produits commandés", format_count)],
+            color_palette,
+            title=f"Évolution des volumes par rapport à {reference_label}:"
+        )
+
+        # Évolution des délais moyens par commande et par produit
         st.markdown(f"""
         <div style="background-color:{color_palette['background']}; padding: 10px; border-radius: 8px; margin-top: 15px;">
-            <h4 style="color:{color_palette['text']};">Évolution des volumes par rapport à {prev_month_name} {prev_year}:</h4>
+            <h4 style="color:{color_palette['text']};">Évolution des délais par rapport à {reference_label}:</h4>
         </div>
         """, unsafe_allow_html=True)
-        
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            change_color = color_palette['positive'] if order_change >= 0 else color_palette['negative']
-            st.markdown(f"""
-            <div style="padding:10px; border-radius:5px; text-align:center;">
-                <p style="margin:0;">Commandes: {prev_total_orders} → {total_orders}</p>
-                <h5 style="color:{change_color}; margin:5px 0 0 0;">{order_change:+.1f}%</h5>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        with col2:
-            change_color = color_palette['positive'] if product_change >= 0 else color_palette['negative']
-            st.markdown(f"""
-            <div style="padding:10px; border-radius:5px; text-align:center;">
-                <p style="margin:0;">Produits uniques: {prev_total_products} → {total_products}</p>
-                <h5 style="color:{change_color}; margin:5px 0 0 0;">{product_change:+.1f}%</h5>
-            </div>
-            """, unsafe_allow_html=True)
-            
-        with col3:
-            change_color = color_palette['positive'] if product_count_change >= 0 else color_palette['negative']
-            st.markdown(f"""
-            <div style="padding:10px; border-radius:5px; text-align:center;">
-                <p style="margin:0;">Total produits commandés: {prev_total_products_count} → {total_products_count}</p>
-                <h5 style="color:{change_color}; margin:5px 0 0 0;">{product_count_change:+.1f}%</h5>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        # Calcul des délais moyens pour les commandes du mois précédent
-        if not prev_orders.empty:
-            prev_orders['Écart_commande (jours)'] = (prev_orders['Délai réel'] - prev_orders['Délai théorique']).round(1)
-            
-            prev_order_delay_means = {
-                'Théorique': prev_orders['Délai théorique'].mean().round(1),
-                'Réel': prev_orders['Délai réel'].mean().round(1),
-                'Écart': prev_orders['Écart_commande (jours)'].mean().round(1)
-            }
-            
-            # Calcul des délais moyens pour les produits du mois précédent
-            prev_data['Écart de délai'] = (prev_data['Délai réel'] - prev_data['Délai théorique']).round(1)
-            
-            prev_product_delay_means = {
-                'Théorique': prev_data['Délai théorique'].mean().round(1),
-                'Réel': prev_data['Délai réel'].mean().round(1),
-                'Écart': prev_data['Écart de délai'].mean().round(1)
-            }
-            
-            # Évolution des délais
-            st.markdown(f"""
-            <div style="background-color:{color_palette['background']}; padding: 10px; border-radius: 8px; margin-top: 15px;">
-                <h4 style="color:{color_palette['text']};">Évolution des délais par rapport à {prev_month_name} {prev_year}:</h4>
-            </div>
-            """, unsafe_allow_html=True)
-
-            # Création de tableaux pour l'évolution des délais
-            tab1, tab2 = st.tabs(["Délais par commande", "Délais par produit"])
-
-            # Onglet Délais par commande
-            with tab1:
-                # Préparation des données pour le tableau d'évolution des commandes
-                order_evolution = pd.DataFrame({
-                    'Type': ['Théorique', 'Réel', 'Écart'],
-                    f'Actuel ({current_month_name})': [
-                        round(order_delay_means['Théorique'], 1), 
-                        round(order_delay_means['Réel'], 1), 
-                        round(order_delay_means['Écart'], 1)
-                    ],
-                    f'Précédent ({prev_month_name})': [
-                        round(prev_order_delay_means['Théorique'], 1), 
-                        round(prev_order_delay_means['Réel'], 1), 
-                        round(prev_order_delay_means['Écart'], 1)
-                    ],
-                    'Évolution (jours)': [
-                        round(order_delay_means['Théorique'] - prev_order_delay_means['Théorique'], 1),
-                        round(order_delay_means['Réel'] - prev_order_delay_means['Réel'], 1),
-                        round(order_delay_means['Écart'] - prev_order_delay_means['Écart'], 1)
-                    ]
-                })
-                
-                # Fonction pour styliser l'évolution
-                def highlight_evolution(val):
-                    if isinstance(val, (int, float)):
-                        if val < 0:
-                            # Pour l'écart, négatif est mieux (donc vert)
-                            return f'background-color: {color_palette["positive"]}; color: white'
-                        elif val > 0:
-                            # Pour l'écart, positif est pire (donc rouge)
-                            return f'background-color: {color_palette["negative"]}; color: white'
-                    return ''
-                
-                # Fonction pour colorer les colonnes (comme dans l'exemple part1_one)
-                def highlight_columns_order(x):
-                    df_styler = pd.DataFrame('', index=x.index, columns=x.columns)
-                    df_styler['Type'] = 'background-color: #f5f5f5'
-                    df_styler[f'Actuel ({current_month_name})'] = f'background-color: {color_palette["primary"]}; color: white'
-                    df_styler[f'Précédent ({prev_month_name})'] = f'background-color: {color_palette["secondary"]}; color: white'
-                    df_styler['Évolution (jours)'] = 'background-color: #e1f5fe'
-                    return df_styler
-                
-                # Appliquer le style au DataFrame
-                styled_order_evolution = order_evolution.style.apply(
-                    highlight_columns_order, axis=None
-                ).applymap(
-                    highlight_evolution, subset=['Évolution (jours)']
-                ).format({
-                    f'Actuel ({current_month_name})': '{:.1f}',
-                    f'Précédent ({prev_month_name})': '{:.1f}',
-                    'Évolution (jours)': '{:.1f}'
-                })
-                
-                # Afficher le tableau
-                st.dataframe(styled_order_evolution, use_container_width=True, hide_index=True)
-
-            # Onglet Délais par produit
-            with tab2:
-                # Préparation des données pour le tableau d'évolution des produits
-                product_evolution = pd.DataFrame({
-                    'Type': ['Théorique', 'Réel', 'Écart'],
-                    f'Actuel ({current_month_name})': [
-                        round(product_delay_means['Théorique'], 1), 
-                        round(product_delay_means['Réel'], 1), 
-                        round(product_delay_means['Écart'], 1)
-                    ],
-                    f'Précédent ({prev_month_name})': [
-                        round(prev_product_delay_means['Théorique'], 1), 
-                        round(prev_product_delay_means['Réel'], 1), 
-                        round(prev_product_delay_means['Écart'], 1)
-                    ],
-                    'Évolution (jours)': [
-                        round(product_delay_means['Théorique'] - prev_product_delay_means['Théorique'], 1),
-                        round(product_delay_means['Réel'] - prev_product_delay_means['Réel'], 1),
-                        round(product_delay_means['Écart'] - prev_product_delay_means['Écart'], 1)
-                    ]
-                })
-                
-                # Appliquer le style au DataFrame
-                styled_product_evolution = product_evolution.style.apply(
-                    highlight_columns_order, axis=None
-                ).applymap(
-                    highlight_evolution, subset=['Évolution (jours)']
-                ).format({
-                    f'Actuel ({current_month_name})': '{:.1f}',
-                    f'Précédent ({prev_month_name})': '{:.1f}',
-                    'Évolution (jours)': '{:.1f}'
-                })
-                
-                # Afficher le tableau
-                st.dataframe(styled_product_evolution, use_container_width=True, hide_index=True)
-
-    else:
-        st.info(f"Aucune donnée disponible pour {prev_month_name} {prev_year} pour comparaison")
+        render_delay_changes(comparaison, baseline, period['label'], reference_label, color_palette)
 
 
 
@@ -476,82 +315,39 @@ def part_three(df, year, month, vendor_search):
     col1, col2 = st.columns(2)
     
     with col1:
-        # Graphique circulaire pour les pourcentages actuels
-        fig_pie = px.pie(
-            status_counts,
-            names='Statut livraison',
-            values='count',
-            color='Statut livraison',
-            color_discrete_map=delivery_status_colors,
-            title=f"Répartition des commandes en {current_month_name} {year}",
-            labels={'Statut livraison': 'Statut de livraison', 'count': 'Nombre de commandes'},
-            hole=0.4
-        )
+        def build_orders_pie(status_counts, current_month_name, year):
+            # Graphique circulaire pour les pourcentages actuels
+            fig_pie = px.pie(
+                status_counts,
+                names='Statut livraison',
+                values='count',
+                color='Statut livraison',
+                color_discrete_map=delivery_status_colors,
+                title=f"Répartition des commandes en {current_month_name} {year}",
+                labels={'Statut livraison': 'Statut de livraison', 'count': 'Nombre de commandes'},
+                hole=0.4
+            )
         
-        fig_pie.update_traces(textposition='inside', textinfo='percent+label')
-        fig_pie.update_layout(
-            title_font_size=16,
-            title_font_color=color_palette['text'],
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)'
-        )
-        st.plotly_chart(fig_pie, use_container_width=True)
+            fig_pie.update_traces(textposition='inside', textinfo='percent+label')
+            fig_pie.update_layout(
+                title_font_size=16,
+                title_font_color=color_palette['text'],
+                plot_bgcolor='rgba(0,0,0,0)',
+                paper_bgcolor='rgba(0,0,0,0)'
+            )
+            return fig_pie
+
+        # Afficher le graphique (reconstruit uniquement si ses données changent)
+        st.plotly_chart(cached_figure(build_orders_pie, status_counts, current_month_name, year), use_container_width=True)
     
     with col2:
-        # Comparaison avec le mois précédent si des données sont disponibles
-        if not prev_orders.empty:
-            prev_orders['Statut livraison'] = prev_orders.apply(categorize_delay, axis=1)
-            prev_status_counts = prev_orders['Statut livraison'].value_counts().reset_index()
-            prev_status_counts.columns = ['Statut livraison', 'count']
-            prev_total_orders = len(prev_orders)
-            prev_status_counts['percentage'] = (prev_status_counts['count'] / prev_total_orders * 100).round(1)
-            
-            # Préparation des données de comparaison           
-            
-            comparison_data = []
-
-            # Créons des dictionnaires pour faciliter l'accès aux pourcentages
-            current_pct_dict = dict(zip(status_counts['Statut livraison'], status_counts['percentage']))
-            prev_pct_dict = dict(zip(prev_status_counts['Statut livraison'], prev_status_counts['percentage']))
-
-            for status in ['En avance', 'À temps', 'Retard accepté', 'Long délai']:
-                # Obtenez les pourcentages de manière plus fiable
-                current_pct = current_pct_dict.get(status, 0)
-                prev_pct = prev_pct_dict.get(status, 0)
-                evolution = current_pct - prev_pct
-                
-                # Déterminer la couleur de l'évolution
-                if status == 'Retard accepté' or status == 'Long délai':
-                    evolution_color = color_palette['negative'] if evolution > 0 else color_palette['positive']
-                else:
-                    evolution_color = color_palette['positive'] if evolution > 0 else color_palette['negative']
-                
-                comparison_data.append({
-                    'Statut': status,
-                    f'% {prev_month_name}': f"{prev_pct:.1f}%",
-                    'Évolution': f"{evolution:+.1f}%",
-                    'color': evolution_color
-                })
-                        
-            comparison_df = pd.DataFrame(comparison_data)
-            
-            st.markdown(f"""
-            <div style="background-color:{color_palette['background']}; padding: 10px; border-radius: 8px;">
-                <h4 style="color:{color_palette['text']};">Comparaison avec {prev_month_name} {prev_year}:</h4>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            # Afficher le tableau avec des couleurs personnalisées
-            for i, row in comparison_df.iterrows():
-                col1, col2, col3 = st.columns([2.5, 1.5, 1.5])
-                with col1:
-                    st.markdown(f"<div style='font-weight:bold;'>{row['Statut']}</div>", unsafe_allow_html=True)
-                with col2:
-                    st.markdown(f"{row[f'% {prev_month_name}']}", unsafe_allow_html=True)
-                with col3:
-                    st.markdown(f"<div style='color:{row['color']};font-weight:bold;'>{row['Évolution']}</div>", unsafe_allow_html=True)
-        else:
-            st.info(f"Aucune donnée disponible pour {prev_month_name} {prev_year}")
+        # Comparaison avec chaque référence, à partir des parts calculées en une passe
+        for baseline in baselines:
+            reference_label = baseline_label(period, baseline)
+            if has_baseline_data(comparaison["commandes"], baseline, "Commandes"):
+                render_status_changes(comparaison["commandes"], baseline, reference_label, color_palette)
+            else:
+                st.info(f"Aucune donnée disponible pour {reference_label}")
 
    
 
@@ -567,81 +363,39 @@ def part_three(df, year, month, vendor_search):
     col1, col2 = st.columns(2)
 
     with col1:
-        # Graphique circulaire pour les pourcentages actuels des produits
-        fig_pie_products = px.pie(
-            status_counts_products,
-            names='Statut de livraison',
-            values='count',
-            color='Statut de livraison',
-            color_discrete_map=delivery_status_colors,
-            title=f"Répartition des produits en {current_month_name} {year}",
-            labels={'Statut de livraison': 'Statut de livraison', 'count': 'Nombre de produits'},
-            hole=0.4
-        )
+        def build_products_pie(status_counts_products, current_month_name, year):
+            # Graphique circulaire pour les pourcentages actuels des produits
+            fig_pie_products = px.pie(
+                status_counts_products,
+                names='Statut de livraison',
+                values='count',
+                color='Statut de livraison',
+                color_discrete_map=delivery_status_colors,
+                title=f"Répartition des produits en {current_month_name} {year}",
+                labels={'Statut de livraison': 'Statut de livraison', 'count': 'Nombre de produits'},
+                hole=0.4
+            )
         
-        fig_pie_products.update_traces(textposition='inside', textinfo='percent+label')
-        fig_pie_products.update_layout(
-            title_font_size=16,
-            title_font_color=color_palette['text'],
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)'
-        )
-        st.plotly_chart(fig_pie_products, use_container_width=True)
+            fig_pie_products.update_traces(textposition='inside', textinfo='percent+label')
+            fig_pie_products.update_layout(
+                title_font_size=16,
+                title_font_color=color_palette['text'],
+                plot_bgcolor='rgba(0,0,0,0)',
+                paper_bgcolor='rgba(0,0,0,0)'
+            )
+            return fig_pie_products
+
+        # Afficher le graphique (reconstruit uniquement si ses données changent)
+        st.plotly_chart(cached_figure(build_products_pie, status_counts_products, current_month_name, year), use_container_width=True)
 
     with col2:
-        # Comparaison avec le mois précédent si des données sont disponibles
-        if not prev_data.empty:
-            prev_data['Statut de livraison'] = prev_data.apply(categorize_delay, axis=1)
-            prev_status_counts_products = prev_data['Statut de livraison'].value_counts().reset_index()
-            prev_status_counts_products.columns = ['Statut de livraison', 'count']
-            prev_total_products_count = len(prev_data)
-            prev_status_counts_products['percentage'] = (prev_status_counts_products['count'] / prev_total_products_count * 100).round(1)
-            
-            # Préparation des données de comparaison
-            comparison_data_products = []
-
-            # Créons des dictionnaires pour faciliter l'accès aux pourcentages
-            current_pct_dict = dict(zip(status_counts_products['Statut de livraison'], status_counts_products['percentage']))
-            prev_pct_dict = dict(zip(prev_status_counts_products['Statut de livraison'], prev_status_counts_products['percentage']))
-
-            for status in ['En avance', 'À temps', 'Retard accepté', 'Long délai']:
-                # Obtenez les pourcentages de manière plus fiable
-                current_pct = current_pct_dict.get(status, 0)
-                prev_pct = prev_pct_dict.get(status, 0)
-                evolution = current_pct - prev_pct
-                
-                # Déterminer la couleur de l'évolution
-                if status == 'Retard accepté' or status == 'Long délai':
-                    evolution_color = color_palette['negative'] if evolution > 0 else color_palette['positive']
-                else:
-                    evolution_color = color_palette['positive'] if evolution > 0 else color_palette['negative']
-                
-                comparison_data_products.append({
-                    'Statut': status,
-                    f'% {prev_month_name}': f"{prev_pct:.1f}%",
-                    'Évolution': f"{evolution:+.1f}%",
-                    'color': evolution_color
-                })
-            
-            comparison_df_products = pd.DataFrame(comparison_data_products)
-            
-            st.markdown(f"""
-            <div style="background-color:{color_palette['background']}; padding: 10px; border-radius: 8px;">
-                <h4 style="color:{color_palette['text']};">Comparaison avec {prev_month_name} {prev_year}:</h4>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            # Afficher le tableau avec des couleurs personnalisées
-            for i, row in comparison_df_products.iterrows():
-                col1, col2, col3 = st.columns([2.5, 1.5, 1.5])
-                with col1:
-                    st.markdown(f"<div style='font-weight:bold;'>{row['Statut']}</div>", unsafe_allow_html=True)
-                with col2:
-                    st.markdown(f"{row[f'% {prev_month_name}']}", unsafe_allow_html=True)
-                with col3:
-                    st.markdown(f"<div style='color:{row['color']};font-weight:bold;'>{row['Évolution']}</div>", unsafe_allow_html=True)
-        else:
-            st.info(f"Aucune donnée disponible pour {prev_month_name} {prev_year}")
+        # Comparaison avec chaque référence, à partir des parts calculées en une passe
+        for baseline in baselines:
+            reference_label = baseline_label(period, baseline)
+            if has_baseline_data(comparaison["lignes"], baseline, "Lignes"):
+                render_status_changes(comparaison["lignes"], baseline, reference_label, color_palette)
+            else:
+                st.info(f"Aucune donnée disponible pour {reference_label}")
     
     # --- SECTION : TOP ET PIRES COMMANDES PAR ÉCART ---
     st.markdown(f"""
@@ -692,6 +446,26 @@ def part_three(df, year, month, vendor_search):
     ]
 
 
+    # Couleur de la colonne de statut selon le statut de livraison (calculée en bloc pour tout le tableau)
+    def delivery_status_styles(statuts):
+        return conditional_styles(
+            [statuts == "En avance", statuts == "À temps"],
+            [
+                f'background-color: {color_palette["positive"]}30; font-weight: bold; color: {color_palette["text"]}',
+                f'background-color: {color_palette["neutral"]}30; font-weight: bold; color: {color_palette["text"]}'
+            ],
+            default=f'background-color: {color_palette["negative"]}30; font-weight: bold; color: {color_palette["text"]}'
+        )
+
+    # Couleurs par colonne des tableaux de commandes, définies une seule fois
+    order_column_styles = {
+        'Bon de commande': f'background-color: {color_palette["primary"]}30; color: {color_palette["text"]}',
+        'Délai théorique': f'background-color: {color_palette["neutral"]}30; color: {color_palette["text"]}',
+        'Délai réel': f'background-color: {color_palette["tertiary"]}30; color: {color_palette["text"]}'
+    }
+
+    order_columns_config = numeric_column_config(decimals={'Délai théorique': 1, 'Délai réel': 1, 'Écart_commande (jours)': 1})
+
     order_tabs = st.tabs(["📈 Meilleurs Commandes (Écart ≤ 0)", "📉 Mauvaises Commandes (Écart > 0)"])
 
     with order_tabs[0]:
@@ -704,40 +478,21 @@ def part_three(df, year, month, vendor_search):
         # Formater les données pour l'affichage
         display_good_orders = good_orders[order_display_cols].copy()
         
-        # S'assurer que les délais sont affichés avec un seul chiffre après la virgule
-        for col in ['Délai théorique', 'Délai réel', 'Écart_commande (jours)']:
-            if col in display_good_orders.columns:
-                display_good_orders[col] = display_good_orders[col].map(lambda x: f"{x:.1f}" if pd.notnull(x) else x)
-        
         # S'assurer que les numéros de commande sont des entiers sans décimales
         if 'Bon de commande' in display_good_orders.columns and display_good_orders['Bon de commande'].dtype != 'object':
             display_good_orders['Bon de commande'] = display_good_orders['Bon de commande'].astype(int)
         
-        # Styliser le dataframe en combinant les couleurs par colonne et le gradient pour Écart
         if not display_good_orders.empty:
-            styled_good_orders = display_good_orders.style.apply(lambda x: [
-                f'background-color: {color_palette["primary"]}30; color: {color_palette["text"]}' 
-                if col == 'Bon de commande' else
-                f'background-color: {color_palette["neutral"]}30; color: {color_palette["text"]}' 
-                if col == 'Délai théorique' else
-                f'background-color: {color_palette["tertiary"]}30; color: {color_palette["text"]}' 
-                if col == 'Délai réel' else
-                f'background-color: {color_palette["positive"]}30; font-weight: bold; color: {color_palette["text"]}' 
-                if col == 'Écart_commande (jours)' else
-                f'background-color: {color_palette["positive" if x["Statut livraison"] == "En avance" else "neutral" if x["Statut livraison"] == "À temps" else "negative"]}30; font-weight: bold; color: {color_palette["text"]}'
-                for col in display_good_orders.columns
-            ], axis=1)
-            
-            # Ajouter le gradient sur la colonne Écart
-            numeric_good_orders = good_orders[order_display_cols].copy()
-            styled_good_orders = styled_good_orders.background_gradient(
-                subset=['Écart_commande (jours)'], 
-                cmap="RdYlGn_r",
-                vmin=numeric_good_orders['Écart_commande (jours)'].min(),
-                vmax=0
+            # Couleurs par colonne précalculées, dégradé sur l'écart et couleur du statut calculés en bloc
+            render_table(
+                display_good_orders,
+                column_styles=order_column_styles,
+                row_styles={
+                    'Statut livraison': delivery_status_styles(display_good_orders['Statut livraison']),
+                    'Écart_commande (jours)': gradient_styles(display_good_orders['Écart_commande (jours)'], cmap="RdYlGn_r", vmin=display_good_orders['Écart_commande (jours)'].min(), vmax=0)
+                },
+                column_config=order_columns_config
             )
-            
-            st.dataframe(styled_good_orders, use_container_width=True, hide_index=True)
         else:
             st.info("Aucune commande avec un écart favorable trouvée dans cette période.")
 
@@ -751,40 +506,21 @@ def part_three(df, year, month, vendor_search):
         # Formater les données pour l'affichage
         display_bad_orders = bad_orders[order_display_cols].copy()
         
-        # S'assurer que les délais sont affichés avec un seul chiffre après la virgule
-        for col in ['Délai théorique', 'Délai réel', 'Écart_commande (jours)']:
-            if col in display_bad_orders.columns:
-                display_bad_orders[col] = display_bad_orders[col].map(lambda x: f"{x:.1f}" if pd.notnull(x) else x)
-        
         # S'assurer que les numéros de commande sont des entiers sans décimales
         if 'Bon de commande' in display_bad_orders.columns and display_bad_orders['Bon de commande'].dtype != 'object':
             display_bad_orders['Bon de commande'] = display_bad_orders['Bon de commande'].astype(int)
         
-        # Styliser le dataframe en combinant les couleurs par colonne et le gradient pour Écart
         if not display_bad_orders.empty:
-            styled_bad_orders = display_bad_orders.style.apply(lambda x: [
-                f'background-color: {color_palette["primary"]}30; color: {color_palette["text"]}' 
-                if col == 'Bon de commande' else
-                f'background-color: {color_palette["neutral"]}30; color: {color_palette["text"]}' 
-                if col == 'Délai théorique' else
-                f'background-color: {color_palette["tertiary"]}30; color: {color_palette["text"]}' 
-                if col == 'Délai réel' else
-                f'background-color: {color_palette["negative"]}30; font-weight: bold; color: {color_palette["text"]}' 
-                if col == 'Écart_commande (jours)' else
-                f'background-color: {color_palette["positive" if x["Statut livraison"] == "En avance" else "neutral" if x["Statut livraison"] == "À temps" else "negative"]}30; font-weight: bold; color: {color_palette["text"]}'
-                for col in display_bad_orders.columns
-            ], axis=1)
-            
-            # Ajouter le gradient sur la colonne Écart
-            numeric_bad_orders = bad_orders[order_display_cols].copy()
-            styled_bad_orders = styled_bad_orders.background_gradient(
-                subset=['Écart_commande (jours)'], 
-                cmap="RdYlGn_r",
-                vmin=0,
-                vmax=numeric_bad_orders['Écart_commande (jours)'].max()
+            # Couleurs par colonne précalculées, dégradé sur l'écart et couleur du statut calculés en bloc
+            render_table(
+                display_bad_orders,
+                column_styles=order_column_styles,
+                row_styles={
+                    'Statut livraison': delivery_status_styles(display_bad_orders['Statut livraison']),
+                    'Écart_commande (jours)': gradient_styles(display_bad_orders['Écart_commande (jours)'], cmap="RdYlGn_r", vmin=0, vmax=display_bad_orders['Écart_commande (jours)'].max())
+                },
+                column_config=order_columns_config
             )
-            
-            st.dataframe(styled_bad_orders, use_container_width=True, hide_index=True)
         else:
             st.info("Aucune commande avec un écart défavorable trouvée dans cette période.")
 
@@ -797,13 +533,16 @@ def part_three(df, year, month, vendor_search):
     </div>
     """, unsafe_allow_html=True)
 
+    # Délai prévu de la prochaine livraison de chaque produit (historique complet du fournisseur)
+    current_data = add_forecast_columns(current_data, forecast_lead_times(df))
+
     # Séparation des produits en bons et mauvais
     good_products = current_data[current_data['Écart de délai'] <= 0].sort_values('Écart de délai').copy()
     bad_products = current_data[current_data['Écart de délai'] > 0].sort_values('Écart de délai', ascending=False).copy()
 
     # S'assurer que les délais ont un seul chiffre après la virgule
     for df in [good_products, bad_products]:
-        for col in ['Délai théorique', 'Délai réel', 'Écart de délai']:
+        for col in ['Délai théorique', 'Délai réel', 'Écart de délai'] + FORECAST_COLUMNS:
             if col in df.columns:
                 df[col] = df[col].round(1)
         
@@ -815,9 +554,23 @@ def part_three(df, year, month, vendor_search):
     product_display_cols = [
         'Matériel', 'Description du matériel', 'Bon de commande', 
         'Délai théorique', 'Délai réel', 'Écart de délai', 'Statut de livraison'
-    ]
+    ] + FORECAST_COLUMNS
 
 
+    # Couleurs par colonne des tableaux de produits, définies une seule fois
+    product_column_styles = {
+        'Matériel': f'background-color: {color_palette["primary"]}30; color: {color_palette["text"]}',
+        'Description du matériel': f'background-color: {color_palette["tertiary"]}30; color: {color_palette["text"]}',
+        'Bon de commande': f'background-color: {color_palette["quaternary"]}30; color: {color_palette["text"]}',
+        'Délai théorique': f'background-color: {color_palette["neutral"]}30; color: {color_palette["text"]}',
+        'Délai réel': f'background-color: {color_palette["tertiary"]}30; color: {color_palette["text"]}',
+        **{col: f'background-color: {color_palette["secondary"]}20; color: {color_palette["text"]}' for col in FORECAST_COLUMNS}
+    }
+
+    product_columns_config = numeric_column_config(
+        decimals={'Délai théorique': 1, 'Délai réel': 1, 'Écart de délai': 1, **{col: 1 for col in FORECAST_COLUMNS}}
+    )
+
     product_tabs = st.tabs(["📈 Produits Performants (Écart ≤ 0)", "📉 Produits à Améliorer (Écart > 0)"])
 
     with product_tabs[0]:
@@ -830,44 +583,25 @@ def part_three(df, year, month, vendor_search):
         # Formater les données pour l'affichage
         display_good_products = good_products[product_display_cols].copy()
         
-        # S'assurer que les délais sont affichés avec un seul chiffre après la virgule
-        for col in ['Délai théorique', 'Délai réel', 'Écart de délai']:
-            if col in display_good_products.columns:
-                display_good_products[col] = display_good_products[col].map(lambda x: f"{x:.1f}" if pd.notnull(x) else x)
-        
         # S'assurer que les numéros de commande sont des entiers sans décimales
         if 'Bon de commande' in display_good_products.columns and display_good_products['Bon de commande'].dtype != 'object':
             display_good_products['Bon de commande'] = display_good_products['Bon de commande'].astype(int)
         
-        # Styliser le dataframe en combinant les couleurs par colonne et le gradient pour Écart
         if not display_good_products.empty:
-            styled_good_products = display_good_products.style.apply(lambda x: [
-                f'background-color: {color_palette["primary"]}30; color: {color_palette["text"]}' 
-                if col == 'Matériel' else
-                f'background-color: {color_palette["tertiary"]}30; color: {color_palette["text"]}' 
-                if col == 'Description du matériel' else
-                f'background-color: {color_palette["quaternary"]}30; color: {color_palette["text"]}' 
-                if col == 'Bon de commande' else
-                f'background-color: {color_palette["neutral"]}30; color: {color_palette["text"]}' 
-                if col == 'Délai théorique' else
-                f'background-color: {color_palette["tertiary"]}30; color: {color_palette["text"]}' 
-                if col == 'Délai réel' else
-                f'background-color: {color_palette["positive"]}30; font-weight: bold; color: {color_palette["text"]}' 
-                if col == 'Écart de délai' else
-                f'background-color: {color_palette["positive" if x["Statut de livraison"] == "En avance" else "neutral" if x["Statut de livraison"] == "À temps" else "negative"]}30; font-weight: bold; color: {color_palette["text"]}'
-                for col in display_good_products.columns
-            ], axis=1)
-            
-            # Ajouter le gradient sur la colonne Écart
-            numeric_good_products = good_products[product_display_cols].copy()
-            styled_good_products = styled_good_products.background_gradient(
-                subset=['Écart de délai'], 
-                cmap="RdYlGn_r",
-                vmin=numeric_good_products['Écart de délai'].min(),
-                vmax=0
+            # Tableau paginé : couleurs calculées sur la liste complète, seule la page visible est envoyée
+            paged_table(
+                display_good_products,
+                key="produits_performants_mois",
+                column_styles=product_column_styles,
+                row_styles={
+                    'Statut de livraison': delivery_status_styles(display_good_products['Statut de livraison']),
+                    'Écart de délai': gradient_styles(display_good_products['Écart de délai'], cmap="RdYlGn_r", vmin=display_good_products['Écart de délai'].min(), vmax=0)
+                },
+                column_config=product_columns_config,
+                search_columns=["Matériel", "Description du matériel", "Bon de commande"],
+                filter_columns=["Statut de livraison"],
+                file_name="produits_performants_mois.csv"
             )
-            
-            st.dataframe(styled_good_products, use_container_width=True, hide_index=True)
         else:
             st.info("Aucun produit avec un écart favorable trouvé dans cette période.")
 
@@ -881,43 +615,24 @@ def part_three(df, year, month, vendor_search):
         # Formater les données pour l'affichage
         display_bad_products = bad_products[product_display_cols].copy()
         
-        # S'assurer que les délais sont affichés avec un seul chiffre après la virgule
-        for col in ['Délai théorique', 'Délai réel', 'Écart de délai']:
-            if col in display_bad_products.columns:
-                display_bad_products[col] = display_bad_products[col].map(lambda x: f"{x:.1f}" if pd.notnull(x) else x)
-        
         # S'assurer que les numéros de commande sont des entiers sans décimales
         if 'Bon de commande' in display_bad_products.columns and display_bad_products['Bon de commande'].dtype != 'object':
             display_bad_products['Bon de commande'] = display_bad_products['Bon de commande'].astype(int)
         
-        # Styliser le dataframe en combinant les couleurs par colonne et le gradient pour Écart
         if not display_bad_products.empty:
-            styled_bad_products = display_bad_products.style.apply(lambda x: [
-                f'background-color: {color_palette["primary"]}30; color: {color_palette["text"]}' 
-                if col == 'Matériel' else
-                f'background-color: {color_palette["tertiary"]}30; color: {color_palette["text"]}' 
-                if col == 'Description du matériel' else
-                f'background-color: {color_palette["quaternary"]}30; color: {color_palette["text"]}' 
-                if col == 'Bon de commande' else
-                f'background-color: {color_palette["neutral"]}30; color: {color_palette["text"]}' 
-                if col == 'Délai théorique' else
-                f'background-color: {color_palette["tertiary"]}30; color: {color_palette["text"]}' 
-                if col == 'Délai réel' else
-                f'background-color: {color_palette["negative"]}30; font-weight: bold; color: {color_palette["text"]}' 
-                if col == 'Écart de délai' else
-                f'background-color: {color_palette["positive" if x["Statut de livraison"] == "En avance" else "neutral" if x["Statut de livraison"] == "À temps" else "negative"]}30; font-weight: bold; color: {color_palette["text"]}'
-                for col in display_bad_products.columns
-            ], axis=1)
-            
-            # Ajouter le gradient sur la colonne Écart
-            numeric_bad_products = bad_products[product_display_cols].copy()
-            styled_bad_products = styled_bad_products.background_gradient(
-                subset=['Écart de délai'], 
-                cmap="RdYlGn_r",
-                vmin=0,
-                vmax=numeric_bad_products['Écart de délai'].max()
+            # Tableau paginé : couleurs calculées sur la liste complète, seule la page visible est envoyée
+            paged_table(
+                display_bad_products,
+                key="produits_a_ameliorer_mois",
+                column_styles=product_column_styles,
+                row_styles={
+                    'Statut de livraison': delivery_status_styles(display_bad_products['Statut de livraison']),
+                    'Écart de délai': gradient_styles(display_bad_products['Écart de délai'], cmap="RdYlGn_r", vmin=0, vmax=display_bad_products['Écart de délai'].max())
+                },
+                column_config=product_columns_config,
+                search_columns=["Matériel", "Description du matériel", "Bon de commande"],
+                filter_columns=["Statut de livraison"],
+                file_name="produits_a_ameliorer_mois.csv"
             )
-            
-            st.dataframe(styled_bad_products, use_container_width=True, hide_index=True)
         else:
             st.info("Aucun produit avec un écart défavorable trouvé dans cette période.")
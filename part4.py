@@ -1,8 +1,10 @@
+import numpy as np
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 import streamlit as st
 from datetime import datetime
+from format1 import *
+from table1 import *
+from forecast1 import *
 
 def part_four(df, selected_supplier):
     """
@@ -107,28 +109,16 @@ def part_four(df, selected_supplier):
     </div>
     """, unsafe_allow_html=True)
     
-    # Appliquer des styles personnalisés pour le tableau - MODIFIÉ: couleurs différentes par colonne
-    def color_yearly_summary(val, col_name):
-        if isinstance(val, int):
-            if col_name == 'Année':
-                return f'background-color: {color_palette["quaternary"]}30;'
-            elif col_name == 'Nombre de commandes':
-                return f'background-color: {color_palette["primary"]}30;'
-            elif col_name == 'Nombre de références':
-                return f'background-color: {color_palette["secondary"]}30;'
-            elif col_name == 'Nombre de lignes':
-                return f'background-color: {color_palette["tertiary"]}30;'
-        return ''
-    
-    # Appliquer les styles pour chaque colonne avec des couleurs différentes
-    styled_yearly_summary = yearly_summary.style\
-        .map(lambda x: color_yearly_summary(x, 'Année'), subset=['Année'])\
-        .map(lambda x: color_yearly_summary(x, 'Nombre de commandes'), subset=['Nombre de commandes'])\
-        .map(lambda x: color_yearly_summary(x, 'Nombre de références'), subset=['Nombre de références'])\
-        .map(lambda x: color_yearly_summary(x, 'Nombre de lignes'), subset=['Nombre de lignes'])
+    # Couleurs différentes par colonne, calculées une seule fois pour tout le tableau
+    yearly_summary_styles = {
+        'Année': f'background-color: {color_palette["quaternary"]}30;',
+        'Nombre de commandes': f'background-color: {color_palette["primary"]}30;',
+        'Nombre de références': f'background-color: {color_palette["secondary"]}30;',
+        'Nombre de lignes': f'background-color: {color_palette["tertiary"]}30;'
+    }
     
     # Afficher le tableau sans l'index
-    st.dataframe(styled_yearly_summary, use_container_width=True, hide_index=True)
+    render_table(yearly_summary, column_styles=yearly_summary_styles)
     
     # --- SECTION AJOUTÉE 2: Délais moyens par Année ---
     st.markdown(f"""
@@ -177,35 +167,27 @@ def part_four(df, selected_supplier):
     </div>
     """, unsafe_allow_html=True)
     
-    # Appliquer des styles personnalisés pour le tableau des commandes
-    def color_delays(val, col_name):
-        if isinstance(val, (int, float)):
-            if col_name == 'Année':
-                return f'background-color: {color_palette["quaternary"]}30;'
-            elif col_name == 'Écart moyen' and val > 0:
-                return f'background-color: {color_palette["negative"]}30;'
-            elif col_name == 'Écart moyen' and val < 0:
-                return f'background-color: {color_palette["positive"]}30;'
-            elif col_name == 'Délai théorique':
-                return f'background-color: {color_palette["secondary"]}30;'
-            elif col_name == 'Délai réel':
-                return f'background-color: {color_palette["tertiary"]}30;'
-        return ''
-    
-    # Appliquer les styles pour le tableau des commandes
-    styled_order_delays = yearly_order_delays.style\
-        .map(lambda x: color_delays(x, 'Année'), subset=['Année'])\
-        .map(lambda x: color_delays(x, 'Délai théorique'), subset=['Délai théorique'])\
-        .map(lambda x: color_delays(x, 'Délai réel'), subset=['Délai réel'])\
-        .map(lambda x: color_delays(x, 'Écart moyen'), subset=['Écart moyen'])\
-        .format({
-            'Délai théorique': '{:.1f}',
-            'Délai réel': '{:.1f}',
-            'Écart moyen': '{:.1f}'
-        })
+    # Couleurs fixes par colonne et couleur de l'écart selon son signe (calculée en bloc)
+    delays_column_styles = {
+        'Année': f'background-color: {color_palette["quaternary"]}30;',
+        'Délai théorique': f'background-color: {color_palette["secondary"]}30;',
+        'Délai réel': f'background-color: {color_palette["tertiary"]}30;'
+    }
+    delays_columns_config = numeric_column_config(decimals={'Délai théorique': 1, 'Délai réel': 1, 'Écart moyen': 1})
+    
+    def ecart_styles(ecarts):
+        return conditional_styles(
+            [ecarts > 0, ecarts < 0],
+            [f'background-color: {color_palette["negative"]}30;', f'background-color: {color_palette["positive"]}30;']
+        )
     
     # Afficher le tableau des commandes sans l'index
-    st.dataframe(styled_order_delays, use_container_width=True, hide_index=True)
+    render_table(
+        yearly_order_delays,
+        column_styles=delays_column_styles,
+        row_styles={'Écart moyen': ecart_styles(yearly_order_delays['Écart moyen'])},
+        column_config=delays_columns_config
+    )
     
     # Créer un tableau stylisé pour les délais des produits
     st.markdown(f"""
@@ -214,20 +196,13 @@ def part_four(df, selected_supplier):
     </div>
     """, unsafe_allow_html=True)
     
-    # Appliquer les styles pour le tableau des produits
-    styled_product_delays = yearly_product_delays.style\
-        .map(lambda x: color_delays(x, 'Année'), subset=['Année'])\
-        .map(lambda x: color_delays(x, 'Délai théorique'), subset=['Délai théorique'])\
-        .map(lambda x: color_delays(x, 'Délai réel'), subset=['Délai réel'])\
-        .map(lambda x: color_delays(x, 'Écart moyen'), subset=['Écart moyen'])\
-        .format({
-            'Délai théorique': '{:.1f}',
-            'Délai réel': '{:.1f}',
-            'Écart moyen': '{:.1f}'
-        })
-    
     # Afficher le tableau des produits sans l'index
-    st.dataframe(styled_product_delays, use_container_width=True, hide_index=True)
+    render_table(
+        yearly_product_delays,
+        column_styles=delays_column_styles,
+        row_styles={'Écart moyen': ecart_styles(yearly_product_delays['Écart moyen'])},
+        column_config=delays_columns_config
+    )
     
  
     # --- SECTION AJOUTÉE 4: Produits toujours en retard ---
@@ -326,6 +301,11 @@ def part_four(df, selected_supplier):
                 # Exclure les colonnes déjà dans final_table
                 cols_to_use = [col for col in pivot_data.columns if col not in final_table.columns]
                 final_table = pd.concat([final_table, pivot_data[cols_to_use]], axis=1)
+
+        # Délai prévu de la prochaine livraison de chaque produit (paires du fournisseur sélectionné)
+        previsions = forecast_lead_times(df)
+        previsions = previsions[previsions['Fournisseur'].isin(supplier_data['Fournisseur'].unique())]
+        final_table = add_forecast_columns(final_table, previsions)
         
         # Créer un tableau stylisé
         st.markdown(f"""
@@ -334,35 +314,10 @@ def part_four(df, selected_supplier):
         </div>
         """, unsafe_allow_html=True)
         
-        # Définir une fonction pour appliquer le dégradé à l'écart moyen global
-        def color_ecart_progressif(val):
-            if isinstance(val, (int, float)) and not pd.isna(val):
-                if val > 0:
-                    # Utiliser un dégradé plus sophistiqué pour l'écart
-                    normalized_val = min(30, val) / 30
-                    r = int(255 - (normalized_val * 50))
-                    g = int(100 - (normalized_val * 70))
-                    b = int(100 - (normalized_val * 70))
-                    return f'background-color: rgb({r}, {g}, {b});'
-                return ''
-            return 'background-color: #FFB74D;'  # Orange pour None/NA
-        
-        # Fonction pour colorer toutes les cellules None en orange
-        def color_none_cells(val):
-            if pd.isna(val):
-                return 'background-color: #FFB74D;'  # Orange pour None/NA
-            return ''
-        
-        # Formatter les colonnes et appliquer les styles
-        styled_final_table = final_table.style
-        
-        # Format pour nombre avec 1 décimale
-        format_dict = {}
-        for col in final_table.columns:
-            if any(term in str(col) for term in ['Délai', 'Écart']):
-                format_dict[col] = '{:.1f}'
-        
-        styled_final_table = styled_final_table.format(format_dict)
+        # Format pour nombre avec 1 décimale (côté navigateur)
+        final_columns_config = numeric_column_config(
+            decimals={col: 1 for col in final_table.columns if any(term in str(col) for term in ['Délai', 'Écart', 'Prévision'])}
+        )
         
         # Définir des couleurs sophistiquées pour chaque type de colonne
         materiel_color = 'background-color: #1A237E40;'  # Bleu indigo profond avec transparence
@@ -372,52 +327,48 @@ def part_four(df, selected_supplier):
         delai_reel_color = 'background-color: #00796B40;'  # Vert teal avec transparence
         ecart_annuel_color = 'background-color: #3E272340;'  # Marron foncé avec transparence
         nombre_annees_color = 'background-color: #5D403740;'  # Marron avec transparence
+        prevision_color = 'background-color: #EC489920;'  # Rose (prévisions)
+        none_color = 'background-color: #FFB74D;'  # Orange pour None/NA
         
-        # Appliquer des couleurs fixes à toutes les colonnes et gérer les None
-        def style_all_columns(df):
-            styles = pd.DataFrame('', index=df.index, columns=df.columns)
-            
-            for col in df.columns:
-                if col == 'Matériel':
-                    styles[col] = materiel_color
-                elif col == 'Description du matériel':
-                    styles[col] = description_color
-                elif col == 'Matériel du fournisseur':
-                    styles[col] = fournisseur_color
-                elif 'Délai théorique' in str(col):
-                    styles[col] = delai_theorique_color
-                elif 'Délai réel' in str(col):
-                    styles[col] = delai_reel_color
-                elif 'Écart annuel' in str(col):
-                    styles[col] = ecart_annuel_color
-                elif 'Nombre d\'années' in str(col):
-                    styles[col] = nombre_annees_color
-            
-            return styles
-        
-        # Appliquer toutes les couleurs de base
-        styled_final_table = styled_final_table.apply(style_all_columns, axis=None)
+        # Couleurs fixes par colonne, calculées une seule fois
+        final_column_styles = {}
+        for col in final_table.columns:
+            if col == 'Matériel':
+                final_column_styles[col] = materiel_color
+            elif col == 'Description du matériel':
+                final_column_styles[col] = description_color
+            elif col == 'Matériel du fournisseur':
+                final_column_styles[col] = fournisseur_color
+            elif 'Délai théorique' in str(col):
+                final_column_styles[col] = delai_theorique_color
+            elif 'Délai réel' in str(col):
+                final_column_styles[col] = delai_reel_color
+            elif 'Écart annuel' in str(col):
+                final_column_styles[col] = ecart_annuel_color
+            elif 'Nombre d\'années' in str(col):
+                final_column_styles[col] = nombre_annees_color
+            elif col in FORECAST_COLUMNS:
+                final_column_styles[col] = prevision_color
         
-        # Appliquer le dégradé pour l'écart moyen global
-        styled_final_table = styled_final_table.background_gradient(
-            subset=['Écart moyen global'], 
+        # Cellules vides en orange (en bloc, colonne par colonne) et dégradé sur l'écart moyen global
+        final_row_styles = {
+            col: np.where(final_table[col].isna().to_numpy(), none_color, '')
+            for col in final_table.columns if final_table[col].isna().any()
+        }
+        final_row_styles['Écart moyen global'] = gradient_styles(
+            final_table['Écart moyen global'],
             cmap="RdYlGn_r",
             vmin=0,
             vmax=final_table['Écart moyen global'].max()
         )
         
-        # Colorer toutes les cellules None en orange
-        for col in final_table.columns:
-            styled_final_table = styled_final_table.map(
-                lambda x: 'background-color: #FFB74D;' if pd.isna(x) else '', 
-                subset=[col]
-            )
-        
-        # Propriétés supplémentaires pour l'alignement et l'apparence
-        styled_final_table = styled_final_table.set_properties(**{'text-align': 'center'})
-        
         # Afficher le tableau sans l'index
-        st.dataframe(styled_final_table, use_container_width=True, hide_index=True)
+        render_table(
+            final_table,
+            column_styles=final_column_styles,
+            row_styles=final_row_styles,
+            column_config=final_columns_config
+        )
     else:
         st.warning("Aucun produit n'a été systématiquement en retard chaque année.")
 
@@ -471,29 +422,16 @@ def part_four(df, selected_supplier):
         'Long délai': color_palette["negative"]
     }
 
-    # Fonction pour colorer les cellules
-    def color_cells(val, col_name):
-        if col_name == 'Année':
-            return f'background-color: {color_palette["quaternary"]}30;'
-        for status, color in status_colors.items():
-            if col_name == status:
-                return f'background-color: {color}30;'
-        return ''
-
-    # Appliquer les styles pour chaque colonne
-    styled_order_status = order_status_display.style
-    for col in order_status_display.columns:
-        styled_order_status = styled_order_status.map(
-            lambda x: color_cells(x, col), 
-            subset=[col]
-        )
-
-    # Formater pour afficher avec un signe de pourcentage
-    format_dict = {col: '{:.1f}%' for col in order_status_display.columns if col != 'Année'}
-    styled_order_status = styled_order_status.format(format_dict)
-
+    # Couleurs par colonne, calculées une seule fois
+    status_column_styles = {'Année': f'background-color: {color_palette["quaternary"]}30;'}
+    for status, color in status_colors.items():
+        status_column_styles[status] = f'background-color: {color}30;'
+    
+    # Formater pour afficher avec un signe de pourcentage (côté navigateur)
+    status_columns_config = numeric_column_config(percent=list(status_colors.keys()), years=['Année'])
+    
     # Afficher le tableau des statuts de commande sans l'index
-    st.dataframe(styled_order_status, use_container_width=True, hide_index=True)
+    render_table(order_status_display, column_styles=status_column_styles, column_config=status_columns_config)
 
     # Pour les produits individuels
     st.markdown(f"""
@@ -532,17 +470,5 @@ def part_four(df, selected_supplier):
     # Renommer la colonne 'Year' en 'Année'
     product_status_display = product_status_display.rename(columns={'Year': 'Année'})
 
-    # Appliquer les styles pour chaque colonne
-    styled_product_status = product_status_display.style
-    for col in product_status_display.columns:
-        styled_product_status = styled_product_status.map(
-            lambda x: color_cells(x, col), 
-            subset=[col]
-        )
-
-    # Formater pour afficher avec un signe de pourcentage
-    format_dict = {col: '{:.1f}%' for col in product_status_display.columns if col != 'Année'}
-    styled_product_status = styled_product_status.format(format_dict)
-
     # Afficher le tableau des statuts de produit sans l'index
-    st.dataframe(styled_product_status, use_container_width=True, hide_index=True)
+    render_table(product_status_display, column_styles=status_column_styles, column_config=status_columns_config)
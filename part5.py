@@ -2,6 +2,12 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import streamlit as st
+from format1 import *
+from table1 import *
+from chart1 import *
+from locale1 import *
+from compare1 import *
+from period1 import *
 from datetime import datetime
 
 def part_five(df, year, vendor_search):
@@ -65,18 +71,18 @@ def part_five(df, year, vendor_search):
     mask_prev = (supplier_data['Year'] == prev_year)
     prev_data = supplier_data[mask_prev].copy()'''
 
-    # Filtrer par année ET mois sélectionnés (remplacer le filtrage existant)
-    mask_current = (supplier_data['Year'] == year) & (supplier_data['Month'].isin(st.session_state.selected_months))
-    current_data = supplier_data[mask_current].copy()
+    # Période sélectionnée et références de comparaison
+    period = current_period(year)
+    baselines = select_baselines()
+    current_data, = period_slices(supplier_data, 'Date de comptabilisation', period)
+    current_data = current_data.copy()
 
     if current_data.empty:
-        st.warning(f"Aucune donnée disponible pour {supplier_name} en {year} pour les mois sélectionnés")
+        st.warning(f"Aucune donnée disponible pour {supplier_name} sur la période {period['label']}")
         return
 
-    # Pour la période de comparaison, utiliser les mêmes mois mais de l'année précédente
-    prev_year = year - 1
-    mask_prev = (supplier_data['Year'] == prev_year) & (supplier_data['Month'].isin(st.session_state.selected_months))
-    prev_data = supplier_data[mask_prev].copy()
+    # Indicateurs de la période et de toutes ses références, calculés en une seule passe groupée
+    comparaison = delay_comparison(supplier_data, period, baselines)
         
 
 
@@ -84,7 +90,7 @@ def part_five(df, year, vendor_search):
     st.markdown(f"""
     <div style="background-color:{color_palette['primary']}; padding: 10px; border-radius: 10px;">
         <h4 style="color: white; text-align: center;">Analyse annuelle du fournisseur: {supplier_name} (ID: {supplier_id})</h4>
-        <h5 style="color: white; text-align: center;">Année {year}</h5>
+        <h5 style="color: white; text-align: center;">Période : {period['label']}</h5>
     </div>
     """, unsafe_allow_html=True)
     
@@ -97,17 +103,6 @@ def part_five(df, year, vendor_search):
         'Date de comptabilisation': 'first',  # Date de la commande
     }).reset_index()
     
-    # Faire la même chose pour l'année précédente
-    if not prev_data.empty:
-        prev_orders = prev_data.groupby('Bon de commande').agg({
-            'Délai théorique': 'max',
-            'Délai réel': 'max',
-            'Matériel': 'nunique',  # Nombre de produits uniques par commande
-            'Date de comptabilisation': 'first',  # Date de la commande
-        }).reset_index()
-    else:
-        prev_orders = pd.DataFrame()
-    
     # Convertir les colonnes numériques en types appropriés
     current_orders['Bon de commande'] = current_orders['Bon de commande'].astype(str).str.replace('\.0$', '', regex=True)
     
@@ -288,183 +283,37 @@ def part_five(df, year, vendor_search):
         </div>
         """, unsafe_allow_html=True)
 
-    # --- SECTION 3: COMPARAISON AVEC L'ANNÉE PRÉCÉDENTE ---
+    # --- SECTION 3: COMPARAISON AVEC LES PÉRIODES DE RÉFÉRENCE ---
     st.markdown(f"""
     <div style="background-color:{color_palette['primary']}; padding: 8px; border-radius: 8px; margin-top: 25px;">
-        <h5 style="color: white; text-align: center; margin: 0;">Comparaison avec l'Année {prev_year}</h5>
+        <h5 style="color: white; text-align: center; margin: 0;">Comparaison avec {', '.join(baseline_label(period, b) for b in baselines)}</h5>
     </div>
     """, unsafe_allow_html=True)
 
-    if not prev_data.empty:
-        # Calcul des indicateurs clés pour l'année précédente
-        prev_total_orders = len(prev_orders)
-        prev_total_products = prev_data['Matériel'].nunique()
-        prev_total_products_count = len(prev_data)
-        
-        # Calcul de l'évolution (pourcentage)
-        order_change = round(((total_orders - prev_total_orders) / prev_total_orders * 100), 1) if prev_total_orders > 0 else 100
-        product_change = round(((total_products - prev_total_products) / prev_total_products * 100), 1) if prev_total_products > 0 else 100
-        product_count_change = round(((total_products_count - prev_total_products_count) / prev_total_products_count * 100), 1) if prev_total_products_count > 0 else 100
-        
-        # Affichage des évolutions en 3 colonnes
+    for baseline in baselines:
+        reference_label = baseline_label(period, baseline)
+        if not has_baseline_data(comparaison["volumes"], baseline, "Lignes"):
+            st.info(f"Aucune donnée disponible pour {reference_label} pour comparaison")
+            continue
+
+        # Évolution des volumes (nombre de commandes, de références et de lignes)
+        render_volume_changes(
+            comparaison["volumes"],
+            baseline,
+            [("Commandes", "Commandes", format_count),
+             ("Références", "Produits uniques", format_count),
+             ("Lignes", "Total produits commandés", format_count)],
+            color_palette,
+            title=f"Évolution des volumes par rapport à {reference_label}:"
+        )
+
+        # Évolution des délais moyens par commande et par produit
         st.markdown(f"""
         <div style="background-color:{color_palette['background']}; padding: 10px; border-radius: 8px; margin-top: 15px;">
-            <h4 style="color:{color_palette['text']};">Évolution des volumes par rapport à l'année {prev_year}:</h4>
+            <h4 style="color:{color_palette['text']};">Évolution des délais par rapport à {reference_label}:</h4>
         </div>
         """, unsafe_allow_html=True)
-        
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            change_color = color_palette['positive'] if order_change >= 0 else color_palette['negative']
-            st.markdown(f"""
-            <div style="padding:10px; border-radius:5px; text-align:center;">
-                <p style="margin:0;">Nombre de commandes: {prev_total_orders} → {total_orders}</p>
-                <h5 style="color:{change_color}; margin:5px 0 0 0;">{order_change:+.1f}%</h5>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        with col2:
-            change_color = color_palette['positive'] if product_change >= 0 else color_palette['negative']
-            st.markdown(f"""
-            <div style="padding:10px; border-radius:5px; text-align:center;">
-                <p style="margin:0;">Nombre de références: {prev_total_products} → {total_products}</p>
-                <h5 style="color:{change_color}; margin:5px 0 0 0;">{product_change:+.1f}%</h5>
-            </div>
-            """, unsafe_allow_html=True)
-            
-        with col3:
-            change_color = color_palette['positive'] if product_count_change >= 0 else color_palette['negative']
-            st.markdown(f"""
-            <div style="padding:10px; border-radius:5px; text-align:center;">
-                <p style="margin:0;">Nombre de lignes: {prev_total_products_count} → {total_products_count}</p>
-                <h5 style="color:{change_color}; margin:5px 0 0 0;">{product_count_change:+.1f}%</h5>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        # Calcul des délais moyens pour les commandes de l'année précédente
-        if not prev_orders.empty:
-            prev_orders['Écart_commande (jours)'] = (prev_orders['Délai réel'] - prev_orders['Délai théorique']).round(1)
-            
-            prev_order_delay_means = {
-                'Théorique': prev_orders['Délai théorique'].mean().round(1),
-                'Réel': prev_orders['Délai réel'].mean().round(1),
-                'Écart': prev_orders['Écart_commande (jours)'].mean().round(1)
-            }
-            
-            # Calcul des délais moyens pour les produits de l'année précédente
-            prev_data['Écart de délai'] = (prev_data['Délai réel'] - prev_data['Délai théorique']).round(1)
-            
-            prev_product_delay_means = {
-                'Théorique': prev_data['Délai théorique'].mean().round(1),
-                'Réel': prev_data['Délai réel'].mean().round(1),
-                'Écart': prev_data['Écart de délai'].mean().round(1)
-            }
-            
-            # Évolution des délais
-            st.markdown(f"""
-            <div style="background-color:{color_palette['background']}; padding: 10px; border-radius: 8px; margin-top: 15px;">
-                <h4 style="color:{color_palette['text']};">Évolution des délais par rapport à l'année {prev_year}:</h4>
-            </div>
-            """, unsafe_allow_html=True)
-
-            # Création de tableaux pour l'évolution des délais
-            tab1, tab2 = st.tabs(["Délais par commande", "Délais par produit"])
-
-            # Onglet Délais par commande
-            with tab1:
-                # Préparation des données pour le tableau d'évolution des commandes
-                order_evolution = pd.DataFrame({
-                    'Type': ['Théorique', 'Réel', 'Écart'],
-                    f'Actuel ({year})': [
-                        round(order_delay_means['Théorique'], 1), 
-                        round(order_delay_means['Réel'], 1), 
-                        round(order_delay_means['Écart'], 1)
-                    ],
-                    f'Précédent ({prev_year})': [
-                        round(prev_order_delay_means['Théorique'], 1), 
-                        round(prev_order_delay_means['Réel'], 1), 
-                        round(prev_order_delay_means['Écart'], 1)
-                    ],
-                    'Évolution (jours)': [
-                        round(order_delay_means['Théorique'] - prev_order_delay_means['Théorique'], 1),
-                        round(order_delay_means['Réel'] - prev_order_delay_means['Réel'], 1),
-                        round(order_delay_means['Écart'] - prev_order_delay_means['Écart'], 1)
-                    ]
-                })
-                
-                # Fonction pour styliser l'évolution
-                def highlight_evolution(val):
-                    if isinstance(val, (int, float)):
-                        if val < 0:
-                            # Pour l'écart, négatif est mieux (donc vert)
-                            return f'background-color: {color_palette["positive"]}; color: white'
-                        elif val > 0:
-                            # Pour l'écart, positif est pire (donc rouge)
-                            return f'background-color: {color_palette["negative"]}; color: white'
-                    return ''
-                
-                # Fonction pour colorer les colonnes
-                def highlight_columns_order(x):
-                    df_styler = pd.DataFrame('', index=x.index, columns=x.columns)
-                    df_styler['Type'] = 'background-color: #f5f5f5'
-                    df_styler[f'Actuel ({year})'] = f'background-color: {color_palette["primary"]}; color: white'
-                    df_styler[f'Précédent ({prev_year})'] = f'background-color: {color_palette["secondary"]}; color: white'
-                    df_styler['Évolution (jours)'] = 'background-color: #e1f5fe'
-                    return df_styler
-                
-                # Appliquer le style au DataFrame
-                styled_order_evolution = order_evolution.style.apply(
-                    highlight_columns_order, axis=None
-                ).map(
-                    highlight_evolution, subset=['Évolution (jours)']
-                ).format({
-                    f'Actuel ({year})': '{:.1f}',
-                    f'Précédent ({prev_year})': '{:.1f}',
-                    'Évolution (jours)': '{:.1f}'
-                })
-                
-                # Afficher le tableau
-                st.dataframe(styled_order_evolution, use_container_width=True, hide_index=True)
-
-            # Onglet Délais par produit
-            with tab2:
-                # Préparation des données pour le tableau d'évolution des produits
-                product_evolution = pd.DataFrame({
-                    'Type': ['Théorique', 'Réel', 'Écart'],
-                    f'Actuel ({year})': [
-                        round(product_delay_means['Théorique'], 1), 
-                        round(product_delay_means['Réel'], 1), 
-                        round(product_delay_means['Écart'], 1)
-                    ],
-                    f'Précédent ({prev_year})': [
-                        round(prev_product_delay_means['Théorique'], 1), 
-                        round(prev_product_delay_means['Réel'], 1), 
-                        round(prev_product_delay_means['Écart'], 1)
-                    ],
-                    'Évolution (jours)': [
-                        round(product_delay_means['Théorique'] - prev_product_delay_means['Théorique'], 1),
-                        round(product_delay_means['Réel'] - prev_product_delay_means['Réel'], 1),
-                        round(product_delay_means['Écart'] - prev_product_delay_means['Écart'], 1)
-                    ]
-                })
-                
-                # Appliquer le style au DataFrame
-                styled_product_evolution = product_evolution.style.apply(
-                    highlight_columns_order, axis=None
-                ).map(
-                    highlight_evolution, subset=['Évolution (jours)']
-                ).format({
-                    f'Actuel ({year})': '{:.1f}',
-                    f'Précédent ({prev_year})': '{:.1f}',
-                    'Évolution (jours)': '{:.1f}'
-                })
-                
-                # Afficher le tableau
-                st.dataframe(styled_product_evolution, use_container_width=True, hide_index=True)
-
-    else:
-        st.info(f"Aucune donnée disponible pour l'année {prev_year} pour comparaison")
+        render_delay_changes(comparaison, baseline, period['label'], reference_label, color_palette)
     
     # --- SECTION 4: RÉPARTITION DES STATUTS DE LIVRAISON ---
     st.markdown(f"""
@@ -482,82 +331,39 @@ def part_five(df, year, vendor_search):
     col1, col2 = st.columns(2)
 
     with col1:
-        # Graphique circulaire pour les pourcentages actuels
-        fig_pie = px.pie(
-            status_counts,
-            names='Statut livraison',
-            values='count',
-            color='Statut livraison',
-            color_discrete_map=delivery_status_colors,
-            title=f"Répartition des commandes en {year}",
-            labels={'Statut livraison': 'Statut de livraison', 'count': 'Nombre de commandes'},
-            hole=0.4
-        )
+        def build_orders_pie(status_counts, year):
+            # Graphique circulaire pour les pourcentages actuels
+            fig_pie = px.pie(
+                status_counts,
+                names='Statut livraison',
+                values='count',
+                color='Statut livraison',
+                color_discrete_map=delivery_status_colors,
+                title=f"Répartition des commandes en {year}",
+                labels={'Statut livraison': 'Statut de livraison', 'count': 'Nombre de commandes'},
+                hole=0.4
+            )
         
-        fig_pie.update_traces(textposition='inside', textinfo='percent+label')
-        fig_pie.update_layout(
-            title_font_size=16,
-            title_font_color=color_palette['text'],
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)'
-        )
-        st.plotly_chart(fig_pie, use_container_width=True)
-
-    with col2:
-        # Comparaison avec l'année précédente si des données sont disponibles
-        if not prev_orders.empty:
-            prev_orders['Statut livraison'] = prev_orders.apply(categorize_delay, axis=1)
-            prev_status_counts = prev_orders['Statut livraison'].value_counts().reset_index()
-            prev_status_counts.columns = ['Statut livraison', 'count']
-            prev_total_orders = len(prev_orders)
-            prev_status_counts['percentage'] = (prev_status_counts['count'] / prev_total_orders * 100).round(1)
-            
-            # Préparation des données de comparaison           
-            
-            comparison_data = []
+            fig_pie.update_traces(textposition='inside', textinfo='percent+label')
+            fig_pie.update_layout(
+                title_font_size=16,
+                title_font_color=color_palette['text'],
+                plot_bgcolor='rgba(0,0,0,0)',
+                paper_bgcolor='rgba(0,0,0,0)'
+            )
+            return fig_pie
 
-            # Créons des dictionnaires pour faciliter l'accès aux pourcentages
-            current_pct_dict = dict(zip(status_counts['Statut livraison'], status_counts['percentage']))
-            prev_pct_dict = dict(zip(prev_status_counts['Statut livraison'], prev_status_counts['percentage']))
+        # Afficher le graphique (reconstruit uniquement si ses données changent)
+        st.plotly_chart(cached_figure(build_orders_pie, status_counts, year), use_container_width=True)
 
-            for status in ['En avance', 'À temps', 'Retard accepté', 'Long délai']:
-                # Obtenez les pourcentages de manière plus fiable
-                current_pct = current_pct_dict.get(status, 0)
-                prev_pct = prev_pct_dict.get(status, 0)
-                evolution = current_pct - prev_pct
-                
-                # Déterminer la couleur de l'évolution
-                if status == 'Retard accepté' or status == 'Long délai':
-                    evolution_color = color_palette['negative'] if evolution > 0 else color_palette['positive']
-                else:
-                    evolution_color = color_palette['positive'] if evolution > 0 else color_palette['negative']
-                
-                comparison_data.append({
-                    'Statut': status,
-                    f'% {prev_year}': f"{prev_pct:.1f}%",
-                    'Évolution': f"{evolution:+.1f}%",
-                    'color': evolution_color
-                })
-                        
-            comparison_df = pd.DataFrame(comparison_data)
-            
-            st.markdown(f"""
-            <div style="background-color:{color_palette['background']}; padding: 10px; border-radius: 8px;">
-                <h4 style="color:{color_palette['text']};">Comparaison avec l'année {prev_year}:</h4>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            # Afficher le tableau avec des couleurs personnalisées
-            for i, row in comparison_df.iterrows():
-                col1, col2, col3 = st.columns([2.5, 1.5, 1.5])
-                with col1:
-                    st.markdown(f"<div style='font-weight:bold;'>{row['Statut']}</div>", unsafe_allow_html=True)
-                with col2:
-                    st.markdown(f"{row[f'% {prev_year}']}", unsafe_allow_html=True)
-                with col3:
-                    st.markdown(f"<div style='color:{row['color']};font-weight:bold;'>{row['Évolution']}</div>", unsafe_allow_html=True)
-        else:
-            st.info(f"Aucune donnée disponible pour l'année {prev_year}")
+    with col2:
+        # Comparaison avec chaque référence, à partir des parts calculées en une passe
+        for baseline in baselines:
+            reference_label = baseline_label(period, baseline)
+            if has_baseline_data(comparaison["commandes"], baseline, "Commandes"):
+                render_status_changes(comparaison["commandes"], baseline, reference_label, color_palette)
+            else:
+                st.info(f"Aucune donnée disponible pour {reference_label}")
 
     st.markdown("""<hr style="width:30%; margin:auto; border:1px solid gray;">""",unsafe_allow_html=True)
 
@@ -571,81 +377,39 @@ def part_five(df, year, vendor_search):
     col1, col2 = st.columns(2)
 
     with col1:
-        # Graphique circulaire pour les pourcentages actuels des produits
-        fig_pie_products = px.pie(
-            status_counts_products,
-            names='Statut de livraison',
-            values='count',
-            color='Statut de livraison',
-            color_discrete_map=delivery_status_colors,
-            title=f"Répartition des produits en {year}",
-            labels={'Statut de livraison': 'Statut de livraison', 'count': 'Nombre de produits'},
-            hole=0.4
-        )
+        def build_products_pie(status_counts_products, year):
+            # Graphique circulaire pour les pourcentages actuels des produits
+            fig_pie_products = px.pie(
+                status_counts_products,
+                names='Statut de livraison',
+                values='count',
+                color='Statut de livraison',
+                color_discrete_map=delivery_status_colors,
+                title=f"Répartition des produits en {year}",
+                labels={'Statut de livraison': 'Statut de livraison', 'count': 'Nombre de produits'},
+                hole=0.4
+            )
         
-        fig_pie_products.update_traces(textposition='inside', textinfo='percent+label')
-        fig_pie_products.update_layout(
-            title_font_size=16,
-            title_font_color=color_palette['text'],
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)'
-        )
-        st.plotly_chart(fig_pie_products, use_container_width=True)
-
-    with col2:
-        # Comparaison avec l'année précédente si des données sont disponibles
-        if not prev_data.empty:
-            prev_data['Statut de livraison'] = prev_data.apply(categorize_delay, axis=1)
-            prev_status_counts_products = prev_data['Statut de livraison'].value_counts().reset_index()
-            prev_status_counts_products.columns = ['Statut de livraison', 'count']
-            prev_total_products_count = len(prev_data)
-            prev_status_counts_products['percentage'] = (prev_status_counts_products['count'] / prev_total_products_count * 100).round(1)
-            
-            # Préparation des données de comparaison
-            comparison_data_products = []
+            fig_pie_products.update_traces(textposition='inside', textinfo='percent+label')
+            fig_pie_products.update_layout(
+                title_font_size=16,
+                title_font_color=color_palette['text'],
+                plot_bgcolor='rgba(0,0,0,0)',
+                paper_bgcolor='rgba(0,0,0,0)'
+            )
+            return fig_pie_products
 
-            # Créons des dictionnaires pour faciliter l'accès aux pourcentages
-            current_pct_dict = dict(zip(status_counts_products['Statut de livraison'], status_counts_products['percentage']))
-            prev_pct_dict = dict(zip(prev_status_counts_products['Statut de livraison'], prev_status_counts_products['percentage']))
+        # Afficher le graphique (reconstruit uniquement si ses données changent)
+        st.plotly_chart(cached_figure(build_products_pie, status_counts_products, year), use_container_width=True)
 
-            for status in ['En avance', 'À temps', 'Retard accepté', 'Long délai']:
-                # Obtenez les pourcentages de manière plus fiable
-                current_pct = current_pct_dict.get(status, 0)
-                prev_pct = prev_pct_dict.get(status, 0)
-                evolution = current_pct - prev_pct
-                
-                # Déterminer la couleur de l'évolution
-                if status == 'Retard accepté' or status == 'Long délai':
-                    evolution_color = color_palette['negative'] if evolution > 0 else color_palette['positive']
-                else:
-                    evolution_color = color_palette['positive'] if evolution > 0 else color_palette['negative']
-                
-                comparison_data_products.append({
-                    'Statut': status,
-                    f'% {prev_year}': f"{prev_pct:.1f}%",
-                    'Évolution': f"{evolution:+.1f}%",
-                    'color': evolution_color
-                })
-            
-            comparison_df_products = pd.DataFrame(comparison_data_products)
-            
-            st.markdown(f"""
-            <div style="background-color:{color_palette['background']}; padding: 10px; border-radius: 8px;">
-                <h4 style="color:{color_palette['text']};">Comparaison avec l'année {prev_year}:</h4>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            # Afficher le tableau avec des couleurs personnalisées
-            for i, row in comparison_df_products.iterrows():
-                col1, col2, col3 = st.columns([2.5, 1.5, 1.5])
-                with col1:
-                    st.markdown(f"<div style='font-weight:bold;'>{row['Statut']}</div>", unsafe_allow_html=True)
-                with col2:
-                    st.markdown(f"{row[f'% {prev_year}']}", unsafe_allow_html=True)
-                with col3:
-                    st.markdown(f"<div style='color:{row['color']};font-weight:bold;'>{row['Évolution']}</div>", unsafe_allow_html=True)
-        else:
-            st.info(f"Aucune donnée disponible pour l'année {prev_year}")
+    with col2:
+        # Comparaison avec chaque référence, à partir des parts calculées en une passe
+        for baseline in baselines:
+            reference_label = baseline_label(period, baseline)
+            if has_baseline_data(comparaison["lignes"], baseline, "Lignes"):
+                render_status_changes(comparaison["lignes"], baseline, reference_label, color_palette)
+            else:
+                st.info(f"Aucune donnée disponible pour {reference_label}")
 
     # --- SECTION 5: TOP ET PIRES PRODUITS PAR ÉCART ---
     st.markdown(f"""
@@ -680,6 +444,30 @@ def part_five(df, year, vendor_search):
         'Délai théorique', 'Délai réel', 'Écart de délai', 'Statut de livraison'
     ]
 
+    # Couleur de la colonne de statut selon le statut de livraison (calculée en bloc pour tout le tableau)
+    def delivery_status_styles(statuts):
+        return conditional_styles(
+            [statuts == "En avance", statuts == "À temps"],
+            [
+                f'background-color: {color_palette["positive"]}30; font-weight: bold; color: {color_palette["text"]}',
+                f'background-color: {color_palette["neutral"]}30; font-weight: bold; color: {color_palette["text"]}'
+            ],
+            default=f'background-color: {color_palette["negative"]}30; font-weight: bold; color: {color_palette["text"]}'
+        )
+
+    # Couleurs par colonne des tableaux de produits, définies une seule fois
+    product_column_styles = {
+        'Matériel': f'background-color: {color_palette["primary"]}30; color: {color_palette["text"]}',
+        'Description du matériel': f'background-color: {color_palette["tertiary"]}30; color: {color_palette["text"]}',
+        'Bon de commande': f'background-color: {color_palette["quaternary"]}30; color: {color_palette["text"]}',
+        'Doc Date': f'background-color: {color_palette["neutral"]}30; color: {color_palette["text"]}',
+        'Order Qty': f'background-color: {color_palette["quaternary"]}30; color: {color_palette["text"]}',
+        'Délai théorique': f'background-color: {color_palette["background"]}; color: {color_palette["text"]}',
+        'Délai réel': f'background-color: {color_palette["tertiary"]}30; color: {color_palette["text"]}'
+    }
+
+    product_columns_config = numeric_column_config(decimals={'Order Qty': 2, 'Délai théorique': 1, 'Délai réel': 1, 'Écart de délai': 1})
+
     product_tabs = st.tabs([f"📈 Produits Performants en {year} (Écart ≤ 0)", f"📉 Produits à Améliorer en {year} (Écart > 0)"])
 
     with product_tabs[0]:
@@ -692,11 +480,6 @@ def part_five(df, year, vendor_search):
         # Formater les données pour l'affichage
         display_good_products = good_products[product_display_cols].copy()
         
-        # S'assurer que les délais sont affichés avec un seul chiffre après la virgule
-        for col in ['Délai théorique', 'Délai réel', 'Écart de délai']:
-            if col in display_good_products.columns:
-                display_good_products[col] = display_good_products[col].map(lambda x: f"{x:.1f}" if pd.notnull(x) else x)
-        
         # S'assurer que les numéros de commande sont des entiers sans décimales
         if 'Bon de commande' in display_good_products.columns and display_good_products['Bon de commande'].dtype != 'object':
             display_good_products['Bon de commande'] = display_good_products['Bon de commande'].astype(int)
@@ -705,44 +488,23 @@ def part_five(df, year, vendor_search):
         if 'Doc Date' in display_good_products.columns:
             display_good_products['Doc Date'] = pd.to_datetime(display_good_products['Doc Date'], errors='coerce').dt.strftime('%Y-%m-%d')
         
-        # Formater Order Qty (2 chiffres après la virgule)
-        if 'Order Qty' in display_good_products.columns:
-            display_good_products['Order Qty'] = display_good_products['Order Qty'].apply(lambda x: f"{x:.2f}" if pd.notnull(x) else "")
 
         
-        # Styliser le dataframe en combinant les couleurs par colonne et le gradient pour Écart
         if not display_good_products.empty:
-            styled_good_products = display_good_products.style.apply(lambda x: [
-                f'background-color: {color_palette["primary"]}30; color: {color_palette["text"]}' 
-                if col == 'Matériel' else
-                f'background-color: {color_palette["tertiary"]}30; color: {color_palette["text"]}' 
-                if col == 'Description du matériel' else
-                f'background-color: {color_palette["quaternary"]}30; color: {color_palette["text"]}' 
-                if col == 'Bon de commande' else
-                f'background-color: {color_palette["neutral"]}30; color: {color_palette["text"]}' 
-                if col == 'Doc Date' else
-                f'background-color: {color_palette["quaternary"]}30; color: {color_palette["text"]}'
-                if col == 'Order Qty' else
-                f'background-color: {color_palette["background"]}; color: {color_palette["text"]}'
-                if col == 'Délai théorique' else
-                f'background-color: {color_palette["tertiary"]}30; color: {color_palette["text"]}' 
-                if col == 'Délai réel' else
-                f'background-color: {color_palette["positive"]}30; font-weight: bold; color: {color_palette["text"]}' 
-                if col == 'Écart de délai' else
-                f'background-color: {color_palette["positive" if x["Statut de livraison"] == "En avance" else "neutral" if x["Statut de livraison"] == "À temps" else "negative"]}30; font-weight: bold; color: {color_palette["text"]}'
-                for col in display_good_products.columns
-            ], axis=1)
-            
-            # Ajouter le gradient sur la colonne Écart
-            numeric_good_products = good_products[product_display_cols].copy()
-            styled_good_products = styled_good_products.background_gradient(
-                subset=['Écart de délai'], 
-                cmap="RdYlGn_r",
-                vmin=numeric_good_products['Écart de délai'].min(),
-                vmax=0
+            # Tableau paginé : couleurs calculées sur la liste complète, seule la page visible est envoyée
+            paged_table(
+                display_good_products,
+                key="produits_performants_annee",
+                column_styles=product_column_styles,
+                row_styles={
+                    'Statut de livraison': delivery_status_styles(display_good_products['Statut de livraison']),
+                    'Écart de délai': gradient_styles(display_good_products['Écart de délai'], cmap="RdYlGn_r", vmin=display_good_products['Écart de délai'].min(), vmax=0)
+                },
+                column_config=product_columns_config,
+                search_columns=["Matériel", "Description du matériel", "Bon de commande"],
+                filter_columns=["Statut de livraison"],
+                file_name="produits_performants_annee.csv"
             )
-            
-            st.dataframe(styled_good_products, use_container_width=True, hide_index=True)
         else:
             st.info(f"Aucun produit avec un écart favorable trouvé pour l'année {year}.")
 
@@ -756,11 +518,6 @@ def part_five(df, year, vendor_search):
         # Formater les données pour l'affichage
         display_bad_products = bad_products[product_display_cols].copy()
         
-        # S'assurer que les délais sont affichés avec un seul chiffre après la virgule
-        for col in ['Délai théorique', 'Délai réel', 'Écart de délai']:
-            if col in display_bad_products.columns:
-                display_bad_products[col] = display_bad_products[col].map(lambda x: f"{x:.1f}" if pd.notnull(x) else x)
-        
         # S'assurer que les numéros de commande sont des entiers sans décimales
         if 'Bon de commande' in display_bad_products.columns and display_bad_products['Bon de commande'].dtype != 'object':
             display_bad_products['Bon de commande'] = display_bad_products['Bon de commande'].astype(int)
@@ -768,43 +525,22 @@ def part_five(df, year, vendor_search):
         if 'Doc Date' in display_bad_products.columns:
             display_bad_products['Doc Date'] = pd.to_datetime(display_bad_products['Doc Date'], errors='coerce').dt.strftime('%Y-%m-%d')
         
-        # Formater Order Qty (2 chiffres après la virgule)
-        if 'Order Qty' in display_bad_products.columns:
-            display_bad_products['Order Qty'] = display_bad_products['Order Qty'].apply(lambda x: f"{x:.2f}" if pd.notnull(x) else "")
         
-        # Styliser le dataframe en combinant les couleurs par colonne et le gradient pour Écart
         if not display_bad_products.empty:
-            styled_bad_products = display_bad_products.style.apply(lambda x: [
-                f'background-color: {color_palette["primary"]}30; color: {color_palette["text"]}' 
-                if col == 'Matériel' else
-                f'background-color: {color_palette["tertiary"]}30; color: {color_palette["text"]}' 
-                if col == 'Description du matériel' else
-                f'background-color: {color_palette["quaternary"]}30; color: {color_palette["text"]}' 
-                if col == 'Bon de commande' else
-                f'background-color: {color_palette["neutral"]}30; color: {color_palette["text"]}' 
-                if col == 'Doc Date' else
-                f'background-color: {color_palette["quaternary"]}30; color: {color_palette["text"]}'
-                if col == 'Order Qty' else
-                f'background-color: {color_palette["background"]}; color: {color_palette["text"]}'
-                if col == 'Délai théorique' else
-                f'background-color: {color_palette["tertiary"]}30; color: {color_palette["text"]}' 
-                if col == 'Délai réel' else
-                f'background-color: {color_palette["negative"]}30; font-weight: bold; color: {color_palette["text"]}' 
-                if col == 'Écart de délai' else
-                f'background-color: {color_palette["positive" if x["Statut de livraison"] == "En avance" else "neutral" if x["Statut de livraison"] == "À temps" else "negative"]}30; font-weight: bold; color: {color_palette["text"]}'
-                for col in display_bad_products.columns
-            ], axis=1)
-            
-            # Ajouter le gradient sur la colonne Écart
-            numeric_bad_products = bad_products[product_display_cols].copy()
-            styled_bad_products = styled_bad_products.background_gradient(
-                subset=['Écart de délai'], 
-                cmap="RdYlGn_r",
-                vmin=0,
-                vmax=numeric_bad_products['Écart de délai'].max()
+            # Tableau paginé : couleurs calculées sur la liste complète, seule la page visible est envoyée
+            paged_table(
+                display_bad_products,
+                key="produits_a_ameliorer_annee",
+                column_styles=product_column_styles,
+                row_styles={
+                    'Statut de livraison': delivery_status_styles(display_bad_products['Statut de livraison']),
+                    'Écart de délai': gradient_styles(display_bad_products['Écart de délai'], cmap="RdYlGn_r", vmin=0, vmax=display_bad_products['Écart de délai'].max())
+                },
+                column_config=product_columns_config,
+                search_columns=["Matériel", "Description du matériel", "Bon de commande"],
+                filter_columns=["Statut de livraison"],
+                file_name="produits_a_ameliorer_annee.csv"
             )
-            
-            st.dataframe(styled_bad_products, use_container_width=True, hide_index=True)
         else:
             st.info(f"Aucun produit avec un écart défavorable trouvé pour l'année {year}.")
 
@@ -858,6 +594,25 @@ def part_five(df, year, vendor_search):
     good_products_agg = product_agg[product_agg['Écart de délai'] <= 0].sort_values('Écart de délai').copy()
     bad_products_agg = product_agg[product_agg['Écart de délai'] > 0].sort_values('Écart de délai', ascending=False).copy()
 
+    # Couleurs par colonne des tableaux agrégés, définies une seule fois
+    agg_column_styles = {
+        'Matériel': f'background-color: {color_palette["primary"]}30; color: {color_palette["text"]}',
+        'Description du matériel': f'background-color: {color_palette["tertiary"]}30; color: {color_palette["text"]}',
+        'Matériel du fournisseur': f'background-color: {color_palette["quaternary"]}30; color: {color_palette["text"]}',
+        'Nbre de commandes': f'background-color: {color_palette["neutral"]}30; color: {color_palette["text"]}',
+        'Délai théorique': f'background-color: {color_palette["neutral"]}30; color: {color_palette["text"]}',
+        'Délai réel': f'background-color: {color_palette["tertiary"]}30; color: {color_palette["text"]}',
+        '% En avance': f'background-color: {color_palette["positive"]}30; color: {color_palette["text"]}',
+        '% À temps': f'background-color: {color_palette["neutral"]}30; color: {color_palette["text"]}',
+        '% Retard accepté': f'background-color: {color_palette["quaternary"]}30; color: {color_palette["text"]}',
+        '% Long délai': f'background-color: {color_palette["negative"]}30; color: {color_palette["text"]}'
+    }
+
+    agg_columns_config = numeric_column_config(
+        decimals={'Délai théorique': 1, 'Délai réel': 1, 'Écart de délai': 1},
+        percent=['% En avance', '% À temps', '% Retard accepté', '% Long délai']
+    )
+
     # Créer des onglets pour les afficher
     product_agg_tabs = st.tabs([f"📈 Produits Performants (Écart moyen ≤ 0)", f"📉 Produits à Améliorer (Écart moyen > 0)"])
 
@@ -873,52 +628,16 @@ def part_five(df, year, vendor_search):
             # Formater les données pour l'affichage
             display_good_agg = good_products_agg.copy()
             
-            # Styliser le dataframe
-            styled_good_agg = display_good_agg.style.apply(lambda x: [
-                f'background-color: {color_palette["primary"]}30; color: {color_palette["text"]}' 
-                if col == 'Matériel' else
-                f'background-color: {color_palette["tertiary"]}30; color: {color_palette["text"]}' 
-                if col == 'Description du matériel' else
-                f'background-color: {color_palette["quaternary"]}30; color: {color_palette["text"]}' 
-                if col == 'Matériel du fournisseur' else
-                f'background-color: {color_palette["neutral"]}30; color: {color_palette["text"]}'
-                if col == 'Nombre de commandes' else  # CETTE LIGNE VIENT MAINTENANT ICI
-                f'background-color: {color_palette["neutral"]}30; color: {color_palette["text"]}'
-                if col == 'Délai théorique' else
-                f'background-color: {color_palette["tertiary"]}30; color: {color_palette["text"]}' 
-                if col == 'Délai réel' else
-                f'background-color: {color_palette["positive"]}30; font-weight: bold; color: {color_palette["text"]}' 
-                if col == 'Écart de délai' else
-                f'background-color: {color_palette["positive"]}30; color: {color_palette["text"]}' 
-                if col == '% En avance' else
-                f'background-color: {color_palette["neutral"]}30; color: {color_palette["text"]}' 
-                if col == '% À temps' else
-                f'background-color: {color_palette["quaternary"]}30; color: {color_palette["text"]}' 
-                if col == '% Retard accepté' else
-                f'background-color: {color_palette["negative"]}30; color: {color_palette["text"]}'
-                for col in display_good_agg.columns
-            ], axis=1)
-            
-            # Ajouter le gradient sur la colonne Écart de délai
-            styled_good_agg = styled_good_agg.background_gradient(
-                subset=['Écart de délai'], 
-                cmap="RdYlGn_r",
-                vmin=display_good_agg['Écart de délai'].min(),
-                vmax=0
+            # Tableau paginé : dégradé calculé sur la liste complète, seule la page visible est envoyée
+            paged_table(
+                display_good_agg,
+                key="statistiques_produits_performants",
+                column_styles=agg_column_styles,
+                row_styles={'Écart de délai': gradient_styles(display_good_agg['Écart de délai'], cmap="RdYlGn_r", vmin=display_good_agg['Écart de délai'].min(), vmax=0)},
+                column_config=agg_columns_config,
+                search_columns=["Matériel", "Description du matériel", "Matériel du fournisseur"],
+                file_name="statistiques_produits_performants.csv"
             )
-            
-            # Formater les nombres
-            styled_good_agg = styled_good_agg.format({
-                'Délai théorique': '{:.1f}',
-                'Délai réel': '{:.1f}',
-                'Écart de délai': '{:.1f}',
-                '% En avance': '{:.1f}%',
-                '% À temps': '{:.1f}%',
-                '% Retard accepté': '{:.1f}%',
-                '% Long délai': '{:.1f}%'
-            })
-            
-            st.dataframe(styled_good_agg, use_container_width=True, hide_index=True)
         else:
             st.info(f"Aucun produit avec un écart moyen favorable trouvé pour l'année {year}.")
 
@@ -934,52 +653,16 @@ def part_five(df, year, vendor_search):
             # Formater les données pour l'affichage
             display_bad_agg = bad_products_agg.copy()
             
-            # Styliser le dataframe
-            styled_bad_agg = display_bad_agg.style.apply(lambda x: [
-                f'background-color: {color_palette["primary"]}30; color: {color_palette["text"]}' 
-                if col == 'Matériel' else
-                f'background-color: {color_palette["tertiary"]}30; color: {color_palette["text"]}' 
-                if col == 'Description du matériel' else
-                f'background-color: {color_palette["quaternary"]}30; color: {color_palette["text"]}' 
-                if col == 'Matériel du fournisseur' else
-                f'background-color: {color_palette["neutral"]}30; color: {color_palette["text"]}'
-                if col == 'Nombre de commandes' else  # CETTE LIGNE VIENT MAINTENANT ICI
-                f'background-color: {color_palette["neutral"]}30; color: {color_palette["text"]}'
-                if col == 'Délai théorique' else
-                f'background-color: {color_palette["tertiary"]}30; color: {color_palette["text"]}' 
-                if col == 'Délai réel' else
-                f'background-color: {color_palette["negative"]}30; font-weight: bold; color: {color_palette["text"]}' 
-                if col == 'Écart de délai' else
-                f'background-color: {color_palette["positive"]}30; color: {color_palette["text"]}' 
-                if col == '% En avance' else
-                f'background-color: {color_palette["neutral"]}30; color: {color_palette["text"]}' 
-                if col == '% À temps' else
-                f'background-color: {color_palette["quaternary"]}30; color: {color_palette["text"]}' 
-                if col == '% Retard accepté' else
-                f'background-color: {color_palette["negative"]}30; color: {color_palette["text"]}'
-                for col in display_bad_agg.columns
-            ], axis=1)
-            
-            # Ajouter le gradient sur la colonne Écart de délai
-            styled_bad_agg = styled_bad_agg.background_gradient(
-                subset=['Écart de délai'], 
-                cmap="RdYlGn_r",
-                vmin=0,
-                vmax=display_bad_agg['Écart de délai'].max()
+            # Tableau paginé : dégradé calculé sur la liste complète, seule la page visible est envoyée
+            paged_table(
+                display_bad_agg,
+                key="statistiques_produits_a_ameliorer",
+                column_styles=agg_column_styles,
+                row_styles={'Écart de délai': gradient_styles(display_bad_agg['Écart de délai'], cmap="RdYlGn_r", vmin=0, vmax=display_bad_agg['Écart de délai'].max())},
+                column_config=agg_columns_config,
+                search_columns=["Matériel", "Description du matériel", "Matériel du fournisseur"],
+                file_name="statistiques_produits_a_ameliorer.csv"
             )
-            
-            # Formater les nombres
-            styled_bad_agg = styled_bad_agg.format({
-                'Délai théorique': '{:.1f}',
-                'Délai réel': '{:.1f}',
-                'Écart de délai': '{:.1f}',
-                '% En avance': '{:.1f}%',
-                '% À temps': '{:.1f}%',
-                '% Retard accepté': '{:.1f}%',
-                '% Long délai': '{:.1f}%'
-            })
-            
-            st.dataframe(styled_bad_agg, use_container_width=True, hide_index=True)
         else:
             st.info(f"Aucun produit avec un écart moyen défavorable trouvé pour l'année {year}.")
 
@@ -1006,13 +689,7 @@ def part_five(df, year, vendor_search):
         current_orders['Mois'] = pd.to_datetime(current_orders['Date de comptabilisation']).dt.month
         
         # Créer un mapping pour les noms des mois en français
-        month_names = {
-            1: 'Janvier', 2: 'Février', 3: 'Mars', 4: 'Avril', 5: 'Mai', 6: 'Juin',
-            7: 'Juillet', 8: 'Août', 9: 'Septembre', 10: 'Octobre', 11: 'Novembre', 12: 'Décembre'
-        }
-        
-        # Appliquer le mapping pour obtenir les noms des mois
-        current_orders['Nom du mois'] = current_orders['Mois'].map(month_names)
+        month_names = month_table()
         
         # Grouper par mois et calculer les métriques mensuelles pour les commandes
         monthly_orders = current_orders.groupby('Mois').agg({
@@ -1070,51 +747,33 @@ def part_five(df, year, vendor_search):
         # Sélectionner et réorganiser les colonnes
         monthly_orders_display = monthly_orders_complete[columns_order].copy()
         
-        # Styliser le tableau des commandes mensuelles
-        styled_monthly_orders = monthly_orders_display.style.apply(lambda x: [
-            f'background-color: {color_palette["primary"]}30; font-weight: bold; color: {color_palette["text"]}' 
-            if col == 'Mois' else
-            f'background-color: {color_palette["quaternary"]}30; color: {color_palette["text"]}' 
-            if col == 'Nombre de commandes' else
-            f'background-color: {color_palette["neutral"]}30; color: {color_palette["text"]}' 
-            if col == 'Délai théorique' else
-            f'background-color: {color_palette["tertiary"]}30; color: {color_palette["text"]}' 
-            if col == 'Délai réel' else
-            f'background-color: {color_palette["positive" if x["Écart moyen"] <= 0 else "negative"]}30; font-weight: bold; color: {color_palette["text"]}' 
-            if col == 'Écart moyen' else
-            f'background-color: {color_palette["positive"]}30; color: {color_palette["text"]}' 
-            if col == '% En avance' else
-            f'background-color: {color_palette["neutral"]}30; color: {color_palette["text"]}' 
-            if col == '% À temps' else
-            f'background-color: {color_palette["quaternary"]}30; color: {color_palette["text"]}' 
-            if col == '% Retard accepté' else
-            f'background-color: {color_palette["negative"]}30; color: {color_palette["text"]}'
-            for col in monthly_orders_display.columns
-        ], axis=1)
-        
-        # Ajouter le gradient sur la colonne Écart moyen
-        styled_monthly_orders = styled_monthly_orders.background_gradient(
-            subset=['Écart moyen'], 
-            cmap="RdYlGn_r",
-            vmin=monthly_orders_display['Écart moyen'].min() if monthly_orders_display['Écart moyen'].min() < 0 else -1,
-            vmax=monthly_orders_display['Écart moyen'].max() if monthly_orders_display['Écart moyen'].max() > 0 else 1
+        # Couleurs par colonne précalculées et dégradé sur l'écart moyen calculé en bloc
+        ecart_moyen = monthly_orders_display['Écart moyen']
+        render_table(
+            monthly_orders_display,
+            column_styles={
+            'Mois': f'background-color: {color_palette["primary"]}30; font-weight: bold; color: {color_palette["text"]}',
+            'Nombre de commandes': f'background-color: {color_palette["quaternary"]}30; color: {color_palette["text"]}',
+            'Délai théorique': f'background-color: {color_palette["neutral"]}30; color: {color_palette["text"]}',
+            'Délai réel': f'background-color: {color_palette["tertiary"]}30; color: {color_palette["text"]}',
+            '% En avance': f'background-color: {color_palette["positive"]}30; color: {color_palette["text"]}',
+            '% À temps': f'background-color: {color_palette["neutral"]}30; color: {color_palette["text"]}',
+            '% Retard accepté': f'background-color: {color_palette["quaternary"]}30; color: {color_palette["text"]}',
+            '% Long délai': f'background-color: {color_palette["negative"]}30; color: {color_palette["text"]}'
+            },
+            row_styles={'Écart moyen': gradient_styles(
+                ecart_moyen,
+                cmap="RdYlGn_r",
+                vmin=ecart_moyen.min() if ecart_moyen.min() < 0 else -1,
+                vmax=ecart_moyen.max() if ecart_moyen.max() > 0 else 1
+            )},
+            column_config=numeric_column_config(
+                integers=['Nombre de commandes'],
+                decimals={'Délai théorique': 1, 'Délai réel': 1, 'Écart moyen': 1},
+                percent=['% En avance', '% À temps', '% Retard accepté', '% Long délai']
+            )
         )
         
-        # Formater les nombres
-        styled_monthly_orders = styled_monthly_orders.format({
-            'Nombre de commandes': '{:.0f}',
-            'Délai théorique': '{:.1f}',
-            'Délai réel': '{:.1f}',
-            'Écart moyen': '{:.1f}',
-            '% En avance': '{:.1f}%',
-            '% À temps': '{:.1f}%',
-            '% Retard accepté': '{:.1f}%',
-            '% Long délai': '{:.1f}%'
-        })
-        
-        # Afficher le tableau stylisé
-        st.dataframe(styled_monthly_orders, use_container_width=True, hide_index=True)
-        
         # Ajouter une visualisation pour les tendances mensuelles
         st.markdown(f"""
         <div style="background-color:{color_palette['background']}; padding: 10px; border-radius: 8px; margin-top: 15px;">
@@ -1193,9 +852,6 @@ def part_five(df, year, vendor_search):
         # Extraire le mois à partir de la date de comptabilisation
         current_data['Mois'] = pd.to_datetime(current_data['Date de comptabilisation']).dt.month
         
-        # Appliquer le mapping pour obtenir les noms des mois
-        current_data['Nom du mois'] = current_data['Mois'].map(month_names)
-        
         
         # Grouper par mois et calculer les métriques mensuelles pour les produits
         monthly_products = current_data.groupby('Mois').agg({
@@ -1250,54 +906,34 @@ def part_five(df, year, vendor_search):
         # Sélectionner et réorganiser les colonnes
         monthly_products_display = monthly_products_complete[columns_order_products].copy()
         
-        # Styliser le tableau des produits mensuels
-        styled_monthly_products = monthly_products_display.style.apply(lambda x: [
-            f'background-color: {color_palette["primary"]}30; font-weight: bold; color: {color_palette["text"]}' 
-            if col == 'Mois' else
-            f'background-color: {color_palette["secondary"]}30; color: {color_palette["text"]}' 
-            if col == 'Produits uniques' else
-            f'background-color: {color_palette["quaternary"]}30; color: {color_palette["text"]}' 
-            if col == 'Nb de lignes' else
-            f'background-color: {color_palette["neutral"]}30; color: {color_palette["text"]}' 
-            if col == 'Délai théorique' else
-            f'background-color: {color_palette["tertiary"]}30; color: {color_palette["text"]}' 
-            if col == 'Délai réel' else
-            f'background-color: {color_palette["positive" if x["Écart moyen"] <= 0 else "negative"]}30; font-weight: bold; color: {color_palette["text"]}' 
-            if col == 'Écart moyen' else
-            f'background-color: {color_palette["positive"]}30; color: {color_palette["text"]}' 
-            if col == '% En avance' else
-            f'background-color: {color_palette["neutral"]}30; color: {color_palette["text"]}' 
-            if col == '% À temps' else
-            f'background-color: {color_palette["quaternary"]}30; color: {color_palette["text"]}' 
-            if col == '% Retard accepté' else
-            f'background-color: {color_palette["negative"]}30; color: {color_palette["text"]}'
-            for col in monthly_products_display.columns
-        ], axis=1)
-        
-        # Ajouter le gradient sur la colonne Écart moyen
-        styled_monthly_products = styled_monthly_products.background_gradient(
-            subset=['Écart moyen'], 
-            cmap="RdYlGn_r",
-            vmin=monthly_products_display['Écart moyen'].min() if monthly_products_display['Écart moyen'].min() < 0 else -1,
-            vmax=monthly_products_display['Écart moyen'].max() if monthly_products_display['Écart moyen'].max() > 0 else 1
+        # Couleurs par colonne précalculées et dégradé sur l'écart moyen calculé en bloc
+        ecart_moyen = monthly_products_display['Écart moyen']
+        render_table(
+            monthly_products_display,
+            column_styles={
+            'Mois': f'background-color: {color_palette["primary"]}30; font-weight: bold; color: {color_palette["text"]}',
+            'Produits uniques': f'background-color: {color_palette["secondary"]}30; color: {color_palette["text"]}',
+            'Nb de lignes': f'background-color: {color_palette["quaternary"]}30; color: {color_palette["text"]}',
+            'Délai théorique': f'background-color: {color_palette["neutral"]}30; color: {color_palette["text"]}',
+            'Délai réel': f'background-color: {color_palette["tertiary"]}30; color: {color_palette["text"]}',
+            '% En avance': f'background-color: {color_palette["positive"]}30; color: {color_palette["text"]}',
+            '% À temps': f'background-color: {color_palette["neutral"]}30; color: {color_palette["text"]}',
+            '% Retard accepté': f'background-color: {color_palette["quaternary"]}30; color: {color_palette["text"]}',
+            '% Long délai': f'background-color: {color_palette["negative"]}30; color: {color_palette["text"]}'
+            },
+            row_styles={'Écart moyen': gradient_styles(
+                ecart_moyen,
+                cmap="RdYlGn_r",
+                vmin=ecart_moyen.min() if ecart_moyen.min() < 0 else -1,
+                vmax=ecart_moyen.max() if ecart_moyen.max() > 0 else 1
+            )},
+            column_config=numeric_column_config(
+                integers=['Produits uniques', 'Nb de lignes'],
+                decimals={'Délai théorique': 1, 'Délai réel': 1, 'Écart moyen': 1},
+                percent=['% En avance', '% À temps', '% Retard accepté', '% Long délai']
+            )
         )
         
-        # Formater les nombres
-        styled_monthly_products = styled_monthly_products.format({
-            'Produits uniques': '{:.0f}',
-            'Nb de lignes': '{:.0f}',
-            'Délai théorique': '{:.1f}',
-            'Délai réel': '{:.1f}',
-            'Écart moyen': '{:.1f}',
-            '% En avance': '{:.1f}%',
-            '% À temps': '{:.1f}%',
-            '% Retard accepté': '{:.1f}%',
-            '% Long délai': '{:.1f}%'
-        })
-        
-        # Afficher le tableau stylisé
-        st.dataframe(styled_monthly_products, use_container_width=True, hide_index=True)
-        
         # Ajouter une visualisation pour les tendances mensuelles des produits
         st.markdown(f"""
         <div style="background-color:{color_palette['background']}; padding: 10px; border-radius: 8px; margin-top: 15px;">
@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+from locale1 import *
+
+
+# Modes de sélection de la période proposés dans la barre latérale
+PERIOD_MODES = ["Mois de l'année", "Plage de dates", "Derniers jours"]
+
+# Fenêtres glissantes proposées (en jours)
+ROLLING_WINDOWS = [30, 90, 180, 365]
+
+
+def make_period(start, end, label=None):
+    """Construit une période [start, end) : début inclus, fin exclue
+
+    Args:
+        start: date de début (incluse)
+        end: date de fin (exclue)
+        label: libellé affiché (calculé à partir des dates par défaut)
+
+    Returns:
+        Dictionnaire {"start", "end", "label"}
+    """
+    start = pd.Timestamp(start).normalize()
+    end = pd.Timestamp(end).normalize()
+    return {"start": start, "end": end, "label": label or period_label(start, end)}
+
+
+def year_period(year):
+    """Période couvrant une année civile complète"""
+    return make_period(pd.Timestamp(int(year), 1, 1), pd.Timestamp(int(year) + 1, 1, 1))
+
+
+def month_range_period(year, start_month, end_month):
+    """Période couvrant les mois start_month à end_month (inclus) d'une année"""
+    start = pd.Timestamp(int(year), int(start_month), 1)
+    return make_period(start, pd.Timestamp(int(year), int(end_month), 1) + pd.DateOffset(months=1))
+
+
+def rolling_period(days, anchor):
+    """Période des `days` derniers jours, se terminant à la date anchor (incluse)"""
+    end = pd.Timestamp(anchor).normalize() + pd.Timedelta(days=1)
+    return make_period(end - pd.Timedelta(days=int(days)), end)
+
+
+def previous_year_period(period):
+    """Même période un an plus tôt (période de comparaison)"""
+    return make_period(
+        period["start"] - pd.DateOffset(years=1),
+        period["end"] - pd.DateOffset(years=1)
+    )
+
+
+def period_label(start, end):
+    """Libellé lisible d'une période [start, end)
+
+    Les périodes en mois entiers sont nommées par leurs mois (« 2024 », « Mars 2024 »,
+    « Octobre 2023 à Mars 2024 »), les autres par leurs dates (« 2 janvier 2024 au 31 mars 2024 »).
+    """
+    last = end - pd.Timedelta(days=1)
+    if start.day == 1 and end.day == 1:
+        if (start.month, last.month) == (1, 12) and start.year == last.year:
+            return str(start.year)
+        if (start.year, start.month) == (last.year, last.month):
+            return f"{month_name(start.month)} {start.year}"
+        if start.year == last.year:
+            return f"{month_name(start.month)} à {month_name(last.month)} {start.year}"
+        return f"{month_name(start.month)} {start.year} à {month_name(last.month)} {last.year}"
+    return (f"{start.day} {month_name(start.month).lower()} {start.year} au "
+            f"{last.day} {month_name(last.month).lower()} {last.year}")
+
+
+def period_months(period):
+    """Liste des numéros de mois couverts par une période (dans l'ordre chronologique)"""
+    mois = pd.period_range(period["start"], period["end"] - pd.Timedelta(days=1), freq="M").month
+    return list(dict.fromkeys(mois.tolist()))
+
+
+def period_year_months(period):
+    """Couples (année, mois) des mois couverts par une période, qui peut chevaucher deux années"""
+    mois = pd.period_range(period["start"], period["end"] - pd.Timedelta(days=1), freq="M")
+    return list(zip(mois.year.tolist(), mois.month.tolist()))
+
+
+def period_month_mask(df, period):
+    """Masque des lignes dont le mois (colonnes Year et Month) est couvert par une période"""
+    return pd.MultiIndex.from_frame(df[["Year", "Month"]]).isin(period_year_months(period))
+
+
+def sort_by_date(df, date_column):
+    """Trie un DataFrame par date (tri stable, dates manquantes en fin) s'il ne l'est pas déjà"""
+    if df[date_column].is_monotonic_increasing:
+        return df
+    return df.sort_values(date_column, kind="mergesort", na_position="last")
+
+
+def period_slice(df, date_column, period):
+    """Renvoie les lignes d'un DataFrame trié par date comprises dans une période
+
+    Les bornes sont trouvées par recherche dichotomique : la sélection est une tranche
+    contiguë du DataFrame, sans masque évalué ligne par ligne.
+
+    Args:
+        df: DataFrame trié par date_column (voir sort_by_date)
+        date_column: colonne de dates ("Date de comptabilisation", "Date du document"...)
+        period: période construite par make_period (ou year_period, rolling_period...)
+    """
+    dates = pd.to_datetime(df[date_column], errors="coerce").to_numpy(dtype="datetime64[ns]")
+    bornes = np.array([period["start"].to_datetime64(), period["end"].to_datetime64()], dtype="datetime64[ns]")
+    debut, fin = np.searchsorted(dates, bornes, side="left")
+    return df.iloc[debut:fin]
+
+
+def period_slices(df, date_column, *periods):
+    """Trie une seule fois le DataFrame par date puis renvoie une tranche par période"""
+    trie = sort_by_date(df, date_column)
+    return [period_slice(trie, date_column, period) for period in periods]
+
+
+def current_period(year):
+    """Période choisie dans la barre latérale, ou l'année complète si aucune n'est définie"""
+    period = st.session_state.get("period")
+    return period if period is not None else year_period(year)
@@ -0,0 +1,143 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+
+# Colonnes identifiant un fournisseur et un matériel dans les tableaux de gamme
+SUPPLIER_KEYS = ['Nom du fournisseur', 'Fournisseur']
+MATERIAL_KEYS = ['Matériel', 'Matériel du fournisseur', 'Description du matériel', 'Nom du fournisseur', 'Order Unit']
+
+# Indicateurs des tableaux par année (ordre des colonnes : indicateur puis année)
+SUPPLIER_METRICS = ['Nombre_Materiels', 'Quantite', 'Valeur_Totale']
+MATERIAL_METRICS = ['Quantite', 'Valeur_Totale']
+
+
+def year_codes(years):
+    """Codes entiers des années (0, 1, ... dans l'ordre chronologique, -1 si manquante) et années correspondantes"""
+    codes, annees = pd.factorize(years, sort=True)
+    return codes, pd.Index(annees.astype(int))
+
+
+def base_aggregate(df):
+    """Agrégation unique des lignes de commande au grain (matériel, fournisseur, année, mois)
+
+    Toutes les vues de gamme (par année, par mois, par fournisseur, par matériel) se déduisent
+    de ce tableau sans relire les lignes : sommes, minimum et maximum des quantités, nombre
+    de quantités renseignées (pour les moyennes).
+
+    Returns:
+        (DataFrame agrégé avec les colonnes "_annee" et "_mois", années correspondant aux codes)
+    """
+    codes, annees = year_codes(df["Year"])
+    cles = list(dict.fromkeys(MATERIAL_KEYS + SUPPLIER_KEYS))
+    donnees = pd.DataFrame({col: df[col].to_numpy() for col in cles})
+    donnees["_annee"] = codes
+    donnees["_mois"] = df["Month"].to_numpy()
+    donnees["valeur"] = pd.to_numeric(df["Valeur nette de la commande"], errors="coerce").to_numpy()
+    donnees["quantite"] = pd.to_numeric(df["Order Quantity"], errors="coerce").to_numpy()
+
+    base = donnees.groupby(cles + ["_annee", "_mois"], dropna=False, observed=True).agg(
+        valeur=("valeur", "sum"),
+        quantite=("quantite", "sum"),
+        qte_min=("quantite", "min"),
+        qte_max=("quantite", "max"),
+        lignes=("quantite", "count")
+    ).reset_index()
+    return base, annees
+
+
+def wide_by_year(aggregated, annees, metrics):
+    """Met un tableau agrégé par (clés, "_annee") en colonnes par année : "{indicateur}_{année}"
+
+    Les années absentes pour un élément valent 0 ; l'ordre des colonnes suit metrics puis les années.
+    """
+    wide = aggregated[metrics].unstack("_annee", fill_value=0)
+    niveaux = wide.columns
+    wide.columns = niveaux.get_level_values(0) + "_" + annees[niveaux.get_level_values(1)].astype(str)
+    return wide.reset_index()
+
+
+def _finish_wide(wide):
+    """Quantités entières, valeur moyenne annuelle et tri par valeur moyenne décroissante"""
+    quant_cols = [col for col in wide.columns if col.startswith('Quantite_')]
+    wide[quant_cols] = wide[quant_cols].astype(int)
+    val_cols = [col for col in wide.columns if col.startswith('Valeur_Totale_')]
+    if val_cols:
+        wide['Valeur_Moyenne'] = wide[val_cols].mean(axis=1).round(1)
+        wide = wide.sort_values('Valeur_Moyenne', ascending=False, kind="mergesort")
+    return wide
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def gamme_tables(df, gamme):
+    """Calcule tous les tableaux de l'analyse d'une gamme à partir d'une seule agrégation
+
+    Mis en cache par jeu de données et gamme.
+
+    Args:
+        df: DataFrame des commandes
+        gamme: gamme de produit analysée
+
+    Returns:
+        Dictionnaire de DataFrame : "yearly" (une ligne par année), "monthly" (année x mois),
+        "suppliers" et "materials" (une colonne par indicateur et par année)
+    """
+    df_gamme = df[df['Prodline Name'] == gamme]
+    if df_gamme.empty:
+        return None
+
+    base, annees = base_aggregate(df_gamme)
+    base = base[base["_annee"] >= 0]
+
+    # Tableau par année (le nombre de commandes distinctes se compte sur les paires année / commande)
+    yearly = base.groupby("_annee").agg(
+        Valeur_Totale=("valeur", "sum"),
+        Nombre_Materiels=("Matériel", "nunique"),
+        Quantite_Totale=("quantite", "sum"),
+        Quantite_Min=("qte_min", "min"),
+        Quantite_Max=("qte_max", "max"),
+        lignes=("lignes", "sum")
+    )
+    codes, _ = year_codes(df_gamme["Year"])
+    commandes, _ = pd.factorize(df_gamme["Bons de commande"])
+    valides = (codes >= 0) & (commandes >= 0)
+    largeur = np.int64(commandes.max() + 1) if valides.any() else np.int64(1)
+    paires = np.unique(codes[valides].astype(np.int64) * largeur + commandes[valides])
+    yearly.insert(1, "Nombre_Commandes", np.bincount(paires // largeur, minlength=len(annees))[yearly.index])
+    yearly["Quantite_Moyenne"] = (yearly["Quantite_Totale"] / yearly.pop("lignes")).round(1)
+    yearly[["Quantite_Totale", "Quantite_Min", "Quantite_Max"]] = yearly[["Quantite_Totale", "Quantite_Min", "Quantite_Max"]].astype(int)
+    yearly.insert(0, "Année", annees[yearly.index])
+    yearly = yearly.reset_index(drop=True)
+
+    # Tableau par année et mois (graphique d'évolution mensuelle)
+    monthly = base.groupby(["_annee", "_mois"]).agg(
+        Valeur_Totale=("valeur", "sum"),
+        Quantite_Totale=("quantite", "sum"),
+        Nombre_Materiels=("Matériel", "nunique")
+    ).reset_index()
+    monthly.insert(0, "Année", annees[monthly.pop("_annee")])
+    monthly = monthly.rename(columns={"_mois": "Mois"})
+    monthly["Mois"] = monthly["Mois"].astype(int)
+    monthly["Quantite_Totale"] = monthly["Quantite_Totale"].astype(int)
+    monthly["Année_str"] = monthly["Année"].astype(str)
+
+    # Tableaux par fournisseur et par matériel, une colonne par indicateur et par année
+    suppliers = base.groupby(SUPPLIER_KEYS + ["_annee"]).agg(
+        Valeur_Totale=("valeur", "sum"),
+        Quantite=("quantite", "sum"),
+        Nombre_Materiels=("Matériel", "nunique")
+    )
+    suppliers = _finish_wide(wide_by_year(suppliers, annees, SUPPLIER_METRICS))
+    try:
+        suppliers['Fournisseur'] = suppliers['Fournisseur'].astype(int)
+    except (ValueError, TypeError):
+        # Si la conversion échoue, garder la colonne telle quelle
+        pass
+
+    materials = base.groupby(MATERIAL_KEYS + ["_annee"]).agg(
+        Valeur_Totale=("valeur", "sum"),
+        Quantite=("quantite", "sum")
+    )
+    materials = _finish_wide(wide_by_year(materials, annees, MATERIAL_METRICS))
+
+    return {"yearly": yearly, "monthly": monthly, "suppliers": suppliers, "materials": materials}
@@ -0,0 +1,196 @@
+import numpy as np
+import plotly.graph_objects as go
+import streamlit as st
+from format1 import *
+from table1 import *
+from chart1 import *
+from period1 import *
+
+
+# Grain de la grille des commandes
+PRODLINE_GRID_KEYS = ["Year", "Month", "Nom du fournisseur", "Fournisseur", "Prodline Name"]
+
+# Palettes des camemberts par gamme
+PIE_PALETTE_BLUE = [
+    '#2E4057', '#083D77', '#4D6A92', '#006E90', '#4F86C6',
+    '#5C4A72', '#7E5A9B', '#9B5094', '#B64E97', '#D34B99',
+    '#7E7B52', '#938B4A', '#A89A42', '#BDAA3A', '#D1BB32'
+]
+PIE_PALETTE_VIOLET = [
+    '#5D4E7B', '#8A7AAF', '#A799CE', '#C4BAE0', '#D3C4E3',
+    '#26495C', '#4C86A8', '#68B0AB', '#8FC0A9', '#C8D5B9',
+    '#AC3B61', '#D63B77', '#EF5D92', '#F283B6', '#FBAFC4'
+]
+PIE_PALETTE_CATEGORY = [
+    '#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd',
+    '#8c564b', '#e377c2', '#7f7f7f', '#bcbd22', '#17becf'
+]
+
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def prodline_grid(df):
+    """Agrège une seule fois les commandes par (année, mois, fournisseur, gamme)
+
+    Quantités et valeurs s'additionnent d'une cellule à l'autre. Le nombre de commandes
+    distinctes ne s'additionne pas (une commande peut couvrir plusieurs mois ou gammes) :
+    il est compté sur la table dédoublonnée des paires (cellule, bon de commande).
+    La grille est partagée entre les réexécutions et ne doit pas être modifiée.
+
+    Args:
+        df: DataFrame des commandes, filtré par statut, gamme et type VC mais pas par année,
+            mois ni fournisseur (ces filtres sont des périmètres de prodline_breakdown)
+
+    Returns:
+        Dictionnaire : "cells" (colonnes de PRODLINE_GRID_KEYS, "qte_totale", "valeur_totale")
+        et "orders" (colonnes de PRODLINE_GRID_KEYS et "Bons de commande", sans doublons)
+    """
+    cells = df.groupby(PRODLINE_GRID_KEYS, dropna=False, observed=True).agg(
+        qte_totale=("Order Quantity", "sum"),
+        valeur_totale=("Valeur nette de la commande", "sum")
+    ).reset_index()
+    orders = df[PRODLINE_GRID_KEYS + ["Bons de commande"]].drop_duplicates().reset_index(drop=True)
+    return {"cells": cells, "orders": orders}
+
+
+def _scope_mask(table, year=None, month=None, supplier=None, period=None):
+    """Masque des lignes de la grille comprises dans un périmètre"""
+    masque = np.ones(len(table), dtype=bool)
+    if period is not None:
+        mois = table["Year"].to_numpy() * 12 + table["Month"].to_numpy() - 1
+        debut = period["start"].year * 12 + period["start"].month - 1
+        fin = period["end"].year * 12 + period["end"].month - 1
+        masque &= (mois >= debut) & (mois < fin)
+    if year is not None:
+        masque &= table["Year"].to_numpy() == year
+    if month is not None:
+        masque &= table["Month"].to_numpy() == month
+    if supplier is not None:
+        masque &= ((table["Nom du fournisseur"] == supplier) | (table["Fournisseur"] == supplier)).to_numpy()
+    return masque
+
+
+def _is_monthly(period):
+    """Indique si une période est faite de mois entiers (réponse possible depuis la grille)"""
+    return period["start"].day == 1 and period["end"].day == 1
+
+
+def prodline_breakdown(df, year=None, month=None, supplier=None, period=None):
+    """Répartition par gamme (commandes, quantité, valeur) pour un périmètre quelconque
+
+    Le périmètre est agrégé à partir de la grille (année, mois, fournisseur, gamme), sans
+    relire les lignes de commande. Seules les périodes qui ne tombent pas sur des mois entiers
+    (plage de dates, derniers jours) sont calculées sur la tranche de lignes correspondante.
+
+    Args:
+        df: DataFrame des commandes, non filtré par année, mois ni fournisseur
+        year: année (toutes si None)
+        month: mois (tous si None)
+        supplier: nom ou code du fournisseur (tous si None)
+        period: période construite par make_period (remplace year et month)
+
+    Returns:
+        DataFrame trié par valeur décroissante : "Prodline Name", "nb_commandes", "qte_totale", "valeur_totale"
+    """
+    if period is not None and not _is_monthly(period):
+        lignes, = period_slices(df, 'Date du document', period)
+        grid = prodline_grid(lignes)
+        scope = dict(supplier=supplier)
+    else:
+        grid = prodline_grid(df)
+        scope = dict(year=year, month=month, supplier=supplier, period=period)
+
+    cells = grid["cells"][_scope_mask(grid["cells"], **scope)]
+    orders = grid["orders"][_scope_mask(grid["orders"], **scope)]
+    summary = cells.groupby("Prodline Name")[["qte_totale", "valeur_totale"]].sum()
+    summary.insert(0, "nb_commandes", orders.groupby("Prodline Name")["Bons de commande"].nunique())
+    summary["nb_commandes"] = summary["nb_commandes"].fillna(0).astype(int)
+    return summary.reset_index().sort_values(by="valeur_totale", ascending=False)
+
+
+def prodline_labels(summary):
+    """Libellés des parts du camembert, construits en bloc (gamme, valeur, unités, commandes)"""
+    return (
+        summary["Prodline Name"].astype(str) + ": " + format_currency_array(summary["valeur_totale"].to_numpy())
+        + "<br>(" + summary["qte_totale"].astype(int).astype(str) + " unités, "
+        + summary["nb_commandes"].astype(int).astype(str) + " commandes)"
+    )
+
+
+def build_prodline_pie(prodline_summary, title, palette, height=500, legend_y=-0.4):
+    """Camembert de la valeur par gamme, avec le total au centre"""
+    fig_pie = go.Figure(data=[go.Pie(
+        labels=prodline_summary['Prodline Name'],
+        values=prodline_summary['valeur_totale'],
+        text=prodline_labels(prodline_summary),
+        hoverinfo='text',
+        textinfo='percent',
+        hole=0.4,
+        marker=dict(colors=palette, line=dict(color='#FFFFFF', width=1.5)),
+        textfont=dict(size=14),
+        rotation=45
+    )])
+
+    # Mise en forme du graphique
+    fig_pie.update_layout(
+        title={
+            'text': title,
+            'font': {'size': 13, 'color': '#505050'},
+            'y': 0.95
+        },
+        legend=dict(
+            orientation='h',
+            yanchor='bottom',
+            y=legend_y,
+            xanchor='center',
+            x=0.5,
+            font=dict(size=12)
+        ),
+        height=height,
+        template='plotly_white',
+        margin=dict(t=80, b=80, l=40, r=40)
+    )
+
+    # Ajouter des annotations au centre du camembert
+    fig_pie.add_annotation(
+        text=f"<b>Total<br>{format_currency_array([prodline_summary['valeur_totale'].sum()])[0]}</b>",
+        x=0.5, y=0.5,
+        font=dict(size=16, color='#505050'),
+        showarrow=False
+    )
+    return fig_pie
+
+
+def show_prodline_breakdown(prodline_summary, title, palette=PIE_PALETTE_VIOLET, height=500, legend_y=-0.4):
+    """Affiche le camembert par gamme et le tableau récapitulatif d'une répartition déjà calculée"""
+    st.markdown("<h6 style='color: #000000; margin-top: 20px;'>Répartition par Gamme de Produits</h6>", unsafe_allow_html=True)
+
+    # Afficher le graphique (reconstruit uniquement si ses données changent)
+    st.plotly_chart(
+        cached_figure(build_prodline_pie, prodline_summary, title, palette, height=height, legend_y=legend_y),
+        use_container_width=True
+    )
+
+    # Ajouter un expander avec le tableau récapitulatif
+    with st.expander("📊 Détail par gamme de produits", expanded=False):
+        prodline_table = prodline_summary[['Prodline Name', 'nb_commandes', 'qte_totale', 'valeur_totale']].rename(columns={
+            "Prodline Name": "Gamme de Produits",
+            "nb_commandes": "Commandes",
+            "qte_totale": "Quantité",
+            "valeur_totale": "Valeur Totale"
+        })
+
+        # Formatage délégué à la grille (les valeurs restent numériques)
+        prodline_columns_config = numeric_column_config(
+            currency=["Valeur Totale"],
+            integers=["Quantité", "Commandes"]
+        )
+
+        # Couleurs par colonne, calculées une seule fois pour tout le tableau
+        prodline_column_styles = {
+            'Gamme de Produits': 'background-color: #e8f5e9; font-weight: bold',
+            'Commandes': 'background-color: #e1f5fe',
+            'Quantité': 'background-color: #fff8e1',
+            'Valeur Totale': 'background-color: #fce4ec; font-weight: bold'
+        }
+
+        render_table(prodline_table, column_styles=prodline_column_styles, column_config=prodline_columns_config)
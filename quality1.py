@@ -0,0 +1,251 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+from file1 import *
+
+
+# Actions possibles d'une règle : les lignes rejetées ou exclues sont retirées, les lignes signalées conservées
+QUALITY_REJECT = "Rejet"
+QUALITY_EXCLUDE = "Exclusion"
+QUALITY_FLAG = "Signalement"
+
+# Politiques de traitement des doublons (lignes répétées par des extractions qui se recouvrent)
+DEDUP_POLICIES = {
+    "signaler": "Signaler seulement",
+    "exacts": "Retirer les doublons exacts",
+    "cle": "Retirer aussi les doublons de clé (première occurrence conservée)"
+}
+DEDUP_DEFAULT = "exacts"
+
+# Tests disponibles pour les règles : (valeurs converties, valeurs lues dans le fichier, règle) -> masque des violations
+QUALITY_TESTS = {
+    "manquant": lambda valeurs, brutes, regle: brutes.isna(),
+    "illisible": lambda valeurs, brutes, regle: valeurs.isna() & brutes.notna(),
+    "valeur": lambda valeurs, brutes, regle: valeurs.isin(regle["Valeurs"]),
+    "annee": lambda valeurs, brutes, regle: valeurs.dt.year.isin(regle["Valeurs"])
+}
+
+
+def _as_text(values):
+    """Convertit une colonne en texte (valeurs manquantes -> chaîne vide) pour le rapport des rejets"""
+    return values.astype(str).where(values.notna().to_numpy(), "")
+
+
+def validate_frame(df, rules, source=None):
+    """Évalue un jeu de règles déclaratif en une passe et sépare les lignes rejetées
+
+    Chaque règle est un dictionnaire {"Règle", "Colonne", "Test", "Action"} (plus "Valeurs"
+    pour les tests "valeur" et "annee"). Tous les masques sont calculés sur les colonnes
+    entières et empilés dans une matrice lignes x règles : le nombre de violations de chaque
+    règle est la somme de sa colonne, et une ligne est retirée dès qu'une règle de rejet ou
+    d'exclusion la vise (la première de la liste donne le motif). Les règles dont la colonne
+    est absente sont ignorées.
+
+    Args:
+        df: DataFrame lu, colonnes déjà converties (dates, nombres)
+        rules: liste des règles, dans l'ordre de priorité des motifs
+        source: DataFrame des valeurs lues avant conversion (mêmes noms de colonnes, même
+            index), pour distinguer une valeur manquante d'une valeur illisible
+
+    Returns:
+        (DataFrame des lignes conservées, rapport) ; le rapport contient "Lignes lues",
+        "Règles" (violations par règle) et "Rejets" (lignes retirées, en texte, avec leur
+        numéro de ligne Excel et le motif)
+    """
+    if source is None:
+        source = df
+    regles = [regle for regle in rules if regle["Colonne"] in df.columns]
+    masques = [
+        np.asarray(QUALITY_TESTS[regle["Test"]](
+            df[regle["Colonne"]],
+            source[regle["Colonne"]] if regle["Colonne"] in source.columns else df[regle["Colonne"]],
+            regle
+        ), dtype=bool)
+        for regle in regles
+    ]
+    return _apply_masks(df, regles, masques, source)
+
+
+def _apply_masks(df, regles, masques, source, extra=None):
+    """Compte les violations de chaque règle, retire les lignes visées et construit le rapport
+
+    Args:
+        df: DataFrame évalué (index du fichier lu : le numéro de ligne Excel en découle)
+        regles: règles évaluées
+        masques: masque des violations de chaque règle, aligné sur df
+        source: DataFrame des valeurs lues avant conversion
+        extra: colonnes supplémentaires du rapport des rejets {nom: tableau aligné sur df}
+
+    Returns:
+        (DataFrame des lignes conservées, rapport)
+    """
+    matrice = np.column_stack(masques) if masques else np.zeros((len(df), 0), dtype=bool)
+    violations = matrice.sum(axis=0)
+
+    retrait = [i for i, regle in enumerate(regles) if regle["Action"] != QUALITY_FLAG]
+    sous_matrice = matrice[:, retrait]
+    retirees = sous_matrice.any(axis=1)
+    motifs = np.argmax(sous_matrice, axis=1)[retirees] if retrait else np.zeros(0, dtype=int)
+
+    synthese = pd.DataFrame({
+        "Règle": [regle["Règle"] for regle in regles],
+        "Colonne": [regle["Colonne"] for regle in regles],
+        "Action": [regle["Action"] for regle in regles],
+        "Lignes": violations,
+        "Part (%)": violations / max(len(df), 1) * 100
+    })
+
+    # Lignes retirées : valeurs telles que lues dans le fichier, sous forme de texte
+    positions = np.flatnonzero(retirees)
+    rejets = pd.DataFrame({"Ligne Excel": np.asarray(df.index)[positions] + 2})
+    rejets["Motif"] = pd.Categorical.from_codes(motifs, categories=[regles[i]["Règle"] for i in retrait])
+    for nom, valeurs in (extra or {}).items():
+        rejets[nom] = np.asarray(valeurs)[positions]
+    for col in df.columns:
+        valeurs = source[col] if col in source.columns else df[col]
+        rejets[col] = _as_text(valeurs.iloc[positions]).to_numpy()
+
+    rapport = {"Lignes lues": len(df), "Règles": synthese, "Rejets": rejets}
+    return (df[~retirees] if retirees.any() else df), rapport
+
+
+def row_hashes(df, columns=None):
+    """Empreinte 64 bits de chaque ligne sur les colonnes données (toutes par défaut), sans tenir compte de l'index"""
+    return pd.util.hash_pandas_object(df[list(columns)] if columns is not None else df, index=False).to_numpy()
+
+
+def duplicate_masks(df, keys):
+    """Repère en une passe les doublons exacts et les doublons de clé métier
+
+    Les lignes sont triées une seule fois sur (empreinte de la clé, empreinte de la ligne) ;
+    les groupes s'obtiennent en comparant chaque ligne triée à la précédente. Le tri étant
+    stable, la première occurrence (dans l'ordre du fichier) de chaque groupe est conservée :
+    - doublon exact : même contenu qu'une ligne précédente ;
+    - doublon de clé : même clé que la première ligne de son groupe, mais contenu différent.
+
+    Args:
+        df: DataFrame à contrôler
+        keys: colonnes de la clé métier
+
+    Returns:
+        (masque des doublons exacts, masque des doublons de clé, position de la première ligne
+        identique à chaque ligne, position de la première ligne de son groupe de clé)
+    """
+    cles = row_hashes(df, keys)
+    lignes = row_hashes(df)
+    ordre = np.lexsort((lignes, cles))
+    cles_triees, lignes_triees = cles[ordre], lignes[ordre]
+
+    debut_cle = np.ones(len(df), dtype=bool)
+    debut_cle[1:] = cles_triees[1:] != cles_triees[:-1]
+    debut_ligne = debut_cle.copy()
+    debut_ligne[1:] |= lignes_triees[1:] != lignes_triees[:-1]
+
+    # Première ligne (dans l'ordre du fichier) de chaque groupe de clé
+    groupes = np.cumsum(debut_cle) - 1
+    premieres = np.minimum.reduceat(ordre, np.flatnonzero(debut_cle)) if len(df) else np.zeros(0, dtype=int)
+    premiere_cle = premieres[groupes]
+    # Première ligne de chaque suite de lignes identiques : le tri étant stable, c'est la tête de la suite
+    premiere_ligne = ordre[np.flatnonzero(debut_ligne)][np.cumsum(debut_ligne) - 1]
+
+    exact = np.empty(len(df), dtype=bool)
+    exact[ordre] = ~debut_ligne
+    identique = np.empty(len(df), dtype=int)
+    identique[ordre] = premiere_ligne
+    meme_cle = np.empty(len(df), dtype=int)
+    meme_cle[ordre] = premiere_cle
+    cle = (np.arange(len(df)) != meme_cle) & ~exact
+    return exact, cle, identique, meme_cle
+
+
+def deduplicate(df, keys, policy=DEDUP_DEFAULT):
+    """Étape d'import : détecte les doublons d'un fichier et applique la politique choisie
+
+    Args:
+        df: DataFrame validé (index du fichier lu)
+        keys: colonnes de la clé métier d'une ligne
+        policy: clé de DEDUP_POLICIES
+
+    Returns:
+        (DataFrame sans les doublons retirés, rapport au format de validate_frame ; les rejets
+        indiquent la ligne Excel de l'occurrence conservée)
+    """
+    exact, cle, identique, meme_cle = duplicate_masks(df, keys)
+    # Ligne réellement conservée : la première du groupe de clé si les doublons de clé sont
+    # retirés, sinon la première ligne identique (un doublon de clé restant alors en place)
+    conservee = meme_cle if policy == "cle" else np.where(exact, identique, meme_cle)
+    regles = [
+        {"Règle": "Doublon exact", "Colonne": "Toutes",
+         "Action": QUALITY_FLAG if policy == "signaler" else QUALITY_REJECT},
+        {"Règle": "Doublon de clé", "Colonne": ", ".join(keys),
+         "Action": QUALITY_REJECT if policy == "cle" else QUALITY_FLAG}
+    ]
+    extra = {"Ligne conservée": np.asarray(df.index)[conservee] + 2}
+    return _apply_masks(df, regles, [exact, cle], df, extra=extra)
+
+
+def merge_reports(reports):
+    """Regroupe les rapports de validation de plusieurs étapes et fichiers
+
+    Args:
+        reports: liste de couples (nom du fichier, rapport de validate_frame) ; les rapports
+            None (fichier non chargé) sont ignorés
+
+    Returns:
+        Dictionnaire {"Lignes lues": {fichier: lignes}, "Règles": DataFrame avec la colonne
+        "Fichier", "Rejets": {fichier: DataFrame des lignes retirées}}
+    """
+    lues, regles, rejets = {}, [], {}
+    for fichier, rapport in reports:
+        if rapport is None:
+            continue
+        lues.setdefault(fichier, rapport["Lignes lues"])
+        regles.append(rapport["Règles"].assign(Fichier=fichier))
+        if not rapport["Rejets"].empty:
+            rejets[fichier] = pd.concat([rejets[fichier], rapport["Rejets"]]) if fichier in rejets else rapport["Rejets"]
+    regles = pd.concat(regles, ignore_index=True) if regles else pd.DataFrame()
+    if not regles.empty:
+        regles = regles[["Fichier", "Règle", "Colonne", "Action", "Lignes", "Part (%)"]]
+    return {"Lignes lues": lues, "Règles": regles, "Rejets": rejets}
+
+
+def show_quality_report(report):
+    """Affiche le bilan de la validation des fichiers importés et les lignes rejetées
+
+    Args:
+        report: rapport de merge_reports (rien n'est affiché s'il est absent)
+    """
+    if not report or report["Règles"].empty:
+        return
+    regles = report["Règles"]
+    signalees = regles.loc[regles["Action"] == QUALITY_FLAG, "Lignes"].sum()
+    nb_rejets = sum(len(rejets) for rejets in report["Rejets"].values())
+
+    titre = f"🧹 Qualité des données importées ({format_number_array([nb_rejets])[0]} lignes retirées)"
+    with st.expander(titre, expanded=False):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            display_metric_card("Lignes lues", format_number_array([sum(report["Lignes lues"].values())])[0], color="#4527A0")
+        with col2:
+            display_metric_card("Lignes retirées", format_number_array([nb_rejets])[0], color="#C62828")
+        with col3:
+            display_metric_card("Valeurs signalées", format_number_array([signalees])[0], color="#F9A825")
+        st.caption(
+            "Une ligne peut enfreindre plusieurs règles : elle est comptée pour chacune, mais retirée une seule fois "
+            "(motif = première règle de rejet ou d'exclusion enfreinte). Les lignes signalées sont conservées, "
+            "leur valeur étant complétée ou laissée vide."
+        )
+        render_table(
+            regles,
+            row_styles={"Lignes": gradient_styles(regles["Lignes"], cmap="Reds", vmin=0)},
+            column_config=numeric_column_config(thousands=["Lignes"], percent=["Part (%)"])
+        )
+        for fichier, rejets in report["Rejets"].items():
+            st.markdown(f"<h6>Lignes retirées : {fichier}</h6>", unsafe_allow_html=True)
+            paged_table(
+                rejets,
+                key=f"qualite_{fichier}",
+                column_config=numeric_column_config(integers=["Ligne Excel", "Ligne conservée"]),
+                filter_columns=["Motif"],
+                file_name=f"rejets_{fichier.lower().replace(' ', '_')}.csv"
+            )
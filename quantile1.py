@@ -0,0 +1,239 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+from format1 import *
+from table1 import *
+from chart1 import data_fingerprint
+
+
+# Quantiles affichés (P50, P90, P95)
+QUANTILES = (0.5, 0.9, 0.95)
+
+# Mesures résumées par les sketches (colonnes du fichier des délais)
+SKETCH_MEASURES = ["Délai réel", "Écart de délai"]
+
+# Colonnes définissant une cellule de sketch : tout filtre de la barre latérale est une union de cellules
+SKETCH_CELLS = ["Year", "Month", "Nom du fournisseur", "Prodline Name", "Drop Statut", "Type VC"]
+
+# Précision relative des sketches : une valeur restituée est à ±1 % de la valeur exacte
+SKETCH_ACCURACY = 0.01
+_GAMMA = (1 + SKETCH_ACCURACY) / (1 - SKETCH_ACCURACY)
+
+
+def sketch_buckets(values):
+    """Numéro de classe logarithmique de chaque valeur (sketch à précision relative, type DDSketch)
+
+    La classe k > 0 couvre les valeurs de ]γ^(k-2), γ^(k-1)], la classe -k leurs opposées,
+    et la classe 0 les valeurs de moins d'un jour en valeur absolue (γ = (1 + α) / (1 - α)).
+    """
+    values = np.asarray(values, dtype=float)
+    absolues = np.abs(values)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rangs = np.ceil(np.log(absolues) / np.log(_GAMMA) - 1e-9) + 1
+    rangs = np.where(absolues >= 1, rangs, 0)
+    return (np.sign(values) * rangs).astype(int)
+
+
+def bucket_values(buckets):
+    """Valeur représentative de chaque classe : erreur relative d'au plus α sur toute la classe"""
+    buckets = np.asarray(buckets)
+    rangs = np.abs(buckets)
+    return np.where(rangs > 0, np.sign(buckets) * 2 * _GAMMA ** (rangs - 1) / (_GAMMA + 1), 0.0)
+
+
+def build_delay_sketches(df, fingerprint=None):
+    """Construit une seule fois par jeu de données les sketches de délais par cellule
+
+    Chaque cellule (année, mois, fournisseur, gamme, statut, type VC) conserve, pour chaque
+    mesure, le nombre de lignes par classe logarithmique. Les sketches se fusionnent par
+    simple addition des effectifs : toute sélection est répondue sans relire les lignes.
+    Le résultat est partagé entre les réexécutions de la page et ne doit pas être modifié.
+
+    Args:
+        df: DataFrame des délais de livraison (complet)
+        fingerprint: empreinte identifiant df, calculée une fois à l'import ; sans elle,
+            toutes les lignes de df sont hachées à chaque appel
+
+    Returns:
+        DataFrame long : colonnes des cellules, "Mesure", "Classe" et "Lignes"
+    """
+    return _delay_sketches(fingerprint or data_fingerprint(df), df)
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _delay_sketches(fingerprint, _df):
+    """Sketches de build_delay_sketches, mis en cache sous l'empreinte (_df n'est pas haché)"""
+    cellules = [col for col in SKETCH_CELLS if col in _df.columns]
+    sketches = []
+    for mesure in SKETCH_MEASURES:
+        valeurs = pd.to_numeric(_df[mesure], errors="coerce")
+        valides = valeurs.notna().to_numpy()
+        donnees = _df.loc[valides, cellules].copy()
+        donnees["Classe"] = sketch_buckets(valeurs[valides])
+        effectifs = donnees.groupby(cellules + ["Classe"], dropna=False, observed=True).size()
+        effectifs = effectifs.rename("Lignes").reset_index()
+        effectifs.insert(len(cellules), "Mesure", mesure)
+        sketches.append(effectifs)
+    sketches = pd.concat(sketches, ignore_index=True)
+    # Colonnes catégorielles : filtres et regroupements rapides lors des fusions
+    for col in cellules + ["Mesure"]:
+        sketches[col] = sketches[col].astype("category")
+    return sketches
+
+
+def selection_mask(cells, selection=None):
+    """Masque des cellules d'une sélection
+
+    Args:
+        cells: DataFrame des colonnes de cellule
+        selection: dictionnaire {colonne: valeur ou liste de valeurs}, None = tout ; une clé
+            tuple de colonnes reçoit une liste de tuples de valeurs, par exemple
+            {("Year", "Month"): [(2023, 11), (2024, 1)]} pour les mois d'une période
+
+    Returns:
+        Tableau NumPy de booléens aligné sur cells (colonnes absentes et valeurs None ignorées)
+    """
+    masque = np.ones(len(cells), dtype=bool)
+    for col, valeur in (selection or {}).items():
+        colonnes = list(col) if isinstance(col, tuple) else [col]
+        if valeur is None or not set(colonnes) <= set(cells.columns):
+            continue
+        if isinstance(col, tuple):
+            masque &= pd.MultiIndex.from_frame(cells[colonnes]).isin(list(valeur))
+        else:
+            valeurs = valeur if isinstance(valeur, (list, tuple, set)) else [valeur]
+            masque &= cells[col].isin(valeurs).to_numpy()
+    return masque
+
+
+def merge_sketches(sketches, measure, selection=None, by=()):
+    """Fusionne les sketches des cellules d'une sélection (addition des effectifs par classe)
+
+    Args:
+        sketches: sketches construits par build_delay_sketches
+        measure: mesure à résumer ("Délai réel" ou "Écart de délai")
+        selection: sélection de cellules (voir selection_mask), None = tout
+        by: colonnes de cellule par lesquelles regrouper (un sketch fusionné par groupe)
+
+    Returns:
+        DataFrame : colonnes by, "Classe" et "Lignes"
+    """
+    masque = (sketches["Mesure"] == measure).to_numpy() & selection_mask(sketches, selection)
+    return sketches[masque].groupby(list(by) + ["Classe"], dropna=False, observed=True)["Lignes"].sum().reset_index()
+
+
+def sketch_quantiles(merged, by=(), quantiles=QUANTILES):
+    """Quantiles de chaque groupe à partir de sketches fusionnés
+
+    Le quantile q est la valeur de rang ⌈q·(n-1)⌉ + 1 parmi les n lignes du groupe (définition
+    « higher » de pandas). La valeur renvoyée
+    est à ±α (1 %) de la valeur exacte de ce rang, ou à moins d'un jour si celle-ci est inférieure
+    à un jour en valeur absolue ; l'erreur ne dépend ni du nombre de lignes ni des fusions.
+
+    Returns:
+        DataFrame indexé par by (une seule ligne si by est vide) : "Lignes" puis "P50", "P90"...
+    """
+    by = list(by)
+    colonnes = ["Lignes"] + [f"P{round(q * 100)}" for q in quantiles]
+    if merged.empty:
+        return pd.DataFrame(columns=colonnes)
+
+    tri = merged.sort_values(by + ["Classe"], kind="mergesort", na_position="last")
+    groupes = tri.groupby(by, dropna=False, observed=True).ngroup().to_numpy() if by else np.zeros(len(tri), dtype=int)
+    effectifs = tri["Lignes"].to_numpy()
+    cumul = pd.Series(effectifs).groupby(groupes).cumsum().to_numpy()
+    totaux = np.bincount(groupes, weights=effectifs)
+    valeurs = bucket_values(tri["Classe"].to_numpy())
+
+    # Première ligne de chaque groupe (les groupes sont contigus après le tri)
+    debuts = np.flatnonzero(np.r_[True, groupes[1:] != groupes[:-1]])
+    index = pd.MultiIndex.from_frame(tri[by].iloc[debuts]) if len(by) > 1 else \
+        pd.Index(tri[by[0]].iloc[debuts]) if by else pd.RangeIndex(1)
+    resultat = pd.DataFrame({"Lignes": totaux.astype(int)}, index=index)
+    for q, nom in zip(quantiles, colonnes[1:]):
+        # Première classe dont l'effectif cumulé atteint le rang du quantile
+        rangs = np.ceil(q * (totaux - 1) - 1e-9) + 1
+        atteint = np.flatnonzero(cumul >= rangs[groupes])
+        _, premiers = np.unique(groupes[atteint], return_index=True)
+        resultat[nom] = valeurs[atteint[premiers]]
+    return resultat
+
+
+def selection_quantiles(sketches, selection=None, by=(), quantiles=QUANTILES):
+    """Quantiles du délai réel et de l'écart pour une sélection, regroupés selon by
+
+    Returns:
+        DataFrame indexé par by : "Lignes", puis "Délai réel P50"... et "Écart P50"...
+    """
+    tables = []
+    for mesure in SKETCH_MEASURES:
+        table = sketch_quantiles(merge_sketches(sketches, mesure, selection, by), by, quantiles)
+        prefixe = "Écart" if mesure == "Écart de délai" else mesure
+        tables.append(table.drop(columns="Lignes").add_prefix(f"{prefixe} "))
+        if mesure == SKETCH_MEASURES[0]:
+            lignes = table["Lignes"]
+    return pd.concat([lignes] + tables, axis=1)
+
+
+def exact_quantiles(df, by, quantiles=QUANTILES):
+    """Quantiles exacts (même définition de rang que les sketches) sur des lignes déjà filtrées"""
+    colonnes = {"Lignes": pd.to_numeric(df[SKETCH_MEASURES[0]], errors="coerce").groupby([df[col] for col in by]).count()}
+    for mesure in SKETCH_MEASURES:
+        prefixe = "Écart" if mesure == "Écart de délai" else mesure
+        valeurs = pd.to_numeric(df[mesure], errors="coerce")
+        groupes = valeurs.groupby([df[col] for col in by])
+        for q in quantiles:
+            colonnes[f"{prefixe} P{round(q * 100)}"] = groupes.quantile(q, interpolation="higher")
+    return pd.DataFrame(colonnes)
+
+
+def show_delay_quantiles(df, selection, lines=None, fingerprint=None):
+    """Affiche les quantiles (P50, P90, P95) du délai réel et de l'écart pour la sélection courante
+
+    Sans fournisseur sélectionné, le détail est donné par fournisseur ; sinon par gamme,
+    et par matériel à partir des lignes du fournisseur (calcul exact, peu de lignes).
+
+    Args:
+        df: DataFrame des délais de livraison complet (sketches construits une fois)
+        selection: dictionnaire {colonne de cellule: valeur ou liste}, None pour « tous »
+        lines: lignes filtrées du fournisseur sélectionné (détail par matériel)
+        fingerprint: empreinte de df (voir build_delay_sketches)
+    """
+    sketches = build_delay_sketches(df, fingerprint)
+    global_table = selection_quantiles(sketches, selection)
+    if global_table.empty or not global_table["Lignes"].sum():
+        return
+
+    st.markdown("<h5 style='text-align: center;'>📊 Distribution des délais (P50 / P90 / P95)</h5>", unsafe_allow_html=True)
+    st.caption(
+        f"Valeurs approchées à ±{SKETCH_ACCURACY:.0%} près (à moins d'un jour pour les valeurs "
+        "inférieures à un jour), calculées par fusion de résumés mensuels."
+    )
+
+    ligne = global_table.iloc[0]
+    colonnes = st.columns(6)
+    for col, nom in zip(colonnes, [c for c in global_table.columns if c != "Lignes"]):
+        with col:
+            st.metric(f"{nom} (j)", f"{ligne[nom]:.1f}")
+
+    decimales = {col: 1 for col in global_table.columns if col != "Lignes"}
+    config = numeric_column_config(thousands=["Lignes"], decimals=decimales)
+    if selection.get("Nom du fournisseur") is None:
+        par_fournisseur = selection_quantiles(sketches, selection, by=["Nom du fournisseur"])
+        par_fournisseur = par_fournisseur.sort_values("Écart P90", ascending=False).reset_index()
+        with st.expander("Quantiles par fournisseur", expanded=False):
+            paged_table(par_fournisseur, key="quantiles_fournisseurs", column_config=config,
+                        file_name="quantiles_fournisseurs.csv")
+        return
+
+    par_gamme = selection_quantiles(sketches, selection, by=["Prodline Name"])
+    par_gamme = par_gamme.reset_index().rename(columns={"Prodline Name": "Gamme"})
+    with st.expander("Quantiles par gamme", expanded=False):
+        render_table(par_gamme, column_config=config)
+
+    if lines is not None and not lines.empty:
+        par_materiel = exact_quantiles(lines, ["Matériel", "Description du matériel"])
+        par_materiel = par_materiel.sort_values("Écart P90", ascending=False).reset_index()
+        with st.expander("Quantiles par matériel (exacts)", expanded=False):
+            paged_table(par_materiel, key="quantiles_materiels", column_config=config,
+                        file_name="quantiles_materiels.csv")
@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+
+
+# Fenêtres glissantes (en mois) des indicateurs de tendance
+ROLLING_MONTHS = (3, 6, 12)
+
+# Une ligne est livrée à temps si son écart est d'au plus 1 jour (statuts « En avance » et « À temps »)
+ON_TIME_MAX_GAP = 1
+
+
+def monthly_grid(df, keys):
+    """Agrège les lignes de livraison sur une grille complète (groupe x mois)
+
+    Chaque groupe (fournisseur, fournisseur x gamme...) reçoit une colonne par mois entre
+    le premier et le dernier mois des données, y compris les mois sans livraison (à zéro).
+
+    Args:
+        df: DataFrame des délais (colonnes Year, Month et "Écart de délai")
+        keys: colonnes définissant les groupes
+
+    Returns:
+        (index des groupes, mois (Timestamp du premier jour), dictionnaire de tableaux
+        NumPy groupes x mois : "lignes", "a_temps", "somme_ecart", "nb_ecart")
+    """
+    keys = list(keys)
+    df = df.dropna(subset=["Year", "Month"])
+    donnees = df[keys + ["Year", "Month"]].copy()
+    ecart = pd.to_numeric(df["Écart de délai"], errors="coerce")
+    donnees["_mois"] = (donnees["Year"].astype(int) * 12 + donnees["Month"].astype(int) - 1).to_numpy()
+    donnees["lignes"] = 1
+    donnees["a_temps"] = (ecart <= ON_TIME_MAX_GAP).astype(int).to_numpy()
+    donnees["somme_ecart"] = ecart.fillna(0).to_numpy()
+    donnees["nb_ecart"] = ecart.notna().astype(int).to_numpy()
+
+    agrege = donnees.groupby(keys + ["_mois"], observed=True)[["lignes", "a_temps", "somme_ecart", "nb_ecart"]].sum()
+
+    premier, dernier = int(donnees["_mois"].min()), int(donnees["_mois"].max())
+    colonnes_mois = np.arange(premier, dernier + 1)
+    tableaux = {
+        mesure: agrege[mesure].unstack("_mois", fill_value=0).reindex(columns=colonnes_mois, fill_value=0)
+        for mesure in ["lignes", "a_temps", "somme_ecart", "nb_ecart"]
+    }
+    groupes = tableaux["lignes"].index
+    mois = pd.to_datetime({"year": colonnes_mois // 12, "month": colonnes_mois % 12 + 1, "day": 1})
+    return groupes, pd.DatetimeIndex(mois), {m: t.to_numpy(dtype=float) for m, t in tableaux.items()}
+
+
+def _window_sums(values, window):
+    """Sommes glissantes sur les `window` derniers mois (axe des colonnes) par différence de cumuls"""
+    cumul = np.concatenate([np.zeros((values.shape[0], 1)), np.cumsum(values, axis=1)], axis=1)
+    debut = np.maximum(np.arange(values.shape[1]) + 1 - window, 0)
+    return cumul[:, 1:] - cumul[:, debut]
+
+
+def rolling_metrics(df, keys=("Nom du fournisseur",), windows=ROLLING_MONTHS):
+    """Taux de livraison à temps et écart moyen glissants, pour tous les groupes à la fois
+
+    Les indicateurs sont calculés à partir de la grille mensuelle par différences de sommes
+    cumulées : aucune boucle par fournisseur, quel que soit leur nombre.
+    Une fenêtre sans livraison donne NaN.
+
+    Args:
+        df: DataFrame des délais (lignes de livraison)
+        keys: colonnes définissant les groupes (fournisseur, fournisseur x gamme...)
+        windows: tailles des fenêtres en mois
+
+    Returns:
+        DataFrame long : colonnes des groupes, "Mois", puis pour chaque fenêtre w
+        "Lignes {w} mois", "À temps {w} mois (%)" et "Écart {w} mois"
+    """
+    if df.empty:
+        return pd.DataFrame(columns=list(keys) + ["Mois"])
+
+    groupes, mois, tableaux = monthly_grid(df, keys)
+    resultat = {}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for w in windows:
+            lignes = _window_sums(tableaux["lignes"], w)
+            resultat[f"Lignes {w} mois"] = lignes
+            resultat[f"À temps {w} mois (%)"] = np.where(lignes > 0, _window_sums(tableaux["a_temps"], w) / lignes * 100, np.nan)
+            nb_ecart = _window_sums(tableaux["nb_ecart"], w)
+            resultat[f"Écart {w} mois"] = np.where(nb_ecart > 0, _window_sums(tableaux["somme_ecart"], w) / nb_ecart, np.nan)
+
+    # Mise à plat (groupe, mois) dans l'ordre des groupes puis des mois
+    tendances = groupes.repeat(len(mois)).to_frame(index=False)
+    tendances["Mois"] = np.tile(mois.to_numpy(), len(groupes))
+    for nom, valeurs in resultat.items():
+        tendances[nom] = valeurs.ravel()
+    return tendances
+
+
+def latest_rolling_metrics(df, keys=("Nom du fournisseur",), windows=ROLLING_MONTHS, end=None):
+    """Indicateurs glissants de chaque groupe au dernier mois des données (ou au mois `end`)
+
+    Seules les dernières colonnes de la grille mensuelle (jusqu'au mois `end` inclus) sont
+    sommées : pour que les fenêtres couvrent bien 3, 6 ou 12 mois, df doit contenir l'historique
+    antérieur à `end`, pas seulement l'année affichée.
+
+    Args:
+        df: DataFrame des délais (historique complet)
+        keys: colonnes définissant les groupes
+        windows: fenêtres en mois
+        end: dernier mois des fenêtres (Timestamp ou date, seuls l'année et le mois comptent)
+
+    Returns:
+        DataFrame indexé par les colonnes des groupes, mêmes colonnes que rolling_metrics
+    """
+    if df.empty:
+        return pd.DataFrame(index=pd.MultiIndex.from_tuples([], names=list(keys)))
+
+    groupes, mois, tableaux = monthly_grid(df, keys)
+    if end is not None:
+        retenus = int(np.searchsorted(mois.to_numpy(), np.datetime64(pd.Timestamp(end.year, end.month, 1)), side="right"))
+        tableaux = {mesure: valeurs[:, :retenus] for mesure, valeurs in tableaux.items()}
+    dernier = pd.DataFrame(index=groupes)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for w in windows:
+            sommes = {mesure: valeurs[:, -w:].sum(axis=1) for mesure, valeurs in tableaux.items()}
+            dernier[f"Lignes {w} mois"] = sommes["lignes"]
+            dernier[f"À temps {w} mois (%)"] = np.where(sommes["lignes"] > 0, sommes["a_temps"] / sommes["lignes"] * 100, np.nan)
+            dernier[f"Écart {w} mois"] = np.where(sommes["nb_ecart"] > 0, sommes["somme_ecart"] / sommes["nb_ecart"], np.nan)
+    return dernier
@@ -0,0 +1,241 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+from format1 import *
+from table1 import *
+from chart1 import *
+from compare1 import STATUS_ORDER, delivery_status
+
+
+# Caractéristiques de chaque fournisseur utilisées pour la segmentation
+SEGMENT_SHARES = [f"{statut} (%)" for statut in STATUS_ORDER]
+SEGMENT_FEATURES = SEGMENT_SHARES + ["Écart moyen", "Écart P90", "Lignes", "Valeur", "Tendance (j/mois)"]
+
+# Caractéristiques très asymétriques, comparées en échelle logarithmique
+SEGMENT_LOG_FEATURES = ["Lignes", "Valeur"]
+
+# Nombre de segments proposé par défaut et au maximum
+SEGMENT_DEFAULT_K = 4
+SEGMENT_MAX_K = 8
+
+SEGMENT_COLORS = ['#6366F1', '#10B981', '#F59E0B', '#EF4444', '#0EA5E9', '#EC4899', '#8B5CF6', '#64748B']
+
+# Nombre maximal de segmentations conservées ; les moins récemment utilisées sont évincées
+SEGMENT_CACHE_SIZE = 64
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def supplier_features(df):
+    """Vecteur de performance de chaque fournisseur, calculé en un passage (np.bincount)
+
+    Parts de chaque statut de livraison, écart moyen et P90 (jours), nombre de lignes,
+    valeur livrée et tendance de l'écart (pente en jours par mois, moindres carrés).
+
+    Args:
+        df: DataFrame des délais (lignes de livraison filtrées)
+
+    Returns:
+        DataFrame indexé par "Nom du fournisseur", colonnes SEGMENT_FEATURES
+    """
+    donnees = df.dropna(subset=["Nom du fournisseur"])
+    codes, names = pd.factorize(donnees["Nom du fournisseur"], sort=True)
+    n = len(names)
+    if n == 0:
+        return pd.DataFrame(columns=SEGMENT_FEATURES)
+
+    ecart = pd.to_numeric(donnees["Écart de délai"], errors="coerce").to_numpy(dtype=float)
+    statuts = pd.Categorical(delivery_status(ecart), categories=STATUS_ORDER).codes
+    lignes = np.bincount(codes, minlength=n).astype(float)
+    parts = np.bincount(codes * len(STATUS_ORDER) + statuts, minlength=n * len(STATUS_ORDER))
+    parts = parts.reshape(n, len(STATUS_ORDER)) / lignes[:, None] * 100
+
+    valide = ~np.isnan(ecart)
+    c, x = codes[valide], ecart[valide]
+    t = (donnees["Year"].to_numpy(dtype=float) * 12 + donnees["Month"].to_numpy(dtype=float))[valide]
+    t = np.nan_to_num(t - np.nanmin(t)) if len(t) else t
+    nb = np.bincount(c, minlength=n).astype(float)
+    somme_t, somme_x = np.bincount(c, t, n), np.bincount(c, x, n)
+    somme_tt, somme_tx = np.bincount(c, t * t, n), np.bincount(c, t * x, n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        moyenne = np.where(nb > 0, somme_x / nb, np.nan)
+        denominateur = nb * somme_tt - somme_t ** 2
+        pente = np.where(denominateur > 0, (nb * somme_tx - somme_t * somme_x) / denominateur, 0.0)
+    p90 = pd.Series(x).groupby(c).quantile(0.9).reindex(range(n)).to_numpy()
+
+    valeur = np.zeros(n)
+    if "Valeur nette" in donnees.columns:
+        valeur = np.bincount(codes, np.nan_to_num(pd.to_numeric(donnees["Valeur nette"], errors="coerce").to_numpy(dtype=float)), n)
+
+    features = pd.DataFrame(parts, columns=SEGMENT_SHARES, index=pd.Index(names, name="Nom du fournisseur"))
+    features["Écart moyen"] = moyenne
+    features["Écart P90"] = p90
+    features["Lignes"] = lignes
+    features["Valeur"] = valeur
+    features["Tendance (j/mois)"] = pente
+    return features
+
+
+def standardize(features):
+    """Centre-réduit les caractéristiques (log pour les volumes) ; les valeurs manquantes valent 0"""
+    x = features[SEGMENT_FEATURES].to_numpy(dtype=float).copy()
+    for j, col in enumerate(SEGMENT_FEATURES):
+        if col in SEGMENT_LOG_FEATURES:
+            x[:, j] = np.log1p(np.maximum(x[:, j], 0))
+    moyenne = np.nanmean(x, axis=0)
+    ecart_type = np.nanstd(x, axis=0)
+    x = (x - moyenne) / np.where(ecart_type > 0, ecart_type, 1)
+    return np.nan_to_num(x)
+
+
+def kmeans(x, k, n_init=4, max_iter=100, seed=0):
+    """k-moyennes (initialisation k-means++) entièrement en NumPy
+
+    Chaque itération calcule toutes les distances points x centres en un produit matriciel
+    et les nouveaux centres par un second produit (matrice d'appartenance) : aucune boucle
+    sur les fournisseurs. La meilleure de n_init initialisations (inertie minimale) est retenue.
+
+    Returns:
+        (segment de chaque point, centres, inertie)
+    """
+    rng = np.random.default_rng(seed)
+    n = len(x)
+    normes = (x ** 2).sum(axis=1)
+    meilleur = None
+    for _ in range(n_init):
+        centres = [x[rng.integers(n)]]
+        distances = ((x - centres[0]) ** 2).sum(axis=1)
+        for _ in range(1, k):
+            total = distances.sum()
+            choix = rng.choice(n, p=distances / total) if total > 0 else rng.integers(n)
+            centres.append(x[choix])
+            distances = np.minimum(distances, ((x - x[choix]) ** 2).sum(axis=1))
+        centres = np.array(centres)
+
+        for _ in range(max_iter):
+            distances = normes[:, None] - 2 * x @ centres.T + (centres ** 2).sum(axis=1)[None, :]
+            segments = np.argmin(distances, axis=1)
+            appartenance = np.zeros((k, n))
+            appartenance[segments, np.arange(n)] = 1
+            effectifs = appartenance.sum(axis=1)
+            nouveaux = np.where(effectifs[:, None] > 0, appartenance @ x / np.maximum(effectifs, 1)[:, None], centres)
+            if np.allclose(nouveaux, centres):
+                break
+            centres = nouveaux
+
+        distances = normes[:, None] - 2 * x @ centres.T + (centres ** 2).sum(axis=1)[None, :]
+        segments = np.argmin(distances, axis=1)
+        inertie = np.maximum(distances[np.arange(n), segments], 0).sum()
+        if meilleur is None or inertie < meilleur[2]:
+            meilleur = (segments, centres, inertie)
+    return meilleur
+
+
+def supplier_segments(features, k=SEGMENT_DEFAULT_K):
+    """Segmente les fournisseurs et décrit chaque segment par son centre (en unités d'origine)
+
+    Les segments sont numérotés du meilleur au moins bon taux de livraison à temps.
+    Le résultat est mis en cache selon l'empreinte des caractéristiques (qui identifie l'état
+    des filtres) et k ; il est partagé et ne doit pas être modifié.
+
+    Returns:
+        (caractéristiques avec la colonne "Segment", centres : une ligne par segment)
+    """
+    cle = (data_fingerprint(features), int(k))
+    stockage = shared_lru("segments", SEGMENT_CACHE_SIZE)
+    resultat = stockage.get(cle)
+    if resultat is not None:
+        return resultat
+
+    k = min(int(k), len(features))
+    segments, _, _ = kmeans(standardize(features), k)
+
+    # Renumérotation : segment 1 = meilleure part livrée à temps (en avance ou à temps)
+    a_temps = features[SEGMENT_SHARES[:2]].sum(axis=1).to_numpy()
+    moyennes = np.bincount(segments, a_temps, k) / np.maximum(np.bincount(segments, minlength=k), 1)
+    rang = np.empty(k, dtype=int)
+    rang[np.argsort(-moyennes, kind="stable")] = np.arange(k)
+    libelles = np.array([f"Segment {i + 1}" for i in range(k)], dtype=object)
+
+    table = features.copy()
+    table.insert(0, "Segment", libelles[rang[segments]])
+    centres = table.groupby("Segment")[SEGMENT_FEATURES].mean()
+    centres.insert(0, "Fournisseurs", table.groupby("Segment").size())
+    centres["Lignes totales"] = table.groupby("Segment")["Lignes"].sum()
+    centres["Valeur totale"] = table.groupby("Segment")["Valeur"].sum()
+    return stockage.put(cle, (table, centres.reset_index()))
+
+
+def build_segment_figure(table):
+    """Nuage des fournisseurs : écart moyen x part livrée à temps, taille = lignes, couleur = segment"""
+    fig = go.Figure()
+    a_temps = table[SEGMENT_SHARES[:2]].sum(axis=1)
+    taille = np.sqrt(table["Lignes"].to_numpy(dtype=float))
+    taille = 8 + 30 * taille / taille.max() if len(taille) and taille.max() > 0 else 10
+    for i, segment in enumerate(sorted(table["Segment"].unique(), key=lambda s: int(s.split()[-1]))):
+        masque = (table["Segment"] == segment).to_numpy()
+        fig.add_trace(go.Scatter(
+            x=table["Écart moyen"][masque], y=a_temps[masque], mode="markers", name=segment,
+            text=table.index[masque],
+            marker=dict(size=np.asarray(taille)[masque] if np.ndim(taille) else taille,
+                        color=SEGMENT_COLORS[i % len(SEGMENT_COLORS)], opacity=0.75,
+                        line=dict(width=1, color="white")),
+            customdata=np.column_stack([table["Lignes"][masque], table["Écart P90"][masque]]),
+            hovertemplate="<b>%{text}</b><br>Écart moyen : %{x:.1f} j<br>À temps : %{y:.1f} %"
+                          "<br>Écart P90 : %{customdata[1]:.1f} j<br>Lignes : %{customdata[0]:.0f}<extra></extra>"
+        ))
+    fig.update_layout(
+        height=480,
+        xaxis_title="Écart moyen (jours)",
+        yaxis_title="Livré à temps (%)",
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="center", x=0.5),
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)'
+    )
+    return fig
+
+
+def show_supplier_segments(df, key="segments"):
+    """Affiche la segmentation des fournisseurs de la sélection (centres, nuage et liste)
+
+    Args:
+        df: DataFrame des délais (lignes filtrées)
+        key: préfixe unique des widgets
+    """
+    features = supplier_features(df)
+    if len(features) < 3:
+        return
+
+    st.markdown("<h5 style='text-align: center;'>🧩 Segmentation des fournisseurs</h5>", unsafe_allow_html=True)
+    k_max = min(SEGMENT_MAX_K, len(features) - 1)
+    k = st.slider("Nombre de segments", 2, k_max, min(SEGMENT_DEFAULT_K, k_max), key=f"{key}_k") if k_max > 2 else 2
+    table, centres = supplier_segments(features, k)
+    st.caption(
+        "Regroupement (k-moyennes) des fournisseurs selon leurs parts de statuts, écart moyen et P90, "
+        "volume, valeur et tendance de l'écart. Segment 1 : meilleure part livrée à temps."
+    )
+
+    couleurs = {f"Segment {i + 1}": f"background-color: {SEGMENT_COLORS[i % len(SEGMENT_COLORS)]}30" for i in range(k)}
+    config = numeric_column_config(
+        thousands=["Fournisseurs", "Lignes totales", "Lignes"],
+        currency=["Valeur totale", "Valeur", "Valeur (moyenne)"],
+        percent=SEGMENT_SHARES,
+        decimals={"Écart moyen": 1, "Écart P90": 1, "Lignes (moyenne)": 0, "Tendance (j/mois)": 2}
+    )
+    render_table(
+        centres.rename(columns={"Lignes": "Lignes (moyenne)", "Valeur": "Valeur (moyenne)"}),
+        row_styles={"Segment": centres["Segment"].map(couleurs).fillna("").to_numpy()},
+        column_config=config
+    )
+    st.plotly_chart(cached_figure(build_segment_figure, table), use_container_width=True)
+
+    with st.expander("Fournisseurs par segment", expanded=False):
+        liste = table.reset_index().rename(columns={"Nom du fournisseur": "Fournisseur"})
+        paged_table(
+            liste,
+            key=f"{key}_liste",
+            row_styles={"Segment": liste["Segment"].map(couleurs).fillna("").to_numpy()},
+            column_config=config,
+            filter_columns=["Segment"],
+            file_name="segments_fournisseurs.csv"
+        )
@@ -0,0 +1,164 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+from file1 import *
+from rolling1 import ON_TIME_MAX_GAP
+
+
+# Nombre minimal de fournisseurs pour qu'un matériel soit considéré multi-sources
+SOURCING_MIN_SUPPLIERS = 2
+
+# Nombre maximal de matériels proposés dans la liste déroulante
+SOURCING_PICKER_LIMIT = 50
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def multi_source_index(df):
+    """Index des matériels achetés à plusieurs fournisseurs (paires matériel x fournisseur dédoublonnées)
+
+    Args:
+        df: DataFrame des délais de livraison
+
+    Returns:
+        Series indexée par "Matériel" : nombre de fournisseurs (au moins SOURCING_MIN_SUPPLIERS)
+    """
+    paires = df[["Matériel", "Fournisseur"]].dropna().drop_duplicates()
+    nb = paires.groupby("Matériel", observed=True).size()
+    return nb[nb >= SOURCING_MIN_SUPPLIERS].rename("Fournisseurs")
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def sourcing_table(df):
+    """Compare les fournisseurs de chaque matériel multi-sources, en un seul groupby (matériel, fournisseur)
+
+    Args:
+        df: DataFrame des délais de livraison (avec "Valeur nette" si disponible)
+
+    Returns:
+        DataFrame (une ligne par paire) : matériel, fournisseur, "Lignes", "Part des lignes (%)",
+        "Écart moyen", "Écart P90", "À temps (%)", "Valeur", "Rang" (1 = plus petit écart moyen
+        du matériel) et "Écart vs meilleur"
+    """
+    index = multi_source_index(df)
+    lignes = df[df["Matériel"].isin(index.index).to_numpy()]
+    if lignes.empty:
+        return pd.DataFrame()
+
+    ecart = pd.to_numeric(lignes["Écart de délai"], errors="coerce")
+    donnees = pd.DataFrame({
+        "Matériel": lignes["Matériel"].to_numpy(),
+        "Fournisseur": lignes["Fournisseur"].to_numpy(),
+        "nom": lignes["Nom du fournisseur"].to_numpy(),
+        "description": lignes["Description du matériel"].to_numpy(),
+        "ecart": ecart.to_numpy(),
+        "a_temps": np.where(ecart.notna(), (ecart <= ON_TIME_MAX_GAP).to_numpy() * 100.0, np.nan),
+        "valeur": pd.to_numeric(lignes["Valeur nette"], errors="coerce").to_numpy() if "Valeur nette" in lignes.columns else np.nan
+    })
+    groupes = donnees.groupby(["Matériel", "Fournisseur"], observed=True, sort=True)
+    table = groupes.agg(
+        description=("description", "first"),
+        nom=("nom", "first"),
+        Lignes=("ecart", "size"),
+        ecart_moyen=("ecart", "mean"),
+        a_temps=("a_temps", "mean"),
+        Valeur=("valeur", "sum")
+    )
+    table["Écart P90"] = groupes["ecart"].quantile(0.9)
+
+    # Comparaison au sein de chaque matériel
+    par_materiel = table.groupby(level="Matériel")
+    table["Part des lignes (%)"] = table["Lignes"] / par_materiel["Lignes"].transform("sum") * 100
+    table["Rang"] = par_materiel["ecart_moyen"].rank(method="min")
+    table["Écart vs meilleur"] = table["ecart_moyen"] - par_materiel["ecart_moyen"].transform("min")
+
+    table = table.reset_index().rename(columns={
+        "description": "Description du matériel",
+        "nom": "Nom du fournisseur",
+        "ecart_moyen": "Écart moyen",
+        "a_temps": "À temps (%)"
+    })
+    table = table.sort_values(["Matériel", "Rang"], kind="mergesort").reset_index(drop=True)
+    return table[[
+        "Matériel", "Description du matériel", "Fournisseur", "Nom du fournisseur", "Lignes",
+        "Part des lignes (%)", "Écart moyen", "Écart P90", "À temps (%)", "Valeur", "Rang", "Écart vs meilleur"
+    ]]
+
+
+def search_materials(materials, query, limit=SOURCING_PICKER_LIMIT):
+    """Matériels dont le code ou la description contient le texte saisi (sans tenir compte de la casse)"""
+    if not query:
+        return materials.head(limit)
+    texte = query.strip().lower()
+    masque = (
+        materials["Matériel"].astype(str).str.lower().str.contains(texte, regex=False) |
+        materials["Description du matériel"].astype(str).str.lower().str.contains(texte, regex=False)
+    )
+    return materials[masque.to_numpy()].head(limit)
+
+
+def show_dual_sourcing(df, key="sourcing"):
+    """Affiche la comparaison des fournisseurs d'un même matériel (matériels multi-sources)
+
+    Args:
+        df: DataFrame des délais de livraison (lignes filtrées)
+        key: préfixe unique des widgets
+    """
+    table = sourcing_table(df)
+    if table.empty:
+        return
+
+    st.markdown("<h5 style='text-align: center;'>🔀 Matériels multi-sources</h5>", unsafe_allow_html=True)
+    materiels = table[["Matériel", "Description du matériel"]].drop_duplicates("Matériel")
+    valeur_totale = pd.to_numeric(df["Valeur nette"], errors="coerce").sum() if "Valeur nette" in df.columns else 0
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        display_metric_card("Matériels multi-sources", format_number_array([len(materiels)])[0], color="#4527A0")
+    with col2:
+        display_metric_card("Part des lignes", f"{table['Lignes'].sum() / max(len(df), 1) * 100:.1f} %", color="#00897B")
+    with col3:
+        part_valeur = table["Valeur"].sum() / valeur_totale * 100 if valeur_totale else 0
+        display_metric_card("Part de la valeur", f"{part_valeur:.1f} %", color="#6A1B9A")
+
+    config = numeric_column_config(
+        thousands=["Lignes"],
+        currency=["Valeur"],
+        percent=["Part des lignes (%)", "À temps (%)"],
+        integers=["Rang"],
+        decimals={"Écart moyen": 1, "Écart P90": 1, "Écart vs meilleur": 1}
+    )
+
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        recherche = st.text_input("Rechercher un matériel", key=f"{key}_recherche", placeholder="Code ou description...")
+    resultats = search_materials(materiels, recherche)
+    with col2:
+        if resultats.empty:
+            st.info("Aucun matériel multi-sources ne correspond à la recherche.")
+            choix = None
+        else:
+            libelles = dict(zip(resultats["Matériel"], resultats["Description du matériel"]))
+            choix = st.selectbox(
+                "Matériel", list(libelles), key=f"{key}_materiel",
+                format_func=lambda m: f"{m} - {libelles[m]}"
+            )
+
+    if choix is not None:
+        detail = table[table["Matériel"] == choix].drop(columns=["Matériel", "Description du matériel"])
+        render_table(
+            detail,
+            row_styles={
+                "Écart moyen": gradient_styles(detail["Écart moyen"], cmap="RdYlGn_r"),
+                "À temps (%)": gradient_styles(detail["À temps (%)"], cmap="RdYlGn", vmin=0, vmax=100)
+            },
+            column_config=config
+        )
+
+    with st.expander("Comparaison complète des matériels multi-sources", expanded=False):
+        paged_table(
+            table,
+            key=f"{key}_table",
+            row_styles={"Écart vs meilleur": gradient_styles(table["Écart vs meilleur"], cmap="Reds", vmin=0)},
+            column_config=config,
+            search_columns=["Matériel", "Description du matériel", "Nom du fournisseur"],
+            file_name="comparaison_multi_sources.csv"
+        )
@@ -0,0 +1,235 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+
+# Au-delà de ce nombre de cellules, le tableau est envoyé sans Styler :
+# seules les configurations de colonnes (formatage côté navigateur) sont conservées
+MAX_STYLED_CELLS = 60000
+
+# Tailles de page proposées pour les tableaux paginés
+PAGE_SIZES = [25, 50, 100, 250]
+
+# Table de conversion 0-255 -> "00"-"ff" pour construire les couleurs en bloc
+_HEX = np.array([f"{i:02x}" for i in range(256)])
+
+
+def conditional_styles(conditions, styles, default=''):
+    """Calcule en bloc les styles d'une colonne selon des conditions (équivalent vectorisé d'un .map)
+
+    Args:
+        conditions: liste de tableaux booléens (évalués dans l'ordre, le premier vrai l'emporte)
+        styles: liste des styles CSS associés à chaque condition
+        default: style appliqué si aucune condition n'est vraie
+
+    Returns:
+        Tableau NumPy de chaînes CSS, une par ligne
+    """
+    conditions = [np.asarray(c, dtype=bool) for c in conditions]
+    return np.select(conditions, styles, default=default).astype(object)
+
+
+def gradient_styles(values, cmap="RdYlGn_r", vmin=None, vmax=None):
+    """Calcule en bloc un dégradé de couleurs de fond (équivalent de Styler.background_gradient)
+
+    Args:
+        values: valeurs numériques de la colonne
+        cmap: nom de la palette matplotlib
+        vmin: borne basse du dégradé (minimum des valeurs par défaut)
+        vmax: borne haute du dégradé (maximum des valeurs par défaut)
+
+    Returns:
+        Tableau NumPy de chaînes CSS (couleur de fond et couleur de texte lisible)
+    """
+    valeurs = pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype=float)
+    manquants = np.isnan(valeurs)
+    if manquants.all():
+        return np.full(len(valeurs), '', dtype=object)
+
+    vmin = np.nanmin(valeurs) if vmin is None else vmin
+    vmax = np.nanmax(valeurs) if vmax is None else vmax
+    etendue = vmax - vmin if vmax != vmin else 1.0
+    normalise = np.clip((np.where(manquants, vmin, valeurs) - vmin) / etendue, 0, 1)
+
+    # Import différé : matplotlib n'est chargé qu'au premier dégradé affiché
+    from matplotlib import colormaps
+
+    rgba = colormaps[cmap](normalise)
+    rgb = np.rint(rgba[:, :3] * 255).astype(int)
+    fond = np.char.add(np.char.add(np.char.add("#", _HEX[rgb[:, 0]]), _HEX[rgb[:, 1]]), _HEX[rgb[:, 2]])
+
+    # Texte blanc sur les fonds sombres, comme le fait pandas (luminance relative)
+    lineaire = np.where(rgba[:, :3] <= 0.04045, rgba[:, :3] / 12.92, ((rgba[:, :3] + 0.055) / 1.055) ** 2.4)
+    luminance = lineaire @ np.array([0.2126, 0.7152, 0.0722])
+    texte = np.where(luminance < 0.408, "#f1f1f1", "#000000")
+
+    css = np.char.add(np.char.add(np.char.add("background-color: ", fond), "; color: "), texte)
+    return np.where(manquants, '', css).astype(object)
+
+
+def style_matrix(df, column_styles=None, row_styles=None):
+    """Construit en une passe la matrice des styles CSS d'un tableau
+
+    Args:
+        df: DataFrame à afficher
+        column_styles: dictionnaire {colonne: style CSS constant pour toute la colonne}
+        row_styles: dictionnaire {colonne: tableau de styles CSS (un par ligne)}, obtenu par
+            conditional_styles ou gradient_styles ; remplace le style constant de la colonne
+
+    Returns:
+        DataFrame de styles aligné sur df
+    """
+    colonnes = list(df.columns)
+    matrice = np.full(df.shape, '', dtype=object)
+
+    for col, css in (column_styles or {}).items():
+        if col in df.columns:
+            matrice[:, colonnes.index(col)] = css
+
+    for col, css in (row_styles or {}).items():
+        if col in df.columns:
+            css = np.asarray(css, dtype=object)
+            # Conserver le style constant de la colonne là où le style conditionnel est vide
+            position = colonnes.index(col)
+            matrice[:, position] = np.where(css == '', matrice[:, position], css)
+
+    return pd.DataFrame(matrice, index=df.index, columns=df.columns)
+
+
+def render_table(df, column_styles=None, row_styles=None, column_config=None,
+                 max_styled_cells=MAX_STYLED_CELLS, **kwargs):
+    """Affiche un tableau stylé à partir de styles précalculés
+
+    Les styles sont appliqués en un seul appel (matrice complète) au lieu d'une fonction
+    évaluée cellule par cellule. Pour les très grands tableaux, le Styler est abandonné
+    et seules les configurations de colonnes sont transmises afin que la grille reste fluide.
+
+    Args:
+        df: DataFrame à afficher (données numériques non formatées)
+        column_styles: dictionnaire {colonne: style CSS constant}
+        row_styles: dictionnaire {colonne: tableau de styles CSS, un par ligne}
+        column_config: configuration des colonnes de st.dataframe (formatage côté navigateur)
+        max_styled_cells: nombre de cellules au-delà duquel les couleurs ne sont pas envoyées
+        **kwargs: arguments supplémentaires transmis à st.dataframe
+    """
+    kwargs.setdefault("use_container_width", True)
+    kwargs.setdefault("hide_index", True)
+
+    if df.empty or df.size > max_styled_cells or not (column_styles or row_styles):
+        st.dataframe(df, column_config=column_config, **kwargs)
+        return
+
+    matrice = style_matrix(df, column_styles, row_styles)
+    styled = df.style.apply(lambda _: matrice, axis=None)
+    st.dataframe(styled, column_config=column_config, **kwargs)
+
+
+def _search_mask(df, recherche, columns):
+    """Renvoie le masque des lignes contenant le texte recherché dans au moins une des colonnes"""
+    masque = np.zeros(len(df), dtype=bool)
+    for col in columns:
+        masque |= df[col].astype(str).str.contains(recherche, case=False, regex=False, na=False).to_numpy()
+    return masque
+
+
+def paged_table(df, key, column_styles=None, row_styles=None, column_config=None,
+                search_columns=None, filter_columns=(), page_size=50, file_name="export.csv"):
+    """Affiche un tableau paginé côté serveur : seule la page visible est envoyée au navigateur
+
+    La recherche, les filtres et le tri sont appliqués sur le DataFrame complet (déjà trié
+    par défaut), puis seule la page demandée est stylée et affichée. Le bouton de
+    téléchargement exporte l'ensemble du résultat filtré, généré uniquement au clic.
+
+    Args:
+        df: DataFrame complet à afficher (données numériques non formatées)
+        key: préfixe unique des widgets du tableau
+        column_styles: dictionnaire {colonne: style CSS constant}
+        row_styles: dictionnaire {colonne: tableau de styles CSS aligné sur df}, calculé sur
+            le tableau complet pour que les couleurs restent identiques d'une page à l'autre
+        column_config: configuration des colonnes de st.dataframe
+        search_columns: colonnes utilisées par la recherche (colonnes texte par défaut)
+        filter_columns: colonnes proposées en filtre (sélection multiple de valeurs)
+        page_size: nombre de lignes par page par défaut
+        file_name: nom du fichier CSV téléchargé
+    """
+    if df.empty:
+        render_table(df, column_config=column_config)
+        return
+
+    if search_columns is None:
+        search_columns = [col for col in df.columns if df[col].dtype == object]
+
+    col1, col2, col3 = st.columns([2, 1.5, 1])
+    with col1:
+        recherche = st.text_input("Rechercher", key=f"{key}_recherche", placeholder="Texte à rechercher...")
+    with col2:
+        tri = st.selectbox("Trier par", ["Ordre par défaut"] + list(df.columns), key=f"{key}_tri")
+    with col3:
+        ordre = st.selectbox("Ordre", ["Décroissant", "Croissant"], key=f"{key}_ordre")
+
+    masque = np.ones(len(df), dtype=bool)
+    if filter_columns:
+        filtre_cols = st.columns(len(filter_columns))
+        for filtre_col, col in zip(filtre_cols, filter_columns):
+            with filtre_col:
+                choix = st.multiselect(
+                    f"Filtrer : {col}",
+                    options=sorted(df[col].dropna().unique().tolist()),
+                    key=f"{key}_filtre_{col}"
+                )
+            if choix:
+                masque &= df[col].isin(choix).to_numpy()
+
+    if recherche:
+        masque &= _search_mask(df, recherche, search_columns)
+
+    # Positions des lignes retenues, dans l'ordre d'affichage
+    positions = np.flatnonzero(masque)
+    if tri != "Ordre par défaut":
+        valeurs = df[tri].iloc[positions].reset_index(drop=True)
+        ordre_tri = valeurs.sort_values(ascending=(ordre == "Croissant"), kind="mergesort", na_position="last").index
+        positions = positions[ordre_tri.to_numpy()]
+
+    total = len(positions)
+    if total == 0:
+        st.info("Aucune ligne ne correspond à la recherche.")
+        return
+
+    col1, col2, col3, col4 = st.columns([1, 1, 2, 1.5])
+    with col1:
+        taille = st.selectbox(
+            "Lignes par page",
+            PAGE_SIZES,
+            index=PAGE_SIZES.index(page_size) if page_size in PAGE_SIZES else 1,
+            key=f"{key}_taille"
+        )
+    nb_pages = max(1, int(np.ceil(total / taille)))
+
+    # Revenir à la première page si le filtrage a réduit le nombre de pages
+    page_key = f"{key}_page"
+    if st.session_state.get(page_key, 1) > nb_pages:
+        st.session_state[page_key] = 1
+    with col2:
+        page = st.number_input("Page", min_value=1, max_value=nb_pages, step=1, key=page_key)
+
+    debut = (int(page) - 1) * taille
+    fin = min(debut + taille, total)
+    with col3:
+        st.caption(f"Lignes {debut + 1} à {fin} sur {total} (page {int(page)} / {nb_pages})")
+    with col4:
+        st.download_button(
+            "Télécharger tout (CSV)",
+            data=lambda: df.iloc[positions].to_csv(index=False, sep=";", decimal=",").encode("utf-8-sig"),
+            file_name=file_name,
+            mime="text/csv",
+            key=f"{key}_telechargement"
+        )
+
+    # Seule la page visible est stylée et envoyée
+    page_positions = positions[debut:fin]
+    page_styles = {
+        col: np.asarray(css, dtype=object)[page_positions]
+        for col, css in (row_styles or {}).items()
+    }
+    render_table(df.iloc[page_positions], column_styles=column_styles, row_styles=page_styles,
+                 column_config=column_config)
@@ -0,0 +1,82 @@
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+import streamlit as st
+from format1 import *
+from table1 import *
+from chart1 import *
+from rolling1 import *
+
+
+def tendance_glissante(df, selected_supplier):
+    """
+    Tendances glissantes (3, 6 et 12 mois) d'un fournisseur : taux de livraison à temps et écart moyen
+
+    Args:
+        df: DataFrame des délais, toutes années confondues
+        selected_supplier: Nom ou ID du fournisseur à analyser
+    """
+    color_palette = {
+        3: '#6366F1',                 # Indigo vif
+        6: '#10B981',                 # Vert émeraude
+        12: '#F59E0B',                # Ambre
+        'text': '#1E293B'             # Bleu slate foncé
+    }
+
+    supplier_data = df[(df['Nom du fournisseur'] == selected_supplier) |
+                       (df['Fournisseur'] == selected_supplier)]
+    if supplier_data.empty:
+        return
+
+    st.markdown("<h5 style='text-align: center;'>📈 Tendances glissantes</h5>", unsafe_allow_html=True)
+    st.caption(
+        "Part des lignes livrées avec au plus 1 jour de retard et écart moyen (jours) "
+        "sur les 3, 6 et 12 derniers mois, à chaque mois."
+    )
+
+    # Un seul groupe pour le fournisseur, même s'il est présent sous plusieurs codes
+    tendances = rolling_metrics(supplier_data.assign(_fournisseur=0), ("_fournisseur",))
+
+    def build_rolling_chart(tendances):
+        fig = make_subplots(
+            rows=2, cols=1, shared_xaxes=True, vertical_spacing=0.08,
+            subplot_titles=("Livraisons à temps (%)", "Écart moyen (jours)")
+        )
+        for w in ROLLING_MONTHS:
+            fig.add_trace(go.Scatter(
+                x=tendances["Mois"], y=tendances[f"À temps {w} mois (%)"], mode='lines',
+                name=f"{w} mois", legendgroup=str(w), line=dict(color=color_palette[w], width=2)
+            ), row=1, col=1)
+            fig.add_trace(go.Scatter(
+                x=tendances["Mois"], y=tendances[f"Écart {w} mois"], mode='lines',
+                name=f"{w} mois", legendgroup=str(w), showlegend=False,
+                line=dict(color=color_palette[w], width=2)
+            ), row=2, col=1)
+        fig.update_yaxes(range=[0, 100], row=1, col=1)
+        fig.update_layout(
+            height=550,
+            hovermode='x unified',
+            legend=dict(orientation='h', yanchor='bottom', y=1.05, xanchor='center', x=0.5),
+            font=dict(color=color_palette['text']),
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)'
+        )
+        return fig
+
+    # Afficher le graphique (reconstruit uniquement si ses données changent)
+    st.plotly_chart(cached_figure(build_rolling_chart, tendances), use_container_width=True)
+
+    # Dernières valeurs par gamme de produit
+    if "Prodline Name" in supplier_data.columns and supplier_data["Prodline Name"].nunique() > 1:
+        taux = [f"À temps {w} mois (%)" for w in ROLLING_MONTHS]
+        ecarts = [f"Écart {w} mois" for w in ROLLING_MONTHS]
+        colonnes = taux + ecarts
+        par_gamme = latest_rolling_metrics(supplier_data, ("Prodline Name",))[colonnes]
+        par_gamme = par_gamme.dropna(how="all").reset_index().rename(columns={"Prodline Name": "Gamme"})
+        if not par_gamme.empty:
+            st.markdown("**Dernières valeurs glissantes par gamme**")
+            st.dataframe(
+                par_gamme,
+                hide_index=True,
+                use_container_width=True,
+                column_config=numeric_column_config(percent=taux, decimals={col: 1 for col in ecarts})
+            )
@@ -0,0 +1,37 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Les modules de l'application sont à la racine du dépôt
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+@pytest.fixture
+def deliveries():
+    """Petit fichier des délais synthétique : 3 fournisseurs, 2 gammes, 2023 à 2025"""
+    rng = np.random.default_rng(0)
+    n = 600
+    dates = pd.Timestamp("2023-01-01") + pd.to_timedelta(rng.integers(0, 3 * 365, n), unit="D")
+    fournisseurs = rng.choice(["Vendor A", "Vendor B", "Vendor C"], n)
+    theorique = rng.integers(5, 40, n).astype(float)
+    # Vendor C livre nettement plus tard que les autres ; quelques écarts hors des bornes des histogrammes
+    ecart = rng.normal(2, 6, n).round(1) + np.where(fournisseurs == "Vendor C", 12, 0)
+    ecart[:5] = [-90, 150, np.nan, 0.4, -0.6]
+    return pd.DataFrame({
+        "Bon de commande": rng.integers(4500000000, 4500000040, n).astype(str),
+        "Fournisseur": np.char.add("F", fournisseurs.astype(str)).astype(object),
+        "Nom du fournisseur": fournisseurs.astype(object),
+        "Matériel": rng.choice(["M1", "M2", "M3", "M4"], n).astype(object),
+        "Prodline Name": rng.choice(["Gamme 1", "Gamme 2"], n).astype(object),
+        "Drop Statut": rng.choice(["Drop", "Non drop"], n).astype(object),
+        "Type VC": rng.choice(["VC", "Non VC"], n).astype(object),
+        "Date de comptabilisation": dates,
+        "Year": dates.year,
+        "Month": dates.month,
+        "Délai théorique": theorique,
+        "Délai réel": theorique + np.nan_to_num(ecart),
+        "Écart de délai": ecart
+    })
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+from alert1 import DEFAULT_RULES, refresh_alerts
+
+
+def _alerts(state):
+    """Alertes triées (règle, élément, valeur) pour comparer deux états"""
+    alertes = state["alerts"].sort_values(["Règle", "Élément"])
+    return list(zip(alertes["Règle"], alertes["Élément"], alertes["Valeur"].astype(float).round(9)))
+
+
+def test_full_refresh_triggers_rules(deliveries):
+    state = refresh_alerts(deliveries)
+    assert state["evaluated"] == state["total"]
+    assert state["alerts"]["Nouvelle"].all()
+    # Vendor C livre en moyenne 14 jours en retard
+    assert ("Vendor C" in set(state["alerts"].loc[state["alerts"]["Règle"] == DEFAULT_RULES[0]["Règle"], "Élément"]))
+
+
+def test_unchanged_reload_reevaluates_nothing(deliveries):
+    premier = refresh_alerts(deliveries)
+    second = refresh_alerts(deliveries.copy(), premier)
+    assert second["evaluated"] == 0
+    assert _alerts(second) == _alerts(premier)
+    assert not second["alerts"]["Nouvelle"].any()
+
+
+def test_incremental_matches_full(deliveries):
+    premier = refresh_alerts(deliveries)
+
+    # Nouvelles données pour un seul fournisseur, dans le dernier mois (les fenêtres ne glissent pas)
+    modifie = deliveries.copy()
+    mois = modifie["Year"] * 12 + modifie["Month"]
+    lignes = (mois == mois.max()) & (modifie["Nom du fournisseur"] == "Vendor A")
+    modifie.loc[lignes, ["Délai réel", "Écart de délai"]] += 30
+
+    incremental = refresh_alerts(modifie, premier)
+    complet = refresh_alerts(modifie)
+    assert 0 < incremental["evaluated"] < incremental["total"]
+    assert _alerts(incremental) == _alerts(complet)
+    # Les alertes déjà actives gardent leur date de détection
+    anciennes = set(zip(premier["alerts"]["Règle"], premier["alerts"]["Élément"]))
+    conservees = [(r, e) in anciennes for r, e in zip(incremental["alerts"]["Règle"], incremental["alerts"]["Élément"])]
+    assert (~incremental["alerts"]["Nouvelle"].to_numpy() == np.array(conservees, dtype=bool)).all()
+
+
+def test_new_month_reevaluates_everything(deliveries):
+    premier = refresh_alerts(deliveries)
+    suivant = deliveries.iloc[:1].copy()
+    suivant["Date de comptabilisation"] = deliveries["Date de comptabilisation"].max() + pd.DateOffset(months=1)
+    suivant["Year"] = suivant["Date de comptabilisation"].dt.year
+    suivant["Month"] = suivant["Date de comptabilisation"].dt.month
+    etendu = pd.concat([deliveries, suivant], ignore_index=True)
+
+    incremental = refresh_alerts(etendu, premier)
+    assert incremental["evaluated"] == incremental["total"]
+    assert _alerts(incremental) == _alerts(refresh_alerts(etendu))
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+from load1 import merge_df
+
+
+def _merge_reference(df1, df2):
+    """Appariement ligne à ligne : la k-ième livraison d'une clé reçoit la k-ième ligne de commande de cette clé"""
+    def cle(po, fournisseur, materiel):
+        return f"{str(po).removesuffix('.0').strip()}|{str(fournisseur).removesuffix('.0').strip()}|{str(materiel).strip()}"
+
+    commandes = {}
+    for po, fournisseur, materiel, date, quantite in zip(
+        df2["Bons de commande"], df2["Fournisseur"], df2["Matériel"], df2["Date du document"], df2["Order Quantity"]
+    ):
+        commandes.setdefault(cle(po, fournisseur, materiel), []).append((date, quantite))
+
+    vues, dates, quantites = {}, [], []
+    for po, fournisseur, materiel in zip(df1["Bon de commande"], df1["Fournisseur"], df1["Matériel"]):
+        k = cle(po, fournisseur, materiel)
+        rang = vues.get(k, 0)
+        vues[k] = rang + 1
+        date, quantite = commandes[k][rang] if rang < len(commandes.get(k, [])) else (pd.NaT, np.nan)
+        dates.append(date)
+        quantites.append(quantite)
+    return pd.to_datetime(pd.Series(dates)), pd.Series(quantites, dtype=float)
+
+
+def test_merge_df_matches_reference(deliveries):
+    rng = np.random.default_rng(2)
+    lignes = deliveries[["Bon de commande", "Fournisseur", "Matériel"]].drop_duplicates()
+    # Deux lignes de commande pour certaines clés, aucune pour d'autres ; numéros lus comme décimaux
+    commandes = pd.concat([lignes.sample(frac=0.8, random_state=0), lignes.sample(frac=0.3, random_state=1)])
+    df2 = pd.DataFrame({
+        "Bons de commande": commandes["Bon de commande"].astype(float).to_numpy(),
+        "Fournisseur": commandes["Fournisseur"].to_numpy(),
+        "Matériel": commandes["Matériel"].str.pad(4, side="right").to_numpy(),
+        "Date du document": pd.Timestamp("2023-01-01") + pd.to_timedelta(rng.integers(0, 900, len(commandes)), unit="D"),
+        "Order Quantity": rng.integers(1, 100, len(commandes)).astype(float)
+    })
+
+    resultat = merge_df(deliveries, df2)
+    dates, quantites = _merge_reference(deliveries, df2)
+    assert resultat[deliveries.columns].equals(deliveries)
+    assert resultat["Document Date"].reset_index(drop=True).equals(dates.rename("Document Date"))
+    assert np.array_equal(resultat["Order Quantity"].to_numpy(), quantites.to_numpy(), equal_nan=True)
+    assert resultat["Order Quantity"].notna().sum() < len(deliveries)
+
+
+def test_merge_df_without_orders(deliveries):
+    assert merge_df(deliveries, None).equals(deliveries)
+    assert merge_df(deliveries, pd.DataFrame()).equals(deliveries)
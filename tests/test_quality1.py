@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from quality1 import QUALITY_EXCLUDE, QUALITY_FLAG, QUALITY_REJECT, deduplicate, duplicate_masks, validate_frame
+
+
+@pytest.fixture
+def lines():
+    rng = np.random.default_rng(1)
+    return pd.DataFrame({
+        "k1": rng.integers(0, 5, 300),
+        "k2": rng.choice(["a", "b"], 300),
+        "v": rng.integers(0, 3, 300)
+    })
+
+
+def test_duplicate_masks_match_pandas(lines):
+    exact, cle, _, _ = duplicate_masks(lines, ["k1", "k2"])
+    assert (exact == lines.duplicated().to_numpy()).all()
+    assert (cle == (lines.duplicated(["k1", "k2"]) & ~lines.duplicated()).to_numpy()).all()
+
+
+def test_duplicate_masks_first_positions(lines):
+    # Positions renvoyées : première occurrence (dans l'ordre du fichier) de la ligne et de la clé
+    _, _, identique, meme_cle = duplicate_masks(lines, ["k1", "k2"])
+    lignes = lines.apply(tuple, axis=1)
+    cles = lines[["k1", "k2"]].apply(tuple, axis=1)
+    assert (identique == lignes.map({v: i for i, v in reversed(list(enumerate(lignes)))}).to_numpy()).all()
+    assert (meme_cle == cles.map({v: i for i, v in reversed(list(enumerate(cles)))}).to_numpy()).all()
+
+
+def test_duplicate_masks_empty():
+    exact, cle, identique, meme_cle = duplicate_masks(pd.DataFrame({"k": [], "v": []}), ["k"])
+    assert len(exact) == len(cle) == len(identique) == len(meme_cle) == 0
+
+
+@pytest.mark.parametrize("policy, kept, rejects", [
+    ("signaler", [0, 1, 2, 3, 4], []),
+    ("exacts", [0, 1, 3], [(4, 3), (6, 2)]),
+    ("cle", [0, 3], [(3, 2), (4, 2), (6, 2)])
+])
+def test_deduplicate_kept_line(policy, kept, rejects):
+    df = pd.DataFrame({"k": [1, 1, 1, 2, 1], "v": ["a", "b", "b", "x", "a"]})
+    resultat, rapport = deduplicate(df, ["k"], policy)
+    assert list(resultat.index) == kept
+    assert list(zip(rapport["Rejets"]["Ligne Excel"], rapport["Rejets"]["Ligne conservée"])) == rejects
+    assert list(rapport["Règles"]["Lignes"]) == [2, 1]
+
+
+def test_validate_frame_counts():
+    source = pd.DataFrame({
+        "date": ["2023-01-05", None, "pas une date", "2022-06-01", "2024-02-29"],
+        "nom": ["A", None, "B", None, "C"]
+    })
+    df = source.assign(date=pd.to_datetime(source["date"], errors="coerce"))
+    regles = [
+        {"Règle": "Date manquante", "Colonne": "date", "Test": "manquant", "Action": QUALITY_REJECT},
+        {"Règle": "Date illisible", "Colonne": "date", "Test": "illisible", "Action": QUALITY_REJECT},
+        {"Règle": "Année 2022", "Colonne": "date", "Test": "annee", "Valeurs": [2022], "Action": QUALITY_EXCLUDE},
+        {"Règle": "Nom manquant", "Colonne": "nom", "Test": "manquant", "Action": QUALITY_FLAG},
+        {"Règle": "Colonne absente", "Colonne": "autre", "Test": "manquant", "Action": QUALITY_REJECT}
+    ]
+    resultat, rapport = validate_frame(df, regles, source)
+
+    assert rapport["Lignes lues"] == 5
+    assert list(rapport["Règles"]["Règle"]) == ["Date manquante", "Date illisible", "Année 2022", "Nom manquant"]
+    assert list(rapport["Règles"]["Lignes"]) == [1, 1, 1, 2]
+    assert list(resultat.index) == [0, 4]
+    # Ligne 1 : date manquante et nom manquant, le motif est la première règle de retrait enfreinte
+    rejets = rapport["Rejets"]
+    assert list(rejets["Ligne Excel"]) == [3, 4, 5]
+    assert list(rejets["Motif"]) == ["Date manquante", "Date illisible", "Année 2022"]
+    assert list(rejets["date"]) == ["", "pas une date", "2022-06-01"]
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from quantile1 import (SKETCH_ACCURACY, bucket_values, build_delay_sketches, exact_quantiles,
+                       selection_quantiles, sketch_buckets)
+
+
+def _within_bounds(approche, exact):
+    """Erreur garantie : ±α en relatif, ou moins d'un jour pour les valeurs de moins d'un jour"""
+    approche, exact = np.asarray(approche, dtype=float), np.asarray(exact, dtype=float)
+    tolerance = np.where(np.abs(exact) >= 1, SKETCH_ACCURACY * np.abs(exact) + 1e-9, 1)
+    return np.abs(approche - exact) <= tolerance
+
+
+def test_bucket_values_relative_error():
+    valeurs = np.r_[np.linspace(-500, 500, 20001), np.geomspace(1, 1e6, 5000), -np.geomspace(1, 1e6, 5000)]
+    assert _within_bounds(bucket_values(sketch_buckets(valeurs)), valeurs).all()
+
+
+@pytest.mark.parametrize("by", [(), ("Nom du fournisseur",), ("Year", "Prodline Name")])
+@pytest.mark.parametrize("selection", [None, {"Year": 2024}, {"Type VC": ["VC"], "Drop Statut": "Drop"}])
+def test_sketch_quantiles_within_bounds(deliveries, selection, by):
+    lignes = deliveries
+    for col, valeur in (selection or {}).items():
+        lignes = lignes[lignes[col].isin(valeur if isinstance(valeur, list) else [valeur])]
+    approche = selection_quantiles(build_delay_sketches(deliveries), selection, by)
+    if by:
+        exact = exact_quantiles(lignes, list(by)).reindex(approche.index)
+    else:
+        exact = exact_quantiles(lignes.assign(_tout=0), ["_tout"]).reset_index(drop=True)
+
+    assert (approche["Lignes"].to_numpy() == exact["Lignes"].to_numpy()).all()
+    for col in approche.columns.drop("Lignes"):
+        assert _within_bounds(approche[col], exact[col]).all(), col
+
+
+def test_period_months_selection(deliveries):
+    # Mois d'une période à cheval sur deux années (décembre 2023 et janvier 2024)
+    selection = {"Nom du fournisseur": "Vendor B", ("Year", "Month"): [(2023, 12), (2024, 1)]}
+    mois = deliveries["Year"] * 100 + deliveries["Month"]
+    lignes = deliveries[mois.isin([202312, 202401]) & (deliveries["Nom du fournisseur"] == "Vendor B")]
+    approche = selection_quantiles(build_delay_sketches(deliveries), selection)
+    exact = exact_quantiles(lignes.assign(_tout=0), ["_tout"]).reset_index(drop=True)
+
+    assert approche["Lignes"].iloc[0] == len(lignes) > 0
+    for col in approche.columns.drop("Lignes"):
+        assert _within_bounds(approche[col], exact[col]).all(), col
+
+
+def test_sketches_keyed_on_fingerprint(deliveries):
+    # Avec une empreinte, les lignes ne sont pas rehachées : la même empreinte rend les mêmes sketches
+    premiers = build_delay_sketches(deliveries, "jeu-1")
+    assert build_delay_sketches(deliveries.iloc[5:15], "jeu-1") is premiers
+    assert build_delay_sketches(deliveries.iloc[5:15], "jeu-2")["Lignes"].sum() == 20
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from compare1 import STATUS_ORDER, STATUS_THRESHOLDS, delivery_status
+from whatif1 import build_gap_histograms, selection_histograms, status_counts
+
+
+def _reference(ecart, thresholds):
+    """Statuts ligne par ligne pour des seuils donnés, avec les bornes de delivery_status"""
+    debut, fin, accepte = thresholds
+    ecart = pd.to_numeric(ecart, errors="coerce").to_numpy(dtype=float)
+    statuts = np.select(
+        [ecart < debut, (ecart >= debut) & (ecart <= fin), (ecart >= fin + 1) & (ecart <= accepte)],
+        STATUS_ORDER[:3], default=STATUS_ORDER[3]
+    )
+    return pd.Series(statuts).value_counts().reindex(STATUS_ORDER, fill_value=0).to_numpy()
+
+
+def test_default_thresholds_match_delivery_status(deliveries):
+    _, totaux = selection_histograms(build_gap_histograms(deliveries))
+    attendu = pd.Series(delivery_status(deliveries["Écart de délai"])).value_counts()
+    assert (status_counts(totaux, STATUS_THRESHOLDS)[0] == attendu.reindex(STATUS_ORDER, fill_value=0).to_numpy()).all()
+
+
+def test_fractional_gaps():
+    # Écarts décimaux autour des seuils : -0.4 est en avance, 1.4 n'est plus à temps
+    ecarts = [-0.4, -1e-6, 0, 0.5, 1, 1.4, 1.99, 2, 6.5, 7, 7.2, 8, np.nan, -75.5, 130.2]
+    df = pd.DataFrame({"Year": 2024, "Month": 1, "Nom du fournisseur": "Vendor A", "Écart de délai": ecarts})
+    _, totaux = selection_histograms(build_gap_histograms(df))
+    attendu = pd.Series(delivery_status(df["Écart de délai"])).value_counts().reindex(STATUS_ORDER, fill_value=0)
+    assert list(status_counts(totaux)[0]) == list(attendu) == [3, 3, 3, 6]
+    for thresholds in [(-1, 0, 1), (1, 6, 7), (0, 1, 1), (-30, 60, 60)]:
+        assert (status_counts(totaux, thresholds)[0] == _reference(df["Écart de délai"], thresholds)).all()
+
+
+@pytest.mark.parametrize("thresholds", [(0, 1, 7), (0, 10, 20), (-5, 3, 3), (2, 5, 30), (-30, 60, 60)])
+@pytest.mark.parametrize("selection", [None, {"Year": 2024}, {"Year": 2024, "Nom du fournisseur": "Vendor B"}, {"Type VC": ["VC"]}])
+def test_status_counts_match_rows(deliveries, selection, thresholds):
+    histogrammes = build_gap_histograms(deliveries)
+    lignes = deliveries
+    for col, valeur in (selection or {}).items():
+        lignes = lignes[lignes[col].isin(valeur if isinstance(valeur, list) else [valeur])]
+    _, totaux = selection_histograms(histogrammes, selection)
+    assert (status_counts(totaux, thresholds)[0] == _reference(lignes["Écart de délai"], thresholds)).all()
+
+
+def test_status_counts_by_group(deliveries):
+    index, groupes = selection_histograms(build_gap_histograms(deliveries), {"Year": 2025}, "Nom du fournisseur")
+    comptes = status_counts(groupes, (0, 10, 20))
+    lignes = deliveries[deliveries["Year"] == 2025]
+    for fournisseur, ligne in zip(index, comptes):
+        ecarts = lignes.loc[lignes["Nom du fournisseur"] == fournisseur, "Écart de délai"]
+        assert (ligne == _reference(ecarts, (0, 10, 20))).all()
+
+
+def test_period_months_selection(deliveries):
+    # Mois d'une période à cheval sur deux années (novembre 2023 à février 2024)
+    mois = [(2023, 11), (2023, 12), (2024, 1), (2024, 2)]
+    _, totaux = selection_histograms(build_gap_histograms(deliveries), {("Year", "Month"): mois})
+    lignes = deliveries[(deliveries["Year"] * 100 + deliveries["Month"]).isin([y * 100 + m for y, m in mois])]
+    assert (status_counts(totaux, (0, 10, 20))[0] == _reference(lignes["Écart de délai"], (0, 10, 20))).all()
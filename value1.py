@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+from file1 import *
+from compare1 import STATUS_ORDER
+
+
+# Valeur nette portée par chaque ligne de livraison (voir attach_order_value)
+VALUE_COLUMN = "Valeur nette"
+
+# Statuts comptés comme livrés à temps
+ON_TIME_STATUSES = ['En avance', 'À temps']
+
+
+def value_status_table(df, by=()):
+    """Répartition de la valeur livrée par statut de livraison, pour tous les groupes à la fois
+
+    Args:
+        df: DataFrame des délais avec la colonne "Valeur nette"
+        by: colonnes de regroupement (fournisseur, gamme...), aucune pour le total
+
+    Returns:
+        DataFrame indexé par by (une seule ligne si by est vide) : "Lignes", "Lignes valorisées",
+        "Valeur livrée", "Valeur {statut}" et "Part {statut} (%)" par statut,
+        "À temps (valeur %)", "À temps (lignes %)" et "Valeur à risque"
+    """
+    by = list(by)
+    cles = by or ["_total"]
+    donnees = pd.DataFrame({
+        "valeur": pd.to_numeric(df[VALUE_COLUMN], errors="coerce").to_numpy(),
+        "statut": df["Statut de livraison"].to_numpy()
+    })
+    for col in by:
+        donnees[col] = df[col].to_numpy()
+    if not by:
+        donnees["_total"] = 0
+    donnees["valorisee"] = donnees["valeur"].notna()
+    donnees["a_temps"] = donnees["statut"].isin(ON_TIME_STATUSES)
+
+    table = donnees.groupby(cles, observed=True).agg(**{
+        "Lignes": ("statut", "size"),
+        "Lignes valorisées": ("valorisee", "sum"),
+        "Valeur livrée": ("valeur", "sum"),
+        "À temps (lignes %)": ("a_temps", "mean")
+    })
+    table["À temps (lignes %)"] *= 100
+
+    # Valeur par statut : une seule agrégation (groupe x statut) puis mise en colonnes
+    par_statut = donnees.groupby(cles + ["statut"], observed=True)["valeur"].sum().unstack("statut")
+    par_statut = par_statut.reindex(index=table.index, columns=STATUS_ORDER).fillna(0)
+
+    total = table["Valeur livrée"].to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for statut in STATUS_ORDER:
+            table[f"Valeur {statut}"] = par_statut[statut].to_numpy()
+            table[f"Part {statut} (%)"] = np.where(total > 0, par_statut[statut].to_numpy() / total * 100, np.nan)
+    table["À temps (valeur %)"] = table[[f"Part {statut} (%)" for statut in ON_TIME_STATUSES]].sum(axis=1, min_count=1)
+    table["Valeur à risque"] = table["Valeur Long délai"]
+    if not by:
+        table = table.reset_index(drop=True)
+    return table
+
+
+def show_value_kpis(df, by):
+    """Affiche les taux de livraison à temps pondérés par la valeur et la valeur à risque (Long délai)
+
+    Args:
+        df: DataFrame des délais filtré, avec la colonne "Valeur nette"
+        by: colonne du détail ("Nom du fournisseur" ou "Prodline Name")
+    """
+    if df.empty or VALUE_COLUMN not in df.columns:
+        return
+
+    total = value_status_table(df).iloc[0]
+    if not total["Lignes valorisées"]:
+        return
+
+    st.markdown("<h5 style='text-align: center;'>💶 Performance pondérée par la valeur</h5>", unsafe_allow_html=True)
+    st.caption(
+        f"{total['Lignes valorisées'] / total['Lignes']:.0%} des lignes de livraison sont rapprochées d'une ligne "
+        "de commande (bon de commande, fournisseur, matériel) ; la valeur d'une ligne de commande est répartie "
+        "entre ses livraisons."
+    )
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        display_metric_card("À temps (valeur)", f"{total['À temps (valeur %)']:.1f} %", color="#00897B")
+    with col2:
+        display_metric_card("À temps (lignes)", f"{total['À temps (lignes %)']:.1f} %", color="#1E88E5")
+    with col3:
+        display_metric_card("Valeur livrée", format_currency_array([total["Valeur livrée"]])[0], color="#4527A0")
+    with col4:
+        display_metric_card("Valeur à risque (Long délai)", format_currency_array([total["Valeur à risque"]])[0], color="#C62828")
+
+    colonnes = ["Lignes", "Valeur livrée", "À temps (valeur %)", "À temps (lignes %)", "Valeur à risque"] + \
+        [f"Part {statut} (%)" for statut in STATUS_ORDER]
+    detail = value_status_table(df, [by])[colonnes]
+    detail = detail.sort_values("Valeur à risque", ascending=False).reset_index()
+    detail = detail.rename(columns={"Prodline Name": "Gamme", "Nom du fournisseur": "Fournisseur"})
+    config = numeric_column_config(
+        currency=["Valeur livrée", "Valeur à risque"],
+        thousands=["Lignes"],
+        percent=[col for col in colonnes if col.endswith("%)")]
+    )
+    titre = "Détail par gamme" if by == "Prodline Name" else "Détail par fournisseur"
+    with st.expander(titre, expanded=False):
+        paged_table(detail, key=f"valeur_{by}", column_config=config, file_name="performance_valeur.csv")
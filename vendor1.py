@@ -0,0 +1,232 @@
+import unicodedata
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+
+ALL_VENDORS = "Tous les fournisseurs"
+
+# Nombre maximal de fournisseurs proposés dans la liste déroulante
+VENDOR_PICKER_LIMIT = 50
+
+
+def normalize_text(text):
+    """Met un texte en minuscules et retire les accents (pour la recherche)"""
+    text = unicodedata.normalize("NFKD", str(text).lower().strip())
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+def _trigrams(text):
+    """Renvoie l'ensemble des trigrammes d'un texte normalisé (bordé d'espaces)"""
+    text = f"  {text} "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _prefix_range(sorted_keys, prefix):
+    """Renvoie les bornes (début, fin) des clés triées commençant par prefix"""
+    debut = np.searchsorted(sorted_keys, prefix, side="left")
+    fin = np.searchsorted(sorted_keys, prefix + "\uffff", side="left")
+    return debut, fin
+
+
+def _supplier_codes(df, names):
+    """Renvoie (année, mois, position du fournisseur) sans doublons pour un DataFrame"""
+    codes = pd.Categorical(df["Nom du fournisseur"].astype(str), categories=names).codes
+    presence = pd.DataFrame({
+        "Year": df["Year"].to_numpy(),
+        "Month": df["Month"].to_numpy(),
+        "code": codes
+    })
+    return presence[(presence["code"] >= 0) & presence["Year"].notna()].drop_duplicates()
+
+
+def _availability(presence):
+    """Positions des fournisseurs présents pour chaque filtre (toutes années, année, année et mois)"""
+    disponibles = {(None, None): np.unique(presence["code"].to_numpy())}
+    for year, groupe in presence.groupby("Year"):
+        disponibles[(int(year), None)] = np.unique(groupe["code"].to_numpy())
+    for (year, month), groupe in presence.groupby(["Year", "Month"]):
+        disponibles[(int(year), int(month))] = np.unique(groupe["code"].to_numpy())
+    return disponibles
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def build_supplier_directory(df1, df2):
+    """Construit une seule fois par jeu de données l'annuaire des fournisseurs
+
+    L'annuaire contient la correspondance code <-> nom, un index de préfixes (mots du nom
+    et codes) et de trigrammes pour la recherche, ainsi que les fournisseurs disponibles
+    pour chaque combinaison année / mois. Il est partagé entre les réexécutions de la page
+    et ne doit pas être modifié.
+
+    Args:
+        df1: DataFrame des délais de livraison
+        df2: DataFrame des commandes
+
+    Returns:
+        Dictionnaire décrivant l'annuaire
+    """
+    colonnes = ["Fournisseur", "Nom du fournisseur"]
+    paires = pd.concat([df1[colonnes], df2[colonnes]], ignore_index=True).dropna(subset=["Nom du fournisseur"])
+    paires = paires.astype(str).drop_duplicates()
+
+    names = np.array(sorted(paires["Nom du fournisseur"].unique()), dtype=object)
+    position = {name: i for i, name in enumerate(names)}
+    name_ids = {name: sorted(ids) for name, ids in paires.groupby("Nom du fournisseur")["Fournisseur"]}
+    id_to_name = dict(zip(paires["Fournisseur"], paires["Nom du fournisseur"]))
+    keys = [normalize_text(name) for name in names]
+    ordre_keys = np.argsort(np.array(keys, dtype=object), kind="stable")
+
+    # Index de préfixes : chaque mot du nom et chaque code, triés pour une recherche dichotomique
+    tokens = []
+    for i, key in enumerate(keys):
+        tokens.extend((mot, i) for mot in key.split())
+        tokens.extend((normalize_text(code), i) for code in name_ids.get(names[i], []))
+    tokens.sort()
+    token_keys = np.array([t[0] for t in tokens], dtype=object)
+    token_positions = np.array([t[1] for t in tokens], dtype=int)
+
+    # Index de trigrammes : trigramme -> positions des fournisseurs qui le contiennent
+    trigram_lists = {}
+    for i, key in enumerate(keys):
+        for trigramme in _trigrams(key):
+            trigram_lists.setdefault(trigramme, []).append(i)
+    trigrams = {t: np.array(p, dtype=int) for t, p in trigram_lists.items()}
+
+    # Fournisseurs disponibles par filtre : communs aux deux fichiers, sinon tous ceux présents
+    dispo1 = _availability(_supplier_codes(df1, names))
+    dispo2 = _availability(_supplier_codes(df2, names))
+    availability = {}
+    for filtre in set(dispo1) | set(dispo2):
+        positions1 = dispo1.get(filtre, np.array([], dtype=int))
+        positions2 = dispo2.get(filtre, np.array([], dtype=int))
+        communs = np.intersect1d(positions1, positions2)
+        availability[filtre] = communs if len(communs) else np.union1d(positions1, positions2)
+
+    return {
+        "names": names,
+        "position": position,
+        "sorted_keys": np.array(keys, dtype=object)[ordre_keys],
+        "sorted_positions": ordre_keys,
+        "name_ids": name_ids,
+        "id_to_name": id_to_name,
+        "token_keys": token_keys,
+        "token_positions": token_positions,
+        "trigrams": trigrams,
+        "availability": availability
+    }
+
+
+def available_suppliers(directory, year=None, month=None):
+    """Renvoie les positions (ordre alphabétique) des fournisseurs disponibles pour une année / un mois
+
+    Args:
+        directory: annuaire construit par build_supplier_directory
+        year: année sélectionnée (None ou texte pour toutes les années)
+        month: mois sélectionné (None ou texte pour tous les mois)
+    """
+    year = year if isinstance(year, (int, np.integer)) else None
+    month = month if isinstance(month, (int, np.integer)) and year is not None else None
+    return directory["availability"].get((year, month), np.array([], dtype=int))
+
+
+def search_suppliers(directory, query, allowed=None, limit=VENDOR_PICKER_LIMIT):
+    """Recherche les fournisseurs correspondant à un texte saisi, classés par pertinence
+
+    Ordre de classement : nom ou code exact, début du nom, début de mots du nom ou d'un code,
+    puis ressemblance approchée (trigrammes communs). À score égal, ordre alphabétique.
+
+    Args:
+        directory: annuaire construit par build_supplier_directory
+        query: texte saisi (nom ou code, sans tenir compte des majuscules ni des accents)
+        allowed: positions des fournisseurs autorisés (tous si None)
+        limit: nombre maximal de résultats
+
+    Returns:
+        Liste des noms de fournisseurs
+    """
+    names = directory["names"]
+    if allowed is None:
+        allowed = np.arange(len(names))
+    q = normalize_text(query or "")
+    if not q:
+        return names[allowed[:limit]].tolist()
+
+    # Score par fournisseur : plus il est bas, plus la correspondance est forte
+    scores = np.full(len(names), np.inf)
+
+    # Chaque mot saisi commence un mot du nom ou un code
+    tous_les_mots = np.ones(len(names), dtype=bool)
+    for mot in q.split():
+        debut, fin = _prefix_range(directory["token_keys"], mot)
+        trouve = np.zeros(len(names), dtype=bool)
+        trouve[directory["token_positions"][debut:fin]] = True
+        tous_les_mots &= trouve
+    scores[tous_les_mots] = 2
+
+    # Début du nom complet, puis nom exact
+    debut, fin = _prefix_range(directory["sorted_keys"], q)
+    positions = directory["sorted_positions"][debut:fin]
+    scores[positions] = 1
+    scores[positions[directory["sorted_keys"][debut:fin] == q]] = 0
+
+    # Code exact
+    exact = directory["id_to_name"].get(str(query).strip())
+    if exact is not None:
+        scores[directory["position"][exact]] = 0
+
+    # Ressemblance approchée : part des trigrammes du texte saisi présents dans le nom
+    trigrammes = _trigrams(q)
+    listes = [directory["trigrams"][t] for t in trigrammes if t in directory["trigrams"]]
+    if listes and len(q) >= 3:
+        communs = np.bincount(np.concatenate(listes), minlength=len(names)) / len(trigrammes)
+        approches = (communs >= 0.5) & np.isinf(scores)
+        scores[approches] = 4 - communs[approches]
+
+    masque = np.zeros(len(names), dtype=bool)
+    masque[allowed] = True
+    candidats = np.flatnonzero(masque & np.isfinite(scores))
+    # Tri stable par score : les positions étant alphabétiques, l'ordre alphabétique départage
+    candidats = candidats[np.argsort(scores[candidats], kind="stable")]
+    return names[candidats[:limit]].tolist()
+
+
+def supplier_picker(directory, year=None, month=None, key="fournisseur", limit=VENDOR_PICKER_LIMIT):
+    """Affiche dans la barre latérale la recherche de fournisseur (saisie puis liste filtrée)
+
+    Seuls les meilleurs résultats sont envoyés au navigateur, quel que soit le nombre
+    de fournisseurs du jeu de données.
+
+    Args:
+        directory: annuaire construit par build_supplier_directory
+        year: année sélectionnée (ou texte pour toutes les années)
+        month: mois sélectionné (ou texte pour tous les mois)
+        key: préfixe unique des widgets
+        limit: nombre maximal de fournisseurs proposés
+
+    Returns:
+        Nom du fournisseur choisi, ou ALL_VENDORS
+    """
+    allowed = available_suppliers(directory, year, month)
+    recherche = st.sidebar.text_input(
+        "Rechercher un fournisseur",
+        key=f"{key}_recherche",
+        placeholder="Nom ou code fournisseur..."
+    )
+    resultats = search_suppliers(directory, recherche, allowed, limit)
+
+    # Conserver le fournisseur déjà choisi s'il reste disponible, même hors des résultats affichés
+    choix_key = f"{key}_choix"
+    choix = st.session_state.get(choix_key, ALL_VENDORS)
+    if choix != ALL_VENDORS and choix not in resultats:
+        position = directory["position"].get(choix)
+        if position is not None and position in allowed:
+            resultats = [choix] + resultats
+        else:
+            st.session_state[choix_key] = ALL_VENDORS
+
+    selected_vendor = st.sidebar.selectbox("Choisissez un fournisseur", [ALL_VENDORS] + resultats, key=choix_key)
+    if len(allowed) > limit:
+        st.sidebar.caption(f"{len(allowed)} fournisseurs disponibles : saisissez un nom ou un code pour affiner la liste")
+    return selected_vendor
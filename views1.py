@@ -0,0 +1,91 @@
+import importlib
+import sys
+import time
+
+import pandas as pd
+import streamlit as st
+
+
+# Registre des vues : nom de la vue -> (module, fonction)
+# Les modules d'analyse (plotly, calculs) ne sont importés qu'au premier affichage de la vue
+VIEW_REGISTRY = {
+    "part_one": ("part1", "part_one"),
+    "part_two": ("part2", "part_two"),
+    "part_three": ("part3", "part_three"),
+    "part_four": ("part4", "part_four"),
+    "part_five": ("part5", "part_five"),
+    "part1_one": ("part1_one", "part1_one"),
+    "part1_two": ("part1_two", "part1_two"),
+    "part1_three": ("part1_three", "part1_three"),
+    "part1_four": ("part1_four", "part1_four"),
+    "part1_five": ("part1_five", "part1_five"),
+    "camembert1": ("part1_one", "camembert1"),
+    "camembert2": ("part1_two", "camembert2"),
+    "camembert3": ("part1_three", "camembert3"),
+    "camembert4": ("part1_four", "camembert4"),
+    "camembert5": ("part1_five", "camembert5"),
+    "analyser_gamme": ("gamme", "analyser_gamme"),
+    "tendance_glissante": ("tendance", "tendance_glissante"),
+    "show_delay_quantiles": ("quantile1", "show_delay_quantiles"),
+    "show_value_kpis": ("value1", "show_value_kpis"),
+    "show_supplier_heatmap": ("heatmap1", "show_supplier_heatmap"),
+    "show_threshold_whatif": ("whatif1", "show_threshold_whatif"),
+    "show_anomalies": ("anomaly1", "show_anomalies"),
+    "show_supplier_segments": ("segment1", "show_supplier_segments"),
+    "show_dual_sourcing": ("sourcing1", "show_dual_sourcing"),
+    "show_alerts": ("alert1", "show_alerts"),
+    "show_quality_report": ("quality1", "show_quality_report"),
+    "setup_period_filter": ("part22", "setup_period_filter")
+}
+
+# Durée d'import (en secondes) de chaque module chargé via le registre
+_IMPORT_TIMES = {}
+
+
+def view(name):
+    """Renvoie la fonction d'affichage d'une vue, en important son module au premier appel
+
+    Args:
+        name: nom de la vue dans VIEW_REGISTRY
+
+    Returns:
+        Fonction de la vue
+    """
+    module_name, function_name = VIEW_REGISTRY[name]
+    module = sys.modules.get(module_name)
+    if module is None:
+        debut = time.perf_counter()
+        module = importlib.import_module(module_name)
+        _IMPORT_TIMES[module_name] = time.perf_counter() - debut
+    return getattr(module, function_name)
+
+
+def import_profile():
+    """Renvoie le profil des imports différés (module, durée en ms), du plus lent au plus rapide
+
+    Les durées incluent les dépendances importées pour la première fois par le module
+    (plotly, matplotlib...) : le premier module qui les charge en porte le coût.
+    """
+    profil = pd.DataFrame(
+        [(module, duree * 1000) for module, duree in _IMPORT_TIMES.items()],
+        columns=["Module", "Import (ms)"]
+    )
+    return profil.sort_values("Import (ms)", ascending=False).reset_index(drop=True)
+
+
+def show_import_profile():
+    """Affiche dans la barre latérale le profil des imports différés (avec ?profil=1 dans l'URL)"""
+    if st.query_params.get("profil") != "1":
+        return
+    with st.sidebar.expander("Profil des imports", expanded=False):
+        profil = import_profile()
+        if profil.empty:
+            st.caption("Aucune vue chargée pour le moment.")
+            return
+        st.dataframe(
+            profil,
+            hide_index=True,
+            use_container_width=True,
+            column_config={"Import (ms)": st.column_config.NumberColumn(format="%.1f")}
+        )
+        st.caption(f"Total : {profil['Import (ms)'].sum():.0f} ms")
@@ -0,0 +1,203 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+from format1 import *
+from table1 import *
+from chart1 import data_fingerprint
+from compare1 import STATUS_ORDER, STATUS_THRESHOLDS
+from quantile1 import SKETCH_CELLS, selection_mask
+
+
+# Bornes des histogrammes d'écart (jours entiers) ; les écarts au-delà sont cumulés dans les classes extrêmes
+GAP_MIN = -60
+GAP_MAX = 120
+
+# Plage proposée pour les seuils : strictement à l'intérieur des bornes, les comptes restent exacts
+WHATIF_RANGE = (-30, 60)
+
+# Statuts comptés comme livrés à temps
+_ON_TIME = STATUS_ORDER[:2]
+
+
+def build_gap_histograms(df, fingerprint=None):
+    """Construit une seule fois par jeu de données l'histogramme des écarts de chaque cellule
+
+    Une cellule est une combinaison (année, mois, fournisseur, gamme, statut, type VC) : tout
+    filtre de la barre latérale est une union de cellules. Chaque jour k de GAP_MIN à GAP_MAX
+    a deux classes : écart égal à k, puis écart strictement entre k et k + 1. Les seuils
+    entiers tombant ainsi sur des bornes de classe, les écarts décimaux reçoivent le même
+    statut qu'avec compare1.delivery_status. Une dernière classe compte les écarts manquants
+    (classés « Long délai », comme dans la catégorisation ligne par ligne).
+    Le résultat est partagé entre les réexécutions et ne doit pas être modifié.
+
+    Args:
+        df: DataFrame des délais de livraison (complet)
+        fingerprint: empreinte identifiant df, calculée une fois à l'import ; sans elle,
+            toutes les lignes de df sont hachées à chaque appel
+
+    Returns:
+        Dictionnaire : "cells" (DataFrame des colonnes de cellule, une ligne par cellule)
+        et "counts" (tableau NumPy cellules x classes)
+    """
+    return _gap_histograms(fingerprint or data_fingerprint(df), df)
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _gap_histograms(fingerprint, _df):
+    """Histogrammes de build_gap_histograms, mis en cache sous l'empreinte (_df n'est pas haché)"""
+    cellules = [col for col in SKETCH_CELLS if col in _df.columns]
+    nb_classes = 2 * (GAP_MAX - GAP_MIN + 1) + 1
+    ecart = pd.to_numeric(_df["Écart de délai"], errors="coerce").to_numpy(dtype=float)
+    manquant = np.isnan(ecart)
+    ecart = np.clip(np.nan_to_num(ecart), GAP_MIN, GAP_MAX)
+    jours = np.floor(ecart)
+    classes = np.where(manquant, nb_classes - 1, 2 * (jours - GAP_MIN) + (ecart > jours)).astype(int)
+
+    codes = _df.groupby(cellules, dropna=False, observed=True, sort=False).ngroup().to_numpy()
+    _, premieres = np.unique(codes, return_index=True)
+    cells = _df[cellules].iloc[premieres].reset_index(drop=True)
+    for col in cellules:
+        cells[col] = cells[col].astype("category")
+
+    counts = np.bincount(codes * nb_classes + classes, minlength=len(cells) * nb_classes)
+    return {"cells": cells, "counts": counts.reshape(len(cells), nb_classes).astype(np.int32)}
+
+
+def selection_histograms(histograms, selection=None, by=None):
+    """Additionne les histogrammes des cellules d'une sélection, globalement ou par groupe
+
+    Args:
+        histograms: histogrammes construits par build_gap_histograms
+        selection: sélection de cellules (voir quantile1.selection_mask), None = tout
+        by: colonne de cellule par laquelle regrouper (fournisseur, gamme...), None = total
+
+    Returns:
+        (index des groupes, tableau NumPy groupes x classes)
+    """
+    cells = histograms["cells"]
+    masque = selection_mask(cells, selection)
+
+    counts = histograms["counts"][masque]
+    if by is None:
+        return pd.RangeIndex(1), counts.sum(axis=0, keepdims=True)
+    groupes = pd.DataFrame(counts).groupby(cells.loc[masque, by].to_numpy(), dropna=False).sum()
+    return pd.Index(groupes.index, name=by), groupes.to_numpy()
+
+
+def status_counts(histograms, thresholds=STATUS_THRESHOLDS):
+    """Nombre de lignes par statut pour des seuils donnés, par sommes cumulées des histogrammes
+
+    Args:
+        histograms: tableau groupes x classes (voir selection_histograms)
+        thresholds: (début de la fenêtre « à temps », fin de cette fenêtre, fin du retard accepté),
+            compris dans WHATIF_RANGE
+
+    Returns:
+        Tableau NumPy groupes x statuts (dans l'ordre de STATUS_ORDER)
+    """
+    debut, fin, accepte = thresholds
+    ecarts = histograms[:, :-1]
+    cumul = np.concatenate([np.zeros((len(histograms), 1)), np.cumsum(ecarts, axis=1)], axis=1)
+
+    def avant(jours):
+        # Lignes dont l'écart est strictement inférieur à `jours` jours
+        return cumul[:, 2 * (jours - GAP_MIN)]
+
+    def jusqua(jours):
+        # Lignes dont l'écart est d'au plus `jours` jours
+        return cumul[:, 2 * (jours - GAP_MIN) + 1]
+
+    # Mêmes bornes que delivery_status : le retard accepté commence à fin + 1 jour
+    avance = avant(debut)
+    a_temps = jusqua(fin) - avance
+    retard = np.maximum(jusqua(accepte) - avant(fin + 1), 0)
+    long_delai = histograms.sum(axis=1) - avance - a_temps - retard
+    return np.column_stack([avance, a_temps, retard, long_delai])
+
+
+def status_shares(histograms, thresholds=STATUS_THRESHOLDS, index=None):
+    """Parts (%) de chaque statut pour des seuils donnés
+
+    Returns:
+        DataFrame : "Lignes" puis une colonne par statut (en %)
+    """
+    comptes = status_counts(histograms, thresholds)
+    lignes = comptes.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        parts = np.where(lignes[:, None] > 0, comptes / lignes[:, None] * 100, np.nan)
+    table = pd.DataFrame(parts, columns=STATUS_ORDER, index=index)
+    table.insert(0, "Lignes", lignes.astype(int))
+    return table
+
+
+def show_threshold_whatif(df, selection, by="Nom du fournisseur", fingerprint=None):
+    """Affiche la simulation des seuils de statut pour la sélection courante
+
+    Les parts de statut sont recalculées à partir des histogrammes d'écart stockés par cellule :
+    déplacer un seuil ne relit aucune ligne de livraison.
+
+    Args:
+        df: DataFrame des délais de livraison complet (histogrammes construits une fois)
+        selection: dictionnaire {colonne de cellule: valeur ou liste}, None pour « tous »
+        by: colonne de détail du tableau (fournisseur ou gamme)
+        fingerprint: empreinte de df (voir build_gap_histograms)
+    """
+    histograms = build_gap_histograms(df, fingerprint)
+    _, total = selection_histograms(histograms, selection)
+    if not total.sum():
+        return
+
+    with st.expander("🎚️ Simulation des seuils de statut", expanded=False):
+        debut_defaut, fin_defaut, accepte_defaut = STATUS_THRESHOLDS
+        col1, col2 = st.columns(2)
+        with col1:
+            debut, fin = st.slider(
+                "Fenêtre « À temps » (jours d'écart)", *WHATIF_RANGE,
+                value=(debut_defaut, fin_defaut), key="whatif_fenetre"
+            )
+        with col2:
+            accepte = st.slider(
+                "Fin du « Retard accepté » (jours d'écart)", *WHATIF_RANGE,
+                value=accepte_defaut, key="whatif_accepte"
+            )
+        if accepte < fin:
+            st.caption("La fin du retard accepté ne peut précéder la fin de la fenêtre à temps : elle est ramenée à celle-ci.")
+            accepte = fin
+        seuils = (debut, fin, accepte)
+
+        actuel = status_shares(total, STATUS_THRESHOLDS).iloc[0]
+        simule = status_shares(total, seuils).iloc[0]
+        st.caption(
+            f"Actuel : à temps de {debut_defaut} à {fin_defaut} j, retard accepté jusqu'à {accepte_defaut} j. "
+            f"Simulé : à temps de {debut} à {fin} j, retard accepté jusqu'à {accepte} j "
+            f"({format_number_array([actuel['Lignes']])[0]} lignes)."
+        )
+        couleurs_delta = {"En avance": "off", "À temps": "normal", "Retard accepté": "off", "Long délai": "inverse"}
+        colonnes = st.columns(len(STATUS_ORDER))
+        for col, statut in zip(colonnes, STATUS_ORDER):
+            with col:
+                st.metric(
+                    f"{statut} (%)", f"{simule[statut]:.1f}",
+                    delta=f"{simule[statut] - actuel[statut]:+.1f} pts",
+                    delta_color=couleurs_delta[statut]
+                )
+
+        index, groupes = selection_histograms(histograms, selection, by)
+        if len(index) < 2:
+            return
+        actuel = status_shares(groupes, STATUS_THRESHOLDS, index)
+        simule = status_shares(groupes, seuils, index)
+        detail = pd.DataFrame({
+            "Lignes": actuel["Lignes"],
+            "À temps actuel (%)": actuel[_ON_TIME].sum(axis=1),
+            "À temps simulé (%)": simule[_ON_TIME].sum(axis=1),
+        })
+        detail["Variation (pts)"] = detail["À temps simulé (%)"] - detail["À temps actuel (%)"]
+        for statut in STATUS_ORDER:
+            detail[f"{statut} simulé (%)"] = simule[statut]
+        detail = detail[detail["Lignes"] > 0].sort_values("Lignes", ascending=False)
+        detail = detail.reset_index().rename(columns={"Nom du fournisseur": "Fournisseur", "Prodline Name": "Gamme"})
+
+        pourcentages = [col for col in detail.columns if col.endswith("(%)")]
+        config = numeric_column_config(thousands=["Lignes"], percent=pourcentages, decimals={"Variation (pts)": 1})
+        paged_table(detail, key="whatif_detail", column_config=config, file_name="simulation_seuils.csv")
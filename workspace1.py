@@ -0,0 +1,272 @@
+import json
+import re
+import shutil
+import time
+from datetime import date, datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import streamlit as st
+
+
+# Dossier des espaces de travail enregistrés (un sous-dossier par espace)
+WORKSPACE_DIR = Path("workspaces")
+
+# Compression des tables Arrow (Feather v2) : LZ4, bien plus rapide à décompresser que zstd
+# pour une taille proche ; nom du fichier de description.
+# Un fichier compressé est bien projeté en mémoire (memory map), mais chaque bloc est
+# décompressé en RAM à la lecture : la projection évite la copie du fichier, pas la
+# décompression. Avec WORKSPACE_COMPRESSION = "uncompressed", les colonnes numériques sont
+# lues sans copie, au prix de fichiers plus gros.
+WORKSPACE_COMPRESSION = "lz4"
+WORKSPACE_MANIFEST = "workspace.json"
+
+# Types des valeurs d'une colonne mixte, enregistrés à côté de son texte pour la restaurer
+MIXED_TYPES = {str: 0, int: 1, float: 2, bool: 3}
+MIXED_PREFIX = "__types__"
+
+# Données de la session enregistrées : tables traitées et agrégats dérivés (alertes, rapport qualité)
+WORKSPACE_DATA_KEYS = ["df1", "df2", "alerts", "quality"]
+
+# Filtres enregistrés (clés des widgets de la barre latérale)
+WORKSPACE_FILTER_KEYS = [
+    "anomalies_exclure", "anomalies_portee", "filtre_annee", "filtre_mois",
+    "fournisseur_recherche", "fournisseur_choix", "filtre_gamme", "filtre_statut",
+    "period_mode", "period_window"
+]
+WORKSPACE_FILTER_PREFIXES = ("period_dates_",)
+
+
+def _mixed_type(value):
+    """Code MIXED_TYPES d'une valeur (entiers et flottants NumPy compris ; texte par défaut)"""
+    if isinstance(value, (bool, np.bool_)):
+        return MIXED_TYPES[bool]
+    if isinstance(value, (int, np.integer)):
+        return MIXED_TYPES[int]
+    if isinstance(value, (float, np.floating)):
+        return MIXED_TYPES[float]
+    return MIXED_TYPES[str]
+
+
+def _to_table(df):
+    """Convertit un DataFrame en table Arrow
+
+    Une colonne texte mêlant des types (codes matériel ou fournisseur numériques et
+    alphanumériques) n'a pas d'équivalent Arrow : elle est enregistrée en texte, avec une
+    colonne MIXED_PREFIX + nom donnant le type de chaque valeur (voir _restore_mixed).
+
+    Returns:
+        (table Arrow, colonnes mixtes enregistrées en texte)
+    """
+    try:
+        return pa.Table.from_pandas(df), []
+    except (pa.ArrowTypeError, pa.ArrowInvalid):
+        df = df.copy()
+        textes = []
+        for col in df.columns[(df.dtypes == object).to_numpy()]:
+            try:
+                pa.array(df[col], from_pandas=True)
+            except (pa.ArrowTypeError, pa.ArrowInvalid):
+                presentes = df[col].notna().to_numpy()
+                df[MIXED_PREFIX + str(col)] = np.fromiter(map(_mixed_type, df[col]), dtype=np.int8, count=len(df))
+                df[col] = df[col].astype(str).where(presentes)
+                textes.append(str(col))
+        return pa.Table.from_pandas(df), textes
+
+
+def _restore_mixed(df, columns):
+    """Rend leurs types d'origine aux colonnes mixtes enregistrées en texte par _to_table"""
+    for col in columns:
+        types = df.pop(MIXED_PREFIX + col).to_numpy()
+        valeurs = df[col].to_numpy(dtype=object).copy()
+        for type_python, code in MIXED_TYPES.items():
+            if type_python is str:
+                continue
+            positions = np.flatnonzero(types == code)
+            convertir = (lambda texte: texte == "True") if type_python is bool else type_python
+            valeurs[positions] = [convertir(texte) for texte in valeurs[positions]]
+        df[col] = valeurs
+    return df
+
+
+def _flatten(value, tables):
+    """Remplace les DataFrames d'une structure (dictionnaires, listes) par une référence de table
+
+    Les tables sont ajoutées à `tables` ; le reste est rendu sérialisable en JSON
+    (dates, tuples et scalaires NumPy sont balisés ou convertis).
+    """
+    if isinstance(value, pd.DataFrame):
+        tables.append(value)
+        return {"__table__": len(tables) - 1}
+    if isinstance(value, dict):
+        return {"__dict__": [[_flatten(k, tables), _flatten(v, tables)] for k, v in value.items()]}
+    if isinstance(value, tuple):
+        return {"__tuple__": [_flatten(v, tables) for v in value]}
+    if isinstance(value, list):
+        return [_flatten(v, tables) for v in value]
+    if isinstance(value, (pd.Timestamp, datetime)):
+        return {"__timestamp__": pd.Timestamp(value).isoformat()}
+    if isinstance(value, date):
+        return {"__date__": value.isoformat()}
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _unflatten(value, tables):
+    """Reconstruit une structure enregistrée par _flatten à partir des tables relues"""
+    if isinstance(value, list):
+        return [_unflatten(v, tables) for v in value]
+    if not isinstance(value, dict):
+        return value
+    if "__table__" in value:
+        return tables[value["__table__"]]
+    if "__dict__" in value:
+        return {_unflatten(k, tables): _unflatten(v, tables) for k, v in value["__dict__"]}
+    if "__tuple__" in value:
+        return tuple(_unflatten(v, tables) for v in value["__tuple__"])
+    if "__timestamp__" in value:
+        return pd.Timestamp(value["__timestamp__"])
+    if "__date__" in value:
+        return date.fromisoformat(value["__date__"])
+    return value
+
+
+def _filter_state(state):
+    """Valeurs des filtres de la session à enregistrer"""
+    return {
+        key: state[key] for key in state
+        if key in WORKSPACE_FILTER_KEYS or str(key).startswith(WORKSPACE_FILTER_PREFIXES)
+    }
+
+
+def list_workspaces(directory=WORKSPACE_DIR):
+    """Espaces de travail enregistrés, du plus récent au plus ancien
+
+    Returns:
+        Liste de dictionnaires {"Nom", "Enregistré le", "Lignes", "Dossier"}
+    """
+    espaces = []
+    for manifeste in Path(directory).glob(f"*/{WORKSPACE_MANIFEST}"):
+        try:
+            description = json.loads(manifeste.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        espaces.append({
+            "Nom": description.get("name", manifeste.parent.name),
+            "Enregistré le": description.get("saved", ""),
+            "Lignes": description.get("rows", {}),
+            "Dossier": manifeste.parent
+        })
+    return sorted(espaces, key=lambda espace: espace["Enregistré le"], reverse=True)
+
+
+def save_workspace(state, name, directory=WORKSPACE_DIR):
+    """Enregistre les données traitées, les agrégats dérivés et les filtres de la session
+
+    Chaque DataFrame (df1, df2, cellules et alertes, rapport qualité) est écrit dans un
+    fichier Arrow IPC (Feather v2) compressé ; la structure qui les relie et les filtres sont
+    décrits dans un fichier JSON. Un espace de même nom est remplacé.
+
+    Args:
+        state: état de session (ou dictionnaire) contenant WORKSPACE_DATA_KEYS
+        name: nom de l'espace de travail
+        directory: dossier des espaces de travail
+
+    Returns:
+        Dossier de l'espace enregistré
+    """
+    dossier = Path(directory) / (re.sub(r"[^\w\-]+", "_", name).strip("_") or "espace")
+    temporaire = dossier.with_name(dossier.name + ".tmp")
+    shutil.rmtree(temporaire, ignore_errors=True)
+    temporaire.mkdir(parents=True)
+
+    tables = []
+    donnees = _flatten({key: state.get(key) for key in WORKSPACE_DATA_KEYS}, tables)
+    textes = {}
+    for i, table in enumerate(tables):
+        table_arrow, colonnes = _to_table(table)
+        if colonnes:
+            textes[str(i)] = colonnes
+        feather.write_feather(table_arrow, temporaire / f"{i}.feather", compression=WORKSPACE_COMPRESSION)
+
+    description = {
+        "name": name,
+        "saved": datetime.now().isoformat(timespec="seconds"),
+        "rows": {key: len(state[key]) for key in ("df1", "df2") if state.get(key) is not None},
+        "tables": len(tables),
+        "text_columns": textes,
+        "data": donnees,
+        "filters": _flatten(_filter_state(state), [])
+    }
+    (temporaire / WORKSPACE_MANIFEST).write_text(json.dumps(description, ensure_ascii=False), encoding="utf-8")
+
+    # Remplacement en une fois : un espace n'est jamais laissé à moitié écrit
+    shutil.rmtree(dossier, ignore_errors=True)
+    temporaire.rename(dossier)
+    return dossier
+
+
+def load_workspace(folder):
+    """Relit un espace de travail : tables projetées en mémoire (memory map) puis converties
+
+    Les blocs compressés sont décompressés à la lecture (voir WORKSPACE_COMPRESSION) ; les
+    colonnes mixtes retrouvent leurs types d'origine, les tables relues étant identiques à
+    celles enregistrées.
+
+    Args:
+        folder: dossier de l'espace (voir list_workspaces)
+
+    Returns:
+        (données {clé de WORKSPACE_DATA_KEYS: valeur}, filtres {clé de widget: valeur})
+    """
+    dossier = Path(folder)
+    description = json.loads((dossier / WORKSPACE_MANIFEST).read_text(encoding="utf-8"))
+    mixtes = description.get("text_columns", {})
+    tables = [
+        _restore_mixed(feather.read_table(dossier / f"{i}.feather", memory_map=True).to_pandas(), mixtes.get(str(i), []))
+        for i in range(description["tables"])
+    ]
+    return _unflatten(description["data"], tables), _unflatten(description["filters"], [])
+
+
+def show_workspace_save(key="espace"):
+    """Affiche dans la barre latérale l'enregistrement de l'espace de travail courant"""
+    with st.sidebar.expander("💾 Enregistrer l'espace de travail", expanded=False):
+        nom = st.text_input("Nom", value=f"Analyse du {datetime.now():%d-%m-%Y}", key=f"{key}_nom")
+        if st.button("Enregistrer", key=f"{key}_enregistrer", use_container_width=True):
+            debut = time.perf_counter()
+            dossier = save_workspace(st.session_state, nom)
+            st.success(f"Espace « {nom} » enregistré en {time.perf_counter() - debut:.1f} s ({dossier})")
+
+
+def show_workspace_open(key="espace"):
+    """Propose de rouvrir un espace de travail enregistré à la place d'un nouvel import
+
+    Les données, agrégats et filtres relus sont placés dans l'état de session, puis la page
+    est relancée comme après un import.
+    """
+    espaces = list_workspaces()
+    if not espaces:
+        return
+    st.markdown("<p>Ou rouvrir un espace de travail enregistré :</p>", unsafe_allow_html=True)
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        choix = st.selectbox(
+            "Espace de travail", range(len(espaces)), key=f"{key}_choix",
+            format_func=lambda i: f"{espaces[i]['Nom']} ({espaces[i]['Enregistré le'].replace('T', ' ')}, "
+                                  f"{espaces[i]['Lignes'].get('df1', 0)} livraisons)"
+        )
+    with col2:
+        st.markdown("<div style='height: 28px'></div>", unsafe_allow_html=True)
+        ouvrir = st.button("Ouvrir", key=f"{key}_ouvrir", use_container_width=True)
+    if ouvrir:
+        donnees, filtres = load_workspace(espaces[choix]["Dossier"])
+        for cle, valeur in {**donnees, **filtres}.items():
+            if valeur is not None:
+                st.session_state[cle] = valeur
+        st.session_state.files_uploaded = True
+        st.rerun()